@@ -0,0 +1,67 @@
+"""Add durable SEC event queue
+
+Revision ID: 20250825_sec_event_queue
+Revises: 20250820_final_company_security
+Create Date: 2025-08-25 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20250825_sec_event_queue'
+down_revision = '20250820_final_company_security'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sec_event_queue",
+        sa.Column("event_id", sa.BigInteger, primary_key=True, autoincrement=True),
+        sa.Column("queue", sa.Text, nullable=False),  # entity_resolution, signal_evaluation, review
+        sa.Column("event_type", sa.Text, nullable=False),  # trial_event, clinical_update, review_item
+        sa.Column("dedupe_key", sa.Text, nullable=False),
+        sa.Column("filing_id", sa.Text),
+        sa.Column("company_cik", sa.BigInteger),
+        sa.Column(
+            "payload",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=False,
+            server_default=sa.text("'{}'::jsonb"),
+        ),
+        sa.Column("status", sa.Text, nullable=False, server_default=sa.text("'pending'")),
+        sa.Column("attempts", sa.Integer, nullable=False, server_default=sa.text("0")),
+        sa.Column("leased_by", sa.Text),
+        sa.Column("lease_expires_at", sa.TIMESTAMP(timezone=True)),
+        sa.Column("last_error", sa.Text),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+        sa.Column("processed_at", sa.TIMESTAMP(timezone=True)),
+    )
+    op.create_check_constraint(
+        "ck_sec_event_queue_status",
+        "sec_event_queue",
+        "status IN ('pending','leased','done','failed')",
+    )
+    # Idempotent appends: replaying a filing does not duplicate events
+    op.create_unique_constraint(
+        "uq_sec_event_queue_queue_dedupe", "sec_event_queue", ["queue", "dedupe_key"]
+    )
+    # Lease scans only touch claimable rows
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS sec_event_queue_claimable_idx "
+        "ON sec_event_queue (queue, event_id) WHERE status IN ('pending','leased')"
+    )
+    op.create_index("sec_event_queue_filing_idx", "sec_event_queue", ["filing_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("sec_event_queue_filing_idx", table_name="sec_event_queue")
+    op.execute("DROP INDEX IF EXISTS sec_event_queue_claimable_idx")
+    op.drop_table("sec_event_queue")
@@ -0,0 +1,36 @@
+"""Track processed EX-21 exhibits for incremental subsidiary harvesting
+
+Revision ID: 20250826_ex21_processed_exhibits
+Revises: 20250825_sec_event_queue
+Create Date: 2025-08-26 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20250826_ex21_processed_exhibits'
+down_revision = '20250825_sec_event_queue'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ex21_processed_exhibits",
+        sa.Column("accession_no", sa.Text, nullable=False),
+        sa.Column("local_path", sa.Text, nullable=False),
+        sa.Column("company_id", sa.BigInteger, nullable=False),
+        sa.Column("names_found", sa.Integer, nullable=False, server_default=sa.text("0")),
+        sa.Column(
+            "processed_at",
+            sa.TIMESTAMP(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+        sa.PrimaryKeyConstraint("accession_no", "local_path", name="pk_ex21_processed_exhibits"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("ex21_processed_exhibits")
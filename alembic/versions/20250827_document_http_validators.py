@@ -0,0 +1,25 @@
+"""Add HTTP cache validators to documents for conditional re-fetch
+
+Revision ID: 20250827_document_http_validators
+Revises: 20250826_ex21_processed_exhibits
+Create Date: 2025-08-27 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20250827_document_http_validators'
+down_revision = '20250826_ex21_processed_exhibits'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("documents", sa.Column("http_etag", sa.Text, nullable=True))
+    op.add_column("documents", sa.Column("http_last_modified", sa.Text, nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("documents", "http_last_modified")
+    op.drop_column("documents", "http_etag")
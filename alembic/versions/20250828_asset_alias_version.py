@@ -0,0 +1,48 @@
+"""Add change counter for asset_aliases
+
+Revision ID: 20250828_asset_alias_version
+Revises: 20250827_document_http_validators
+Create Date: 2025-08-28 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '20250828_asset_alias_version'
+down_revision = '20250827_document_http_validators'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Change counter bumped by any write to asset_aliases; in-memory alias
+    # indexes compare it to decide when to reload. A row (not a sequence) so
+    # the bump commits or rolls back with the write that caused it.
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS asset_aliases_version (
+            id smallint PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+            version bigint NOT NULL DEFAULT 0
+        )
+    """)
+    op.execute("INSERT INTO asset_aliases_version (id, version) VALUES (1, 0) ON CONFLICT DO NOTHING")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_asset_aliases_version() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE asset_aliases_version SET version = version + 1 WHERE id = 1;
+            RETURN NULL;
+        END;
+        $$;
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_asset_aliases_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON asset_aliases
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_asset_aliases_version()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_asset_aliases_version ON asset_aliases")
+    op.execute("DROP FUNCTION IF EXISTS bump_asset_aliases_version()")
+    op.execute("DROP TABLE IF EXISTS asset_aliases_version")
@@ -0,0 +1,39 @@
+"""Unique span key on document_entities
+
+Revision ID: 20250829_document_entity_span_key
+Revises: 20250828_asset_alias_version
+Create Date: 2025-08-29 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '20250829_document_entity_span_key'
+down_revision = '20250828_asset_alias_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keep the oldest row of any duplicated span before enforcing uniqueness
+    op.execute("""
+        DELETE FROM document_entities d
+         USING document_entities k
+         WHERE d.doc_id = k.doc_id
+           AND d.ent_type = k.ent_type
+           AND d.page_no = k.page_no
+           AND d.char_start = k.char_start
+           AND d.char_end = k.char_end
+           AND d.value_text = k.value_text
+           AND d.entity_id > k.entity_id
+    """)
+    # Bulk span writers insert with ON CONFLICT DO NOTHING on this key
+    op.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_document_entities_span
+        ON document_entities (doc_id, ent_type, page_no, char_start, char_end, value_text)
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS uq_document_entities_span")
@@ -0,0 +1,51 @@
+"""Near-duplicate fingerprints and canonical document pointer
+
+Revision ID: 20250830_document_fingerprints
+Revises: 20250829_document_entity_span_key
+Create Date: 2025-08-30 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20250830_document_fingerprints'
+down_revision = '20250829_document_entity_span_key'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Near-duplicates point at the document they copy and skip linking
+    op.add_column(
+        'documents',
+        sa.Column('canonical_doc_id', sa.BigInteger(),
+                  sa.ForeignKey('documents.doc_id', ondelete='SET NULL'), nullable=True)
+    )
+    op.create_index('ix_documents_canonical_doc_id', 'documents', ['canonical_doc_id'])
+
+    # MinHash signature of each canonical document and its LSH band keys
+    op.create_table(
+        'document_fingerprints',
+        sa.Column('doc_id', sa.BigInteger(),
+                  sa.ForeignKey('documents.doc_id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('signature', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    )
+    op.create_table(
+        'document_fingerprint_bands',
+        sa.Column('band', sa.SmallInteger(), nullable=False),
+        sa.Column('band_hash', sa.BigInteger(), nullable=False),
+        sa.Column('doc_id', sa.BigInteger(),
+                  sa.ForeignKey('documents.doc_id', ondelete='CASCADE'), nullable=False),
+        sa.PrimaryKeyConstraint('band', 'band_hash', 'doc_id'),
+    )
+    op.create_index('ix_document_fingerprint_bands_doc', 'document_fingerprint_bands', ['doc_id'])
+
+
+def downgrade() -> None:
+    op.drop_table('document_fingerprint_bands')
+    op.drop_table('document_fingerprints')
+    op.drop_index('ix_documents_canonical_doc_id', table_name='documents')
+    op.drop_column('documents', 'canonical_doc_id')
@@ -0,0 +1,108 @@
+"""Persisted resolver blocking keys per company
+
+Revision ID: 20250831_company_blocking_keys
+Revises: 20250830_document_fingerprints
+Create Date: 2025-08-31 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20250831_company_blocking_keys'
+down_revision = '20250830_document_fingerprints'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # (key_type, key) -> company: strong-token pairs, domains and drug codes
+    op.create_table(
+        'company_blocking_keys',
+        sa.Column('key_type', sa.Text(), nullable=False),
+        sa.Column('key', sa.Text(), nullable=False),
+        sa.Column('company_id', sa.Integer(),
+                  sa.ForeignKey('companies.company_id', ondelete='CASCADE'), nullable=False),
+        sa.PrimaryKeyConstraint('key_type', 'key', 'company_id'),
+    )
+    op.create_index('ix_company_blocking_keys_company', 'company_blocking_keys', ['company_id'])
+
+    # Companies whose keys must be recomputed; filled by triggers, drained by
+    # ncfd.mapping.blocking_index.sync_blocking_keys()
+    op.create_table(
+        'company_blocking_dirty',
+        sa.Column('company_id', sa.Integer(), primary_key=True),
+        sa.Column('marked_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    )
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION mark_company_blocking_dirty() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            col text := TG_ARGV[0];
+        BEGIN
+            IF TG_OP IN ('INSERT', 'UPDATE') AND (to_jsonb(NEW) ->> col) IS NOT NULL THEN
+                INSERT INTO company_blocking_dirty (company_id)
+                VALUES ((to_jsonb(NEW) ->> col)::int) ON CONFLICT DO NOTHING;
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') AND (to_jsonb(OLD) ->> col) IS NOT NULL THEN
+                INSERT INTO company_blocking_dirty (company_id)
+                VALUES ((to_jsonb(OLD) ->> col)::int) ON CONFLICT DO NOTHING;
+            END IF;
+            RETURN NULL;
+        END;
+        $$;
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION mark_trial_sponsor_blocking_dirty() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            INSERT INTO company_blocking_dirty (company_id)
+            SELECT t.sponsor_company_id
+            FROM trials t
+            WHERE t.sponsor_company_id IS NOT NULL
+              AND t.trial_id IN (
+                  CASE WHEN TG_OP <> 'DELETE' THEN NEW.trial_id END,
+                  CASE WHEN TG_OP <> 'INSERT' THEN OLD.trial_id END
+              )
+            ON CONFLICT DO NOTHING;
+            RETURN NULL;
+        END;
+        $$;
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_companies_blocking_dirty
+        AFTER INSERT OR UPDATE OF name, website_domain ON companies
+        FOR EACH ROW EXECUTE FUNCTION mark_company_blocking_dirty('company_id')
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_company_aliases_blocking_dirty
+        AFTER INSERT OR UPDATE OR DELETE ON company_aliases
+        FOR EACH ROW EXECUTE FUNCTION mark_company_blocking_dirty('company_id')
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_trials_blocking_dirty
+        AFTER INSERT OR UPDATE OF sponsor_company_id ON trials
+        FOR EACH ROW EXECUTE FUNCTION mark_company_blocking_dirty('sponsor_company_id')
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_trial_assets_blocking_dirty
+        AFTER INSERT OR UPDATE OR DELETE ON trial_assets_xref
+        FOR EACH ROW EXECUTE FUNCTION mark_trial_sponsor_blocking_dirty()
+    """)
+
+    # Backfill on the next sync
+    op.execute("INSERT INTO company_blocking_dirty (company_id) SELECT company_id FROM companies")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_trial_assets_blocking_dirty ON trial_assets_xref")
+    op.execute("DROP TRIGGER IF EXISTS trg_trials_blocking_dirty ON trials")
+    op.execute("DROP TRIGGER IF EXISTS trg_company_aliases_blocking_dirty ON company_aliases")
+    op.execute("DROP TRIGGER IF EXISTS trg_companies_blocking_dirty ON companies")
+    op.execute("DROP FUNCTION IF EXISTS mark_trial_sponsor_blocking_dirty()")
+    op.execute("DROP FUNCTION IF EXISTS mark_company_blocking_dirty()")
+    op.drop_table('company_blocking_dirty')
+    op.drop_index('ix_company_blocking_keys_company', table_name='company_blocking_keys')
+    op.drop_table('company_blocking_keys')
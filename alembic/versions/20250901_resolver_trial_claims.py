@@ -0,0 +1,37 @@
+"""Per-run trial claims for resolve-batch
+
+Revision ID: 20250901_resolver_trial_claims
+Revises: 20250831_company_blocking_keys
+Create Date: 2025-09-01 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20250901_resolver_trial_claims'
+down_revision = '20250831_company_blocking_keys'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # One row per (run, trial) once a resolve-batch worker claims the trial.
+    # Completed claims keep later workers of the same run from resolving the
+    # trial again whatever the outcome; an unfinished claim can be taken over
+    # once its lease expires.
+    op.create_table(
+        'resolver_trial_claims',
+        sa.Column('run_id', sa.Text(), nullable=False),
+        sa.Column('nct_id', sa.Text(), nullable=False),
+        sa.Column('claimed_by', sa.Text(), nullable=False),
+        sa.Column('lease_expires_at', sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column('completed_at', sa.TIMESTAMP(timezone=True)),
+        sa.Column('outcome', sa.Text()),
+        sa.PrimaryKeyConstraint('run_id', 'nct_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('resolver_trial_claims')
@@ -0,0 +1,66 @@
+"""Trigger-fed change queue for the in-process candidate index
+
+Revision ID: 20250902_company_index_changes
+Revises: 20250901_resolver_trial_claims
+Create Date: 2025-09-02 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '20250902_company_index_changes'
+down_revision = '20250901_resolver_trial_claims'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Last transaction that wrote each company or one of its aliases. Readers
+    # (ncfd.mapping.candidate_index) re-read companies whose changed_xid is at
+    # or above their watermark, the oldest transaction still running when
+    # they last looked, so late commits are never skipped. One row per
+    # company keeps the table bounded without pruning.
+    op.execute("""
+        CREATE TABLE company_index_changes (
+            company_id integer PRIMARY KEY,
+            changed_xid xid8 NOT NULL
+        )
+    """)
+    op.execute("CREATE INDEX ix_company_index_changes_xid ON company_index_changes (changed_xid)")
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION mark_company_index_changed() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.company_id IS NOT NULL THEN
+                INSERT INTO company_index_changes (company_id, changed_xid)
+                VALUES (NEW.company_id, pg_current_xact_id())
+                ON CONFLICT (company_id) DO UPDATE SET changed_xid = EXCLUDED.changed_xid;
+            END IF;
+            IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND OLD.company_id IS DISTINCT FROM NEW.company_id) THEN
+                INSERT INTO company_index_changes (company_id, changed_xid)
+                VALUES (OLD.company_id, pg_current_xact_id())
+                ON CONFLICT (company_id) DO UPDATE SET changed_xid = EXCLUDED.changed_xid;
+            END IF;
+            RETURN NULL;
+        END;
+        $$;
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_companies_index_changed
+        AFTER INSERT OR UPDATE OR DELETE ON companies
+        FOR EACH ROW EXECUTE FUNCTION mark_company_index_changed()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_company_aliases_index_changed
+        AFTER INSERT OR UPDATE OR DELETE ON company_aliases
+        FOR EACH ROW EXECUTE FUNCTION mark_company_index_changed()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_company_aliases_index_changed ON company_aliases")
+    op.execute("DROP TRIGGER IF EXISTS trg_companies_index_changed ON companies")
+    op.execute("DROP FUNCTION IF EXISTS mark_company_index_changed()")
+    op.execute("DROP TABLE IF EXISTS company_index_changes")
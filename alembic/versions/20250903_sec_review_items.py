@@ -0,0 +1,47 @@
+"""Add durable SEC review items
+
+Revision ID: 20250903_sec_review_items
+Revises: 20250902_company_index_changes
+Create Date: 2025-09-03 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20250903_sec_review_items'
+down_revision = '20250902_company_index_changes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Items SecEventProcessor flags for human review when the event queue is enabled
+    op.create_table(
+        "sec_review_items",
+        sa.Column("item_id", sa.Text, primary_key=True),
+        sa.Column("filing_id", sa.Text),
+        sa.Column("company_cik", sa.BigInteger),
+        sa.Column("item_type", sa.Text, nullable=False),  # trial_event, clinical_update
+        sa.Column("reason", sa.Text),
+        sa.Column("confidence", sa.Float),
+        sa.Column("extracted_content", sa.Text),
+        sa.Column(
+            "evidence_spans",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=False,
+            server_default=sa.text("'[]'::jsonb"),
+        ),
+        sa.Column("flagged_at", sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.Column("assigned_to", sa.Text),
+        sa.Column("review_status", sa.Text, nullable=False, server_default=sa.text("'pending'")),
+        sa.Column("review_notes", sa.Text),
+        sa.Column("reviewed_at", sa.TIMESTAMP(timezone=True)),
+    )
+    op.create_index("sec_review_items_status_idx", "sec_review_items", ["review_status", "flagged_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("sec_review_items_status_idx", table_name="sec_review_items")
+    op.drop_table("sec_review_items")
@@ -126,6 +126,7 @@ def demo_enhanced_span_capture():
         doc_id=1,
         page_no=1
     )
+    span_capture.flush()
     
     print(f"   ✅ Captured {len(spans)} entity spans:")
     
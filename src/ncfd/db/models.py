@@ -7,7 +7,7 @@ from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from sqlalchemy import (
     String, Text, Boolean, Date, DateTime, ForeignKey, Index,
     UniqueConstraint, Integer, BigInteger, CheckConstraint, event, func,
-    PrimaryKeyConstraint, Numeric
+    PrimaryKeyConstraint, Numeric, LargeBinary, SmallInteger
 )
 
 from sqlalchemy.dialects.postgresql import ARRAY, JSONB, DATERANGE, ENUM as PGEnum
@@ -460,6 +460,11 @@ class Document(Base):
     status: Mapped[str] = mapped_column(Text, server_default="discovered", nullable=False)  # discovered, fetched, parsed, indexed, linked, ready_for_card, card_built, error
     error_msg: Mapped[Optional[str]] = mapped_column(Text)
     crawl_run_id: Mapped[Optional[str]] = mapped_column(Text)
+    # HTTP validators from the last fetch, sent back as If-None-Match / If-Modified-Since
+    http_etag: Mapped[Optional[str]] = mapped_column(Text)
+    http_last_modified: Mapped[Optional[str]] = mapped_column(Text)
+    # Set on near-duplicates: the document this one copies (linking is skipped)
+    canonical_doc_id: Mapped[Optional[int]] = mapped_column(ForeignKey("documents.doc_id", ondelete="SET NULL"))
 
     text_pages: Mapped[List["DocumentTextPage"]] = relationship(
         back_populates="document",
@@ -500,6 +505,7 @@ class Document(Base):
         Index("ix_documents_published_at", "published_at"),
         Index("ix_documents_status", "status"),
         Index("ix_documents_type_date", "source_type", "published_at", postgresql_ops={"published_at": "DESC"}),
+        Index("ix_documents_canonical_doc_id", "canonical_doc_id"),
     )
 
 
@@ -581,6 +587,7 @@ class DocumentEntity(Base):
         Index("ix_docents_doc", "doc_id"),
         Index("ix_docents_type", "ent_type"),
         Index("ix_document_entities_confidence", "confidence"),
+        Index("uq_document_entities_span", "doc_id", "ent_type", "page_no", "char_start", "char_end", "value_text", unique=True),
         CheckConstraint("confidence IS NULL OR (confidence >= 0 AND confidence <= 1)", name="ck_document_entities_confidence"),
     )
 
@@ -598,6 +605,26 @@ class DocumentCitation(Base):
     document: Mapped["Document"] = relationship(back_populates="citations")
 
 
+class DocumentFingerprint(Base):
+    __tablename__ = "document_fingerprints"
+
+    doc_id: Mapped[int] = mapped_column(ForeignKey("documents.doc_id", ondelete="CASCADE"), primary_key=True)
+    signature: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)  # 128 little-endian uint32 MinHash values
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class DocumentFingerprintBand(Base):
+    __tablename__ = "document_fingerprint_bands"
+
+    band: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    band_hash: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    doc_id: Mapped[int] = mapped_column(ForeignKey("documents.doc_id", ondelete="CASCADE"), primary_key=True)
+
+    __table_args__ = (
+        Index("ix_document_fingerprint_bands_doc", "doc_id"),
+    )
+
+
 class DocumentNote(Base):
     __tablename__ = "document_notes"
 
@@ -0,0 +1,138 @@
+"""
+Process-wide cache of database schema introspection.
+
+Code that adapts to optional tables and columns (securities' exchange
+column, auto-detected EDGAR tables) used to query `information_schema` on
+every call. `get_schema()` reads the catalog once per database URL and
+serves lookups from memory. A snapshot is tied to the Alembic revision in
+`alembic_version`, re-read at most once per `check_interval` seconds, so a
+migration invalidates it and anything memoized on it (such as generated
+SQL) without a restart.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+def _read_revision(session: Session) -> Optional[str]:
+    """Current Alembic revision, or None if migrations are not installed."""
+    try:
+        with session.begin_nested():
+            row = session.execute(text("SELECT version_num FROM alembic_version")).first()
+    except Exception:
+        return None
+    return row[0] if row else None
+
+
+def _read_columns(session: Session) -> Dict[str, Set[str]]:
+    """Lower-cased `schema.table` → column names for all user tables."""
+    rows = session.execute(
+        text(
+            """
+            SELECT lower(table_schema) AS sch, lower(table_name) AS tbl, lower(column_name) AS col
+            FROM information_schema.columns
+            WHERE table_schema NOT IN ('pg_catalog','information_schema')
+        """
+        )
+    ).fetchall()
+    out: Dict[str, Set[str]] = {}
+    for sch, tbl, col in rows:
+        out.setdefault(f"{sch}.{tbl}", set()).add(col)
+    return out
+
+
+class SchemaSnapshot:
+    """Tables and columns of one database at one Alembic revision."""
+
+    def __init__(self, revision: Optional[str], columns: Dict[str, Set[str]]):
+        self.revision = revision
+        self.columns_by_table = columns
+        self._by_name: Dict[str, Set[str]] = {}
+        for full, cols in columns.items():
+            self._by_name.setdefault(full.split(".", 1)[-1], set()).update(cols)
+        self._memo: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def has_table(self, table: str) -> bool:
+        """True if a table of this name exists in any schema."""
+        return table.lower() in self._by_name
+
+    def has_column(self, table: str, column: str) -> bool:
+        """True if a table of this name in any schema has the column."""
+        return column.lower() in self._by_name.get(table.lower(), ())
+
+    def memo(self, key: str, build: Callable[[], Any]) -> Any:
+        """Value derived from this snapshot, built once and dropped with it."""
+        with self._lock:
+            if key not in self._memo:
+                self._memo[key] = build()
+            return self._memo[key]
+
+
+class SchemaCache:
+    """Schema snapshots keyed by database URL."""
+
+    def __init__(self, check_interval: float = 60.0):
+        """
+        Initialize an empty cache.
+
+        Args:
+            check_interval: Minimum seconds between Alembic revision checks
+        """
+        self.check_interval = check_interval
+        self._entries: Dict[str, SchemaSnapshot] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(session: Session) -> str:
+        return session.get_bind().url.render_as_string(hide_password=True)
+
+    def get(self, session: Session) -> SchemaSnapshot:
+        """Snapshot for the session's database, reloading after a migration."""
+        key = self._key(session)
+        now = time.monotonic()
+        snapshot = self._entries.get(key)
+        if snapshot is not None and now - self._checked_at.get(key, 0.0) < self.check_interval:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._entries.get(key)
+            if snapshot is not None and now - self._checked_at.get(key, 0.0) < self.check_interval:
+                return snapshot
+
+            revision = _read_revision(session)
+            if snapshot is None or revision != snapshot.revision:
+                snapshot = SchemaSnapshot(revision, _read_columns(session))
+                self._entries[key] = snapshot
+                logger.info(
+                    f"Schema cache loaded {len(snapshot.columns_by_table)} tables at revision {revision}"
+                )
+            self._checked_at[key] = time.monotonic()
+            return snapshot
+
+    def clear(self) -> None:
+        """Forget all snapshots; the next lookup re-reads the catalog."""
+        with self._lock:
+            self._entries = {}
+            self._checked_at = {}
+
+
+_shared_cache: Optional[SchemaCache] = None
+
+
+def get_schema(session: Session) -> SchemaSnapshot:
+    """Schema snapshot for the session's database from the process-wide cache."""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = SchemaCache()
+    return _shared_cache.get(session)
@@ -0,0 +1,79 @@
+"""
+Aho–Corasick multi-pattern matcher.
+
+Builds a trie with failure links over a fixed set of patterns so that every
+occurrence of every pattern is found in a single left-to-right pass over the
+text, independent of how many patterns there are.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class AhoCorasickMatcher:
+    """Automaton over a fixed pattern set; matching is case-sensitive."""
+
+    def __init__(self, patterns: Iterable[str]):
+        """
+        Build the automaton.
+
+        Args:
+            patterns: Strings to search for (empty strings are ignored)
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._pattern: List[Optional[str]] = [None]  # Pattern ending at node
+        self._dict_link: List[int] = [0]  # Nearest terminal node on the failure chain
+
+        for pattern in patterns:
+            if pattern:
+                self._add(pattern)
+        self.pattern_count = sum(1 for p in self._pattern if p is not None)
+        self._build_links()
+
+    def _add(self, pattern: str) -> None:
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._pattern.append(None)
+                self._dict_link.append(0)
+            node = nxt
+        self._pattern[node] = pattern
+
+    def _build_links(self) -> None:
+        """Breadth-first construction of failure and dictionary-suffix links."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(ch, 0)
+                self._fail[child] = fail
+                self._dict_link[child] = fail if self._pattern[fail] is not None else self._dict_link[fail]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """
+        Yield (start, end, pattern) for every occurrence, including overlaps.
+
+        Matches are yielded in order of end position.
+        """
+        goto, fail, pattern_at, dict_link = self._goto, self._fail, self._pattern, self._dict_link
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+
+            out = node if pattern_at[node] is not None else dict_link[node]
+            while out:
+                pattern = pattern_at[out]
+                yield i + 1 - len(pattern), i + 1, pattern
+                out = dict_link[out]
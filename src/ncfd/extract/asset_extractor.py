@@ -8,9 +8,13 @@ from document text using regex patterns and normalization rules.
 import re
 import unicodedata
 import hashlib
+from bisect import bisect_left
 from datetime import datetime, timezone
-from typing import List, Tuple, Optional, Dict, Any
-from dataclasses import dataclass
+from collections import OrderedDict, defaultdict
+from typing import List, Tuple, Optional, Dict, Any, Callable, Hashable, Sequence
+from dataclasses import dataclass, field
+
+from .aho_corasick import AhoCorasickMatcher
 
 
 @dataclass
@@ -27,9 +31,27 @@ class AssetMatch:
     # Source versioning and deduplication fields
     source_version: str = "1.0"  # Version of extraction rules used
     extraction_timestamp: str = ""  # When this extraction was performed
-    deduplication_key: str = ""  # Key for deduplication (hash of content + position)
+    deduplication_key: Optional[str] = ""  # Key for deduplication (hash of content + position); None = derive on first read
     source_document_id: str = ""  # ID of source document
     source_page_hash: str = ""  # Hash of source page content for change detection
+    _deduplication_key: Optional[str] = field(default="", init=False, repr=False, compare=False)
+
+
+def _get_deduplication_key(self: AssetMatch) -> str:
+    """Deduplication key, hashed from content and position on first read when not given."""
+    if self._deduplication_key is None:
+        self._deduplication_key = generate_deduplication_key(
+            self.value_text, self.page_no, self.char_start, self.char_end, self.source_document_id
+        )
+    return self._deduplication_key
+
+
+def _set_deduplication_key(self: AssetMatch, value: Optional[str]) -> None:
+    self._deduplication_key = value
+
+
+# Installed after @dataclass so the field keeps its "" default and __init__ assigns through the setter
+AssetMatch.deduplication_key = property(_get_deduplication_key, _set_deduplication_key)
 
 
 # Asset code patterns as specified in phase4.md
@@ -44,9 +66,77 @@ ASSET_CODE_PATTERNS = [
 # Compile patterns for efficiency
 COMPILED_PATTERNS = [re.compile(pattern) for pattern in ASSET_CODE_PATTERNS]
 
+NCT_ID_PATTERN = r"\b(?i:NCT)\d+\b"
+NCT_REGEX = re.compile(NCT_ID_PATTERN)
+
+# Single-pass scanner for NCT IDs and asset codes. Every alternative starts
+# at a word boundary with a capital letter (or "nct"), so that is checked once
+# up front; code alternatives never match at the same start.
+ENTITY_SCANNER = re.compile(
+    rf"\b(?=[A-Z]|(?i:nct))(?:(?P<nct>{NCT_ID_PATTERN})|(?P<code>"
+    + "|".join(f"(?:{ASSET_CODE_PATTERNS[i]})" for i in (2, 3, 0, 4, 1))
+    + "))"
+)
+_CODE_FULLMATCH = re.compile("|".join(f"(?:{p})" for p in ASSET_CODE_PATTERNS))
+
 # Current version of extraction rules
 EXTRACTION_RULES_VERSION = "1.0.0"
 
+# Prebuilt INN/generic automata, keyed by dictionary object identity and
+# validated against a version (or, for plain dicts, the key set)
+_INN_MATCHER_CACHE_SIZE = 4
+_inn_matcher_cache: "OrderedDict[int, Tuple[Dict[str, str], Hashable, AhoCorasickMatcher]]" = OrderedDict()
+
+
+class InnDictionary(dict):
+    """
+    INN/generic dictionary (normalized name -> alias type) with a name-set version.
+    
+    `version` is bumped whenever a name is added or removed, so cached
+    automata can be validated in O(1). Changing the type of an existing name
+    does not bump it; types are looked up live during extraction.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+    
+    def __setitem__(self, key, value):
+        if key not in self:
+            self.version += 1
+        super().__setitem__(key, value)
+    
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.version += 1
+    
+    def __ior__(self, other):
+        self.update(other)
+        return self
+    
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+    
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+    
+    def pop(self, key, *default):
+        if key in self:
+            self.version += 1
+        return super().pop(key, *default)
+    
+    def popitem(self):
+        item = super().popitem()
+        self.version += 1
+        return item
+    
+    def clear(self):
+        super().clear()
+        self.version += 1
+
 def generate_deduplication_key(value_text: str, page_no: int, char_start: int, 
                               char_end: int, source_document_id: str = "") -> str:
     """
@@ -102,8 +192,9 @@ def deduplicate_asset_matches(matches: List[AssetMatch],
         unique_matches = []
         
         for match in matches:
-            if match.deduplication_key and match.deduplication_key not in seen_keys:
-                seen_keys.add(match.deduplication_key)
+            key = match.deduplication_key
+            if key and key not in seen_keys:
+                seen_keys.add(key)
                 unique_matches.append(match)
         
         return unique_matches
@@ -247,6 +338,84 @@ def generate_code_variants(code: str) -> List[str]:
     return list(set(variants))  # Remove duplicates
 
 
+def _code_matches(value_text: str, char_start: int, char_end: int, page_no: int,
+                  timestamp: str, source_document_id: str, page_hash: str) -> List[AssetMatch]:
+    """Build the code matches for one hit: the form as written plus its collapsed form."""
+    forms = [value_text, value_text.replace('-', '')] if '-' in value_text else [value_text]
+    return [
+        AssetMatch(
+            value_text=form,
+            value_norm=form,
+            alias_type='code',
+            page_no=page_no,
+            char_start=char_start,
+            char_end=char_end,
+            detector='regex',
+            confidence=1.0,
+            source_version=EXTRACTION_RULES_VERSION,
+            extraction_timestamp=timestamp,
+            deduplication_key=None,
+            source_document_id=source_document_id,
+            source_page_hash=page_hash
+        )
+        for form in forms
+    ]
+
+
+def scan_codes_and_ncts(text: str, page_no: int = 1, source_document_id: str = "",
+                        page_content: str = "") -> Tuple[List[AssetMatch], List[AssetMatch]]:
+    """
+    Extract asset codes and NCT IDs in one regex pass.
+    
+    Produces the same hits as running every code pattern and the NCT pattern
+    separately: the inner ``AA-001`` of ``BMS-AA-001`` and short NCT IDs that
+    also look like codes (``NCT123``) are emitted as codes too.
+    
+    Args:
+        text: Text to scan
+        page_no: Page number where the text was found
+        source_document_id: Source document identifier for deduplication
+        page_content: Raw page content for change detection
+        
+    Returns:
+        (code matches, NCT matches), each ordered by position
+    """
+    codes: List[AssetMatch] = []
+    ncts: List[AssetMatch] = []
+    timestamp = datetime.now(timezone.utc).isoformat()
+    page_hash = generate_page_hash(page_content) if page_content else ""
+    
+    for match in ENTITY_SCANNER.finditer(text):
+        value_text = match.group(0)
+        char_start, char_end = match.span()
+        
+        if match.lastgroup == 'nct':
+            ncts.append(AssetMatch(
+                value_text=value_text,
+                value_norm=value_text.upper(),
+                alias_type='nct',
+                page_no=page_no,
+                char_start=char_start,
+                char_end=char_end,
+                detector='regex',
+                confidence=1.0
+            ))
+            if _CODE_FULLMATCH.fullmatch(value_text):
+                codes.extend(_code_matches(value_text, char_start, char_end, page_no,
+                                           timestamp, source_document_id, page_hash))
+            continue
+        
+        codes.extend(_code_matches(value_text, char_start, char_end, page_no,
+                                   timestamp, source_document_id, page_hash))
+        if value_text.count('-') == 2:
+            # BMS-AA-001 also contains the code AA-001
+            inner_start = char_start + value_text.index('-') + 1
+            codes.extend(_code_matches(text[inner_start:char_end], inner_start, char_end, page_no,
+                                       timestamp, source_document_id, page_hash))
+    
+    return codes, ncts
+
+
 def extract_asset_codes(text: str, page_no: int = 1, source_document_id: str = "", 
                         page_content: str = "") -> List[AssetMatch]:
     """
@@ -261,118 +430,97 @@ def extract_asset_codes(text: str, page_no: int = 1, source_document_id: str = "
     Returns:
         List of AssetMatch objects with versioning and deduplication
     """
-    matches = []
-    current_timestamp = datetime.now(timezone.utc).isoformat()
-    page_hash = generate_page_hash(page_content) if page_content else ""
+    codes, _ = scan_codes_and_ncts(text, page_no, source_document_id, page_content)
+    return codes
+
+
+def get_inn_matcher(inn_dict: Dict[str, str], version: Optional[Hashable] = None) -> AhoCorasickMatcher:
+    """
+    Get the automaton for an INN dictionary, building it only when needed.
     
-    for pattern in COMPILED_PATTERNS:
-        for match in pattern.finditer(text):
-            value_text = match.group(0)
-            char_start = match.start()
-            char_end = match.end()
-            
-            # Create both hyphenated and collapsed forms as aliases
-            if '-' in value_text:
-                # Hyphenated form (e.g., AB-123)
-                collapsed_form = value_text.replace('-', '')
-                matches.append(AssetMatch(
-                    value_text=value_text,
-                    value_norm=value_text,
-                    alias_type='code',
-                    page_no=page_no,
-                    char_start=char_start,
-                    char_end=char_end,
-                    detector='regex',
-                    confidence=1.0,
-                    source_version=EXTRACTION_RULES_VERSION,
-                    extraction_timestamp=current_timestamp,
-                    deduplication_key=generate_deduplication_key(
-                        value_text, page_no, char_start, char_end, source_document_id
-                    ),
-                    source_document_id=source_document_id,
-                    source_page_hash=page_hash
-                ))
-                
-                # Also add collapsed form
-                matches.append(AssetMatch(
-                    value_text=collapsed_form,
-                    value_norm=collapsed_form,
-                    alias_type='code',
-                    page_no=page_no,
-                    char_start=char_start,
-                    char_end=char_end,
-                    detector='regex',
-                    confidence=1.0,
-                    source_version=EXTRACTION_RULES_VERSION,
-                    extraction_timestamp=current_timestamp,
-                    deduplication_key=generate_deduplication_key(
-                        collapsed_form, page_no, char_start, char_end, source_document_id
-                    ),
-                    source_document_id=source_document_id,
-                    source_page_hash=page_hash
-                ))
-            else:
-                # Collapsed form (e.g., AB123)
-                matches.append(AssetMatch(
-                    value_text=value_text,
-                    value_norm=value_text,
-                    alias_type='code',
-                    page_no=page_no,
-                    char_start=char_start,
-                    char_end=char_end,
-                    detector='regex',
-                    confidence=1.0,
-                    source_version=EXTRACTION_RULES_VERSION,
-                    extraction_timestamp=current_timestamp,
-                    deduplication_key=generate_deduplication_key(
-                        value_text, page_no, char_start, char_end, source_document_id
-                    ),
-                    source_document_id=source_document_id,
-                    source_page_hash=page_hash
-                ))
+    The automaton is cached per dictionary object and rebuilt when its names
+    change. The check is O(1) for an InnDictionary or when the caller passes
+    a `version` that changes whenever names are added or removed; plain
+    dicts without a version are compared by key set.
     
-    return matches
+    Args:
+        inn_dict: Dictionary mapping normalized names to their types
+        version: Caller-maintained version or fingerprint of the name set
+        
+    Returns:
+        Aho–Corasick matcher over the dictionary keys
+    """
+    if version is None:
+        version = inn_dict.version if isinstance(inn_dict, InnDictionary) else None
+    key = id(inn_dict)
+    cached = _inn_matcher_cache.get(key)
+    if cached is not None and cached[0] is inn_dict:
+        fresh = cached[1] == version if version is not None else cached[1] == inn_dict.keys()
+        if fresh:
+            _inn_matcher_cache.move_to_end(key)
+            return cached[2]
+    
+    matcher = AhoCorasickMatcher(inn_dict.keys())
+    stamp = version if version is not None else frozenset(inn_dict)
+    # Keep a reference to the dict so its id cannot be reused while cached
+    _inn_matcher_cache[key] = (inn_dict, stamp, matcher)
+    _inn_matcher_cache.move_to_end(key)
+    while len(_inn_matcher_cache) > _INN_MATCHER_CACHE_SIZE:
+        _inn_matcher_cache.popitem(last=False)
+    return matcher
+
 
+def clear_inn_matcher_cache() -> None:
+    """Drop all cached INN automata."""
+    _inn_matcher_cache.clear()
 
-def extract_inn_generics(text: str, inn_dict: Dict[str, str], page_no: int = 1) -> List[AssetMatch]:
+
+def extract_inn_generics(text: str, inn_dict: Dict[str, str], page_no: int = 1,
+                         inn_version: Optional[Hashable] = None) -> List[AssetMatch]:
     """
     Extract INN/generic names from text using a dictionary lookup.
     
+    All dictionary names are found in one pass with a cached Aho–Corasick
+    automaton; hits that start or end inside a word are discarded.
+    
     Args:
         text: Text to search for INN/generic names
         inn_dict: Dictionary mapping normalized names to their types
         page_no: Page number where the text was found
+        inn_version: Version of the dictionary's name set (see get_inn_matcher)
         
     Returns:
-        List of AssetMatch objects
+        List of AssetMatch objects ordered by position
     """
+    if not inn_dict or not text:
+        return []
+    
     matches = []
     text_lower = text.lower()
+    n = len(text_lower)
+    
+    for start, end, norm_name in get_inn_matcher(inn_dict, inn_version).iter_matches(text_lower):
+        # Word-boundary checks
+        if start > 0 and text_lower[start - 1].isalnum():
+            continue
+        if end < n and text_lower[end].isalnum():
+            continue
+        alias_type = inn_dict.get(norm_name)
+        if alias_type is None:  # Removed since the automaton was built
+            continue
+        
+        matches.append(AssetMatch(
+            value_text=text[start:end],
+            value_norm=norm_name,
+            alias_type=alias_type,
+            page_no=page_no,
+            char_start=start,
+            char_end=end,
+            detector='dict',
+            confidence=1.0
+        ))
     
-    for norm_name, alias_type in inn_dict.items():
-        # Find all occurrences of the normalized name in the text
-        start_pos = 0
-        while True:
-            pos = text_lower.find(norm_name, start_pos)
-            if pos == -1:
-                break
-                
-            # Extract the original text at this position
-            original_text = text[pos:pos + len(norm_name)]
-            
-            matches.append(AssetMatch(
-                value_text=original_text,
-                value_norm=norm_name,
-                alias_type=alias_type,
-                page_no=page_no,
-                char_start=pos,
-                char_end=pos + len(norm_name),
-                detector='dict',
-                confidence=1.0
-            ))
-            
-            start_pos = pos + 1
-    
+    matches.sort(key=lambda m: (m.char_start, -m.char_end))
     return matches
 
 
@@ -387,25 +535,81 @@ def extract_nct_ids(text: str, page_no: int = 1) -> List[AssetMatch]:
     Returns:
         List of AssetMatch objects
     """
-    matches = []
-    
-    # Pattern for NCT IDs: NCT followed by numbers
-    nct_pattern = re.compile(r'\bNCT\d+\b', re.IGNORECASE)
-    
-    for match in nct_pattern.finditer(text):
-        value_text = match.group(0)
-        matches.append(AssetMatch(
-            value_text=value_text,
-            value_norm=value_text.upper(),
+    return [
+        AssetMatch(
+            value_text=match.group(0),
+            value_norm=match.group(0).upper(),
             alias_type='nct',
             page_no=page_no,
             char_start=match.start(),
             char_end=match.end(),
             detector='regex',
             confidence=1.0
-        ))
+        )
+        for match in NCT_REGEX.finditer(text)
+    ]
+
+
+def proximity_join(left: Sequence[Any], right: Sequence[Any], window: int,
+                   position: Callable[[Any], int],
+                   group: Optional[Callable[[Any], Hashable]] = None) -> List[Tuple[int, int, int]]:
+    """
+    Find all (left, right) mention pairs whose positions are within a window.
     
-    return matches
+    Both sides are sorted by (group, position) and swept with a two-pointer
+    window, so cost is O((n+m) log(n+m)) plus the number of pairs returned,
+    instead of comparing every left mention with every right mention.
+    
+    Args:
+        left: First set of mentions
+        right: Second set of mentions
+        window: Maximum absolute distance between positions (inclusive)
+        position: Position of a mention (e.g., char offset or span midpoint)
+        group: Optional key that pairs must share (e.g., page number)
+        
+    Returns:
+        (left_index, right_index, distance) tuples ordered by left index, then
+        right index - the order a nested loop over left then right would give
+    """
+    if not left or not right:
+        return []
+    
+    def grouped(items: Sequence[Any]) -> Dict[Hashable, List[Tuple[int, int]]]:
+        groups: Dict[Hashable, List[Tuple[int, int]]] = defaultdict(list)
+        for idx, item in enumerate(items):
+            groups[group(item) if group else None].append((position(item), idx))
+        for entries in groups.values():
+            entries.sort()
+        return groups
+    
+    left_groups = grouped(left)
+    right_groups = grouped(right)
+    
+    pairs: List[Tuple[int, int, int]] = []
+    for key, left_entries in left_groups.items():
+        right_entries = right_groups.get(key)
+        if not right_entries:
+            continue
+        
+        right_positions = [pos for pos, _ in right_entries]
+        lo = bisect_left(right_positions, left_entries[0][0] - window)
+        hi = lo
+        for left_pos, left_idx in left_entries:
+            # Slide the window [left_pos - window, left_pos + window] forward
+            while lo < len(right_positions) and right_positions[lo] < left_pos - window:
+                lo += 1
+            hi = max(hi, lo)
+            while hi < len(right_positions) and right_positions[hi] <= left_pos + window:
+                hi += 1
+            for right_pos, right_idx in right_entries[lo:hi]:
+                pairs.append((left_idx, right_idx, abs(left_pos - right_pos)))
+    
+    pairs.sort()
+    return pairs
+
+
+def _span_midpoint(match: AssetMatch) -> int:
+    return (match.char_start + match.char_end) // 2
 
 
 def find_nearby_assets(asset_matches: List[AssetMatch], nct_matches: List[AssetMatch], 
@@ -414,6 +618,7 @@ def find_nearby_assets(asset_matches: List[AssetMatch], nct_matches: List[AssetM
     Find asset mentions that are near NCT IDs within a specified character window.
     
     This implements HP-1 from phase4.md: "NCT near asset" heuristic.
+    Mentions must be on the same page; distance is between span midpoints.
     
     Args:
         asset_matches: List of asset matches
@@ -423,23 +628,11 @@ def find_nearby_assets(asset_matches: List[AssetMatch], nct_matches: List[AssetM
     Returns:
         List of tuples (asset_match, nct_match) for nearby pairs
     """
-    nearby_pairs = []
-    
-    for asset_match in asset_matches:
-        for nct_match in nct_matches:
-            # Check if they're on the same page
-            if asset_match.page_no != nct_match.page_no:
-                continue
-                
-            # Calculate distance between asset and NCT
-            asset_pos = (asset_match.char_start + asset_match.char_end) // 2
-            nct_pos = (nct_match.char_start + nct_match.char_end) // 2
-            distance = abs(asset_pos - nct_pos)
-            
-            if distance <= window_size:
-                nearby_pairs.append((asset_match, nct_match))
-    
-    return nearby_pairs
+    pairs = proximity_join(
+        asset_matches, nct_matches, window_size,
+        position=_span_midpoint, group=lambda m: m.page_no
+    )
+    return [(asset_matches[i], nct_matches[j]) for i, j, _ in pairs]
 
 
 def create_asset_shell(names_jsonb: Dict[str, Any] = None) -> Dict[str, Any]:
@@ -464,7 +657,8 @@ def create_asset_shell(names_jsonb: Dict[str, Any] = None) -> Dict[str, Any]:
 
 
 def extract_all_entities(text: str, page_no: int = 1, 
-                        inn_dict: Optional[Dict[str, str]] = None) -> List[AssetMatch]:
+                        inn_dict: Optional[Dict[str, str]] = None,
+                        inn_version: Optional[Hashable] = None) -> List[AssetMatch]:
     """
     Extract all entity types from text in one pass.
     
@@ -472,22 +666,20 @@ def extract_all_entities(text: str, page_no: int = 1,
         text: Text to extract entities from
         page_no: Page number where the text was found
         inn_dict: Dictionary for INN/generic extraction
+        inn_version: Version of the dictionary's name set (see get_inn_matcher)
         
     Returns:
         List of all AssetMatch objects found
     """
-    matches = []
-    
-    # Extract asset codes
-    matches.extend(extract_asset_codes(text, page_no))
+    # Asset codes and NCT IDs come from a single scan
+    codes, ncts = scan_codes_and_ncts(text, page_no)
+    matches = codes
     
     # Extract INN/generics if dictionary provided
     if inn_dict:
-        matches.extend(extract_inn_generics(text, inn_dict, page_no))
-    
-    # Extract NCT IDs
-    matches.extend(extract_nct_ids(text, page_no))
+        matches.extend(extract_inn_generics(text, inn_dict, page_no, inn_version))
     
+    matches.extend(ncts)
     return matches
 
 
@@ -0,0 +1,108 @@
+"""
+Paragraph chunking and token-budgeted windowing for Study Card extraction.
+
+Pages are split on blank lines into paragraph chunks carrying the page
+number, 1-based paragraph index and character offsets into the page text,
+which is what the `page_paragraph` evidence scheme refers to. Offsets are
+tracked with a running cursor so chunking is linear in the page length.
+Consecutive chunks are then packed into windows that fit a model input
+budget; each window is sent as one extraction request.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+PARAGRAPH_SEPARATOR = "\n\n"
+
+# JSON keys and offsets add a little to every chunk in the serialized payload
+CHUNK_OVERHEAD_TOKENS = 16
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def _split_span(text: str, start: int, end: int, max_chars: Optional[int]) -> Iterator[Tuple[int, int]]:
+    """Split text[start:end] into pieces of at most max_chars, breaking at whitespace."""
+    while max_chars and end - start > max_chars:
+        cut = text.rfind(" ", start + 1, start + max_chars + 1)
+        if cut <= start:
+            cut = start + max_chars
+        yield start, cut
+        start = cut
+        while start < end and text[start].isspace():
+            start += 1
+    if start < end:
+        yield start, end
+
+
+def create_text_chunks_from_pages(
+    pages: List[Dict[str, Any]],
+    max_chunk_tokens: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Convert document pages to paragraph chunks with page offsets.
+
+    Args:
+        pages: Page dictionaries with `page_no` and `text`
+        max_chunk_tokens: Paragraphs longer than this are split at whitespace
+            into several chunks sharing the paragraph number
+
+    Returns:
+        Chunks with `page`, `paragraph`, `text`, `start` and `end`, where
+        `text == page_text[start:end]`
+    """
+    max_chars = max_chunk_tokens * 4 if max_chunk_tokens else None
+    chunks = []
+
+    for page in pages:
+        page_no = page.get('page_no', 1)
+        text = page.get('text', '') or ''
+        cursor = 0
+
+        for i, raw in enumerate(text.split(PARAGRAPH_SEPARATOR)):
+            raw_start = cursor
+            cursor += len(raw) + len(PARAGRAPH_SEPARATOR)
+
+            stripped = raw.strip()
+            if not stripped:
+                continue
+
+            start = raw_start + len(raw) - len(raw.lstrip())
+            end = start + len(stripped)
+            for piece_start, piece_end in _split_span(text, start, end, max_chars):
+                chunks.append({
+                    'page': page_no,
+                    'paragraph': i + 1,
+                    'text': text[piece_start:piece_end],
+                    'start': piece_start,
+                    'end': piece_end,
+                })
+
+    return chunks
+
+
+def pack_windows(chunks: List[Dict[str, Any]], max_tokens: int) -> List[List[Dict[str, Any]]]:
+    """
+    Greedily pack consecutive chunks into windows of at most max_tokens.
+
+    A chunk larger than the budget on its own gets a window to itself;
+    split long paragraphs with `max_chunk_tokens` to avoid that.
+    """
+    windows: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    used = 0
+
+    for chunk in chunks:
+        cost = estimate_tokens(chunk['text']) + CHUNK_OVERHEAD_TOKENS
+        if current and used + cost > max_tokens:
+            windows.append(current)
+            current, used = [], 0
+        current.append(chunk)
+        used += cost
+
+    if current:
+        windows.append(current)
+    return windows
@@ -0,0 +1,405 @@
+"""
+Streaming bulk loader for ChEMBL and WHO INN dictionaries.
+
+Dictionary dumps are read record by record (CSV/TSV, JSON lines or SDF,
+optionally gzipped), names are normalized in chunks across a process pool,
+and the normalized rows are streamed with `COPY` into a temporary staging
+table. Assets and aliases are then merged with a handful of set-based
+statements, so a full refresh runs in constant memory regardless of the
+size of the dump.
+"""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ncfd.extract.asset_extractor import norm_drug_name
+
+logger = logging.getLogger(__name__)
+
+# Raw row: (alias, alias_type, source, entity_key, is_primary, metadata)
+# Normalized row: (alias, alias_norm, alias_type, source, entity_key, is_primary, metadata)
+RawRow = Tuple[str, str, str, Optional[str], bool, Dict[str, Any]]
+NormRow = Tuple[str, str, str, str, str, bool, Dict[str, Any]]
+
+STAGING_TABLE = "dictionary_staging"
+STAGING_COLUMNS = ("alias", "alias_norm", "alias_type", "source", "entity_key", "is_primary", "metadata")
+
+# Accepted column names per field, first match wins (header names are lower-cased)
+CHEMBL_COLUMNS = {
+    "chembl_id": ("chembl_id", "molecule_chembl_id"),
+    "name": ("pref_name", "chembl_pref_name", "name"),
+    "synonyms": ("synonyms", "synonym", "molecule_synonyms"),
+    "syn_type": ("syn_type", "synonym_type"),
+    "molecule_type": ("molecule_type",),
+    "therapeutic_flag": ("therapeutic_flag",),
+}
+WHO_INN_COLUMNS = {
+    "name": ("inn", "inn_name", "recommended_inn", "proposed_inn", "name"),
+    "status": ("status", "inn_status", "list_type"),
+    "therapeutic_class": ("therapeutic_class", "class"),
+    "year_proposed": ("year_proposed", "year"),
+}
+SYNONYM_SEPARATORS = ("|", ";")
+TRADE_NAME_TYPES = {"trade_name", "trade name", "brand"}
+
+
+def _open_text(path: Path):
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace", newline="")
+    return open(path, "r", encoding="utf-8", errors="replace", newline="")
+
+
+def _dump_format(path: Path) -> str:
+    suffix = Path(path.stem).suffix if path.suffix == ".gz" else path.suffix
+    suffix = suffix.lower()
+    if suffix in (".sdf", ".sd"):
+        return "sdf"
+    if suffix in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if suffix in (".tsv", ".tab", ".txt"):
+        return "tsv"
+    return "csv"
+
+
+def _iter_sdf(handle) -> Iterator[Dict[str, str]]:
+    """Yield the `> <field>` data items of each SDF record; molblocks are skipped."""
+    record: Dict[str, str] = {}
+    field: Optional[str] = None
+    values: List[str] = []
+    for line in handle:
+        line = line.rstrip("\r\n")
+        if line.startswith("$$$$"):
+            if field is not None:
+                record[field] = "\n".join(values)
+            if record:
+                yield record
+            record, field, values = {}, None, []
+        elif line.startswith(">") and "<" in line and ">" in line[1:]:
+            if field is not None:
+                record[field] = "\n".join(values)
+            field = line[line.index("<") + 1:line.rindex(">")].strip().lower()
+            values = []
+        elif field is not None:
+            if line.strip():
+                values.append(line.strip())
+            else:
+                record[field] = "\n".join(values)
+                field, values = None, []
+    if field is not None:
+        record[field] = "\n".join(values)
+    if record:
+        yield record
+
+
+def iter_dictionary_records(path: str) -> Iterator[Dict[str, str]]:
+    """
+    Stream records from a dictionary dump.
+
+    The format is taken from the extension (`.csv`, `.tsv`/`.txt`, `.jsonl`,
+    `.sdf`, each optionally `.gz`). Keys are lower-cased.
+    """
+    path = Path(path)
+    fmt = _dump_format(path)
+    with _open_text(path) as handle:
+        if fmt == "sdf":
+            yield from _iter_sdf(handle)
+        elif fmt == "jsonl":
+            for line in handle:
+                if line.strip():
+                    yield {str(k).lower(): v for k, v in json.loads(line).items()}
+        else:
+            csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+            reader = csv.DictReader(handle, delimiter="\t" if fmt == "tsv" else ",")
+            for record in reader:
+                yield {(k or "").strip().lower(): v for k, v in record.items()}
+
+
+def _field(record: Dict[str, Any], names: Sequence[str]) -> Optional[str]:
+    for name in names:
+        value = record.get(name)
+        if value not in (None, ""):
+            return str(value).strip()
+    return None
+
+
+def _split_synonyms(value: Optional[str]) -> List[str]:
+    if not value:
+        return []
+    parts = [value]
+    for sep in SYNONYM_SEPARATORS + ("\n",):
+        parts = [p for part in parts for p in part.split(sep)]
+    return [p.strip() for p in parts if p.strip()]
+
+
+def chembl_rows(records: Iterable[Dict[str, Any]]) -> Iterator[RawRow]:
+    """
+    Map ChEMBL records to alias rows keyed by ChEMBL ID.
+
+    The preferred name and synonyms become generic (or brand) aliases and the
+    ChEMBL ID itself a `chembl` alias; records without any name are skipped.
+    """
+    for record in records:
+        chembl_id = _field(record, CHEMBL_COLUMNS["chembl_id"])
+        name = _field(record, CHEMBL_COLUMNS["name"])
+        synonyms = _split_synonyms(_field(record, CHEMBL_COLUMNS["synonyms"]))
+        if not name and not synonyms:
+            continue
+
+        syn_type = (_field(record, CHEMBL_COLUMNS["syn_type"]) or "").lower()
+        syn_alias_type = "brand" if syn_type in TRADE_NAME_TYPES else "generic"
+        key = f"chembl:{chembl_id}" if chembl_id else None
+        metadata = {
+            "chembl_id": chembl_id,
+            "molecule_type": _field(record, CHEMBL_COLUMNS["molecule_type"]),
+            "therapeutic_flag": _field(record, CHEMBL_COLUMNS["therapeutic_flag"]),
+        }
+
+        if name:
+            yield name, "generic", "chembl", key, True, metadata
+        for synonym in synonyms:
+            yield synonym, syn_alias_type, "chembl", key, False, metadata
+        if chembl_id:
+            yield chembl_id, "chembl", "chembl", key, False, metadata
+
+
+def who_inn_rows(records: Iterable[Dict[str, Any]]) -> Iterator[RawRow]:
+    """Map WHO INN records to `inn` alias rows keyed by the normalized INN."""
+    for record in records:
+        name = _field(record, WHO_INN_COLUMNS["name"])
+        if not name:
+            continue
+        metadata = {
+            "inn_status": _field(record, WHO_INN_COLUMNS["status"]),
+            "therapeutic_class": _field(record, WHO_INN_COLUMNS["therapeutic_class"]),
+            "year_proposed": _field(record, WHO_INN_COLUMNS["year_proposed"]),
+        }
+        yield name, "inn", "who_inn", None, True, metadata
+
+
+def normalize_chunk(rows: List[RawRow]) -> List[NormRow]:
+    """Normalize a chunk of rows (runs in a worker process)."""
+    out: List[NormRow] = []
+    for alias, alias_type, source, key, is_primary, metadata in rows:
+        alias_norm = norm_drug_name(alias)
+        if not alias_norm:
+            continue
+        out.append((alias, alias_norm, alias_type, source,
+                    key or f"{source}:{alias_norm}", is_primary, metadata))
+    return out
+
+
+def _chunks(rows: Iterable[RawRow], size: int) -> Iterator[List[RawRow]]:
+    chunk: List[RawRow] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def normalize_rows(rows: Iterable[RawRow], workers: int = 1, chunk_size: int = 10000) -> Iterator[NormRow]:
+    """
+    Normalize rows in order, fanning chunks out to `workers` processes.
+
+    At most two chunks per worker are in flight, so memory stays bounded
+    however long the input is.
+    """
+    if workers <= 1:
+        for chunk in _chunks(rows, chunk_size):
+            yield from normalize_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in _chunks(rows, chunk_size):
+            pending.append(pool.submit(normalize_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _copy_value(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, dict):
+        value = json.dumps({k: v for k, v in value.items() if v is not None})
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+class CopyStream(io.TextIOBase):
+    """Read-only file object over rows, rendered in COPY text format on demand."""
+
+    def __init__(self, rows: Iterable[Sequence[Any]]):
+        self._rows = iter(rows)
+        self._buffer = ""
+        self.rows = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        parts = [self._buffer]
+        length = len(self._buffer)
+        while size < 0 or length < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            line = "\t".join(_copy_value(v) for v in row) + "\n"
+            parts.append(line)
+            length += len(line)
+            self.rows += 1
+
+        data = "".join(parts)
+        if size < 0:
+            self._buffer = ""
+            return data
+        self._buffer = data[size:]
+        return data[:size]
+
+
+class DictionaryBulkLoader:
+    """Stream a dictionary dump into `assets`/`asset_aliases` via a COPY staging table."""
+
+    SOURCES = {"chembl": chembl_rows, "who_inn": who_inn_rows}
+
+    def __init__(self, db_session: Session, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the loader.
+
+        Args:
+            db_session: Session on a PostgreSQL (psycopg2) connection
+            config: Optional settings: workers, chunk_size
+        """
+        config = config or {}
+        self.db_session = db_session
+        self.workers = config.get("workers", min(4, os.cpu_count() or 1))
+        self.chunk_size = config.get("chunk_size", 10000)
+
+    def load(self, source: str, path: str) -> Dict[str, int]:
+        """
+        Load one dump and merge it; the caller commits.
+
+        Args:
+            source: 'chembl' or 'who_inn'
+            path: Dump file path
+
+        Returns:
+            Counts of staged rows, created assets and inserted aliases
+        """
+        if source not in self.SOURCES:
+            raise ValueError(f"Unknown dictionary source: {source}")
+
+        rows = normalize_rows(
+            self.SOURCES[source](iter_dictionary_records(path)),
+            workers=self.workers,
+            chunk_size=self.chunk_size,
+        )
+        self._create_staging()
+        staged = self._copy(rows)
+        stats = {"staged": staged, **self._merge()}
+        logger.info(
+            f"Bulk-loaded {source} dictionary from {path}: {stats['staged']} rows staged, "
+            f"{stats['assets_created']} assets created, {stats['aliases_inserted']} aliases inserted"
+        )
+        return stats
+
+    def _create_staging(self) -> None:
+        self.db_session.execute(text(f"DROP TABLE IF EXISTS {STAGING_TABLE}"))
+        self.db_session.execute(text(f"""
+            CREATE TEMP TABLE {STAGING_TABLE} (
+                alias       text NOT NULL,
+                alias_norm  text NOT NULL,
+                alias_type  text NOT NULL,
+                source      text NOT NULL,
+                entity_key  text NOT NULL,
+                is_primary  boolean NOT NULL,
+                metadata    jsonb NOT NULL,
+                asset_id    bigint
+            ) ON COMMIT DROP
+        """))
+
+    def _copy(self, rows: Iterable[NormRow]) -> int:
+        stream = CopyStream(rows)
+        cursor = self.db_session.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {STAGING_TABLE} ({', '.join(STAGING_COLUMNS)}) FROM STDIN",
+                stream,
+            )
+        finally:
+            cursor.close()
+        self.db_session.execute(text(f"CREATE INDEX ON {STAGING_TABLE} (entity_key)"))
+        self.db_session.execute(text(f"ANALYZE {STAGING_TABLE}"))
+        return stream.rows
+
+    def _merge(self) -> Dict[str, int]:
+        # Attach each entity to the lowest asset already carrying any of its aliases
+        self.db_session.execute(text(f"""
+            UPDATE {STAGING_TABLE} s
+               SET asset_id = m.asset_id
+              FROM (
+                    SELECT DISTINCT ON (st.entity_key) st.entity_key, a.asset_id
+                      FROM {STAGING_TABLE} st
+                      JOIN asset_aliases a ON a.alias_norm = st.alias_norm
+                     ORDER BY st.entity_key, a.asset_id
+                   ) m
+             WHERE s.entity_key = m.entity_key
+        """))
+
+        # One new asset per unmatched entity, named after its primary alias
+        created = self.db_session.execute(text(f"""
+            WITH entities AS (
+                SELECT DISTINCT ON (entity_key) entity_key, alias, alias_norm, source, metadata
+                  FROM {STAGING_TABLE}
+                 WHERE asset_id IS NULL
+                 ORDER BY entity_key, is_primary DESC, alias_type <> 'chembl' DESC, alias_norm
+            ), created AS (
+                INSERT INTO assets (names_jsonb)
+                SELECT metadata || jsonb_build_object(
+                           'primary_name', alias,
+                           'normalized_name', alias_norm,
+                           'discovery_source', source,
+                           'dictionary_key', entity_key)
+                  FROM entities
+                RETURNING asset_id, names_jsonb->>'dictionary_key' AS entity_key
+            ), attached AS (
+                UPDATE {STAGING_TABLE} s
+                   SET asset_id = c.asset_id
+                  FROM created c
+                 WHERE s.entity_key = c.entity_key
+                RETURNING 1
+            )
+            SELECT count(*) FROM created
+        """)).scalar() or 0
+
+        inserted = self.db_session.execute(text(f"""
+            INSERT INTO asset_aliases (asset_id, alias, alias_norm, alias_type, source)
+            SELECT DISTINCT ON (asset_id, alias_norm, alias_type)
+                   asset_id, alias, alias_norm, alias_type::asset_alias_type, source
+              FROM {STAGING_TABLE}
+             WHERE asset_id IS NOT NULL
+             ORDER BY asset_id, alias_norm, alias_type, is_primary DESC
+            ON CONFLICT DO NOTHING
+        """)).rowcount
+
+        return {"assets_created": created, "aliases_inserted": inserted}
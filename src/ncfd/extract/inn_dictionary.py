@@ -16,6 +16,8 @@ from sqlalchemy.orm import Session
 
 from ncfd.db.models import Asset, AssetAlias
 from ncfd.extract.asset_extractor import norm_drug_name
+from ncfd.extract.dictionary_loader import DictionaryBulkLoader
+from ncfd.mapping.alias_index import AliasIndex, get_alias_index
 
 logger = logging.getLogger(__name__)
 
@@ -50,14 +52,23 @@ class AssetDiscovery:
 class INNDictionaryManager:
     """Manages INN/generic dictionaries and asset discovery."""
     
-    def __init__(self, db_session: Session):
+    def __init__(
+        self,
+        db_session: Session,
+        alias_index: Optional[AliasIndex] = None,
+        loader_config: Optional[Dict[str, Any]] = None
+    ):
         """
         Initialize the dictionary manager.
         
         Args:
             db_session: Database session for queries and updates
+            alias_index: Alias → asset index (defaults to the shared process index)
+            loader_config: Bulk loader settings (workers, chunk_size)
         """
         self.db_session = db_session
+        self.alias_index = alias_index or get_alias_index()
+        self.loader_config = loader_config or {}
         
         # In-memory dictionary for fast lookups
         self._alias_norm_map: Dict[str, List[DictionaryEntry]] = {}
@@ -77,17 +88,22 @@ class INNDictionaryManager:
         """
         Load ChEMBL drug names into the dictionary.
         
+        An existing dump file is streamed straight into assets/asset_aliases
+        (see `bulk_load_dictionary`); otherwise the built-in sample entries
+        are loaded into memory.
+        
         Args:
-            chembl_file_path: Path to ChEMBL data file (JSON or CSV)
+            chembl_file_path: Path to ChEMBL dump (CSV/TSV, JSON lines or SDF, optionally gzipped)
             
         Returns:
             Number of entries loaded
         """
         logger.info(f"Loading ChEMBL dictionary from {chembl_file_path}")
         
+        if Path(chembl_file_path).is_file():
+            return self.bulk_load_dictionary('chembl', chembl_file_path)['staged']
+        
         try:
-            # For now, simulate ChEMBL data structure
-            # In production, this would parse actual ChEMBL dump files
             sample_chembl_data = self._get_sample_chembl_data()
             
             entries_loaded = 0
@@ -120,17 +136,22 @@ class INNDictionaryManager:
         """
         Load WHO INN (International Nonproprietary Names) into dictionary.
         
+        An existing list file is streamed straight into assets/asset_aliases
+        (see `bulk_load_dictionary`); otherwise the built-in sample entries
+        are loaded into memory.
+        
         Args:
-            who_inn_file_path: Path to WHO INN data file
+            who_inn_file_path: Path to WHO INN list (CSV/TSV, JSON lines or SDF, optionally gzipped)
             
         Returns:
             Number of entries loaded
         """
         logger.info(f"Loading WHO INN dictionary from {who_inn_file_path}")
         
+        if Path(who_inn_file_path).is_file():
+            return self.bulk_load_dictionary('who_inn', who_inn_file_path)['staged']
+        
         try:
-            # For now, simulate WHO INN data structure
-            # In production, this would parse WHO INN list files
             sample_inn_data = self._get_sample_who_inn_data()
             
             entries_loaded = 0
@@ -164,6 +185,29 @@ class INNDictionaryManager:
             logger.error(f"Failed to load WHO INN dictionary: {e}")
             return 0
     
+    def bulk_load_dictionary(self, source: str, file_path: str) -> Dict[str, int]:
+        """
+        Stream a full dictionary dump into assets/asset_aliases.
+        
+        Records are parsed incrementally, normalized in parallel, COPY'd into
+        a staging table and merged with set-based SQL; nothing is held in
+        memory per entry. The caller commits.
+        
+        Args:
+            source: 'chembl' or 'who_inn'
+            file_path: Dump file path
+            
+        Returns:
+            Counts of staged rows, created assets and inserted aliases
+        """
+        stats = DictionaryBulkLoader(self.db_session, self.loader_config).load(source, file_path)
+        
+        # Dictionary entries now live in asset_aliases; rebuild lookups from there
+        self._alias_norm_map = {}
+        self._loaded_sources.add(source)
+        self.alias_index.ensure_fresh(self.db_session, force=True)
+        return stats
+    
     def build_alias_norm_map(self) -> Dict[str, List[DictionaryEntry]]:
         """
         Build the complete alias_norm → (type, source) mapping.
@@ -196,27 +240,34 @@ class INNDictionaryManager:
         if not self._alias_norm_map:
             self.build_alias_norm_map()
         
+        # One version check per call; token lookups below never touch the DB
+        self.alias_index.ensure_fresh(self.db_session)
+        
         # Tokenize text and check each token/phrase
         tokens = self._tokenize_for_drug_names(text)
+        norm_cache: Dict[str, str] = {}
         
         for token_info in tokens:
-            token_norm = norm_drug_name(token_info['text'])
+            token_text = token_info['text']
+            token_norm = norm_cache.get(token_text)
+            if token_norm is None:
+                token_norm = norm_cache[token_text] = norm_drug_name(token_text)
             
             if token_norm in self._alias_norm_map:
                 entries = self._alias_norm_map[token_norm]
                 
                 for entry in entries:
                     # Check if this asset already exists
-                    existing_asset = self._find_existing_asset(entry)
+                    existing_asset_id = self._find_existing_asset_id(entry)
                     
                     discovery = AssetDiscovery(
-                        value_text=token_info['text'],
+                        value_text=token_text,
                         value_norm=token_norm,
                         alias_type=entry.alias_type,
                         source=entry.source,
                         confidence=entry.confidence,
-                        existing_asset_id=existing_asset.asset_id if existing_asset else None,
-                        needs_asset_creation=existing_asset is None
+                        existing_asset_id=existing_asset_id,
+                        needs_asset_creation=existing_asset_id is None
                     )
                     
                     discoveries.append(discovery)
@@ -250,13 +301,14 @@ class INNDictionaryManager:
         # Create initial alias
         alias = AssetAlias(
             asset_id=asset.asset_id,
-            alias_text=discovery.value_text,
+            alias=discovery.value_text,
             alias_norm=discovery.value_norm,
             alias_type=discovery.alias_type,
-            confidence=discovery.confidence
+            source=discovery.source
         )
         
         self.db_session.add(alias)
+        self.alias_index.add_on_commit(self.db_session, discovery.value_norm, discovery.alias_type, asset.asset_id)
         
         logger.info(f"Created asset {asset.asset_id} with alias {discovery.value_text}")
         return asset
@@ -293,12 +345,13 @@ class INNDictionaryManager:
                 if not existing_alias:
                     alias = AssetAlias(
                         asset_id=asset.asset_id,
-                        alias_text=id_value,
+                        alias=id_value,
                         alias_norm=norm_drug_name(id_value),
                         alias_type=id_type.replace('_id', ''),
-                        confidence=self.confidence_thresholds['exact_match']
+                        source='backfill'
                     )
                     self.db_session.add(alias)
+                    self.alias_index.add_on_commit(self.db_session, alias.alias_norm, alias.alias_type, asset.asset_id)
         
         logger.info(f"Backfilled asset {asset.asset_id} with {len(external_ids)} external IDs")
     
@@ -313,15 +366,17 @@ class INNDictionaryManager:
         """Load existing aliases from database into dictionary."""
         logger.info("Loading existing aliases from database")
         
-        aliases = self.db_session.query(AssetAlias).all()
+        aliases = self.db_session.query(
+            AssetAlias.alias, AssetAlias.alias_norm, AssetAlias.alias_type, AssetAlias.asset_id
+        ).all()
         
         for alias in aliases:
             entry = DictionaryEntry(
-                alias_text=alias.alias_text,
+                alias_text=alias.alias,
                 alias_norm=alias.alias_norm,
                 alias_type=alias.alias_type,
                 source='database',
-                confidence=alias.confidence or 1.0,
+                confidence=self.confidence_thresholds['exact_match'],
                 metadata={'asset_id': alias.asset_id}
             )
             
@@ -329,20 +384,14 @@ class INNDictionaryManager:
         
         logger.info(f"Loaded {len(aliases)} existing aliases from database")
     
-    def _find_existing_asset(self, entry: DictionaryEntry) -> Optional[Asset]:
-        """Find existing asset for a dictionary entry."""
+    def _find_existing_asset_id(self, entry: DictionaryEntry) -> Optional[int]:
+        """Find existing asset ID for a dictionary entry via the in-memory alias index."""
         if 'asset_id' in entry.metadata:
-            return self.db_session.query(Asset).filter(
-                Asset.asset_id == entry.metadata['asset_id']
-            ).first()
+            return entry.metadata['asset_id']
         
         # Look for asset with matching alias
-        alias = self.db_session.query(AssetAlias).filter(
-            AssetAlias.alias_norm == entry.alias_norm,
-            AssetAlias.alias_type == entry.alias_type
-        ).first()
-        
-        return alias.asset if alias else None
+        asset_ids = self.alias_index.asset_ids(entry.alias_norm, entry.alias_type)
+        return asset_ids[0] if asset_ids else None
     
     def _tokenize_for_drug_names(self, text: str) -> List[Dict[str, Any]]:
         """
@@ -459,16 +508,26 @@ class INNDictionaryManager:
 class EnhancedSpanCapture:
     """Enhanced span capture system for comprehensive entity extraction."""
     
-    def __init__(self, db_session: Session, inn_manager: INNDictionaryManager):
+    # Columns of the unique span key on document_entities
+    SPAN_KEY = ('doc_id', 'ent_type', 'page_no', 'char_start', 'char_end', 'value_text')
+    
+    def __init__(self, db_session: Session, inn_manager: INNDictionaryManager, flush_size: int = 5000):
         """
         Initialize the enhanced span capture system.
         
+        Spans are buffered across pages and documents and written in
+        multi-row inserts once `flush_size` rows are pending; call `flush()`
+        before committing.
+        
         Args:
             db_session: Database session
             inn_manager: INN dictionary manager for asset lookups
+            flush_size: Buffered rows that trigger a write (also the batch size)
         """
         self.db_session = db_session
         self.inn_manager = inn_manager
+        self.flush_size = flush_size
+        self._pending: Dict[Tuple, Dict[str, Any]] = {}
     
     def capture_comprehensive_spans(self, text: str, doc_id: int, page_no: int = 1) -> List[Dict[str, Any]]:
         """
@@ -496,7 +555,7 @@ class EnhancedSpanCapture:
         drug_spans = self._capture_drug_name_spans(text, page_no)
         spans.extend(drug_spans)
         
-        # Store spans in database
+        # Buffer spans for the next bulk write
         self._store_spans_in_database(spans, doc_id)
         
         return spans
@@ -571,22 +630,54 @@ class EnhancedSpanCapture:
         return spans
     
     def _store_spans_in_database(self, spans: List[Dict[str, Any]], doc_id: int):
-        """Store captured spans in document_entities table."""
+        """Buffer captured spans for document_entities, writing once the buffer is full."""
+        for span in spans:
+            row = {
+                'doc_id': doc_id,
+                'ent_type': span['ent_type'],
+                'value_text': span['value_text'],
+                'value_norm': span['value_norm'],
+                'page_no': span['page_no'],
+                'char_start': span['char_start'],
+                'char_end': span['char_end'],
+                'detector': span['detector'],
+                'confidence': span['confidence']
+            }
+            self._pending.setdefault(tuple(row[c] for c in self.SPAN_KEY), row)
+        
+        logger.debug(f"Buffered {len(spans)} entity spans for document {doc_id}")
+        
+        if len(self._pending) >= self.flush_size:
+            self.flush()
+    
+    def flush(self) -> int:
+        """
+        Write all buffered spans with multi-row inserts.
+        
+        Spans already stored (same document, type, position and text) are
+        skipped, so re-capturing a document is idempotent.
+        
+        Returns:
+            Number of rows inserted
+        """
+        from sqlalchemy.dialects.postgresql import insert
         from ncfd.db.models import DocumentEntity
         
-        for span in spans:
-            entity = DocumentEntity(
-                doc_id=doc_id,
-                ent_type=span['ent_type'],
-                value_text=span['value_text'],
-                value_norm=span['value_norm'],
-                page_no=span['page_no'],
-                char_start=span['char_start'],
-                char_end=span['char_end'],
-                detector=span['detector'],
-                confidence=span['confidence']
-            )
-            
-            self.db_session.add(entity)
+        if not self._pending:
+            return 0
+        
+        rows = list(self._pending.values())
+        self._pending = {}
+        
+        table = DocumentEntity.__table__
+        stmt = insert(table).on_conflict_do_nothing(
+            index_elements=[table.c[c] for c in self.SPAN_KEY]
+        )
+        
+        inserted = 0
+        for i in range(0, len(rows), self.flush_size):
+            result = self.db_session.execute(stmt, rows[i:i + self.flush_size])
+            inserted += max(result.rowcount or 0, 0)
         
-        logger.info(f"Stored {len(spans)} entity spans for document {doc_id}")
+        logger.info(f"Stored {inserted} of {len(rows)} buffered entity spans")
+        return inserted
@@ -9,11 +9,14 @@ from __future__ import annotations
 import os
 import json
 import logging
-from typing import Dict, Any, Optional, List
+from functools import lru_cache
+from typing import Callable, Dict, Any, Optional, List
 import langextract as lx
 from langextract.data import ExampleData, Extraction
 from pathlib import Path
-from .validator import validate_card, validate_evidence_spans
+from .chunking import create_text_chunks_from_pages
+from .study_card_cache import StudyCardCache
+from .validator import check_card, raise_for_check
 
 logger = logging.getLogger(__name__)
 
@@ -81,6 +84,31 @@ def load_prompts() -> str:
     
     return prompts
 
+@lru_cache(maxsize=1)
+def study_card_examples() -> tuple:
+    """Few-shot examples for consistent extraction, built once per process."""
+    return (
+        ExampleData(
+            text="Methods: Adults with COPD randomized 2:1 to Drug X vs placebo. Primary endpoint: Annualized exacerbation rate at Week 52 (ITT analysis). Results: n=660 (Drug X n=440; placebo n=220). Annualized exacerbation rate: 0.85 vs 1.23 (rate ratio 0.69, 95% CI 0.58-0.82, p<0.001).",
+            extractions=[
+                Extraction(
+                    extraction_class="StudyCard",
+                    extraction_text=json.dumps({
+                        "doc": {"doc_type": "Abstract", "title": "Phase 3 Study of Drug X in COPD", "year": 2024, "url": "https://example.com", "source_id": "example_001"},
+                        "trial": {"nct_id": "NCT12345678", "phase": "3", "indication": "COPD", "is_pivotal": True},
+                        "primary_endpoints": [{"name": "Annualized exacerbation rate", "evidence": [{"loc": {"scheme": "page_paragraph", "page": 1, "paragraph": 1}}]}],
+                        "populations": {"itt": {"defined": True, "evidence": [{"loc": {"scheme": "page_paragraph", "page": 1, "paragraph": 1}}]}, "pp": {"defined": False, "evidence": []}, "analysis_primary_on": "ITT"},
+                        "arms": [{"label": "Drug X", "n": 440, "evidence": [{"loc": {"scheme": "page_paragraph", "page": 1, "paragraph": 2}}]}, {"label": "Placebo", "n": 220, "evidence": [{"loc": {"scheme": "page_paragraph", "page": 1, "paragraph": 2}}]}],
+                        "sample_size": {"total_n": 660, "evidence": [{"loc": {"scheme": "page_paragraph", "page": 1, "paragraph": 2}}]},
+                        "results": {"primary": [{"endpoint": "Annualized exacerbation rate", "effect_size": {"metric": "Rate Ratio", "value": 0.69, "ci_low": 0.58, "ci_high": 0.82, "ci_level": 95, "evidence": [{"loc": {"scheme": "page_paragraph", "page": 1, "paragraph": 2}}]}, "p_value": 0.001, "evidence": [{"loc": {"scheme": "page_paragraph", "page": 1, "paragraph": 2}}]}]},
+                        "coverage_level": "high", "coverage_rationale": "All required fields present with evidence: primary endpoint, total N, ITT analysis, and effect size with p-value."
+                    }),
+                    attributes={}
+                )
+            ]
+        ),
+    )
+
 def build_payload(doc_meta: Dict[str, Any], chunks: List[Dict[str, Any]], trial_hint: Dict[str, Any]) -> Dict[str, Any]:
     """Build the payload for LangExtract processing."""
     return {
@@ -95,23 +123,57 @@ class StudyCardAdapter:
     
     This adapter provides a stable interface with strict validation
     and fails hard on non-JSON or invalid data. Supports both Gemini and OpenAI.
+    Prompts, examples and the API key are resolved once, so one instance
+    (see `get_adapter`) can serve many extractions, including concurrently.
+    Payload extractions are served from a persistent `StudyCardCache`.
     """
     
-    def __init__(self):
-        """Initialize the adapter with prompts and validation."""
+    def __init__(self, cache: Optional[StudyCardCache] = None):
+        """Initialize the adapter with prompts, validation and the extraction cache."""
         self.prompts = load_prompts()
+        self.cache = cache if cache is not None else StudyCardCache.from_env()
+        self.examples = list(study_card_examples())
         
         # Get active model configuration
         self.config = ModelConfig.get_active_config()
         
         # Verify API key is available
-        api_key = os.getenv(self.config["env_var"])
-        if not api_key:
+        self.api_key = os.getenv(self.config["env_var"])
+        if not self.api_key:
             raise ValueError(
                 f"{self.config['env_var']} environment variable not set. "
                 f"Please set your API key for {self.config['provider']}."
             )
     
+    def extract_payload(
+        self,
+        payload: Dict[str, Any],
+        prompt: Optional[str] = None,
+        on_miss: Optional[Callable[[], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Extract a Study Card from a `build_payload` payload, using the cache.
+        
+        Args:
+            payload: Document metadata, text chunks and trial context
+            prompt: Extraction prompt; defaults to the adapter's prompts
+            on_miss: Called right before an LLM call is made; may raise to abort it
+            
+        Returns:
+            Validated Study Card data, cached or freshly extracted
+        """
+        prompt = prompt or self.prompts
+        key = self.cache.key(payload, prompt, self.config["model_id"])
+        
+        with self.cache.lock_for(key):
+            card = self.cache.get(key)
+            if card is None:
+                if on_miss is not None:
+                    on_miss()
+                card = self.extract(json.dumps(payload, indent=2), prompt)
+                self.cache.put(key, card)
+            return card
+    
     def extract(self, text: str, prompt: str) -> Dict[str, Any]:
         """
         Extract Study Card data from text using LangExtract.
@@ -127,39 +189,13 @@ class StudyCardAdapter:
             ExtractionError: If extraction fails or returns invalid data
         """
         try:
-            # Build example data for consistent extraction
-            examples = [
-                ExampleData(
-                    text="Methods: Adults with COPD randomized 2:1 to Drug X vs placebo. Primary endpoint: Annualized exacerbation rate at Week 52 (ITT analysis). Results: n=660 (Drug X n=440; placebo n=220). Annualized exacerbation rate: 0.85 vs 1.23 (rate ratio 0.69, 95% CI 0.58-0.82, p<0.001).",
-                    extractions=[
-                        Extraction(
-                            extraction_class="StudyCard",
-                            extraction_text=json.dumps({
-                                "doc": {"doc_type": "Abstract", "title": "Phase 3 Study of Drug X in COPD", "year": 2024, "url": "https://example.com", "source_id": "example_001"},
-                                "trial": {"nct_id": "NCT12345678", "phase": "3", "indication": "COPD", "is_pivotal": True},
-                                "primary_endpoints": [{"name": "Annualized exacerbation rate", "evidence": [{"loc": {"scheme": "page_paragraph", "page": 1, "paragraph": 1}}]}],
-                                "populations": {"itt": {"defined": True, "evidence": [{"loc": {"scheme": "page_paragraph", "page": 1, "paragraph": 1}}]}, "pp": {"defined": False, "evidence": []}, "analysis_primary_on": "ITT"},
-                                "arms": [{"label": "Drug X", "n": 440, "evidence": [{"loc": {"scheme": "page_paragraph", "page": 1, "paragraph": 2}}]}, {"label": "Placebo", "n": 220, "evidence": [{"loc": {"scheme": "page_paragraph", "page": 1, "paragraph": 2}}]}],
-                                "sample_size": {"total_n": 660, "evidence": [{"loc": {"scheme": "page_paragraph", "page": 1, "paragraph": 2}}]},
-                                "results": {"primary": [{"endpoint": "Annualized exacerbation rate", "effect_size": {"metric": "Rate Ratio", "value": 0.69, "ci_low": 0.58, "ci_high": 0.82, "ci_level": 95, "evidence": [{"loc": {"scheme": "page_paragraph", "page": 1, "paragraph": 2}}]}, "p_value": 0.001, "evidence": [{"loc": {"scheme": "page_paragraph", "page": 1, "paragraph": 2}}]}]},
-                                "coverage_level": "high", "coverage_rationale": "All required fields present with evidence: primary endpoint, total N, ITT analysis, and effect size with p-value."
-                            }),
-                            attributes={}
-                        )
-                    ]
-                )
-            ]
-            
-            # Get API key for the active provider
-            api_key = os.getenv(self.config["env_var"])
-            
             # Run extraction with provider-specific configuration
             result = lx.extract(
                 text_or_documents=text,
                 prompt_description=prompt,
-                examples=examples,
+                examples=self.examples,
                 model_id=self.config["model_id"],
-                api_key=api_key,
+                api_key=self.api_key,
                 fence_output=self.config["fence_output"],
                 use_schema_constraints=self.config["use_schema_constraints"]
             )
@@ -208,16 +244,16 @@ class StudyCardAdapter:
             except json.JSONDecodeError as e:
                 raise ExtractionError(f"Invalid JSON returned: {e}")
             
-            # Validate against schema
+            # Validate against schema; one pass also collects evidence gaps
+            check = check_card(data)
             try:
-                validate_card(data, is_pivotal=data.get("trial", {}).get("is_pivotal", False))
+                raise_for_check(check, is_pivotal=data.get("trial", {}).get("is_pivotal", False))
             except Exception as e:
                 raise ExtractionError(f"Schema validation failed: {e}")
             
             # Post-extract validation: every numeric field must have evidence
-            evidence_issues = validate_evidence_spans(data)
-            if evidence_issues:
-                raise ExtractionError(f"Missing evidence spans: {', '.join(evidence_issues)}")
+            if check.evidence_issues:
+                raise ExtractionError(f"Missing evidence spans: {', '.join(check.evidence_issues)}")
             
             return data
             
@@ -228,6 +264,15 @@ class StudyCardAdapter:
             # Wrap unexpected errors
             raise ExtractionError(f"Extraction failed: {e}") from e
 
+@lru_cache(maxsize=None)
+def _adapter_for(env_var: str, api_key: str) -> StudyCardAdapter:
+    return StudyCardAdapter()
+
+def get_adapter() -> StudyCardAdapter:
+    """Shared adapter for the active provider; rebuilt when the provider or key changes."""
+    config = ModelConfig.get_active_config()
+    return _adapter_for(config["env_var"], os.getenv(config["env_var"]))
+
 def run_langextract(prompt_text: str, payload: Dict[str, Any], model_id: str = None) -> Dict[str, Any]:
     """
     Run LangExtract extraction using the StudyCardAdapter.
@@ -243,12 +288,8 @@ def run_langextract(prompt_text: str, payload: Dict[str, Any], model_id: str = N
     Raises:
         ExtractionError: If extraction fails
     """
-    # Convert payload to text format for LangExtract
-    input_text = json.dumps(payload, indent=2)
-    
-    # Use the adapter for consistent extraction
-    adapter = StudyCardAdapter()
-    return adapter.extract(input_text, prompt_text)
+    # Reuse the shared adapter; unchanged inputs are served from the cache
+    return get_adapter().extract_payload(payload, prompt_text)
 
 def _parse_study_card_text(study_card_text: str) -> Dict[str, Any]:
     """
@@ -444,39 +485,6 @@ def extract_study_card_from_document(
         logger.error(f"StudyCard extraction failed: {e}")
         raise ExtractionError(f"Extraction failed: {e}")
 
-def create_text_chunks_from_pages(pages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """
-    Convert document pages to text chunks for LangExtract processing.
-    
-    Args:
-        pages: List of page dictionaries with text and positioning
-        
-    Returns:
-        List of text chunks with positioning information
-    """
-    chunks = []
-    
-    for page in pages:
-        page_no = page.get('page_no', 1)
-        text = page.get('text', '')
-        
-        if text.strip():
-            # Split text into paragraphs for better processing
-            paragraphs = text.split('\n\n')
-            
-            for i, paragraph in enumerate(paragraphs):
-                if paragraph.strip():
-                    chunk = {
-                        'page': page_no,
-                        'paragraph': i + 1,
-                        'text': paragraph.strip(),
-                        'start': len('\n\n'.join(paragraphs[:i])) if i > 0 else 0,
-                        'end': len('\n\n'.join(paragraphs[:i+1]))
-                    }
-                    chunks.append(chunk)
-    
-    return chunks
-
 def extract_study_card_from_document_pages(
     doc_meta: Dict[str, Any], 
     pages: List[Dict[str, Any]], 
@@ -496,7 +504,9 @@ def extract_study_card_from_document_pages(
         Validated study card dictionary
     """
     chunks = create_text_chunks_from_pages(pages)
-    return extract_study_card_from_document(doc_meta, chunks, trial_hint)
+    if not chunks:
+        raise ValueError("No text chunks provided for extraction")
+    return get_adapter().extract_payload(build_payload(doc_meta, chunks, trial_hint or {}))
 
 # Legacy mock client for backward compatibility (can be removed in production)
 class MockGeminiClient:
@@ -0,0 +1,114 @@
+"""
+Concurrency helpers shared by LLM extraction workers.
+
+- RunBudget: per-run LLM call and token budget. A call's estimated input
+  tokens are charged when the call is reserved, so workers that start
+  together cannot overshoot the token budget between them; output tokens
+  (or a correction to the estimate) are recorded once the response arrives.
+- KeyedLocks: one lock per cache key, dropped once no thread holds or waits
+  on it, so identical concurrent requests cost a single LLM call without
+  keeping a lock alive for every key ever seen.
+"""
+
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional
+
+
+class RunBudget:
+    """Thread-safe LLM call/token accounting for one extraction run."""
+
+    def __init__(
+        self,
+        max_calls: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        counters: Iterable[str] = ()
+    ):
+        """
+        Initialize the budget.
+
+        Args:
+            max_calls: LLM calls allowed per run (None = unlimited)
+            max_tokens: Tokens allowed per run (None = unlimited)
+            counters: Extra named counters kept alongside the budget (e.g. cache_hits)
+        """
+        self.max_calls = max_calls
+        self.max_tokens = max_tokens
+        self._counters = tuple(counters)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Reset per-run LLM call and token accounting."""
+        with self._lock:
+            self._stats = {'llm_calls': 0, 'tokens_used': 0, 'budget_skips': 0}
+            self._stats.update((name, 0) for name in self._counters)
+
+    def reserve(self, input_tokens: int = 0) -> bool:
+        """
+        Reserve one call and charge its input tokens up front.
+
+        Returns:
+            False (and counts a budget skip) if the call does not fit
+        """
+        with self._lock:
+            stats = self._stats
+            calls_exhausted = self.max_calls is not None and stats['llm_calls'] >= self.max_calls
+            tokens_exhausted = (
+                self.max_tokens is not None
+                and stats['tokens_used'] + input_tokens > self.max_tokens
+            )
+            if calls_exhausted or tokens_exhausted:
+                stats['budget_skips'] += 1
+                return False
+
+            stats['llm_calls'] += 1
+            stats['tokens_used'] += input_tokens
+            return True
+
+    def record_tokens(self, tokens: int):
+        """Add tokens used by a reserved call; negative values correct an over-estimate."""
+        with self._lock:
+            self._stats['tokens_used'] += int(tokens)
+
+    def count(self, name: str, n: int = 1):
+        """Increment a named counter."""
+        with self._lock:
+            self._stats[name] += n
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of calls, tokens, budget skips and extra counters."""
+        with self._lock:
+            return dict(self._stats)
+
+
+class KeyedLocks:
+    """Per-key mutual exclusion with reference-counted lock entries."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, List] = {}  # key -> [lock, holders + waiters]
+
+    @contextmanager
+    def hold(self, key: Hashable) -> Iterator[None]:
+        """Hold the lock for `key`; its entry is removed when the last user leaves."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._entries[key]
+
+    def __len__(self) -> int:
+        """Number of keys currently held or waited on."""
+        with self._lock:
+            return len(self._entries)
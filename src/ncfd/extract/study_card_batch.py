@@ -0,0 +1,219 @@
+"""
+Concurrent Study Card extraction across many documents.
+
+Each document's pages are chunked and packed into token-budgeted windows
+(see `chunking`); every window is one LLM request through a single shared
+`StudyCardAdapter`. Requests run on a bounded thread pool, are spaced to a
+provider requests-per-minute limit, and stop being issued once the run's
+call or token budget is spent. Windows served from the adapter's extraction
+cache skip both the rate limit and the budget. When a document needs
+several windows their cards are merged (see `merge_study_cards`), so facts
+found in any window are kept.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .chunking import create_text_chunks_from_pages, estimate_tokens, pack_windows
+from .llm_budget import RunBudget
+
+logger = logging.getLogger(__name__)
+
+COVERAGE_RANK = {"high": 2, "medium": 1, "med": 1, "low": 0}
+
+
+def _coverage(card: Dict[str, Any]) -> int:
+    return COVERAGE_RANK.get(card.get('coverage_level'), -1)
+
+
+def _merge_values(base: Any, other: Any) -> Any:
+    if isinstance(base, dict) and isinstance(other, dict):
+        merged = dict(base)
+        for key, value in other.items():
+            merged[key] = _merge_values(base[key], value) if key in base else value
+        return merged
+    if isinstance(base, list) and isinstance(other, list):
+        seen = {json.dumps(item, sort_keys=True, default=str) for item in base}
+        merged = list(base)
+        for item in other:
+            item_key = json.dumps(item, sort_keys=True, default=str)
+            if item_key not in seen:
+                seen.add(item_key)
+                merged.append(item)
+        return merged
+    return other if base in (None, "") else base
+
+
+def merge_study_cards(cards: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Merge the Study Cards of one document's windows into a single card.
+
+    Lists (arms, endpoints, signals, ...) are unioned without duplicates and
+    objects are merged key by key. Scalars come from the best-covered card
+    that has a value, and the card takes the highest coverage level.
+
+    Returns:
+        The merged card, or None without cards
+    """
+    if not cards:
+        return None
+    ranked = sorted(cards, key=_coverage, reverse=True)
+    merged = ranked[0]
+    for card in ranked[1:]:
+        merged = _merge_values(merged, card)
+    return merged
+
+
+class _BudgetExhausted(Exception):
+    """Raised before an LLM call that the run budget cannot afford."""
+
+
+@dataclass
+class StudyCardJob:
+    """One document to extract a Study Card from."""
+    doc_meta: Dict[str, Any]
+    pages: List[Dict[str, Any]]
+    trial_hint: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class StudyCardResult:
+    """Outcome of a Study Card job."""
+    source_id: Optional[str]
+    card: Optional[Dict[str, Any]] = None
+    windows: int = 0
+    errors: List[str] = field(default_factory=list)
+    budget_skipped: bool = False
+
+
+class StudyCardExtractionScheduler:
+    """Run Study Card extractions for many documents under rate and budget limits."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, adapter: Any = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            config: Optional settings: max_concurrency, requests_per_minute,
+                max_llm_calls_per_run, token_budget_per_run, max_window_tokens
+                and max_chunk_tokens
+            adapter: Extraction adapter; defaults to the shared `get_adapter()`
+        """
+        config = config or {}
+        self.max_concurrency = max(1, int(config.get('max_concurrency', 4)))
+        self.requests_per_minute = config.get('requests_per_minute')
+        self.max_llm_calls_per_run = config.get('max_llm_calls_per_run')
+        self.token_budget_per_run = config.get('token_budget_per_run')
+        self.max_window_tokens = int(config.get('max_window_tokens', 6000))
+        self.max_chunk_tokens = int(config.get('max_chunk_tokens', 1000))
+
+        self._adapter = adapter
+        self._lock = threading.Lock()
+        self._next_request_at = 0.0
+        self._budget = RunBudget(
+            self.max_llm_calls_per_run, self.token_budget_per_run, counters=('cache_hits',)
+        )
+
+    @property
+    def adapter(self):
+        if self._adapter is None:
+            from .lanextract_adapter import get_adapter
+            self._adapter = get_adapter()
+        return self._adapter
+
+    def extract_many(self, jobs: List[StudyCardJob]) -> List[StudyCardResult]:
+        """
+        Extract Study Cards for all jobs.
+
+        Returns:
+            One result per job, in input order
+        """
+        self._budget.reset()
+        if not jobs:
+            return []
+
+        adapter = self.adapter
+        prompt_tokens = estimate_tokens(adapter.prompts)
+
+        results = [StudyCardResult(source_id=job.doc_meta.get('source_id')) for job in jobs]
+        requests = []
+        for job, result in zip(jobs, results):
+            chunks = create_text_chunks_from_pages(job.pages, self.max_chunk_tokens)
+            windows = pack_windows(chunks, self.max_window_tokens)
+            result.windows = len(windows)
+            if not windows:
+                result.errors.append("No text chunks provided for extraction")
+            for window in windows:
+                payload = {
+                    "document_metadata": job.doc_meta,
+                    "text_chunks": window,
+                    "trial_context": job.trial_hint or {},
+                }
+                requests.append((result, payload))
+
+        def _run(request):
+            result, payload = request
+            called = []
+
+            def before_llm_call():
+                input_tokens = prompt_tokens + estimate_tokens(json.dumps(payload, indent=2))
+                if not self._budget.reserve(input_tokens):
+                    raise _BudgetExhausted()
+                self._wait_for_rate_slot()
+                called.append(True)
+
+            try:
+                card = adapter.extract_payload(payload, on_miss=before_llm_call)
+            except _BudgetExhausted:
+                return result, None, None, True
+            except Exception as e:
+                return result, None, str(e), False
+            if called:
+                self._budget.record_tokens(estimate_tokens(json.dumps(card)))
+            else:
+                self._budget.count('cache_hits')
+            return result, card, None, False
+
+        window_cards: Dict[int, List[Dict[str, Any]]] = {}
+        workers = min(self.max_concurrency, len(requests)) or 1
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for result, card, error, skipped in executor.map(_run, requests):
+                if skipped:
+                    result.budget_skipped = True
+                elif error:
+                    result.errors.append(error)
+                else:
+                    window_cards.setdefault(id(result), []).append(card)
+
+        for result in results:
+            result.card = merge_study_cards(window_cards.get(id(result), []))
+
+        stats = self.get_run_stats()
+        logger.info(
+            f"Study Card extraction: {len(jobs)} documents, {stats['llm_calls']} LLM calls, "
+            f"{stats['cache_hits']} cache hits, {stats['tokens_used']} tokens, "
+            f"{stats['budget_skips']} skipped for budget"
+        )
+        return results
+
+    def _wait_for_rate_slot(self):
+        """Space request starts evenly to stay under requests_per_minute."""
+        if not self.requests_per_minute:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_request_at)
+            self._next_request_at = start_at + 60.0 / self.requests_per_minute
+        if start_at > now:
+            time.sleep(start_at - now)
+
+    def get_run_stats(self) -> Dict[str, int]:
+        """Get LLM call, token, cache and budget statistics for the current run."""
+        return self._budget.stats()
@@ -0,0 +1,129 @@
+"""
+Persistent, content-addressed cache of extracted Study Cards.
+
+A validated card is stored under a key derived from the sha256 of the
+extraction input (document text chunks, metadata and trial context), the
+hash of the prompt text, the model id and the Study Card schema version.
+Any change to the document, `study_card_prompts`, the model or the schema
+therefore misses the cache, while re-running the pipeline over unchanged
+inputs costs no LLM calls. Entries are JSON files written atomically under
+`<cache_dir>/<key[:2]>/<key>.json`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Optional
+
+from .llm_budget import KeyedLocks
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_FILE = Path(__file__).parent / "study_card.schema.json"
+
+
+def _sha256(data: str) -> str:
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=1)
+def schema_version() -> str:
+    """Content hash of the Study Card schema."""
+    return hashlib.sha256(SCHEMA_FILE.read_bytes()).hexdigest()[:16]
+
+
+def document_hash(payload: Dict[str, Any]) -> str:
+    """sha256 of the canonical JSON of an extraction payload."""
+    return _sha256(json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str))
+
+
+class StudyCardCache:
+    """File-backed Study Card cache with hit/miss accounting."""
+
+    def __init__(self, cache_dir: Any = ".cache/study_cards", enabled: bool = True):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding cache entries
+            enabled: When False every lookup misses and nothing is written
+        """
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled
+        if self.enabled:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._key_locks = KeyedLocks()
+        self._stats = {'hits': 0, 'misses': 0, 'writes': 0, 'errors': 0}
+
+    @classmethod
+    def from_env(cls) -> "StudyCardCache":
+        """Cache configured by STUDY_CARD_CACHE_DIR / STUDY_CARD_CACHE_ENABLED."""
+        enabled = os.getenv("STUDY_CARD_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+        return cls(os.getenv("STUDY_CARD_CACHE_DIR", ".cache/study_cards"), enabled=enabled)
+
+    def key(self, payload: Dict[str, Any], prompt: str, model_id: str) -> str:
+        """Cache key for (document hash, prompt hash, model id, schema version)."""
+        raw = f"{document_hash(payload)}|{_sha256(prompt)}|{model_id}|{schema_version()}"
+        return _sha256(raw)
+
+    def lock_for(self, key: str) -> ContextManager[None]:
+        """
+        Lock guarding a single key, for use in a `with` block.
+
+        Holding it across lookup, extraction and store makes concurrent
+        requests for the same input cost a single LLM call.
+        """
+        return self._key_locks.hold(key)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Load a cached card, counting a hit or a miss."""
+        card = None
+        if self.enabled:
+            path = self._path(key)
+            if path.exists():
+                try:
+                    with open(path, 'r') as f:
+                        card = json.load(f)
+                except Exception as e:
+                    logger.warning(f"Study Card cache read failed for {key}: {e}")
+                    self._count('errors')
+
+        self._count('hits' if card is not None else 'misses')
+        return card
+
+    def put(self, key: str, card: Dict[str, Any]):
+        """Persist a validated card."""
+        if not self.enabled:
+            return
+
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump(card, f)
+            tmp_path.replace(path)
+            self._count('writes')
+        except Exception as e:
+            logger.warning(f"Study Card cache write failed for {key}: {e}")
+            self._count('errors')
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get hit, miss, write and error counts."""
+        with self._lock:
+            return dict(self._stats)
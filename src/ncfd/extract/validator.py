@@ -8,6 +8,8 @@ and enforces pivotal trial requirements.
 from __future__ import annotations
 import json
 import jsonschema
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, List
 
@@ -30,6 +32,104 @@ def load_schema() -> Dict[str, Any]:
 _schema = load_schema()
 
 
+@lru_cache(maxsize=1)
+def get_validator() -> jsonschema.protocols.Validator:
+    """
+    Study Card validator, built once.
+    
+    The schema is checked, the draft-specific validator class resolved and
+    its format checker attached a single time; every card reuses the result.
+    """
+    cls = jsonschema.validators.validator_for(_schema)
+    cls.check_schema(_schema)
+    return cls(_schema, format_checker=cls.FORMAT_CHECKER)
+
+
+@dataclass
+class CardCheck:
+    """Schema errors, evidence gaps and coverage of a card from one traversal."""
+    schema_errors: List[jsonschema.ValidationError] = field(default_factory=list)
+    missing_fields: List[str] = field(default_factory=list)  # Pivotal-required fields absent
+    evidence_issues: List[str] = field(default_factory=list)
+    
+    @property
+    def is_valid(self) -> bool:
+        return not self.schema_errors
+    
+    @property
+    def coverage_level(self) -> str:
+        """Coverage is high with all required elements, med with one missing, else low."""
+        if not self.missing_fields:
+            return "high"
+        return "med" if len(self.missing_fields) == 1 else "low"
+    
+    def best_schema_error(self) -> jsonschema.ValidationError:
+        """The error jsonschema.validate would have raised."""
+        return jsonschema.exceptions.best_match(self.schema_errors)
+
+
+def _has_evidence(obj: Dict[str, Any]) -> bool:
+    """Check if an object has evidence spans."""
+    evidence = obj.get("evidence", [])
+    return isinstance(evidence, list) and len(evidence) > 0
+
+
+def _walk_card(card: Dict[str, Any], check: CardCheck) -> None:
+    """Single pass collecting missing required elements and evidence gaps."""
+    missing, issues = check.missing_fields, check.evidence_issues
+    
+    primary_endpoints = card.get("primary_endpoints") or []
+    if not primary_endpoints:
+        missing.append("primary_endpoints")
+    for i, endpoint in enumerate(primary_endpoints):
+        if not _has_evidence(endpoint):
+            issues.append(f"primary_endpoints[{i}].evidence")
+    
+    sample_size = card.get("sample_size") or {}
+    if sample_size.get("total_n") is None:
+        missing.append("sample_size.total_n")
+    elif not _has_evidence(sample_size):
+        issues.append("sample_size.evidence")
+    
+    if not (card.get("populations") or {}).get("analysis_primary_on"):
+        missing.append("populations.analysis_primary_on")
+    
+    for i, arm in enumerate(card.get("arms") or []):
+        if arm.get("n") is not None and not _has_evidence(arm):
+            issues.append(f"arms[{i}].evidence")
+    
+    has_effect_or_p = False
+    for i, result in enumerate((card.get("results") or {}).get("primary") or []):
+        p_value = result.get("p_value")
+        effect_size = result.get("effect_size") or {}
+        if p_value is not None and not _has_evidence(result):
+            issues.append(f"results.primary[{i}].evidence")
+        if effect_size.get("value") is not None and not _has_evidence(effect_size):
+            issues.append(f"results.primary[{i}].effect_size.evidence")
+        if p_value is not None or effect_size.get("value") is not None:
+            has_effect_or_p = True
+    if not has_effect_or_p:
+        missing.append("results.primary.(effect_size.value OR p_value)")
+
+
+def check_card(card: Dict[str, Any], schema: bool = True) -> CardCheck:
+    """
+    Check a Study Card in one go.
+    
+    Args:
+        card: Study Card dictionary
+        schema: Whether to run schema validation (content checks always run)
+        
+    Returns:
+        CardCheck with schema errors, pivotal gaps, evidence gaps and coverage
+    """
+    check = CardCheck()
+    if schema:
+        check.schema_errors = list(get_validator().iter_errors(card))
+    _walk_card(card, check)
+    return check
+
+
 def validate_card(card: Dict[str, Any], is_pivotal: bool = False) -> None:
     """
     Validate a Study Card against the schema and pivotal requirements.
@@ -42,14 +142,22 @@ def validate_card(card: Dict[str, Any], is_pivotal: bool = False) -> None:
         jsonschema.ValidationError: If schema validation fails
         ValueError: If pivotal trial requirements are not met
     """
-    # First, validate against JSON schema
-    jsonschema.validate(card, _schema)
+    raise_for_check(check_card(card), is_pivotal)
+
+
+def raise_for_check(check: CardCheck, is_pivotal: bool = False) -> None:
+    """
+    Raise for a failed CardCheck exactly as validate_card would.
+    
+    Raises:
+        jsonschema.ValidationError: If schema validation failed
+        ValueError: If pivotal trial requirements are not met
+    """
+    if check.schema_errors:
+        raise check.best_schema_error()
     
-    # Check pivotal trial requirements
-    if is_pivotal:
-        missing = _check_pivotal_requirements(card)
-        if missing:
-            raise ValueError(f"PivotalStudyMissingFields: {', '.join(missing)}")
+    if is_pivotal and check.missing_fields:
+        raise ValueError(f"PivotalStudyMissingFields: {', '.join(check.missing_fields)}")
 
 
 def _check_pivotal_requirements(card: Dict[str, Any]) -> List[str]:
@@ -62,34 +170,7 @@ def _check_pivotal_requirements(card: Dict[str, Any]) -> List[str]:
     Returns:
         List of missing required field paths
     """
-    missing = []
-    
-    # Check primary endpoints
-    if not card.get("primary_endpoints"):
-        missing.append("primary_endpoints")
-    
-    # Check sample size total N
-    total_n = ((card.get("sample_size") or {}).get("total_n"))
-    if total_n is None:
-        missing.append("sample_size.total_n")
-    
-    # Check ITT/PP selection for primary analysis
-    if not (card.get("populations") or {}).get("analysis_primary_on"):
-        missing.append("populations.analysis_primary_on")
-    
-    # Check effect size OR p-value for primary endpoint
-    ok = False
-    for r0 in (card.get("results") or {}).get("primary", []):
-        eff = (r0.get("effect_size") or {}).get("value")
-        p = r0.get("p_value")
-        if eff is not None or p is not None:
-            ok = True
-            break
-    
-    if not ok:
-        missing.append("results.primary.(effect_size.value OR p_value)")
-    
-    return missing
+    return check_card(card, schema=False).missing_fields
 
 
 def validate_evidence_spans(card: Dict[str, Any]) -> List[str]:
@@ -102,39 +183,7 @@ def validate_evidence_spans(card: Dict[str, Any]) -> List[str]:
     Returns:
         List of validation issues found
     """
-    issues = []
-    
-    # Helper function to check evidence
-    def has_evidence(obj: Dict[str, Any], field_name: str) -> bool:
-        """Check if an object has evidence spans."""
-        evidence = obj.get("evidence", [])
-        return isinstance(evidence, list) and len(evidence) > 0
-    
-    # Check primary endpoints
-    for i, endpoint in enumerate(card.get("primary_endpoints", [])):
-        if not has_evidence(endpoint, "evidence"):
-            issues.append(f"primary_endpoints[{i}].evidence")
-    
-    # Check sample size
-    sample_size = card.get("sample_size", {})
-    if sample_size.get("total_n") is not None and not has_evidence(sample_size, "evidence"):
-        issues.append("sample_size.evidence")
-    
-    # Check arms
-    for i, arm in enumerate(card.get("arms", [])):
-        if arm.get("n") is not None and not has_evidence(arm, "evidence"):
-            issues.append(f"arms[{i}].evidence")
-    
-    # Check results
-    for i, result in enumerate(card.get("results", {}).get("primary", [])):
-        if result.get("p_value") is not None and not has_evidence(result, "evidence"):
-            issues.append(f"results.primary[{i}].evidence")
-        
-        effect_size = result.get("effect_size", {})
-        if effect_size.get("value") is not None and not has_evidence(effect_size, "evidence"):
-            issues.append(f"results.primary[{i}].effect_size.evidence")
-    
-    return issues
+    return check_card(card, schema=False).evidence_issues
 
 
 def get_coverage_level(card: Dict[str, Any]) -> str:
@@ -147,37 +196,7 @@ def get_coverage_level(card: Dict[str, Any]) -> str:
     Returns:
         Coverage level: "high", "med", or "low"
     """
-    # Check required elements for high coverage
-    has_primary_endpoint = bool(card.get("primary_endpoints"))
-    has_total_n = card.get("sample_size", {}).get("total_n") is not None
-    has_analysis_population = bool(card.get("populations", {}).get("analysis_primary_on"))
-    
-    # Check for effect size or p-value
-    has_effect_or_p = False
-    for result in card.get("results", {}).get("primary", []):
-        if (result.get("effect_size", {}).get("value") is not None or 
-            result.get("p_value") is not None):
-            has_effect_or_p = True
-            break
-    
-    # Count missing elements
-    missing_count = 0
-    if not has_primary_endpoint:
-        missing_count += 1
-    if not has_total_n:
-        missing_count += 1
-    if not has_analysis_population:
-        missing_count += 1
-    if not has_effect_or_p:
-        missing_count += 1
-    
-    # Determine coverage level
-    if missing_count == 0:
-        return "high"
-    elif missing_count == 1:
-        return "med"
-    else:
-        return "low"
+    return check_card(card, schema=False).coverage_level
 
 
 def validate_card_completeness(card: Dict[str, Any]) -> Dict[str, Any]:
@@ -199,29 +218,24 @@ def validate_card_completeness(card: Dict[str, Any]) -> Dict[str, Any]:
         "recommendations": []
     }
     
-    try:
-        # Schema validation
-        jsonschema.validate(card, _schema)
-        results["coverage_level"] = get_coverage_level(card)
-    except jsonschema.ValidationError as e:
+    check = check_card(card)
+    
+    if check.is_valid:
+        results["coverage_level"] = check.coverage_level
+    else:
         results["is_valid"] = False
-        results["schema_errors"].append(str(e))
+        best = check.best_schema_error()
+        results["schema_errors"] = [str(best)] + [str(e) for e in check.schema_errors if e is not best]
     
     # Check pivotal requirements if applicable
-    is_pivotal = card.get("trial", {}).get("is_pivotal", False)
-    if is_pivotal:
-        try:
-            missing = _check_pivotal_requirements(card)
-            if missing:
-                results["pivotal_errors"] = missing
-                results["recommendations"].append("Pivotal trial missing required fields")
-        except ValueError as e:
-            results["pivotal_errors"].append(str(e))
+    is_pivotal = (card.get("trial") or {}).get("is_pivotal", False)
+    if is_pivotal and check.missing_fields:
+        results["pivotal_errors"] = check.missing_fields
+        results["recommendations"].append("Pivotal trial missing required fields")
     
     # Check evidence spans
-    evidence_issues = validate_evidence_spans(card)
-    if evidence_issues:
-        results["evidence_issues"] = evidence_issues
+    if check.evidence_issues:
+        results["evidence_issues"] = check.evidence_issues
         results["recommendations"].append("Add evidence spans for all numeric claims")
     
     # Generate recommendations
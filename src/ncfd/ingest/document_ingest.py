@@ -5,12 +5,18 @@ This module handles the discovery, fetching, parsing, and entity extraction
 for company PR/IR documents and conference abstracts (AACR, ASCO, ESMO).
 """
 
+import asyncio
 import hashlib
 import json
 import logging
+import os
 import re
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from datetime import datetime
-from typing import List, Dict, Optional, Any, Tuple
+from typing import List, Dict, Optional, Any, Iterator, Tuple
 from urllib.parse import urlparse
 import requests
 from bs4 import BeautifulSoup
@@ -24,25 +30,75 @@ from ncfd.extract.asset_extractor import (
     AssetMatch, extract_all_entities, find_nearby_assets,
     get_confidence_for_link_type
 )
+from ncfd.ingest.near_dup import MinHasher, NearDuplicateIndex
+from ncfd.ingest.pdf_pages import PDF_AVAILABLE, PdfPageExtractor
+from ncfd.mapping.alias_index import get_alias_index
 from ncfd.storage import StorageBackend, StorageError, create_storage_backend, create_unified_storage_manager
 
 logger = logging.getLogger(__name__)
 
 
+def _get_header(headers: Optional[Dict[str, str]], name: str) -> Optional[str]:
+    """Case-insensitive header lookup on a plain dict."""
+    if not headers:
+        return None
+    name = name.lower()
+    for key, value in headers.items():
+        if isinstance(key, str) and key.lower() == name:
+            return value
+    return None
+
+
 class DocumentIngester:
     """Handles document ingestion workflow for PR/IR and conference abstracts."""
     
-    def __init__(self, db_session: Session, storage_config: Dict[str, Any] = None):
+    def __init__(self, db_session: Session, storage_config: Dict[str, Any] = None,
+                 fetch_config: Dict[str, Any] = None, parse_config: Dict[str, Any] = None):
         """
         Initialize the document ingester.
         
         Args:
             db_session: Database session
             storage_config: Storage configuration dictionary
+            fetch_config: Fetch engine settings (concurrency, per-host limits, politeness delay,
+                streaming to storage)
+            parse_config: PDF parsing settings (workers, per-document time, memory and page caps)
+                and near-duplicate detection settings
         """
         self.db_session = db_session
         self.storage_config = storage_config or {}
         self.storage_backend = None
+        self.alias_index = get_alias_index()
+        
+        # Fetch engine settings
+        fetch_config = fetch_config or {}
+        self.fetch_timeout = fetch_config.get('timeout', 30)
+        self.max_concurrency = max(1, fetch_config.get('max_concurrency', 16))
+        self.per_host_concurrency = max(1, fetch_config.get('per_host_concurrency', 2))
+        self.per_host_delay = fetch_config.get('per_host_delay_seconds', 1.0)
+        # Stream bodies straight to storage so fetched docs carry handles, not bytes
+        self.stream_to_storage = fetch_config.get('stream_to_storage', True)
+        self.stream_chunk_size = fetch_config.get('stream_chunk_size', 64 * 1024)
+        self.stream_head_bytes = fetch_config.get('stream_head_bytes', 64 * 1024)
+        self.last_fetch_stats: Dict[str, int] = {}
+        
+        # PDF parsing settings
+        parse_config = parse_config or {}
+        self.pdf_extractor = PdfPageExtractor(
+            max_workers=parse_config.get('pdf_workers'),
+            max_seconds=parse_config.get('pdf_max_seconds', 120.0),
+            page_timeout=parse_config.get('pdf_page_timeout_seconds', 30),
+            max_memory_mb=parse_config.get('pdf_max_memory_mb', 1024),
+            max_pages=parse_config.get('pdf_max_pages', 500)
+        )
+        
+        # Near-duplicates (syndicated copies) attach to their canonical document
+        self.near_dup_index = None
+        if parse_config.get('near_dup_enabled', True):
+            self.near_dup_index = NearDuplicateIndex(
+                threshold=parse_config.get('near_dup_threshold', 0.8),
+                min_tokens=parse_config.get('near_dup_min_tokens', 50)
+            )
         
         # Initialize storage backend if config provided
         if self.storage_config:
@@ -174,21 +230,41 @@ class DocumentIngester:
         
         return discovered_sources
     
-    def fetch_document(self, url: str, source_type: str) -> Optional[Dict[str, Any]]:
+    def fetch_document(self, url: str, source_type: str,
+                       conditional_headers: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
         """
         Fetch a document from URL and compute metadata.
         
         Args:
             url: Document URL
             source_type: Type of document source
+            conditional_headers: If-None-Match / If-Modified-Since headers from a previous fetch
             
         Returns:
-            Document metadata and content, or None if failed
+            Document metadata and content, a ``not_modified`` marker on HTTP 304,
+            or None if failed. When streaming to storage, ``content`` is replaced
+            by a ``storage_uri``/``size`` handle.
         """
         try:
-            response = self.session.get(url, timeout=30)
+            stream = self.storage_backend is not None and self.stream_to_storage
+            request_kwargs = {'timeout': self.fetch_timeout, 'headers': conditional_headers or None}
+            if stream:
+                request_kwargs['stream'] = True
+            response = self.session.get(url, **request_kwargs)
+            
+            if response.status_code == 304:
+                response.close()
+                return {
+                    'url': url,
+                    'not_modified': True,
+                    'headers': dict(response.headers)
+                }
+            
             response.raise_for_status()
             
+            if stream:
+                return self._fetch_to_storage(url, response)
+            
             # Compute SHA256 hash of raw content
             content = response.content
             sha256 = hashlib.sha256(content).hexdigest()
@@ -216,7 +292,70 @@ class DocumentIngester:
             logger.error(f"Failed to fetch {url}: {e}")
             return None
     
-    def parse_document(self, content: bytes, content_type: str, url: str) -> Dict[str, Any]:
+    def _fetch_to_storage(self, url: str, response: requests.Response) -> Dict[str, Any]:
+        """
+        Stream a response body into the storage backend.
+        
+        The body is hashed incrementally while it is written to a temp file,
+        which is then handed to the backend; only the first
+        ``stream_head_bytes`` are kept in memory for publication-date parsing.
+        
+        Returns:
+            Document metadata with a storage handle instead of content
+        """
+        hasher = hashlib.sha256()
+        size = 0
+        head = bytearray()
+        
+        fd, tmp_path = tempfile.mkstemp(prefix='fetch-', suffix='.part',
+                                        dir=self.storage_backend.staging_dir())
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=self.stream_chunk_size):
+                    if not chunk:
+                        continue
+                    hasher.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+                    if len(head) < self.stream_head_bytes:
+                        head += chunk[:self.stream_head_bytes - len(head)]
+            
+            sha256 = hasher.hexdigest()
+            metadata = {
+                'source_url': url,
+                'uploaded_at': datetime.utcnow().isoformat(),
+                'content_length': size
+            }
+            storage_uri = self.storage_backend.store_file(
+                tmp_path, sha256, self._get_filename_from_url(url), metadata
+            )
+        finally:
+            response.close()
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        
+        content_type = response.headers.get('content-type', 'text/html')
+        
+        return {
+            'url': url,
+            'storage_uri': storage_uri,
+            'sha256': sha256,
+            'size': size,
+            'content_type': content_type,
+            'published_at': self._extract_publication_date(response, bytes(head)),
+            'oa_status': self._determine_oa_status(url, content_type, response.headers),
+            'headers': dict(response.headers)
+        }
+    
+    def load_content(self, fetch_data: Dict[str, Any]) -> bytes:
+        """Return document bytes, opening the storage handle lazily if needed."""
+        if 'content' in fetch_data:
+            return fetch_data['content']
+        with closing(self.storage_backend.open_stream(fetch_data['storage_uri'])) as stream:
+            return stream.read()
+    
+    def parse_document(self, content: bytes, content_type: str, url: str,
+                       stream: bool = False) -> Dict[str, Any]:
         """
         Parse document content and extract text, tables, and entities.
         
@@ -224,6 +363,9 @@ class DocumentIngester:
             content: Raw document content
             content_type: MIME type of content
             url: Source URL for context
+            stream: For PDFs, return pages lazily under ``page_stream`` instead
+                of collecting them, so store_document can persist each page
+                as soon as it is extracted
             
         Returns:
             Parsed document data
@@ -270,16 +412,56 @@ class DocumentIngester:
             parsed_data['entities'] = [self._asset_match_to_dict(entity) for entity in entities]
             
         elif 'application/pdf' in content_type:
-            # PDF parsing would go here
-            # For now, return minimal data
-            parsed_data['text_pages'].append({
-                'page_no': 1,
-                'char_count': 0,
-                'text': '[PDF content - parsing not implemented]'
-            })
+            if not PDF_AVAILABLE:
+                logger.warning(f"pdfminer.six not installed; skipping PDF text for {url}")
+                parsed_data['text_pages'].append({
+                    'page_no': 1,
+                    'char_count': 0,
+                    'text': '[PDF content - pdfminer.six not installed]'
+                })
+            elif stream:
+                parsed_data['page_stream'] = self._iter_pdf_pages(content, url)
+            else:
+                for page in self._iter_pdf_pages(content, url):
+                    parsed_data['text_pages'].append({
+                        'page_no': page['page_no'],
+                        'char_count': page['char_count'],
+                        'text': page['text']
+                    })
+                    parsed_data['tables'].extend(page['tables'])
+                    parsed_data['entities'].extend(page['entities'])
+                    for key, value in self._extract_citations(page['text']).items():
+                        parsed_data['citations'].setdefault(key, value)
+                
+                parsed_data['text_pages'].sort(key=lambda p: p['page_no'])
+                parsed_data['tables'].sort(key=lambda t: (t['page_no'], t['table_idx']))
         
         return parsed_data
     
+    def _iter_pdf_pages(self, content: bytes, url: str) -> Iterator[Dict[str, Any]]:
+        """
+        Yield PDF pages (text, tables and entities) in the order workers finish them.
+        
+        Unreadable PDFs yield nothing.
+        """
+        fd, path = tempfile.mkstemp(prefix='parse-', suffix='.pdf')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            
+            try:
+                pages = self.pdf_extractor.iter_pages(path)
+                for page in pages:
+                    entities = extract_all_entities(page['text'], page_no=page['page_no'])
+                    page['entities'] = [self._asset_match_to_dict(entity) for entity in entities]
+                    yield page
+            except Exception as e:
+                logger.warning(f"Failed to parse PDF {url}: {e}")
+            
+            logger.info(f"PDF parse stats for {url}: {self.pdf_extractor.last_stats}")
+        finally:
+            os.unlink(path)
+    
     def store_document(self, fetch_data: Dict[str, Any], parsed_data: Dict[str, Any],
                       source_type: str, publisher: str = None) -> Optional[Document]:
         """
@@ -296,14 +478,15 @@ class DocumentIngester:
         """
         try:
             # Upload to storage backend if available
-            storage_uri = None
-            if self.storage_backend:
+            # Streamed fetches were written to storage already
+            storage_uri = fetch_data.get('storage_uri')
+            if storage_uri is None and self.storage_backend:
                 storage_uri = self._upload_to_storage(
                     fetch_data['content'],
                     fetch_data['sha256'],
                     fetch_data['url']
                 )
-            else:
+            elif storage_uri is None:
                 # Fallback to local storage path
                 storage_uri = f"file:///tmp/{fetch_data['sha256']}"
             
@@ -318,12 +501,16 @@ class DocumentIngester:
                 sha256=fetch_data['sha256'],
                 oa_status=fetch_data['oa_status'],
                 status='fetched',
-                fetched_at=datetime.utcnow()
+                fetched_at=datetime.utcnow(),
+                http_etag=_get_header(fetch_data.get('headers'), 'etag'),
+                http_last_modified=_get_header(fetch_data.get('headers'), 'last-modified')
             )
             
             self.db_session.add(doc)
             self.db_session.flush()  # Get the doc_id
             
+            hasher = MinHasher() if self.near_dup_index else None
+            
             # Create text pages
             for page_data in parsed_data['text_pages']:
                 text_page = DocumentTextPage(
@@ -333,6 +520,8 @@ class DocumentIngester:
                     text=page_data['text']
                 )
                 self.db_session.add(text_page)
+                if hasher:
+                    hasher.update(page_data['text'])
             
             # Create tables
             for table_data in parsed_data['tables']:
@@ -345,19 +534,50 @@ class DocumentIngester:
                 )
                 self.db_session.add(table)
             
+            # Near-duplicates keep their pages but not entities; streamed
+            # documents can only be checked once all pages are in
+            page_stream = parsed_data.get('page_stream')
+            canonical_doc_id = None
+            if page_stream is None:
+                canonical_doc_id = self._attach_near_duplicate(doc, hasher)
+            
             # Create entities
-            for entity_data in parsed_data['entities']:
-                entity = DocumentEntity(
-                    doc_id=doc.doc_id,
-                    ent_type=entity_data['alias_type'],
-                    value_text=entity_data['value_text'],
-                    value_norm=entity_data['value_norm'],
-                    page_no=entity_data['page_no'],
-                    char_start=entity_data['char_start'],
-                    char_end=entity_data['char_end'],
-                    detector=entity_data['detector']
-                )
-                self.db_session.add(entity)
+            if canonical_doc_id is None:
+                for entity_data in parsed_data['entities']:
+                    self.db_session.add(self._entity_from_dict(doc.doc_id, entity_data))
+            
+            # Persist streamed PDF pages as they finish, releasing each after flush
+            if page_stream is not None:
+                for page in page_stream:
+                    rows = [DocumentTextPage(
+                        doc_id=doc.doc_id,
+                        page_no=page['page_no'],
+                        char_count=page['char_count'],
+                        text=page['text']
+                    )]
+                    rows.extend(
+                        DocumentTable(
+                            doc_id=doc.doc_id,
+                            page_no=table_data['page_no'],
+                            table_idx=table_data['table_idx'],
+                            table_jsonb=table_data['table_jsonb'],
+                            detector=table_data['detector']
+                        )
+                        for table_data in page['tables']
+                    )
+                    rows.extend(self._entity_from_dict(doc.doc_id, e) for e in page['entities'])
+                    
+                    self.db_session.add_all(rows)
+                    self.db_session.flush()
+                    for row in rows:
+                        self.db_session.expunge(row)
+                    
+                    for key, value in self._extract_citations(page['text']).items():
+                        parsed_data['citations'].setdefault(key, value)
+                    if hasher:
+                        hasher.update(page['text'])
+                
+                self._attach_near_duplicate(doc, hasher)
             
             # Create citations if any
             if parsed_data['citations']:
@@ -381,6 +601,37 @@ class DocumentIngester:
             self.db_session.rollback()
             return None
     
+    def _attach_near_duplicate(self, doc: Document, hasher: Optional[MinHasher]) -> Optional[int]:
+        """
+        Point a near-duplicate at its canonical document, or index it as canonical.
+        
+        Best effort: lookup failures leave the document treated as canonical.
+        
+        Returns:
+            Canonical doc_id if the document is a near-duplicate
+        """
+        if hasher is None or not self.near_dup_index.eligible(hasher):
+            return None
+        
+        signature = hasher.signature()
+        try:
+            with self.db_session.begin_nested():
+                match = self.near_dup_index.find(self.db_session, signature)
+                if match is None:
+                    self.near_dup_index.add(self.db_session, doc.doc_id, signature)
+                    return None
+        except Exception as e:
+            logger.warning(f"Near-duplicate check failed for doc_id {doc.doc_id}: {e}")
+            return None
+        
+        canonical_doc_id, score = match
+        doc.canonical_doc_id = canonical_doc_id
+        logger.info(
+            f"Document {doc.doc_id} is a near-duplicate of {canonical_doc_id} "
+            f"(estimated similarity {score:.2f})"
+        )
+        return canonical_doc_id
+    
     def create_document_links(self, doc: Document, entities: List[Dict[str, Any]]) -> None:
         """
         Create document links based on extracted entities.
@@ -615,6 +866,19 @@ class DocumentIngester:
             'detector': asset_match.detector
         }
     
+    def _entity_from_dict(self, doc_id: int, entity_data: Dict[str, Any]) -> DocumentEntity:
+        """Build a DocumentEntity row from an entity dictionary."""
+        return DocumentEntity(
+            doc_id=doc_id,
+            ent_type=entity_data['alias_type'],
+            value_text=entity_data['value_text'],
+            value_norm=entity_data['value_norm'],
+            page_no=entity_data['page_no'],
+            char_start=entity_data['char_start'],
+            char_end=entity_data['char_end'],
+            detector=entity_data['detector']
+        )
+    
     def _dict_to_asset_match(self, entity_dict: Dict[str, Any]) -> AssetMatch:
         """Convert dictionary to AssetMatch."""
         return AssetMatch(
@@ -630,13 +894,11 @@ class DocumentIngester:
     def _get_or_create_asset(self, asset_match: AssetMatch) -> Asset:
         """Get existing asset or create new one."""
         # Look for existing asset by alias
-        existing_alias = self.db_session.query(AssetAlias).filter(
-            AssetAlias.alias_norm == asset_match.value_norm,
-            AssetAlias.alias_type == asset_match.alias_type
-        ).first()
-        
-        if existing_alias:
-            return existing_alias.asset
+        self.alias_index.ensure_fresh(self.db_session)
+        for asset_id in self.alias_index.asset_ids(asset_match.value_norm, asset_match.alias_type):
+            asset = self.db_session.get(Asset, asset_id)
+            if asset is not None:
+                return asset
         
         # Create new asset
         asset = Asset()
@@ -652,6 +914,7 @@ class DocumentIngester:
             source='document_extraction'
         )
         self.db_session.add(alias)
+        self.alias_index.add_on_commit(self.db_session, asset_match.value_norm, asset_match.alias_type, asset.asset_id)
         
         return asset
 
@@ -712,33 +975,139 @@ class DocumentIngester:
         
         fetched_docs = []
         failed_sources = []
+        not_modified = []
         
-        for i, source in enumerate(sources[:max_docs]):
-            try:
-                logger.info(f"Fetching {i+1}/{len(sources)}: {source['url']}")
-                
-                fetch_data = self.fetch_document(source['url'], source.get('source_type', 'unknown'))
-                if fetch_data:
-                    fetched_docs.append({
-                        'source': source,
-                        'fetch_data': fetch_data
-                    })
-                    logger.info(f"Successfully fetched: {source['url']}")
-                else:
-                    failed_sources.append(source)
-                    logger.warning(f"Failed to fetch: {source['url']}")
-                    
-            except Exception as e:
+        batch = sources[:max_docs]
+        validators = self._load_conditional_headers(batch)
+        
+        for source, fetch_data in self._run_async(self._fetch_sources_async(batch, validators)):
+            if fetch_data is None:
                 failed_sources.append(source)
-                logger.error(f"Error fetching {source['url']}: {e}")
-                continue
+                logger.warning(f"Failed to fetch: {source['url']}")
+            elif fetch_data.get('not_modified'):
+                # Unchanged since last fetch: skip parse, store and link entirely
+                not_modified.append(source)
+                logger.debug(f"Not modified: {source['url']}")
+            else:
+                fetched_docs.append({
+                    'source': source,
+                    'fetch_data': fetch_data
+                })
+                logger.info(f"Successfully fetched: {source['url']}")
+        
+        self.last_fetch_stats = {
+            'fetched': len(fetched_docs),
+            'not_modified': len(not_modified),
+            'failed': len(failed_sources)
+        }
         
         # Store fetch results for tracking
         self._store_fetch_results(fetched_docs, failed_sources)
         
-        logger.info(f"Fetch job completed: {len(fetched_docs)} fetched, {len(failed_sources)} failed")
+        logger.info(
+            f"Fetch job completed: {len(fetched_docs)} fetched, {len(not_modified)} not modified, "
+            f"{len(failed_sources)} failed"
+        )
         return fetched_docs
     
+    async def _fetch_sources_async(
+        self,
+        sources: List[Dict[str, Any]],
+        validators: Dict[str, Dict[str, str]]
+    ) -> List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]:
+        """
+        Fetch sources concurrently with global and per-host limits.
+        
+        Blocking ``requests`` calls run on a thread pool sized to the global
+        limit; per-host semaphores and a minimum delay between request starts
+        to the same host keep the crawl polite.
+        
+        Returns:
+            (source, fetch_data) pairs in input order
+        """
+        loop = asyncio.get_running_loop()
+        global_sem = asyncio.Semaphore(self.max_concurrency)
+        host_sems: Dict[str, asyncio.Semaphore] = {}
+        host_locks: Dict[str, asyncio.Lock] = {}
+        host_last_start: Dict[str, float] = {}
+        
+        async def wait_politely(host: str):
+            lock = host_locks.setdefault(host, asyncio.Lock())
+            async with lock:
+                wait = host_last_start.get(host, 0.0) + self.per_host_delay - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                host_last_start[host] = time.monotonic()
+        
+        async def fetch_one(executor: ThreadPoolExecutor, source: Dict[str, Any]):
+            url = source['url']
+            host = urlparse(url).netloc.lower()
+            host_sem = host_sems.setdefault(host, asyncio.Semaphore(self.per_host_concurrency))
+            
+            # Take the host slot and wait out the host delay before taking a global
+            # slot, so one busy or slow-paced host cannot hold global slots idle
+            async with host_sem:
+                await wait_politely(host)
+                async with global_sem:
+                    try:
+                        fetch_data = await loop.run_in_executor(
+                            executor, self.fetch_document, url,
+                            source.get('source_type', 'unknown'), validators.get(url)
+                        )
+                    except Exception as e:
+                        logger.error(f"Error fetching {url}: {e}")
+                        fetch_data = None
+                    return source, fetch_data
+        
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            return await asyncio.gather(*(fetch_one(executor, s) for s in sources))
+    
+    @staticmethod
+    def _run_async(coro):
+        """Run a coroutine to completion, even when called from inside an event loop."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coro).result()
+    
+    def _load_conditional_headers(self, sources: List[Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+        """
+        Build If-None-Match / If-Modified-Since headers per URL.
+        
+        Validators come from the source's own ``headers`` (a previous fetch)
+        or from the stored document with the same URL.
+        """
+        validators: Dict[str, Dict[str, str]] = {}
+        
+        urls = [s['url'] for s in sources]
+        stored: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        if urls:
+            try:
+                rows = self.db_session.query(
+                    Document.source_url, Document.http_etag, Document.http_last_modified
+                ).filter(Document.source_url.in_(urls)).all()
+                stored = {url: (etag, last_modified) for url, etag, last_modified in rows}
+            except Exception as e:
+                logger.warning(f"Could not load stored HTTP validators: {e}")
+        
+        for source in sources:
+            url = source['url']
+            etag, last_modified = stored.get(url, (None, None))
+            etag = _get_header(source.get('headers'), 'etag') or etag
+            last_modified = _get_header(source.get('headers'), 'last-modified') or last_modified
+            
+            headers = {}
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+            if headers:
+                validators[url] = headers
+        
+        return validators
+    
     def run_parse_job(self, fetched_docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Run the parse job to extract text and entities.
@@ -748,6 +1117,11 @@ class DocumentIngester:
         - Extract text, tables, and entities
         - Store parsed data
         
+        Documents fetched as storage handles are read one at a time and their
+        parsed data is not retained; the link job reads text back from the
+        stored pages instead, so memory stays flat across large batches.
+        PDF pages are extracted in parallel and written as each page finishes.
+        
         Args:
             fetched_docs: List of fetched documents
             
@@ -768,9 +1142,10 @@ class DocumentIngester:
                 
                 # Parse document content
                 parsed_data = self.parse_document(
-                    fetch_data['content'],
+                    self.load_content(fetch_data),
                     fetch_data['content_type'],
-                    source['url']
+                    source['url'],
+                    stream=True
                 )
                 
                 # Store document in database
@@ -779,7 +1154,11 @@ class DocumentIngester:
                 parsed_docs.append({
                     'source': source,
                     'fetch_data': fetch_data,
-                    'parsed_data': parsed_data,
+                    'parsed_data': (
+                        parsed_data
+                        if 'content' in fetch_data and 'page_stream' not in parsed_data
+                        else None
+                    ),
                     'document': doc
                 })
                 
@@ -820,7 +1199,21 @@ class DocumentIngester:
             try:
                 source = doc_data['source']
                 doc = doc_data['document']
-                parsed_data = doc_data['parsed_data']
+                
+                # Near-duplicates share the canonical document's links
+                if doc.canonical_doc_id is not None:
+                    logger.info(
+                        f"Skipping near-duplicate {source['url']} -> canonical doc_id {doc.canonical_doc_id}"
+                    )
+                    linked_docs.append({
+                        'source': source,
+                        'document': doc,
+                        'entities': [],
+                        'canonical_doc_id': doc.canonical_doc_id
+                    })
+                    continue
+                
+                parsed_data = doc_data.get('parsed_data') or self._parsed_data_from_document(doc)
                 
                 logger.info(f"Linking {i+1}/{len(parsed_docs)}: {source['url']} -> doc_id {doc.doc_id}")
                 
@@ -890,7 +1283,8 @@ class DocumentIngester:
                 },
                 'fetch': {
                     'total_fetched': len(fetched_docs),
-                    'failed_fetches': len(sources) - len(fetched_docs)
+                    'not_modified': self.last_fetch_stats.get('not_modified', 0),
+                    'failed_fetches': self.last_fetch_stats.get('failed', 0)
                 },
                 'parse': {
                     'total_parsed': len(parsed_docs),
@@ -909,6 +1303,11 @@ class DocumentIngester:
             logger.error(f"Phase 4 pipeline failed: {e}")
             raise
     
+    def close(self) -> None:
+        """Release HTTP and PDF worker resources."""
+        self.pdf_extractor.close()
+        self.session.close()
+    
     # Helper methods for workflow tracking
     
     def _store_discovery_results(self, sources: List[Dict[str, Any]]) -> None:
@@ -931,6 +1330,15 @@ class DocumentIngester:
         # In production, this would store to a job tracking table
         logger.info(f"Link results stored: {len(linked_docs)} linked, {len(failed_links)} failed")
     
+    def _parsed_data_from_document(self, doc: Document) -> Dict[str, Any]:
+        """Rebuild the text pages of a stored document for linking."""
+        return {
+            'text_pages': [
+                {'page_no': page.page_no, 'char_count': page.char_count, 'text': page.text}
+                for page in doc.text_pages
+            ]
+        }
+    
     def _extract_entities_from_parsed_data(self, parsed_data: Dict[str, Any], doc_id: int) -> List[Dict[str, Any]]:
         """Extract entities from parsed document data."""
         from ncfd.extract.asset_extractor import extract_all_entities
@@ -0,0 +1,168 @@
+"""
+Near-duplicate document detection with MinHash-LSH.
+
+Each document is reduced to a 128-value MinHash signature over hashed word
+shingles of its normalized text, so the share of equal values estimates the
+Jaccard similarity of two documents; syndicated copies of a release that
+differ only in boilerplate score close to 1. Signatures of canonical
+documents are persisted in `document_fingerprints` together with 16 LSH band
+keys (8 values each) in `document_fingerprint_bands`. A lookup is 16 indexed
+equality probes followed by a signature comparison on the few candidates.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_MERSENNE = np.uint64((1 << 61) - 1)
+_BLOCK = 1024  # shingles permuted at once
+
+# Fixed seed: signatures are persisted, so the permutations must never change
+_rng = np.random.RandomState(20250830)
+_A = _rng.randint(1, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+
+
+def _to_signed(value: int) -> int:
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def band_keys(signature: np.ndarray) -> List[int]:
+    """LSH key of each band of a signature, as signed 64-bit integers."""
+    return [
+        _to_signed(int.from_bytes(
+            hashlib.blake2b(signature[i * ROWS:(i + 1) * ROWS].tobytes(), digest_size=8).digest(), "big"
+        ))
+        for i in range(BANDS)
+    ]
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(a == b))
+
+
+def signature_from_bytes(data: bytes) -> np.ndarray:
+    """Decode a stored signature."""
+    return np.frombuffer(bytes(data), dtype="<u4")
+
+
+class MinHasher:
+    """
+    Incremental MinHash over word shingles.
+
+    Text can be fed page by page; only the running signature is kept, so
+    memory does not grow with document length. Shingles do not span calls.
+    """
+
+    def __init__(self, shingle_size: int = 3):
+        self.shingle_size = shingle_size
+        self.tokens = 0
+        self._mins = np.full(NUM_PERM, _MAX_HASH, dtype=np.uint64)
+
+    def update(self, page_text: str) -> None:
+        """Add the shingles of a block of text."""
+        tokens = _TOKEN_RE.findall(page_text.lower())
+        if not tokens:
+            return
+        self.tokens += len(tokens)
+
+        k = min(self.shingle_size, len(tokens))
+        hashes = np.frombuffer(b"".join(
+            hashlib.blake2b(" ".join(tokens[i:i + k]).encode(), digest_size=4).digest()
+            for i in range(len(tokens) - k + 1)
+        ), dtype="<u4").astype(np.uint64)
+
+        for start in range(0, len(hashes), _BLOCK):
+            block = hashes[start:start + _BLOCK, None]
+            permuted = ((block * _A + _B) % _MERSENNE) & _MAX_HASH
+            np.minimum(self._mins, permuted.min(axis=0), out=self._mins)
+
+    def signature(self) -> np.ndarray:
+        """The signature of everything fed so far (uint32 values)."""
+        return self._mins.astype("<u4")
+
+
+class NearDuplicateIndex:
+    """Persisted MinHash-LSH index of canonical documents."""
+
+    def __init__(self, threshold: float = 0.8, min_tokens: int = 50):
+        """
+        Initialize the index.
+
+        Args:
+            threshold: Minimum estimated Jaccard similarity for a near-duplicate
+            min_tokens: Documents shorter than this are never matched or indexed
+        """
+        self.threshold = threshold
+        self.min_tokens = min_tokens
+
+    def eligible(self, hasher: MinHasher) -> bool:
+        """Whether a document has enough text for a reliable signature."""
+        return hasher.tokens >= self.min_tokens
+
+    def find(self, session: Session, signature: np.ndarray) -> Optional[Tuple[int, float]]:
+        """
+        Find the most similar canonical document.
+
+        Returns:
+            (doc_id, similarity) of the best indexed document at or above
+            `threshold`, or None
+        """
+        keys = band_keys(signature)
+        probes = ", ".join(f"({i}, :h{i})" for i in range(BANDS))
+        rows = session.execute(
+            text(f"""
+                SELECT f.doc_id, f.signature
+                  FROM document_fingerprints f
+                 WHERE f.doc_id IN (
+                       SELECT doc_id FROM document_fingerprint_bands
+                        WHERE (band, band_hash) IN ({probes})
+                 )
+            """),
+            {f"h{i}": key for i, key in enumerate(keys)},
+        ).all()
+
+        best: Optional[Tuple[int, float]] = None
+        for doc_id, stored in rows:
+            score = similarity(signature, signature_from_bytes(stored))
+            if score >= self.threshold and (best is None or (-score, doc_id) < (-best[1], best[0])):
+                best = (doc_id, score)
+        return best
+
+    def add(self, session: Session, doc_id: int, signature: np.ndarray) -> None:
+        """Index a canonical document."""
+        session.execute(
+            text("""
+                INSERT INTO document_fingerprints (doc_id, signature)
+                VALUES (:doc_id, :signature)
+                ON CONFLICT (doc_id) DO UPDATE SET signature = EXCLUDED.signature
+            """),
+            {"doc_id": doc_id, "signature": signature.tobytes()},
+        )
+        session.execute(
+            text("DELETE FROM document_fingerprint_bands WHERE doc_id = :doc_id"),
+            {"doc_id": doc_id},
+        )
+        session.execute(
+            text("""
+                INSERT INTO document_fingerprint_bands (band, band_hash, doc_id)
+                VALUES (:band, :band_hash, :doc_id)
+            """),
+            [{"band": i, "band_hash": key, "doc_id": doc_id} for i, key in enumerate(band_keys(signature))],
+        )
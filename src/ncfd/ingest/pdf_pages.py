@@ -0,0 +1,341 @@
+"""
+Page-parallel PDF text and table extraction.
+
+Each worker process lays out one contiguous range of pages with pdfminer,
+walking the page tree once for the whole range, so a long document spreads
+across the pool and each range can be persisted as soon as it finishes.
+Workers cap their own address space and per-page runtime; the caller caps
+each document with a wall-clock deadline.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeout, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+try:
+    from pdfminer.high_level import extract_pages  # type: ignore
+    from pdfminer.layout import LTTextContainer, LTTextLine  # type: ignore
+    from pdfminer.pdfpage import PDFPage  # type: ignore
+except Exception:
+    extract_pages = None
+
+logger = logging.getLogger(__name__)
+
+PDF_AVAILABLE = extract_pages is not None
+
+# Table heuristic: rows of short, column-aligned text lines
+ROW_TOLERANCE = 3.0  # points between baselines treated as the same row
+MIN_TABLE_ROWS = 2
+MAX_AVG_CELL_CHARS = 40
+
+
+class PageTimeout(Exception):
+    """Raised inside a worker when a single page exceeds its time budget."""
+
+
+def _raise_page_timeout(signum, frame):
+    raise PageTimeout("page extraction timed out")
+
+
+def _init_worker(max_memory_mb: Optional[int]) -> None:
+    """Cap the worker's address space at its startup size plus `max_memory_mb`."""
+    if not max_memory_mb or resource is None:
+        return
+    try:
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+    limit = current + max_memory_mb * 1024 * 1024
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def count_pages(path: str) -> int:
+    """Count pages without laying any of them out."""
+    with open(path, "rb") as f:
+        return sum(1 for _ in PDFPage.get_pages(f))
+
+
+def detect_tables(lines: List[Tuple[float, float, str]], page_no: int) -> List[Dict[str, Any]]:
+    """
+    Detect tables from positioned text lines.
+
+    Lines sharing a baseline form a row; runs of consecutive rows with the
+    same number (>= 2) of short cells are reported as a table.
+
+    Args:
+        lines: (x0, y0, text) for each text line on the page
+        page_no: 1-based page number
+
+    Returns:
+        Table dicts in the same shape as HTML tables
+    """
+    rows: List[List[Tuple[float, str]]] = []
+    row_y: Optional[float] = None
+    for x0, y0, text in sorted(lines, key=lambda l: (-l[1], l[0])):
+        if row_y is None or abs(y0 - row_y) > ROW_TOLERANCE:
+            rows.append([])
+            row_y = y0
+        rows[-1].append((x0, text))
+
+    tables: List[Dict[str, Any]] = []
+    run: List[List[str]] = []
+
+    def close_run():
+        if len(run) >= MIN_TABLE_ROWS:
+            cells = [c for r in run for c in r]
+            if sum(len(c) for c in cells) / len(cells) <= MAX_AVG_CELL_CHARS:
+                tables.append({
+                    "page_no": page_no,
+                    "table_idx": len(tables),
+                    "table_jsonb": {
+                        "rows": [list(r) for r in run],
+                        "row_count": len(run),
+                        "col_count": len(run[0]),
+                    },
+                    "detector": "pdfminer",
+                })
+        run.clear()
+
+    for row in rows:
+        cells = [text for _, text in sorted(row)]
+        if len(cells) >= 2 and (not run or len(cells) == len(run[0])):
+            run.append(cells)
+            continue
+        close_run()
+        if len(cells) >= 2:
+            run.append(cells)
+    close_run()
+
+    return tables
+
+
+def _page_result(layout: Any, page_no: int) -> Dict[str, Any]:
+    """Build a page dict from a pdfminer LTPage."""
+    text_parts: List[str] = []
+    lines: List[Tuple[float, float, str]] = []
+    for element in layout:
+        if not isinstance(element, LTTextContainer):
+            continue
+        text_parts.append(element.get_text())
+        for line in element:
+            if isinstance(line, LTTextLine):
+                line_text = line.get_text().strip()
+                if line_text:
+                    lines.append((line.x0, line.y0, line_text))
+
+    text = " ".join(" ".join(text_parts).split())
+    return {
+        "page_no": page_no,
+        "char_count": len(text),
+        "text": text,
+        "tables": detect_tables(lines, page_no),
+    }
+
+
+def _past(deadline: Optional[float]) -> bool:
+    return deadline is not None and time.time() >= deadline
+
+
+def extract_page_range(
+    path: str,
+    first_page: int,
+    last_page: int,
+    page_timeout: Optional[int] = None,
+    deadline: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """
+    Extract text and tables from a contiguous page range (runs in a worker process).
+
+    The file is opened and its page tree walked once for the whole range. A
+    page that fails or exceeds `page_timeout` is reported with an `error` key
+    and the walk resumes at the next page. Once `deadline` has passed the
+    range stops between pages and the pages not reached are left out.
+
+    Args:
+        path: PDF file path
+        first_page: 1-based first page number
+        last_page: 1-based last page number (inclusive)
+        page_timeout: Seconds per page before it is abandoned
+        deadline: Wall-clock time (time.time()) after which no further page is started
+
+    Returns:
+        Page dicts with page_no, char_count, text and tables, or page_no and error
+    """
+    use_alarm = bool(page_timeout) and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_page_timeout)
+
+    results: List[Dict[str, Any]] = []
+    page_no = first_page
+    while page_no <= last_page and not _past(deadline):
+        layouts = extract_pages(
+            path, page_numbers=set(range(page_no - 1, last_page)), maxpages=last_page
+        )
+        try:
+            while page_no <= last_page and not _past(deadline):
+                if use_alarm:
+                    signal.alarm(int(page_timeout))
+                try:
+                    layout = next(layouts)
+                finally:
+                    if use_alarm:
+                        signal.alarm(0)
+                results.append(_page_result(layout, page_no))
+                page_no += 1
+        except StopIteration:
+            break
+        except Exception as e:
+            # The layout generator is dead after an error; reopen past this page
+            results.append({"page_no": page_no, "error": str(e) or type(e).__name__})
+            page_no += 1
+        finally:
+            layouts.close()
+
+    return results
+
+
+class PdfPageExtractor:
+    """
+    Extract PDF pages across a process pool, yielding them as they finish.
+
+    The pool is created lazily and reused across documents.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_seconds: float = 120.0,
+        page_timeout: int = 30,
+        max_memory_mb: Optional[int] = 1024,
+        max_pages: int = 500,
+        pages_per_task: Optional[int] = None
+    ):
+        """
+        Initialize the extractor.
+
+        Args:
+            max_workers: Worker processes (defaults to min(4, cpu_count))
+            max_seconds: Wall-clock budget per document
+            page_timeout: Seconds per page before a worker gives up on it
+            max_memory_mb: Extra address space each worker may allocate
+            max_pages: Pages beyond this are skipped
+            pages_per_task: Pages per worker range (defaults to an even split across workers)
+        """
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_seconds = max_seconds
+        self.page_timeout = page_timeout
+        self.max_memory_mb = max_memory_mb
+        self.max_pages = max_pages
+        self.pages_per_task = pages_per_task
+        self.last_stats: Dict[str, Any] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(self.max_memory_mb,),
+            )
+        return self._pool
+
+    def _discard_pool(self, terminate: bool = False) -> None:
+        """Shut the pool down (killing busy workers if `terminate`) so the next document gets a fresh one."""
+        pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        processes = list((getattr(pool, "_processes", None) or {}).values()) if terminate else []
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    def _page_ranges(self, limit: int) -> List[Tuple[int, int]]:
+        """Split pages 1..limit into contiguous (first, last) ranges."""
+        size = self.pages_per_task or -(-limit // self.max_workers)
+        size = max(1, size)
+        return [(first, min(first + size - 1, limit)) for first in range(1, limit + 1, size)]
+
+    def iter_pages(self, path: str) -> Iterator[Dict[str, Any]]:
+        """
+        Yield page dicts, range by range in completion order.
+
+        Pages that fail or time out are skipped. Workers stop starting pages
+        once the document deadline passes, and the caller then terminates the
+        pool so ranges still inside a slow page cannot hold up the next
+        document. Per-document counts are left in `last_stats`.
+        """
+        if not PDF_AVAILABLE:
+            raise RuntimeError("pdfminer.six is not installed")
+
+        started = time.monotonic()
+        total = count_pages(path)
+        limit = min(total, self.max_pages)
+        if total > limit:
+            logger.warning(f"PDF has {total} pages; extracting the first {limit}")
+
+        stats = {"pages": total, "extracted": 0, "failed": 0, "skipped": total - limit, "timed_out": False}
+        self.last_stats = stats
+
+        pool = self._get_pool()
+        deadline = time.time() + self.max_seconds
+        futures = {
+            pool.submit(extract_page_range, path, first, last, self.page_timeout, deadline): (first, last)
+            for first, last in self._page_ranges(limit)
+        }
+
+        try:
+            for future in as_completed(list(futures), timeout=self.max_seconds):
+                first, last = futures.pop(future)
+                try:
+                    pages = future.result()
+                except BrokenProcessPool as e:
+                    # A worker died (e.g. hit its memory cap); start a fresh pool next time
+                    logger.warning(f"PDF worker pool broken on pages {first}-{last}: {e}")
+                    self._discard_pool()
+                    stats["failed"] += last - first + 1
+                    continue
+                except Exception as e:
+                    logger.warning(f"Failed to extract PDF pages {first}-{last}: {e}")
+                    stats["failed"] += last - first + 1
+                    continue
+                stats["skipped"] += last - first + 1 - len(pages)  # Stopped at the deadline
+                for page in pages:
+                    if "error" in page:
+                        logger.warning(f"Failed to extract PDF page {page['page_no']}: {page['error']}")
+                        stats["failed"] += 1
+                        continue
+                    stats["extracted"] += 1
+                    yield page
+        except FuturesTimeout:
+            pending = sum(last - first + 1 for first, last in futures.values())
+            stats["timed_out"] = True
+            stats["skipped"] += pending
+            logger.warning(
+                f"PDF deadline of {self.max_seconds}s hit; skipping {pending} pages"
+            )
+            self._discard_pool(terminate=True)
+        finally:
+            for future in futures:
+                future.cancel()
+            stats["seconds"] = round(time.monotonic() - started, 3)
+
+    def close(self) -> None:
+        """Shut down the worker pool."""
+        self._discard_pool()
@@ -6,20 +6,26 @@ This module provides robust narrative parsing with:
 - Evidence span tracking
 - Hallucination prevention
 - Fallback strategies
+- Bounded-concurrency batch extraction with a persistent result cache
 """
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass
 
 import google.generativeai as genai
 from pydantic import BaseModel, ValidationError, Field
 
+from ..extract.chunking import estimate_tokens
+from ..extract.llm_budget import KeyedLocks, RunBudget
 from .sec_types import (
     EightKItem, TenKSection, DocumentSection, 
     ExtractionResult, SecIngestionResult
@@ -27,6 +33,9 @@ from .sec_types import (
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the 8-K/10-K prompts or schemas change so cached results are invalidated
+PROMPT_VERSION = "2025-08-01"
+
 
 class TrialEventSchema(BaseModel):
     """Schema for trial event extraction from 8-K filings."""
@@ -88,6 +97,8 @@ class SecLangExtractor:
     - Evidence span tracking
     - Hallucination prevention
     - Multiple extraction strategies
+    - Result cache keyed by section content hash, prompt version and model
+    - Per-run LLM call / token budget
     """
     
     def __init__(self, config: Dict[str, Any]):
@@ -103,6 +114,24 @@ class SecLangExtractor:
         self.max_retries = config.get('max_retries', 3)
         self.temperature = config.get('temperature', 0.1)  # Low temperature for consistency
         
+        # Batch extraction settings
+        self.max_concurrency = max(1, int(config.get('max_concurrency', 4)))
+        self.max_llm_calls_per_run = config.get('max_llm_calls_per_run')
+        self.token_budget_per_run = config.get('token_budget_per_run')
+        
+        # Persistent extraction cache
+        self.cache_enabled = config.get('extraction_cache_enabled', True)
+        self.cache_dir = Path(config.get('extraction_cache_dir', '.cache/sec/langextract'))
+        if self.cache_enabled:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Run-level accounting (reset by batch_extract) and per-key cache locks
+        self._key_locks = KeyedLocks()
+        self._budget = RunBudget(
+            self.max_llm_calls_per_run, self.token_budget_per_run,
+            counters=('cache_hits', 'cache_misses')
+        )
+        
         # Initialize Gemini
         if self.api_key:
             genai.configure(api_key=self.api_key)
@@ -134,12 +163,8 @@ class SecLangExtractor:
             # Build prompt with strict constraints
             prompt = self._build_8k_prompt(section, filing_metadata)
             
-            # Extract with validation
-            extraction_result = self._extract_with_validation(
-                prompt, 
-                TrialEventSchema,
-                max_retries=self.max_retries
-            )
+            # Extract with validation (served from cache when possible)
+            extraction_result = self._extract_cached(section, prompt, TrialEventSchema)
             
             if not extraction_result:
                 return None
@@ -189,12 +214,8 @@ class SecLangExtractor:
             # Build prompt with strict constraints
             prompt = self._build_10k_prompt(section, filing_metadata)
             
-            # Extract with validation
-            extraction_result = self._extract_with_validation(
-                prompt, 
-                ClinicalDevelopmentSchema,
-                max_retries=self.max_retries
-            )
+            # Extract with validation (served from cache when possible)
+            extraction_result = self._extract_cached(section, prompt, ClinicalDevelopmentSchema)
             
             if not extraction_result:
                 return None
@@ -330,10 +351,16 @@ Remember: ONLY extract what is explicitly stated. If in doubt, use null.
         Returns:
             Validated extraction result or None if failed
         """
+        input_tokens = estimate_tokens(prompt)
         for attempt in range(max_retries):
+            if not self._budget.reserve(input_tokens):
+                logger.warning("LLM budget exhausted for this run, skipping extraction")
+                return None
+            
             try:
                 # Generate response from Gemini
                 response = self.model.generate_content(prompt)
+                self._record_token_usage(input_tokens, prompt, response)
                 
                 if not response.text:
                     logger.warning(f"Empty response from Gemini (attempt {attempt + 1})")
@@ -372,6 +399,89 @@ Remember: ONLY extract what is explicitly stated. If in doubt, use null.
         logger.error(f"All {max_retries} extraction attempts failed")
         return None
     
+    def _extract_cached(
+        self,
+        section: DocumentSection,
+        prompt: str,
+        schema_class: type
+    ) -> Optional[Any]:
+        """
+        Extract with validation, reusing a cached result for identical sections.
+        
+        Concurrent requests for the same key are serialized so duplicate
+        sections within a batch only cost a single LLM call.
+        """
+        cache_key = self._cache_key(section, schema_class)
+        
+        with self._key_locks.hold(cache_key):
+            cached = self._get_cached_extraction(cache_key, schema_class)
+            if cached is not None:
+                self._budget.count('cache_hits')
+                return cached
+            
+            self._budget.count('cache_misses')
+            
+            result = self._extract_with_validation(
+                prompt,
+                schema_class,
+                max_retries=self.max_retries
+            )
+            
+            if result is not None:
+                self._cache_extraction(cache_key, result)
+            
+            return result
+    
+    def _cache_key(self, section: DocumentSection, schema_class: type) -> str:
+        """Build cache key from section content hash, schema, prompt version and model."""
+        raw = f"{section.content_hash}|{schema_class.__name__}|{PROMPT_VERSION}|{self.model_name}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    
+    def _get_cached_extraction(self, cache_key: str, schema_class: type) -> Optional[Any]:
+        """Load a previously validated extraction from the cache."""
+        if not self.cache_enabled:
+            return None
+        
+        cache_file = self.cache_dir / f"{cache_key}.json"
+        if not cache_file.exists():
+            return None
+        
+        try:
+            with open(cache_file, 'r') as f:
+                cached_data = json.load(f)
+            return schema_class(**cached_data)
+        except Exception as e:
+            logger.warning(f"Extraction cache read failed for {cache_key}: {e}")
+            return None
+    
+    def _cache_extraction(self, cache_key: str, result: Any):
+        """Persist a validated extraction to the cache."""
+        if not self.cache_enabled:
+            return
+        
+        try:
+            cache_file = self.cache_dir / f"{cache_key}.json"
+            tmp_file = cache_file.with_suffix('.tmp')
+            with open(tmp_file, 'w') as f:
+                json.dump(result.dict(), f, default=str)
+            tmp_file.replace(cache_file)
+        except Exception as e:
+            logger.warning(f"Extraction cache write failed for {cache_key}: {e}")
+    
+    def _record_token_usage(self, reserved_tokens: int, prompt: str, response: Any):
+        """Settle a call's token usage against the input tokens reserved for it."""
+        usage = getattr(response, 'usage_metadata', None)
+        tokens = getattr(usage, 'total_token_count', None) if usage is not None else None
+        if not tokens:
+            response_text = getattr(response, 'text', '') or ''
+            tokens = estimate_tokens(prompt) + estimate_tokens(response_text)
+        
+        self._budget.record_tokens(int(tokens) - reserved_tokens)
+    
+    def get_run_stats(self) -> Dict[str, int]:
+        """Get LLM call, token and cache statistics for the current run."""
+        return self._budget.stats()
+    
     def _extract_json_from_response(self, response_text: str) -> Optional[str]:
         """Extract JSON from Gemini response text."""
         # Look for JSON blocks
@@ -443,21 +553,42 @@ Remember: ONLY extract what is explicitly stated. If in doubt, use null.
         errors = []
         warnings = []
         
-        for section in sections:
+        self._budget.reset()
+        
+        if form_type == '8-K':
+            extract_fn = self.extract_trial_events_from_8k
+        elif form_type in ['10-K', '10-Q']:
+            extract_fn = self.extract_clinical_development_from_10k
+        else:
+            extract_fn = None
+        
+        def _extract_section(section: DocumentSection):
             try:
-                if form_type == '8-K':
-                    item = self.extract_trial_events_from_8k(section, filing_metadata)
-                    if item:
-                        extracted_items.append(item)
-                elif form_type in ['10-K', '10-Q']:
-                    item = self.extract_clinical_development_from_10k(section, filing_metadata)
-                    if item:
-                        extracted_items.append(item)
-                        
+                return extract_fn(section, filing_metadata), None
             except Exception as e:
-                error_msg = f"Error extracting from section '{section.title}': {e}"
-                errors.append(error_msg)
-                logger.error(error_msg)
+                return None, f"Error extracting from section '{section.title}': {e}"
+        
+        if extract_fn and sections:
+            workers = min(self.max_concurrency, len(sections))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # map() preserves section order in the results
+                for item, error_msg in executor.map(_extract_section, sections):
+                    if error_msg:
+                        errors.append(error_msg)
+                        logger.error(error_msg)
+                    elif item:
+                        extracted_items.append(item)
+        
+        run_stats = self.get_run_stats()
+        if run_stats['budget_skips']:
+            warnings.append(
+                f"LLM budget exhausted: {run_stats['budget_skips']} extraction(s) skipped "
+                f"after {run_stats['llm_calls']} calls / {run_stats['tokens_used']} tokens"
+            )
+        logger.info(
+            f"Batch extraction: {run_stats['llm_calls']} LLM calls, "
+            f"{run_stats['cache_hits']} cache hits, {run_stats['tokens_used']} tokens"
+        )
         
         processing_time = (datetime.utcnow() - start_time).total_seconds()
         
@@ -0,0 +1,319 @@
+"""
+Local relevance scoring for SEC filing sections.
+
+This module decides which sections are worth sending to the LLM extractor:
+- Aho–Corasick phrase matcher over INNs, known asset codes and trial vocabulary
+- Compiled regexes for NCT IDs and asset code shapes
+- Small linear (logistic) model over the match features
+- Deterministic audit sampling of rejected sections for recall monitoring
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from ..extract.aho_corasick import AhoCorasickMatcher
+from ..extract.asset_extractor import ASSET_CODE_PATTERNS
+
+logger = logging.getLogger(__name__)
+
+
+# Trial vocabulary that signals clinical-development content in filings
+TRIAL_VOCABULARY = [
+    "clinical trial", "clinical study", "pivotal", "phase 1", "phase 2", "phase 3",
+    "phase i", "phase ii", "phase iii", "phase 1/2", "phase 2/3", "randomized",
+    "placebo", "double-blind", "open-label", "primary endpoint", "secondary endpoint",
+    "topline", "top-line", "enrollment", "enrolled", "patients", "dosing", "dosed",
+    "efficacy", "safety", "adverse event", "serious adverse", "clinical hold",
+    "data readout", "interim analysis", "statistically significant", "p-value",
+    "hazard ratio", "overall survival", "progression-free", "fda", "ema", "bla",
+    "nda", "ind", "breakthrough therapy", "fast track", "orphan drug",
+    "complete response letter", "pdufa", "investigational",
+]
+
+NCT_PATTERN = r"\bNCT\d{8}\b"
+
+# Default logistic weights; overridable via config['relevance_filter']['weights']
+DEFAULT_WEIGHTS = {
+    "bias": -3.0,
+    "nct": 3.0,
+    "asset_code": 0.6,
+    "inn": 1.5,
+    "trial_terms": 1.2,
+    "term_density": 0.8,
+}
+
+
+@dataclass
+class RelevanceScore:
+    """Relevance decision for a single section."""
+    score: float
+    relevant: bool
+    features: Dict[str, float] = field(default_factory=dict)
+    audit: bool = False  # Rejected section routed anyway for recall monitoring
+
+
+class SectionRelevanceScorer:
+    """
+    Fast local relevance scorer for filing sections.
+
+    All vocabulary (trial terms plus any INNs/asset codes loaded from the
+    database) is built into one Aho–Corasick automaton, so scoring a section
+    is a single pass over its text regardless of vocabulary size, plus two
+    small regex scans for NCT IDs and code shapes and a dot product.
+    """
+
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        known_terms: Optional[Iterable[str]] = None,
+        known_inns: Optional[Iterable[str]] = None
+    ):
+        """
+        Initialize the relevance scorer.
+
+        Args:
+            config: Relevance filter configuration
+            known_terms: Extra domain terms (e.g., known asset codes)
+            known_inns: INN/generic drug names
+        """
+        config = config or {}
+        self.threshold = config.get('threshold', 0.5)
+        self.audit_sample_rate = config.get('audit_sample_rate', 0.02)
+        self.weights = {**DEFAULT_WEIGHTS, **config.get('weights', {})}
+
+        vocabulary = set(TRIAL_VOCABULARY) | set(config.get('extra_vocabulary', []))
+        self._trial_terms = {t.lower() for t in vocabulary}
+        self._known_terms = {t.lower() for t in (known_terms or []) if t}
+        self._inns = {t.lower() for t in (known_inns or []) if t and len(t) >= 4}
+
+        self._phrase_matcher = self._build_phrase_matcher(
+            self._trial_terms | self._known_terms | self._inns
+        )
+        self._nct_pattern = re.compile(NCT_PATTERN, re.IGNORECASE)
+        self._code_pattern = re.compile("|".join(f"(?:{p})" for p in ASSET_CODE_PATTERNS))
+
+        self.stats = {
+            'scored': 0,
+            'routed': 0,
+            'rejected': 0,
+            'audited': 0,
+            'routed_positive': 0,
+            'audit_positive': 0,
+        }
+        self._audit_hashes: Set[str] = set()
+
+    @classmethod
+    def from_session(cls, session, config: Optional[Dict[str, Any]] = None) -> "SectionRelevanceScorer":
+        """
+        Build a scorer whose vocabulary includes asset aliases from the DB.
+
+        Args:
+            session: SQLAlchemy session
+            config: Relevance filter configuration
+        """
+        from sqlalchemy import text
+
+        inns: Set[str] = set()
+        terms: Set[str] = set()
+
+        rows = session.execute(text(
+            "SELECT alias_norm, alias_type FROM asset_aliases"
+        )).fetchall()
+        for alias_norm, alias_type in rows:
+            if alias_type in ('inn', 'generic', 'brand'):
+                inns.add(alias_norm)
+            elif alias_type == 'code':
+                terms.add(alias_norm)
+
+        logger.info(f"Relevance scorer loaded {len(inns)} INNs and {len(terms)} asset codes")
+        return cls(config, known_terms=terms, known_inns=inns)
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]] = None, session=None) -> "SectionRelevanceScorer":
+        """
+        Build the pipeline's scorer, loading DB vocabulary unless disabled.
+
+        Falls back to the built-in vocabulary when the database is unavailable.
+
+        Args:
+            config: Relevance filter configuration
+            session: SQLAlchemy session; a new one is opened if omitted
+        """
+        config = config or {}
+        if not config.get('load_db_vocabulary', True):
+            return cls(config)
+
+        try:
+            if session is not None:
+                return cls.from_session(session, config)
+            from ..db.session import get_session
+            with get_session() as db_session:
+                return cls.from_session(db_session, config)
+        except Exception as e:
+            logger.warning(f"Relevance vocabulary not loaded from database, using built-in terms: {e}")
+            return cls(config)
+
+    @staticmethod
+    def _build_phrase_matcher(phrases: Set[str]) -> Optional[AhoCorasickMatcher]:
+        """Build the phrase automaton over lowercased phrases."""
+        if not phrases:
+            return None
+        return AhoCorasickMatcher(phrases)
+
+    @staticmethod
+    def _is_word_char(ch: str) -> bool:
+        return ch.isalnum() or ch == '_'
+
+    def _iter_phrases(self, text: str) -> Iterable[str]:
+        """
+        Yield word-bounded phrase hits, leftmost-longest and non-overlapping.
+
+        Mirrors a longest-first ``(?<!\\w)(?:...)(?!\\w)`` alternation, so a
+        phrase nested inside a longer hit (e.g. "phase 1" in "phase 1/2") is
+        not counted twice.
+        """
+        if self._phrase_matcher is None:
+            return
+        text_lower = text.lower()
+        n = len(text_lower)
+        is_word = self._is_word_char
+
+        hits = []
+        for start, end, phrase in self._phrase_matcher.iter_matches(text_lower):
+            if start > 0 and is_word(text_lower[start - 1]):
+                continue
+            if end < n and is_word(text_lower[end]):
+                continue
+            hits.append((start, end, phrase))
+
+        hits.sort(key=lambda h: (h[0], -h[1]))
+        last_end = 0
+        for start, end, phrase in hits:
+            if start < last_end:
+                continue
+            last_end = end
+            yield phrase
+
+    def extract_features(self, text: str) -> Dict[str, float]:
+        """Compute match features for a section of text."""
+        nct_hits = len(self._nct_pattern.findall(text))
+        code_hits = len(self._code_pattern.findall(text))
+
+        trial_terms: Set[str] = set()
+        inn_hits = 0
+        for term in self._iter_phrases(text):
+            if term in self._inns:
+                inn_hits += 1
+            elif term in self._known_terms:
+                code_hits += 1
+            else:
+                trial_terms.add(term)
+
+        words = max(1, text.count(' ') + 1)
+        term_hits = nct_hits + code_hits + inn_hits + len(trial_terms)
+
+        return {
+            'nct': math.log1p(nct_hits),
+            'asset_code': math.log1p(code_hits),
+            'inn': math.log1p(inn_hits),
+            'trial_terms': math.log1p(len(trial_terms)),
+            'term_density': min(5.0, 100.0 * term_hits / words),  # hits per 100 words
+        }
+
+    def score(self, text: str) -> float:
+        """Score text relevance in [0, 1] with the linear model."""
+        features = self.extract_features(text)
+        return self._logistic(features)
+
+    def _logistic(self, features: Dict[str, float]) -> float:
+        z = self.weights['bias'] + sum(
+            self.weights.get(name, 0.0) * value for name, value in features.items()
+        )
+        return 1.0 / (1.0 + math.exp(-z))
+
+    def _should_audit(self, section: Any) -> bool:
+        """Deterministically sample rejected sections by content hash."""
+        if self.audit_sample_rate <= 0:
+            return False
+        key = getattr(section, 'content_hash', None) or section.content
+        bucket = int(hashlib.sha256(key.encode('utf-8')).hexdigest()[:8], 16) / 0xFFFFFFFF
+        return bucket < self.audit_sample_rate
+
+    def evaluate(self, section: Any) -> RelevanceScore:
+        """Score a section and decide whether it should be routed to the LLM."""
+        features = self.extract_features(section.content)
+        score = self._logistic(features)
+        relevant = score >= self.threshold
+        audit = not relevant and self._should_audit(section)
+
+        self.stats['scored'] += 1
+        if relevant:
+            self.stats['routed'] += 1
+        else:
+            self.stats['rejected'] += 1
+            if audit:
+                self.stats['audited'] += 1
+
+        return RelevanceScore(score=score, relevant=relevant, features=features, audit=audit)
+
+    def filter_sections(self, sections: List[Any]) -> List[Any]:
+        """
+        Return sections that should be sent to the LLM.
+
+        Includes relevant sections plus the audit sample of rejected ones.
+        Audited sections are remembered so extraction outcomes can be recorded.
+        """
+        selected = []
+        self._audit_hashes = set()
+
+        for section in sections:
+            decision = self.evaluate(section)
+            if decision.relevant or decision.audit:
+                selected.append(section)
+            if decision.audit:
+                self._audit_hashes.add(section.content_hash)
+
+        return selected
+
+    def record_outcomes(self, sections: List[Any], productive_hashes: Set[str]):
+        """
+        Record which routed sections produced extractions.
+
+        Args:
+            sections: Sections returned by filter_sections
+            productive_hashes: Content hashes of sections that yielded extracted items
+        """
+        for section in sections:
+            if section.content_hash not in productive_hashes:
+                continue
+            if section.content_hash in self._audit_hashes:
+                self.stats['audit_positive'] += 1
+                logger.warning(
+                    f"Relevance filter missed productive section '{section.title}'"
+                )
+            else:
+                self.stats['routed_positive'] += 1
+
+    def estimated_recall(self) -> Optional[float]:
+        """
+        Estimate recall from the audit sample.
+
+        Misses are extrapolated from productive audited sections by the
+        sampling rate. Returns None until there is any positive evidence.
+        """
+        routed_positive = self.stats['routed_positive']
+        audit_positive = self.stats['audit_positive']
+        if self.audit_sample_rate <= 0 or routed_positive + audit_positive == 0:
+            return None
+        estimated_missed = audit_positive / self.audit_sample_rate
+        return routed_positive / (routed_positive + estimated_missed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get routing statistics including estimated recall."""
+        return {**self.stats, 'estimated_recall': self.estimated_recall()}
@@ -2,6 +2,7 @@
 from __future__ import annotations
 from typing import List, Optional, Dict, Tuple
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import subprocess
 import shutil
@@ -10,6 +11,7 @@ import typer
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from ncfd.db.schema_cache import get_schema
 from ncfd.db.session import get_session
 from ncfd.mapping.normalize import norm_name
 from ncfd.ingest.deps import human_message
@@ -170,6 +172,25 @@ def _load_doc_body(local_path: Optional[str]) -> Optional[str]:
         except Exception:
             return None
 
+def _parse_exhibit(local_path: Optional[str]) -> Tuple[Optional[str], Optional[List[str]]]:
+    """Load and parse one exhibit; top-level so it can run in a process pool.
+
+    Returns (local_path, names) where names is None if the body could not be loaded.
+    """
+    body = _load_doc_body(local_path)
+    if not body:
+        return local_path, None
+    names = (
+        _parse_html(body)
+        if BeautifulSoup and ("<table" in body.lower() or "<html" in body.lower())
+        else _parse_text(body)
+    )
+    # If no header-driven parse worked, try a forgiving line-by-line fallback
+    if not names:
+        names = _fallback_parse_naive(body)
+    return local_path, names
+
+
 # ---------- schema autodetect ----------
 
 _REQ_FILINGS_ANY = {
@@ -187,20 +208,7 @@ _REQ_DOCS_ANY = {
 
 
 def _columns_by_table(session: Session) -> Dict[str, set]:
-    rows = session.execute(
-        text(
-            """
-            SELECT lower(table_schema) AS sch, lower(table_name) AS tbl, lower(column_name) AS col
-            FROM information_schema.columns
-            WHERE table_schema NOT IN ('pg_catalog','information_schema')
-        """
-        )
-    ).fetchall()
-    out: Dict[str, set] = {}
-    for sch, tbl, col in rows:
-        key = f"{sch}.{tbl}"
-        out.setdefault(key, set()).add(col)
-    return out
+    return get_schema(session).columns_by_table
 
 
 def _best_table_and_cols(cols_by_tbl: Dict[str, set], req: Dict[str, set]) -> Optional[Tuple[str, Dict[str, str]]]:
@@ -229,19 +237,11 @@ def _best_table_and_cols(cols_by_tbl: Dict[str, set], req: Dict[str, set]) -> Op
 
 def _validate_table_and_cols(session: Session, table: str, cols: List[str]) -> None:
     sch, tbl = (table.split(".", 1) + ["public"])[:2] if "." in table else ("public", table)
-    session.execute(
-        text(
-            """
-            SELECT 1
-            FROM information_schema.columns
-            WHERE lower(table_schema) = lower(:sch)
-              AND lower(table_name) = lower(:tbl)
-              AND lower(column_name) = ANY(:cols)
-        """
-        ),
-        {"sch": sch, "tbl": tbl, "cols": [c.lower() for c in cols]},
-    ).fetchall()
+    known = _columns_by_table(session).get(f"{sch.lower()}.{tbl.lower()}", set())
+    missing = [c for c in cols if c.lower() not in known]
     # We don't hard-fail here; any mismatch will surface when the main query runs.
+    if missing:
+        typer.echo(f"[warn] {table} is missing columns: {', '.join(missing)}", err=True)
 
 
 def _detect_sec_sources(session: Session) -> Tuple[str, Dict[str, str], str, Dict[str, str]]:
@@ -284,6 +284,7 @@ def _ex21_documents(
     filings_cols: Optional[Dict[str, Optional[str]]] = None,
     docs_table: Optional[str] = None,
     docs_cols: Optional[Dict[str, Optional[str]]] = None,
+    incremental: bool = False,
 ):
     filings_cols = filings_cols or {}
     docs_cols = docs_cols or {}
@@ -294,6 +295,13 @@ def _ex21_documents(
         docs_table,
         docs_cols,
     )
+    skip_processed = f"""
+          AND NOT EXISTS (
+                SELECT 1 FROM ex21_processed_exhibits p
+                WHERE p.accession_no = f.{fcol['accession']}
+                  AND p.local_path = d.{dcol['path']}
+          )
+    """ if incremental else ""
     sql = f"""
         SELECT c.company_id,
                f.{fcol['cik']} AS cik,
@@ -314,6 +322,7 @@ def _ex21_documents(
                 UPPER(COALESCE(d.{dcol['doc_type']},'')) LIKE 'EX-21%%'
              OR d.{dcol['description']} ILIKE '%%subsidiar%%'
           )
+          {skip_processed}
         ORDER BY f.{fcol['date']} DESC
         LIMIT :lim
     """
@@ -321,25 +330,72 @@ def _ex21_documents(
 
 
 def _insert_aliases(session: Session, parent_company_id: int, names: List[str]) -> int:
-    inserted = 0
-    for raw in names:
+    return _insert_aliases_bulk(session, [(parent_company_id, n) for n in names])
+
+
+def _insert_aliases_bulk(
+    session: Session, pairs: List[Tuple[int, str]], chunk_size: int = 1000
+) -> int:
+    """Upsert (parent_company_id, subsidiary name) pairs with multi-row INSERTs.
+
+    Pairs that normalize to the same alias are written once. Returns the
+    number of aliases actually inserted (existing ones are skipped).
+    """
+    rows, seen = [], set()
+    for cid, raw in pairs:
         alias_norm = norm_name(raw)
-        if not alias_norm:
-            continue
-        session.execute(
+        if alias_norm and (cid, alias_norm) not in seen:
+            seen.add((cid, alias_norm))
+            rows.append({"cid": cid, "alias": raw[:500], "alias_norm": alias_norm})
+
+    inserted = 0
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        values, params = [], {}
+        for i, r in enumerate(chunk):
+            values.append(f"(:cid{i}, 'subsidiary', :alias{i}, :norm{i}, 'exhibit21')")
+            params.update({f"cid{i}": r["cid"], f"alias{i}": r["alias"], f"norm{i}": r["alias_norm"]})
+        result = session.execute(
             text(
-                """
+                f"""
                 INSERT INTO company_aliases (company_id, alias_type, alias, alias_norm, source)
-                VALUES (:cid, 'subsidiary', :alias, :alias_norm, 'exhibit21')
+                VALUES {", ".join(values)}
                 ON CONFLICT (company_id, alias_norm, alias_type) DO NOTHING
             """
             ),
-            {"cid": parent_company_id, "alias": raw[:500], "alias_norm": alias_norm},
+            params,
         )
-        inserted += 1
+        inserted += result.rowcount or 0
     return inserted
 
 
+def _mark_processed(session: Session, processed: List[Tuple[str, str, int, int]]) -> None:
+    """Record (accession_no, local_path, company_id, names_found) as harvested."""
+    # One row per exhibit; ON CONFLICT DO UPDATE cannot touch a row twice in one statement
+    processed = list({(p[0], p[1]): p for p in processed}.values())
+    if not processed:
+        return
+    session.execute(
+        text(
+            """
+            INSERT INTO ex21_processed_exhibits (accession_no, local_path, company_id, names_found)
+            SELECT * FROM unnest(
+                CAST(:accs AS text[]), CAST(:paths AS text[]),
+                CAST(:cids AS bigint[]), CAST(:counts AS int[])
+            )
+            ON CONFLICT (accession_no, local_path) DO UPDATE
+              SET names_found = EXCLUDED.names_found, processed_at = now()
+        """
+        ),
+        {
+            "accs": [p[0] for p in processed],
+            "paths": [p[1] for p in processed],
+            "cids": [p[2] for p in processed],
+            "counts": [p[3] for p in processed],
+        },
+    )
+
+
 def _common_cli_overrides():
     return {
         "filings_table": typer.Option(None, "--filings-table", help="schema.table for filings"),
@@ -392,6 +448,10 @@ def build_subs(
     limit: int = typer.Option(2000, "--limit", help="Max exhibits to scan this run"),
     dry_run: bool = typer.Option(False, "--dry-run", help="Scan/parse but do not write aliases"),
     debug: bool = typer.Option(False, "--debug", help="Print per-exhibit parse counts"),
+    incremental: bool = typer.Option(
+        True, "--incremental/--full", help="Skip exhibits already harvested in a previous run"
+    ),
+    workers: int = typer.Option(4, "--workers", help="Parser processes (1 = parse in-process)"),
     filings_table: Optional[str] = _common_cli_overrides()["filings_table"],
     filings_cik: Optional[str] = _common_cli_overrides()["filings_cik"],
     filings_form: Optional[str] = _common_cli_overrides()["filings_form"],
@@ -416,28 +476,34 @@ def build_subs(
             {"cik": filings_cik, "form": filings_form, "date": filings_date, "accession": filings_acc},
             docs_table,
             {"accession": docs_acc, "doc_type": docs_type, "description": docs_desc, "path": docs_path},
+            incremental=incremental,
         )
-        for (parent_cid, _cik, _form, _fdate, _acc, doc_type, doc_descr, local_path) in rows:
-            body = _load_doc_body(local_path)
-            if not body:
+        paths = [r[7] for r in rows]
+        if workers > 1 and len(paths) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parsed = list(pool.map(_parse_exhibit, paths, chunksize=8))
+        else:
+            parsed = [_parse_exhibit(p) for p in paths]
+
+        alias_pairs: List[Tuple[int, str]] = []
+        processed: List[Tuple[str, str, int, int]] = []
+        for row, (_, names) in zip(rows, parsed):
+            parent_cid, _cik, _form, _fdate, acc, _doc_type, _doc_descr, local_path = row
+            if names is None:
                 if debug:
                     typer.echo(f"[ex21] {local_path} -> 0 names (no body)")
                 continue
-            names = (
-                _parse_html(body)
-                if BeautifulSoup and ("<table" in body.lower() or "<html" in body.lower())
-                else _parse_text(body)
-            )
-            # If no header-driven parse worked, try a forgiving line-by-line fallback
-            if not names:
-                names = _fallback_parse_naive(body)
 
             if debug:
                 typer.echo(f"[ex21] {local_path} -> {len(names)} names")
 
             found += len(names)
-            if not dry_run and names:
-                wrote += _insert_aliases(s, parent_cid, names)
+            alias_pairs.extend((parent_cid, n) for n in names)
+            processed.append((acc, local_path, parent_cid, len(names)))
+
+        if not dry_run:
+            wrote = _insert_aliases_bulk(s, alias_pairs)
+            _mark_processed(s, processed)
     typer.echo(
         f"Exhibits scanned={len(rows)}  names_found={found}  aliases_inserted={wrote}  dry_run={dry_run}"
     )
@@ -456,6 +522,8 @@ def cli_dry(
         since=since,
         limit=limit,
         debug=True,
+        incremental=True,
+        workers=4,
         # override Typer OptionInfo defaults with *actual* values
         filings_table="edgar.filings",
         filings_cik="cik",
@@ -483,6 +551,8 @@ def cli_load(
         since=since,
         limit=limit,
         debug=True,
+        incremental=True,
+        workers=4,
         filings_table="edgar.filings",
         filings_cik="cik",
         filings_form="form",
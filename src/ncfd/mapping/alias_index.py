@@ -0,0 +1,154 @@
+"""
+In-memory alias → asset index.
+
+Bulk-loads `asset_aliases` once and answers (alias_norm, alias_type) lookups
+from memory. The index is versioned by the `asset_aliases_version` counter
+row, which a statement-level trigger bumps inside every transaction that
+writes `asset_aliases`, so a new version is only visible together with the
+rows that caused it. The version is checked at most once per
+`check_interval` seconds and the index is reloaded only when it has moved.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+class AliasIndex:
+    """Versioned (alias_norm, alias_type) → asset_ids index."""
+
+    def __init__(self, check_interval: float = 5.0):
+        """
+        Initialize an empty index.
+
+        Args:
+            check_interval: Minimum seconds between version checks
+        """
+        self.check_interval = check_interval
+        self.version: Optional[int] = None
+        self._loaded = False
+        self._checked_at = 0.0
+        self._by_key: Dict[Tuple[str, str], List[int]] = {}
+        self._by_norm: Dict[str, List[Tuple[str, int]]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(ids) for ids in self._by_key.values())
+
+    def _read_version(self, session: Session) -> Optional[int]:
+        """Current alias change counter, or None if the counter is not installed."""
+        try:
+            with session.begin_nested():
+                row = session.execute(
+                    text("SELECT version FROM asset_aliases_version WHERE id = 1")
+                ).first()
+        except Exception:
+            return None
+        return row[0] if row else None
+
+    def ensure_fresh(self, session: Session, force: bool = False) -> None:
+        """
+        Reload the index if `asset_aliases` changed since it was built.
+
+        Costs nothing inside the check interval, one query otherwise, and a
+        full reload only when the version moved (or cannot be read).
+        """
+        now = time.monotonic()
+        if self._loaded and not force and now - self._checked_at < self.check_interval:
+            return
+
+        with self._lock:
+            if self._loaded and not force and now - self._checked_at < self.check_interval:
+                return
+
+            version = self._read_version(session)
+            self._checked_at = time.monotonic()
+            if self._loaded and not force and version is not None and version == self.version:
+                return
+
+            self._load(session)
+            self.version = version
+
+    def _load(self, session: Session) -> None:
+        """Bulk-load all aliases."""
+        rows = session.execute(
+            text("SELECT alias_norm, alias_type, asset_id FROM asset_aliases ORDER BY asset_id")
+        ).all()
+
+        by_key: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        by_norm: Dict[str, List[Tuple[str, int]]] = defaultdict(list)
+        for alias_norm, alias_type, asset_id in rows:
+            by_key[(alias_norm, alias_type)].append(asset_id)
+            by_norm[alias_norm].append((alias_type, asset_id))
+
+        self._by_key = dict(by_key)
+        self._by_norm = dict(by_norm)
+        self._loaded = True
+        logger.info(f"Alias index loaded {len(rows)} aliases ({len(self._by_key)} keys)")
+
+    def asset_ids(self, alias_norm: str, alias_type: str) -> List[int]:
+        """Asset IDs carrying an alias, lowest first."""
+        return list(self._by_key.get((alias_norm, alias_type), ()))
+
+    def aliases_for(self, alias_norm: str) -> List[Tuple[str, int]]:
+        """(alias_type, asset_id) pairs for a normalized alias of any type."""
+        return list(self._by_norm.get(alias_norm, ()))
+
+    def add(self, alias_norm: str, alias_type: str, asset_id: int) -> None:
+        """Record a committed alias this process wrote, without waiting for a reload."""
+        with self._lock:
+            ids = self._by_key.setdefault((alias_norm, alias_type), [])
+            if asset_id not in ids:
+                ids.append(asset_id)
+                ids.sort()
+                self._by_norm.setdefault(alias_norm, []).append((alias_type, asset_id))
+
+    def add_on_commit(self, session: Session, alias_norm: str, alias_type: str, asset_id: int) -> None:
+        """
+        Record an alias written in `session` once its transaction commits.
+
+        Aliases of a transaction that rolls back are discarded.
+        """
+        key = ("alias_index_pending", id(self))
+        if key not in session.info:
+            session.info[key] = []
+
+            def apply_pending(sess):
+                pending, sess.info[key] = sess.info[key], []
+                for alias in pending:
+                    self.add(*alias)
+
+            def discard_pending(sess):
+                sess.info[key] = []
+
+            event.listen(session, "after_commit", apply_pending)
+            event.listen(session, "after_rollback", discard_pending)
+        session.info[key].append((alias_norm, alias_type, asset_id))
+
+    def clear(self) -> None:
+        """Drop all entries; the next ensure_fresh reloads."""
+        with self._lock:
+            self._by_key = {}
+            self._by_norm = {}
+            self._loaded = False
+            self.version = None
+
+
+_shared_index: Optional[AliasIndex] = None
+
+
+def get_alias_index() -> AliasIndex:
+    """Process-wide alias index shared by discovery, linking and ingestion."""
+    global _shared_index
+    if _shared_index is None:
+        _shared_index = AliasIndex()
+    return _shared_index
@@ -0,0 +1,222 @@
+"""
+Persisted blocking keys for resolver candidate generation.
+
+`company_blocking_keys` maps (key_type, key) to company IDs for the same
+blocking keys `derive_context` computes on the trial side:
+
+  * token_pair  sorted pair of strong tokens from one company name or alias
+  * domain      website domain or domain alias, lower-cased, without www.
+  * drug_code   asset code names (AB-123) of trials already sponsored by the company
+
+Triggers on companies, company_aliases, trials and trial_assets_xref record
+touched companies in `company_blocking_dirty`; `sync_blocking_keys` drains
+that queue and recomputes keys for just those companies, so the index is
+maintained incrementally. The migration queues every company, so the initial
+backfill belongs to the `sync-blocking-index` command; `resolve-batch` only
+syncs a bounded number of companies per run. Candidate generation is then one indexed lookup
+(`blocking_candidates`) shared by `resolve-nct` and `resolve-batch`.
+"""
+
+from __future__ import annotations
+
+import logging
+from itertools import combinations
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ncfd.db.schema_cache import get_schema
+from ncfd.mapping.blocks import _DRUG_CODE_RE, CandidateContext, strong_tokens
+from ncfd.mapping.candidate_index import similarity
+from ncfd.mapping.candidates import hydrate_candidates
+from ncfd.mapping.normalize import norm_name
+
+logger = logging.getLogger(__name__)
+
+KEY_TOKEN_PAIR = "token_pair"
+KEY_DOMAIN = "domain"
+KEY_DRUG_CODE = "drug_code"
+
+
+def _domain_key(value: str) -> str:
+    dom = (value or "").strip().lower()
+    return dom[4:] if dom.startswith("www.") else dom
+
+
+def token_pair_keys(name: str) -> List[str]:
+    """Blocking keys for all strong-token pairs of one name."""
+    toks = list(dict.fromkeys(strong_tokens(name)))
+    return [" ".join(sorted(pair)) for pair in combinations(toks, 2)]
+
+
+def drug_code_keys(value: str) -> List[str]:
+    return [m.group(0) for m in _DRUG_CODE_RE.finditer((value or "").upper())]
+
+
+def company_keys(names: Iterable[str], domains: Iterable[str], codes: Iterable[str]) -> Set[Tuple[str, str]]:
+    """(key_type, key) set for a company's names/aliases, domains and drug codes."""
+    keys: Set[Tuple[str, str]] = set()
+    for name in names:
+        keys.update((KEY_TOKEN_PAIR, k) for k in token_pair_keys(name))
+    for dom in domains:
+        if _domain_key(dom):
+            keys.add((KEY_DOMAIN, _domain_key(dom)))
+    for code in codes:
+        keys.update((KEY_DRUG_CODE, k) for k in drug_code_keys(code))
+    return keys
+
+
+def context_keys(ctx: CandidateContext) -> Dict[str, List[str]]:
+    """Lookup keys of a trial-side blocking context, grouped by key type."""
+    return {
+        KEY_TOKEN_PAIR: list(dict.fromkeys(" ".join(p) for p in ctx.strong_token_pairs)),
+        KEY_DOMAIN: list(dict.fromkeys(_domain_key(d) for d in ctx.domains if d)),
+        KEY_DRUG_CODE: list(dict.fromkeys(ctx.drug_codes)),
+    }
+
+
+def _index_installed(session: Session) -> bool:
+    return get_schema(session).has_table("company_blocking_keys")
+
+
+def sync_blocking_keys(session: Session, batch_size: int = 1000, max_companies: Optional[int] = None) -> int:
+    """
+    Recompute keys for companies queued in company_blocking_dirty.
+
+    Each batch is committed on its own, so a large backlog is never rebuilt
+    in one transaction. Batches are claimed with SKIP LOCKED so concurrent
+    resolvers can share the work.
+
+    Args:
+        session: SQLAlchemy session
+        batch_size: Companies recomputed per transaction
+        max_companies: Stop after about this many companies (None = drain the queue)
+
+    Returns:
+        Number of companies processed
+    """
+    if not _index_installed(session):
+        return 0
+
+    total = 0
+    while max_companies is None or total < max_companies:
+        if max_companies is not None:
+            batch_size = min(batch_size, max_companies - total)
+        ids = [r[0] for r in session.execute(text("""
+            DELETE FROM company_blocking_dirty
+            WHERE company_id IN (
+                SELECT company_id FROM company_blocking_dirty
+                ORDER BY company_id
+                LIMIT :lim
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING company_id
+        """), {"lim": batch_size}).fetchall()]
+        if not ids:
+            break
+        _rebuild_keys(session, ids)
+        session.commit()
+        total += len(ids)
+        if len(ids) < batch_size:
+            break
+
+    if total:
+        logger.info(f"Blocking index refreshed for {total} companies")
+    return total
+
+
+def _rebuild_keys(session: Session, company_ids: List[int]) -> None:
+    names: Dict[int, List[str]] = {}
+    domains: Dict[int, List[str]] = {}
+    codes: Dict[int, List[str]] = {}
+
+    for cid, name, website_domain in session.execute(text("""
+        SELECT company_id, name, COALESCE(website_domain, '')
+        FROM companies
+        WHERE company_id = ANY(:ids)
+    """), {"ids": company_ids}).fetchall():
+        names.setdefault(cid, []).append(name or "")
+        domains.setdefault(cid, []).append(website_domain)
+
+    for cid, alias, alias_type in session.execute(text("""
+        SELECT company_id, alias, alias_type
+        FROM company_aliases
+        WHERE company_id = ANY(:ids)
+    """), {"ids": company_ids}).fetchall():
+        if alias_type == "domain":
+            domains.setdefault(cid, []).append(alias or "")
+        else:
+            names.setdefault(cid, []).append(alias or "")
+
+    for cid, alias in session.execute(text("""
+        SELECT DISTINCT t.sponsor_company_id, aa.alias
+        FROM trials t
+        JOIN trial_assets_xref x ON x.trial_id = t.trial_id AND x.status = 'active'
+        JOIN asset_aliases aa ON aa.asset_id = x.asset_id AND aa.alias_type = 'code'
+        WHERE t.sponsor_company_id = ANY(:ids)
+    """), {"ids": company_ids}).fetchall():
+        codes.setdefault(cid, []).append(alias or "")
+
+    session.execute(
+        text("DELETE FROM company_blocking_keys WHERE company_id = ANY(:ids)"),
+        {"ids": company_ids},
+    )
+    rows = [
+        {"key_type": key_type, "key": key, "cid": cid}
+        for cid in names  # companies that still exist
+        for key_type, key in sorted(company_keys(names[cid], domains.get(cid, []), codes.get(cid, [])))
+    ]
+    if rows:
+        session.execute(text("""
+            INSERT INTO company_blocking_keys (key_type, key, company_id)
+            VALUES (:key_type, :key, :cid)
+            ON CONFLICT DO NOTHING
+        """), rows)
+
+
+def blocking_candidates(session: Session, ctx: CandidateContext, limit: int = 25) -> List[Tuple[int, int]]:
+    """(company_id, matched keys) for a trial context, most matched keys first."""
+    keys = context_keys(ctx)
+    if not any(keys.values()) or not _index_installed(session):
+        return []
+    rows = session.execute(text("""
+        SELECT company_id, count(*) AS hits
+        FROM company_blocking_keys
+        WHERE (key_type = 'token_pair' AND key = ANY(:pairs))
+           OR (key_type = 'domain' AND key = ANY(:domains))
+           OR (key_type = 'drug_code' AND key = ANY(:codes))
+        GROUP BY company_id
+        ORDER BY hits DESC, company_id
+        LIMIT :lim
+    """), {
+        "pairs": keys[KEY_TOKEN_PAIR],
+        "domains": keys[KEY_DOMAIN],
+        "codes": keys[KEY_DRUG_CODE],
+        "lim": limit,
+    }).fetchall()
+    return [(r[0], int(r[1])) for r in rows]
+
+
+def add_blocked_candidates(
+    session: Session,
+    cands: List[Dict[str, Any]],
+    ctx: CandidateContext,
+    sponsor_text_norm: str,
+    limit: int = 25,
+) -> List[Dict[str, Any]]:
+    """
+    Append companies sharing a blocking key with the trial to trigram candidates.
+
+    Blocked companies the trigram search missed are hydrated like any other
+    candidate; their `sim` is the trigram similarity of the company name.
+    """
+    seen = {c["company_id"] for c in cands}
+    extra_ids = [cid for cid, _hits in blocking_candidates(session, ctx, limit) if cid not in seen]
+    if not extra_ids:
+        return cands
+
+    extra = hydrate_candidates(session, [(cid, 0.0) for cid in extra_ids])
+    for c in extra:
+        c["sim"] = similarity(norm_name(c["name"] or ""), sponsor_text_norm)
+    return list(cands) + extra
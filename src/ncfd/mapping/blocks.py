@@ -1,6 +1,7 @@
 # ncfd/src/ncfd/mapping/blocks.py
 from __future__ import annotations
 from dataclasses import dataclass
+from itertools import combinations
 import re
 from typing import List, Dict, Any, Tuple, Optional
 from sqlalchemy import text
@@ -77,6 +78,22 @@ def load_trial_party(session: Session, trial_id: int, nct_id: str, sponsor_text:
     texts = [t for t in texts if t and t.strip()]
     return TrialParty(nct_id=nct_id, texts=list(dict.fromkeys(texts)), interventions=intervs)
 
+def load_trial_interventions(session: Session, nct_ids: List[str]) -> List[str]:
+    """Intervention names across the latest versions of several trials (e.g. one sponsor's)."""
+    if not nct_ids:
+        return []
+    rows = session.execute(text("""
+      SELECT DISTINCT ON (t.trial_id) tv.raw_jsonb
+      FROM trials t
+      JOIN trial_versions tv ON tv.trial_id = t.trial_id
+      WHERE t.nct_id = ANY(:ncts)
+      ORDER BY t.trial_id, tv.captured_at DESC
+    """), {"ncts": list(nct_ids)}).fetchall()
+    out: List[str] = []
+    for (raw,) in rows:
+        out.extend(_extract_interventions(dict(raw) if raw else {}))
+    return list(dict.fromkeys(out))
+
 def derive_context(tp: TrialParty) -> CandidateContext:
     # domains from any party text
     doms = []
@@ -91,10 +108,7 @@ def derive_context(tp: TrialParty) -> CandidateContext:
         codes.append(m.group(0))
     codes = list(dict.fromkeys(codes))
 
-    # strong token pairs (blocking key)
-    stoks = strong_tokens(" ".join(tp.texts))
-    pairs: List[Tuple[str, str]] = []
-    for i in range(len(stoks)):
-        for j in range(i+1, len(stoks)):
-            pairs.append(tuple(sorted((stoks[i], stoks[j]))))
+    # strong token pairs (blocking key); repeated tokens would only add duplicate pairs
+    stoks = list(dict.fromkeys(strong_tokens(" ".join(tp.texts))))
+    pairs: List[Tuple[str, str]] = [tuple(sorted(p)) for p in combinations(stoks, 2)]
     return CandidateContext(nct_id=tp.nct_id, domains=doms, drug_codes=codes, strong_token_pairs=pairs)
@@ -0,0 +1,476 @@
+"""
+In-process trigram candidate index over company names and aliases.
+
+Answers the same top-k query as `candidate_retrieval` (pg_trgm `%` on
+`companies.name_norm` and `company_aliases.alias_norm`, best similarity per
+company, hydrated with domains and the best US listing) without touching
+Postgres. Trigrams and similarity follow pg_trgm: each alphanumeric word is
+lower-cased and padded with two leading blanks and one trailing blank, and
+similarity is shared trigrams over the union of both trigram sets.
+
+The index is built from a database snapshot and saved as a directory of
+`.npy` arrays (sorted trigrams, posting offsets, posting lists and per-entry
+columns) plus a `meta.json` holding company metadata. Arrays are opened with
+`mmap_mode='r'`, so resolver worker processes share one copy of the pages.
+
+Freshness comes from `company_index_changes`, which triggers on
+`companies` and `company_aliases` keep up to date with the last transaction
+to write each company (any insert, update or delete, ORM or raw SQL). At
+most once per `refresh_interval` seconds, companies changed at or after the
+watermark are re-read into a small in-memory overlay that shadows their
+snapshot entries; deleted companies shadow to nothing. The watermark is the
+oldest transaction still running when changes were last read, so a
+transaction that commits late is picked up by the next refresh. Without the
+change queue (migration not applied) each refresh rebuilds the snapshot.
+
+The overlay is scanned in Python on every query, so once it holds more than
+`max_overlay` companies the snapshot is rebuilt (and saved), which empties
+it. Listing metadata (ticker, CIK, exchange) is only re-read for companies the
+triggers flag, so a change to a company's securities alone shows up at the
+next rebuild (or `build-candidate-index` run), not at the next refresh.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+from ncfd.mapping.candidates import _best_us_security
+
+logger = logging.getLogger(__name__)
+
+SIMILARITY_THRESHOLD = 0.3  # pg_trgm.similarity_threshold default
+FORMAT_VERSION = 2  # 2: watermark is a transaction id, not a timestamp
+
+KIND_COMPANY = 0
+KIND_ALIAS = 1
+
+_WORD_RE = re.compile(r"[^\W_]+")
+_ARRAYS = ("trigrams", "offsets", "postings", "entry_company", "entry_kind", "entry_ntrgm")
+
+
+def trigrams(value: str) -> FrozenSet[str]:
+    """pg_trgm trigram set of a string."""
+    out = set()
+    for word in _WORD_RE.findall((value or "").lower()):
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            out.add(padded[i:i + 3])
+    return frozenset(out)
+
+
+def similarity(a: str, b: str) -> float:
+    """pg_trgm similarity() of two strings."""
+    ta, tb = trigrams(a), trigrams(b)
+    union = len(ta | tb)
+    return len(ta & tb) / union if union else 0.0
+
+
+def _domain(alias: Optional[str]) -> Optional[str]:
+    dom = (alias or "").lower()
+    return dom[4:] if dom.startswith("www.") else dom
+
+
+class CandidateIndex:
+    """Snapshot trigram index with an incremental overlay of changed companies."""
+
+    def __init__(
+        self,
+        path: Optional[Any] = None,
+        refresh_interval: float = 300.0,
+        threshold: float = SIMILARITY_THRESHOLD,
+        max_overlay: int = 2000,
+    ):
+        """
+        Initialize an empty index.
+
+        Args:
+            path: Index directory to load from and save to
+            refresh_interval: Minimum seconds between database freshness checks
+            threshold: Similarity cut-off, as pg_trgm's `%` operator
+            max_overlay: Changed companies held in the overlay before the snapshot is rebuilt
+        """
+        self.path = Path(path) if path else None
+        self.refresh_interval = refresh_interval
+        self.threshold = threshold
+        self.max_overlay = max_overlay
+        self.watermark: Optional[str] = None
+        self._loaded = False
+        self._checked_at = 0.0
+        self._lock = threading.Lock()  # Guards snapshot and overlay swaps
+        self._refresh_lock = threading.Lock()  # One refresh at a time
+        self._set_snapshot(self._empty_arrays(), {})
+
+    def __len__(self) -> int:
+        return len(self._entry_company) + sum(len(e) for e, _ in self._overlay.values())
+
+    # ------------------------------------------------------------------ #
+    # Build / load / save
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _empty_arrays() -> Dict[str, np.ndarray]:
+        return {
+            "trigrams": np.array([], dtype="<U3"),
+            "offsets": np.zeros(1, dtype=np.int64),
+            "postings": np.array([], dtype=np.int32),
+            "entry_company": np.array([], dtype=np.int64),
+            "entry_kind": np.array([], dtype=np.int8),
+            "entry_ntrgm": np.array([], dtype=np.int32),
+        }
+
+    @staticmethod
+    def _build_arrays(entries: List[Tuple[int, int, FrozenSet[str]]]) -> Dict[str, np.ndarray]:
+        """Posting arrays for (company_id, kind, trigram set) entries."""
+        by_trgm: Dict[str, List[int]] = {}
+        for eid, (_cid, _kind, tg) in enumerate(entries):
+            for t in tg:
+                by_trgm.setdefault(t, []).append(eid)
+
+        keys = sorted(by_trgm)
+        lengths = np.array([len(by_trgm[t]) for t in keys], dtype=np.int64)
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        postings = (
+            np.concatenate([np.asarray(by_trgm[t], dtype=np.int32) for t in keys])
+            if keys else np.array([], dtype=np.int32)
+        )
+        return {
+            "trigrams": np.array(keys, dtype="<U3"),
+            "offsets": offsets,
+            "postings": postings,
+            "entry_company": np.array([e[0] for e in entries], dtype=np.int64),
+            "entry_kind": np.array([e[1] for e in entries], dtype=np.int8),
+            "entry_ntrgm": np.array([len(e[2]) for e in entries], dtype=np.int32),
+        }
+
+    def _set_snapshot(self, arrays: Dict[str, np.ndarray], companies: Dict[int, Dict[str, Any]]) -> None:
+        self._trigrams = arrays["trigrams"]
+        self._offsets = arrays["offsets"]
+        self._postings = arrays["postings"]
+        self._entry_company = arrays["entry_company"]
+        self._entry_kind = arrays["entry_kind"]
+        self._entry_ntrgm = arrays["entry_ntrgm"]
+        self._companies = companies
+        # company_id -> (entries, meta or None when the company is gone)
+        self._overlay: Dict[int, Tuple[List[Tuple[int, FrozenSet[str]]], Optional[Dict[str, Any]]]] = {}
+        self._shadowed = np.array([], dtype=np.int64)
+
+    def build(self, session: Session) -> None:
+        """Build the snapshot from the database, saving it if a path is set."""
+        watermark = self._read_watermark(session)
+        company_rows, alias_rows = self._fetch_rows(session)
+        entries, companies = self._entries_from_rows(session, company_rows, alias_rows)
+
+        with self._lock:
+            self._set_snapshot(self._build_arrays(entries), companies)
+            self.watermark = watermark
+            self._loaded = True
+            self._checked_at = time.monotonic()
+
+        logger.info(
+            f"Candidate index built: {len(company_rows)} companies, {len(alias_rows)} aliases, "
+            f"{len(self._trigrams)} trigrams"
+        )
+        if self.path:
+            self.save(self.path)
+
+    def save(self, path: Any) -> None:
+        """Write the snapshot (without the overlay) to an index directory."""
+        path = Path(path)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        if tmp.exists():
+            shutil.rmtree(tmp)
+        tmp.mkdir(parents=True)
+
+        arrays = {
+            "trigrams": self._trigrams,
+            "offsets": self._offsets,
+            "postings": self._postings,
+            "entry_company": self._entry_company,
+            "entry_kind": self._entry_kind,
+            "entry_ntrgm": self._entry_ntrgm,
+        }
+        for name in _ARRAYS:
+            np.save(tmp / f"{name}.npy", np.asarray(arrays[name]))
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "watermark": self.watermark,
+            "companies": {str(cid): m for cid, m in self._companies.items()},
+        }
+        with open(tmp / "meta.json", "w") as f:
+            json.dump(meta, f, default=str)
+
+        old = path.with_name(f"{path.name}.{os.getpid()}.old")
+        if path.exists():
+            path.replace(old)
+        tmp.replace(path)
+        if old.exists():
+            shutil.rmtree(old)
+
+    def load(self, path: Optional[Any] = None) -> bool:
+        """Memory-map a saved snapshot; False if it is missing or unreadable."""
+        path = Path(path) if path else self.path
+        if not path or not (path / "meta.json").exists():
+            return False
+        try:
+            with open(path / "meta.json") as f:
+                meta = json.load(f)
+            if meta.get("format_version") != FORMAT_VERSION:
+                logger.warning(f"Candidate index at {path} has an old format; ignoring it")
+                return False
+            arrays = {name: np.load(path / f"{name}.npy", mmap_mode="r") for name in _ARRAYS}
+        except Exception as e:
+            logger.warning(f"Candidate index load failed for {path}: {e}")
+            return False
+
+        with self._lock:
+            self._set_snapshot(arrays, {int(cid): m for cid, m in meta["companies"].items()})
+            self.watermark = meta["watermark"]
+            self._loaded = True
+            self._checked_at = 0.0  # Check the database on first use
+        return True
+
+    # ------------------------------------------------------------------ #
+    # Database reads
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _read_watermark(session: Session) -> Optional[str]:
+        """
+        Oldest transaction still running, or None without the change queue.
+
+        Every change from an older transaction is already committed and
+        visible to reads made after this one.
+        """
+        try:
+            with session.begin_nested():
+                session.execute(text("SELECT 1 FROM company_index_changes LIMIT 1"))
+                row = session.execute(text("SELECT pg_snapshot_xmin(pg_current_snapshot())")).first()
+        except Exception:
+            return None
+        return str(row[0])
+
+    @staticmethod
+    def _fetch_rows(session: Session, company_ids: Optional[List[int]] = None):
+        """Company and alias rows, optionally limited to some companies."""
+        where, params = "", {}
+        if company_ids is not None:
+            where, params = "WHERE company_id IN :ids", {"ids": company_ids}
+
+        def _query(sql: str):
+            stmt = text(sql.format(where=where))
+            if company_ids is not None:
+                stmt = stmt.bindparams(bindparam("ids", expanding=True))
+            return session.execute(stmt, params).fetchall()
+
+        company_rows = _query(
+            "SELECT company_id, name, name_norm, COALESCE(website_domain, '') FROM companies {where}"
+        )
+        alias_rows = _query(
+            "SELECT company_id, alias_norm, alias_type, alias FROM company_aliases {where} ORDER BY company_id"
+        )
+        return company_rows, alias_rows
+
+    @staticmethod
+    def _entries_from_rows(session: Session, company_rows, alias_rows):
+        """Index entries and hydrated metadata for company and alias rows."""
+        entries: List[Tuple[int, int, FrozenSet[str]]] = []
+        companies: Dict[int, Dict[str, Any]] = {}
+        for cid, name, name_norm, website_domain in company_rows:
+            entries.append((cid, KIND_COMPANY, trigrams(name_norm)))
+            companies[cid] = {"name": name, "website_domain": website_domain, "domains": []}
+
+        for cid, alias_norm, alias_type, alias in alias_rows:
+            entries.append((cid, KIND_ALIAS, trigrams(alias_norm)))
+            if alias_type == "domain" and alias:
+                dom = _domain(alias)
+                meta = companies.setdefault(cid, {"name": None, "website_domain": "", "domains": []})
+                if dom and dom not in meta["domains"]:
+                    meta["domains"].append(dom)
+
+        sec = _best_us_security(session, list(companies))
+        for cid, meta in companies.items():
+            s = sec.get(cid, {})
+            meta["ticker"] = s.get("ticker")
+            meta["cik"] = s.get("cik")
+            meta["exchange"] = s.get("exchange")
+        return entries, companies
+
+    # ------------------------------------------------------------------ #
+    # Freshness
+    # ------------------------------------------------------------------ #
+
+    def ensure_fresh(self, session: Session, force: bool = False) -> None:
+        """
+        Bring the index up to date with the database.
+
+        Loads the saved snapshot (or builds one) on first use, then at most
+        once per refresh interval applies companies changed since the
+        watermark. Only one caller refreshes at a time; while a loaded index
+        is being refreshed, other callers keep using it as is.
+        """
+        if self._loaded and not force and time.monotonic() - self._checked_at < self.refresh_interval:
+            return
+
+        if not self._refresh_lock.acquire(blocking=not self._loaded or force):
+            return
+        try:
+            if self._loaded and not force and time.monotonic() - self._checked_at < self.refresh_interval:
+                return
+
+            if not self._loaded and not self.load():
+                self.build(session)
+                return
+
+            watermark = self._read_watermark(session)
+            if watermark is None or self.watermark is None:
+                logger.info("Candidate index change queue unavailable; rebuilding")
+                self.build(session)
+                return
+
+            self._apply_changes(session, self.watermark)
+            if len(self._overlay) > self.max_overlay:
+                logger.info(f"Candidate index overlay holds {len(self._overlay)} companies; rebuilding")
+                self.build(session)
+                return
+            with self._lock:
+                self.watermark = watermark
+                self._checked_at = time.monotonic()
+        finally:
+            self._refresh_lock.release()
+
+    def _apply_changes(self, session: Session, since: str) -> None:
+        """Re-read companies changed at or after transaction `since` into the overlay."""
+        changed = [r[0] for r in session.execute(text("""
+            SELECT company_id FROM company_index_changes
+            WHERE changed_xid >= CAST(:wm AS xid8)
+        """), {"wm": since}).fetchall()]
+        if not changed:
+            return
+
+        company_rows, alias_rows = self._fetch_rows(session, changed)
+        entries, companies = self._entries_from_rows(session, company_rows, alias_rows)
+        by_company: Dict[int, List[Tuple[int, FrozenSet[str]]]] = {cid: [] for cid in changed}
+        for cid, kind, tg in entries:
+            by_company.setdefault(cid, []).append((kind, tg))
+
+        with self._lock:
+            for cid, company_entries in by_company.items():
+                self._overlay[cid] = (company_entries, companies.get(cid))
+            self._shadowed = np.array(sorted(self._overlay), dtype=np.int64)
+        logger.info(f"Candidate index refreshed {len(changed)} changed companies")
+
+    # ------------------------------------------------------------------ #
+    # Queries
+    # ------------------------------------------------------------------ #
+
+    def _snapshot_hits(self, query: FrozenSet[str]) -> Iterable[Tuple[int, int, int, float]]:
+        """(kind, entry_id, company_id, sim) for snapshot entries over the threshold."""
+        if not query or not len(self._trigrams):
+            return []
+        keys = np.array(sorted(query), dtype="<U3")
+        pos = np.searchsorted(self._trigrams, keys)
+        inside = pos < len(self._trigrams)
+        pos, keys = pos[inside], keys[inside]
+        pos = pos[np.asarray(self._trigrams[pos]) == keys]
+        if not len(pos):
+            return []
+
+        ids = np.concatenate([self._postings[self._offsets[p]:self._offsets[p + 1]] for p in pos])
+        entry_ids, shared = np.unique(ids, return_counts=True)
+        sims = shared / (len(query) + np.asarray(self._entry_ntrgm[entry_ids]) - shared)
+        keep = sims >= self.threshold
+        entry_ids, sims = entry_ids[keep], sims[keep]
+        company_ids = np.asarray(self._entry_company[entry_ids])
+        if len(self._shadowed):
+            live = ~np.isin(company_ids, self._shadowed)
+            entry_ids, sims, company_ids = entry_ids[live], sims[live], company_ids[live]
+        kinds = np.asarray(self._entry_kind[entry_ids])
+        return zip(kinds.tolist(), entry_ids.tolist(), company_ids.tolist(), sims.tolist())
+
+    def _overlay_hits(self, query: FrozenSet[str]) -> List[Tuple[int, int, int, float]]:
+        out = []
+        n = len(self._entry_company)
+        with self._lock:
+            overlay = list(self._overlay.items())
+        for cid, (company_entries, _meta) in overlay:
+            for kind, tg in company_entries:
+                union = len(query | tg)
+                sim = len(query & tg) / union if union else 0.0
+                if sim >= self.threshold:
+                    out.append((kind, n, cid, sim))
+                n += 1
+        return out
+
+    def _meta(self, company_id: int) -> Optional[Dict[str, Any]]:
+        if company_id in self._overlay:
+            return self._overlay[company_id][1]
+        return self._companies.get(company_id)
+
+    def candidates(self, sponsor_text_norm: str, k: int = 50) -> List[Dict[str, Any]]:
+        """Top-k companies for a normalized sponsor, shaped like `candidate_retrieval`."""
+        query = trigrams(sponsor_text_norm)
+        k_each = max(1, k // 2)
+
+        hits = list(self._snapshot_hits(query)) + self._overlay_hits(query)
+        sim_by_company: Dict[int, float] = {}
+        for kind in (KIND_COMPANY, KIND_ALIAS):
+            ranked = sorted((h for h in hits if h[0] == kind), key=lambda h: (-h[3], h[1]))[:k_each]
+            for _kind, _eid, cid, sim in ranked:
+                sim_by_company[cid] = max(sim_by_company.get(cid, 0.0), sim)
+
+        top = sorted(sim_by_company.items(), key=lambda x: x[1], reverse=True)[:k]
+        out: List[Dict[str, Any]] = []
+        for cid, sim in top:
+            m = self._meta(cid) or {"name": None, "website_domain": "", "domains": []}
+            out.append({
+                "company_id": cid,
+                "name": m.get("name"),
+                "website_domain": m.get("website_domain", ""),
+                "domains": list(m.get("domains", [])),
+                "ticker": m.get("ticker"),
+                "cik": m.get("cik"),
+                "exchange": m.get("exchange"),
+                "sim": sim,
+            })
+        return out
+
+    def clear(self) -> None:
+        """Drop all entries; the next ensure_fresh reloads or rebuilds."""
+        with self._lock:
+            self._set_snapshot(self._empty_arrays(), {})
+            self._loaded = False
+            self.watermark = None
+
+
+_shared_index: Optional[CandidateIndex] = None
+
+
+def get_candidate_index() -> Optional[CandidateIndex]:
+    """
+    Process-wide candidate index, enabled by CANDIDATE_INDEX_PATH.
+
+    Returns None when the variable is unset so callers fall back to
+    querying Postgres.
+    """
+    global _shared_index
+    path = os.getenv("CANDIDATE_INDEX_PATH")
+    if not path:
+        return None
+    if _shared_index is None or _shared_index.path != Path(path):
+        interval = float(os.getenv("CANDIDATE_INDEX_REFRESH_SECONDS", "300"))
+        max_overlay = int(os.getenv("CANDIDATE_INDEX_MAX_OVERLAY", "2000"))
+        _shared_index = CandidateIndex(path, refresh_interval=interval, max_overlay=max_overlay)
+    return _shared_index
@@ -4,6 +4,8 @@ from typing import List, Dict, Any, Tuple, Optional
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from ncfd.db.schema_cache import SchemaSnapshot, get_schema
+
 ALLOWED_EXCH = {"NASDAQ", "NYSE", "NYSE AMERICAN", "NYSE ARCA", "OTCQX", "OTCQB"}
 
 def _company_hits(session: Session, qnorm: str, limit: int) -> List[Tuple[int, float]]:
@@ -40,29 +42,15 @@ def _attach_company_meta(session: Session, company_ids: List[int]) -> Dict[int,
     return {r[0]: {"company_id": r[0], "name": r[1], "website_domain": r[2]} for r in rows}
 
 def _col_exists(session: Session, table: str, column: str) -> bool:
-    sql = text("""
-        SELECT 1
-        FROM information_schema.columns
-        WHERE table_name = :t AND column_name = :c
-        LIMIT 1
-    """)
-    return session.execute(sql, {"t": table, "c": column}).first() is not None
+    return get_schema(session).has_column(table, column)
 
 def _table_exists(session: Session, table: str) -> bool:
-    sql = text("""
-        SELECT 1
-        FROM information_schema.tables
-        WHERE table_name = :t
-        LIMIT 1
-    """)
-    return session.execute(sql, {"t": table}).first() is not None
-
-def _best_us_security(session: Session, company_ids: List[int]) -> Dict[int, Dict[str, Any]]:
-    if not company_ids:
-        return {}
+    return get_schema(session).has_table(table)
 
-    use_direct_exchange = _col_exists(session, "securities", "exchange")
-    use_fk_exchange = (not use_direct_exchange) and _col_exists(session, "securities", "exchange_id") and _table_exists(session, "exchanges")
+def _security_rank_sql(schema: SchemaSnapshot):
+    """Best-listing query for the securities/exchanges layout of this schema."""
+    use_direct_exchange = schema.has_column("securities", "exchange")
+    use_fk_exchange = (not use_direct_exchange) and schema.has_column("securities", "exchange_id") and schema.has_table("exchanges")
 
     if use_direct_exchange:
         join_sql = ""
@@ -70,7 +58,7 @@ def _best_us_security(session: Session, company_ids: List[int]) -> Dict[int, Dic
     elif use_fk_exchange:
         label_col: Optional[str] = None
         for cand in ("code", "name", "mic"):
-            if _col_exists(session, "exchanges", cand):
+            if schema.has_column("exchanges", cand):
                 label_col = cand
                 break
         label_col = label_col or "name"
@@ -80,7 +68,7 @@ def _best_us_security(session: Session, company_ids: List[int]) -> Dict[int, Dic
         join_sql = ""
         exch_expr = "''"
 
-    sql = text(f"""
+    return text(f"""
         WITH ranked AS (
           SELECT
             s.company_id,
@@ -109,6 +97,14 @@ def _best_us_security(session: Session, company_ids: List[int]) -> Dict[int, Dic
         FROM ranked
         WHERE rn = 1
     """)
+
+def _best_us_security(session: Session, company_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    if not company_ids:
+        return {}
+
+    # Schema probing and SQL generation happen once per schema revision
+    schema = get_schema(session)
+    sql = schema.memo("best_us_security_sql", lambda: _security_rank_sql(schema))
     rows = session.execute(sql, {"ids": company_ids}).fetchall()
     return {r[0]: {"ticker": r[1], "cik": r[2], "exchange": r[3]} for r in rows}
 
@@ -134,6 +130,13 @@ def _alias_domains_map(session: Session, company_ids: List[int]) -> Dict[int, Li
     return out
 
 def candidate_retrieval(session: Session, sponsor_text_norm: str, k: int = 50) -> List[Dict[str, Any]]:
+    # Served from the in-process trigram index when CANDIDATE_INDEX_PATH is set
+    from ncfd.mapping.candidate_index import get_candidate_index
+    index = get_candidate_index()
+    if index is not None:
+        index.ensure_fresh(session)
+        return index.candidates(sponsor_text_norm, k=k)
+
     k_each = max(1, k // 2)
     c_hits = _company_hits(session, sponsor_text_norm, k_each)
     a_hits = _alias_hits(session, sponsor_text_norm, k_each)
@@ -143,6 +146,10 @@ def candidate_retrieval(session: Session, sponsor_text_norm: str, k: int = 50) -
         sim_by_company[cid] = max(sim_by_company.get(cid, 0.0), sim)
 
     top = sorted(sim_by_company.items(), key=lambda x: x[1], reverse=True)[:k]
+    return hydrate_candidates(session, top)
+
+def hydrate_candidates(session: Session, top: List[Tuple[int, float]]) -> List[Dict[str, Any]]:
+    """Candidate rows (name, domains, best US listing, sim) for (company_id, sim) pairs, in order."""
     company_ids = [cid for cid, _ in top]
 
     meta = _attach_company_meta(session, company_ids)
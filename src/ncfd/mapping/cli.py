@@ -1,12 +1,18 @@
 # ncfd/src/ncfd/mapping/cli.py
 from __future__ import annotations
 
+import hashlib
 import json
+import multiprocessing
 import re
 import os
+import socket
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Sequence, Tuple
 
 import typer
 from rich.console import Console
@@ -18,20 +24,28 @@ from sqlalchemy.exc import ProgrammingError, DBAPIError
 from ncfd.db.session import get_session
 from ncfd.mapping.normalize import norm_name
 from ncfd.mapping.candidates import candidate_retrieval
+from ncfd.mapping.candidate_index import CandidateIndex
 from ncfd.mapping.probabilistic import (
     score_candidates,
     decide_probabilistic,
     extract_domains,
 )
-from ncfd.mapping.blocks import load_trial_party, derive_context
+from ncfd.mapping.blocks import (
+    load_trial_party, load_trial_interventions, derive_context, CandidateContext, TrialParty,
+)
+from ncfd.mapping.blocking_index import add_blocked_candidates, sync_blocking_keys
 from ncfd.mapping.persist import (
     persist_decision,
+    persist_decisions,
     persist_candidate_features,
+    persist_candidate_features_many,
+    sponsor_is_ignored,
 )
-from ncfd.mapping.det import det_resolve, DetDecision
-from ncfd.mapping.deterministic import resolve_company as det_exact_resolve
+from ncfd.mapping.det import det_resolve, DetDecision, _det_by_rules
+from ncfd.mapping.deterministic import resolve_company as det_exact_resolve, resolve_companies
 from ncfd.mapping.alias_promotion import upsert_alias_from_sponsor
 from ncfd.mapping.llm_decider import decide_with_llm, decide_with_llm_research, LlmDecision
+from ncfd.mapping.ctgov_metadata import get_metadata_provider
 
 app = typer.Typer(add_completion=False)
 console = Console()
@@ -458,6 +472,20 @@ def _serialize_scored(scored, topn: int = 10) -> List[Dict[str, Any]]:
 
 def _enqueue_review(session, *, run_id: str, nct_id: str, sponsor_text: str, candidates: List[Dict[str, Any]], reason: str):
     """Stable queue writer: insert into review_queue (JSONB-bound)."""
+    _enqueue_reviews(
+        session,
+        run_id=run_id,
+        nct_ids=[nct_id],
+        sponsor_text=sponsor_text,
+        candidates=candidates,
+        reason=reason,
+    )
+
+
+def _enqueue_reviews(session, *, run_id: str, nct_ids: List[str], sponsor_text: str, candidates: List[Dict[str, Any]], reason: str):
+    """Queue the same sponsor-level review item for every trial in nct_ids (one executemany)."""
+    if not nct_ids:
+        return
     stmt = (
         text(
             """
@@ -469,13 +497,16 @@ def _enqueue_review(session, *, run_id: str, nct_id: str, sponsor_text: str, can
     )
     session.execute(
         stmt,
-        {
-            "run_id": run_id,
-            "nct_id": nct_id,
-            "sponsor_text": sponsor_text,
-            "candidates": candidates,
-            "reason": reason,
-        },
+        [
+            {
+                "run_id": run_id,
+                "nct_id": nct_id,
+                "sponsor_text": sponsor_text,
+                "candidates": candidates,
+                "reason": reason,
+            }
+            for nct_id in nct_ids
+        ],
     )
 
 # --------------------------------------------------------------------------- #
@@ -849,27 +880,21 @@ def resolve_nct(
             console.print("[yellow]No sponsor text found; cannot resolve.[/yellow]")
             raise typer.Exit(1)
 
-        cands = candidate_retrieval(s, norm_name(sponsor_for_match), k=k)
+        # Step 3: Try probabilistic decision first
+        cands, scored, prob_dec = _score_with_blocking(
+            s,
+            candidate_retrieval(s, norm_name(sponsor_for_match), k=k),
+            sponsor_for_match,
+            ctx_full,
+            cfg,
+            context={"domains": ctx_full.domains, "drug_code_hit": bool(ctx_full.drug_codes)},
+        )
         if not cands:
             console.print("[yellow]No candidates found.[/yellow]")
             raise typer.Exit(1)
         _print_candidates(cands, title=f"Candidate Retrieval for {nct_id}")
-
-        weights = cfg.get("model", {}).get("weights", {})
-        intercept = cfg.get("model", {}).get("intercept", 0.0)
-        scored = score_candidates(
-            cands,
-            sponsor_for_match,
-            weights,
-            intercept,
-            context={"domains": ctx_full.domains, "drug_code_hit": bool(ctx_full.drug_codes)},
-        )
         _print_top_features(scored, topn=min(10, len(scored)))
 
-        # Step 3: Try probabilistic decision first
-        th = cfg["thresholds"]
-        prob_dec = decide_probabilistic(scored, th["tau_accept"], th["review_low"], th["min_top2_margin"])
-
         # If probabilistic hits accept, use it (regardless of decider)
         if prob_dec.mode == "accept":
             console.rule("Decision (Probabilistic)")
@@ -1075,6 +1100,417 @@ def resolve_nct(
             console.print_json(json.dumps(blob, ensure_ascii=False))
 
 
+# --------------------------------------------------------------------------- #
+# Batch resolution (sponsor-level)
+# --------------------------------------------------------------------------- #
+
+@dataclass
+class _SponsorOutcome:
+    """Trial-independent resolution of one sponsor string."""
+    det: Optional[DetDecision] = None
+    scored: List[Any] = field(default_factory=list)
+    prob_dec: Any = None
+    ctx: Dict[str, Any] = field(default_factory=dict)
+
+
+_NOT_LOOKED_UP = object()
+
+
+def _group_pending_by_sponsor(rows) -> Dict[str, List[str]]:
+    """Group (nct_id, sponsor_text) rows by sponsor text, keeping first-seen order."""
+    groups: Dict[str, List[str]] = {}
+    for nct_id, sponsor_text in rows:
+        groups.setdefault(sponsor_text, []).append(nct_id)
+    return groups
+
+
+def _score_with_blocking(
+    session,
+    cands: List[Dict[str, Any]],
+    sponsor_text: str,
+    block_ctx: CandidateContext,
+    cfg: Dict[str, Any],
+    context: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[Dict[str, Any]], List[Any], Any]:
+    """
+    Score trigram candidates; unless that is an accept, add blocked candidates and rescore.
+
+    Extra candidates change top-2 margins, so they are only consulted when
+    the trigram candidates alone do not produce a clear accept.
+    Returns (candidates, scored, probabilistic decision).
+    """
+    weights = cfg.get("model", {}).get("weights", {})
+    intercept = cfg.get("model", {}).get("intercept", 0.0)
+    th = cfg["thresholds"]
+
+    def decide(cs):
+        scored = score_candidates(cs, sponsor_text, weights, intercept, context=context) if cs else []
+        return scored, decide_probabilistic(scored, th["tau_accept"], th["review_low"], th["min_top2_margin"])
+
+    scored, prob_dec = decide(cands)
+    if prob_dec.mode != "accept":
+        extended = add_blocked_candidates(session, cands, block_ctx, norm_name(sponsor_text))
+        if len(extended) > len(cands):
+            cands = extended
+            scored, prob_dec = decide(cands)
+    return cands, scored, prob_dec
+
+
+def _resolve_sponsor(
+    session,
+    sponsor_text: str,
+    cfg: Dict[str, Any],
+    *,
+    skip_det: bool = False,
+    candidate_memo: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+    exact: Any = _NOT_LOOKED_UP,
+    interventions: Sequence[str] = (),
+) -> _SponsorOutcome:
+    """
+    Deterministic, then candidate retrieval + scoring for one sponsor.
+
+    The outcome is shared by every trial with the same sponsor text. Candidates
+    are memoized per normalized name, which also covers sponsor strings that
+    differ only in case/punctuation. `exact` takes a precomputed
+    resolve_companies() result for the sponsor; `interventions` are the
+    intervention names of the sponsor's trials, whose drug codes join the
+    sponsor's token pairs and domains as blocking keys.
+    """
+    if not skip_det and sponsor_text:
+        if exact is _NOT_LOOKED_UP:
+            exact = det_exact_resolve(session, sponsor_text)
+        if exact:
+            det = DetDecision(company_id=exact.company_id, method=f"det_exact:{exact.method}", evidence=exact.evidence)
+        else:
+            # det_resolve() would only repeat the alias/name/domain lookups before its rules
+            det = _det_by_rules(session, sponsor_text)
+        if det and getattr(det, "company_id", None):
+            return _SponsorOutcome(det=det)
+
+    qnorm = norm_name(sponsor_text)
+    if candidate_memo is None:
+        cands = candidate_retrieval(session, qnorm, k=50)
+    else:
+        if qnorm not in candidate_memo:
+            candidate_memo[qnorm] = candidate_retrieval(session, qnorm, k=50)
+        cands = candidate_memo[qnorm]
+
+    ctx = _make_context_for_prob(session, nct=None, sponsor_text=sponsor_text)
+    block_ctx = derive_context(TrialParty(
+        nct_id="", texts=[sponsor_text] if sponsor_text else [], interventions=list(interventions),
+    ))
+    cands, scored, prob_dec = _score_with_blocking(session, cands, sponsor_text, block_ctx, cfg, context=ctx)
+    if not cands:
+        return _SponsorOutcome()
+    return _SponsorOutcome(scored=scored, prob_dec=prob_dec, ctx=ctx)
+
+
+def _apply_trials(session, company_id: int, nct_ids: List[str]) -> None:
+    """Set trials.sponsor_company_id for all trials of a resolved sponsor."""
+    session.execute(
+        text("UPDATE trials SET sponsor_company_id=:cid WHERE nct_id = ANY(:ncts)"),
+        {"cid": company_id, "ncts": list(nct_ids)},
+    )
+
+
+def _promote_alias(session, label: str, company_id: int, sponsor_text: str) -> None:
+    try:
+        if upsert_alias_from_sponsor(session, company_id, sponsor_text):
+            console.print(f"[dim][alias] + {label} → company {company_id}[/dim]")
+    except Exception as e:
+        console.print(f"[dim][alias] ! {label} → company {company_id}: {e}[/dim]")
+
+
+def _apply_sponsor_outcome(
+    session,
+    sponsor_text: str,
+    nct_ids: List[str],
+    outcome: _SponsorOutcome,
+    *,
+    run_id: str,
+    persist: bool,
+    decider: str,
+    apply_trial: bool,
+    force_review_on_reject: bool,
+) -> str:
+    """
+    Fan a sponsor-level outcome out to its trials with bulk writes.
+
+    Only the LLM step runs per trial, since it researches the trial itself.
+
+    Returns:
+        Outcome label for the run report (det_accept, prob_accept, prob_review,
+        prob_reject, no_candidates, ignored or llm)
+    """
+    s = session
+    label = nct_ids[0] if len(nct_ids) == 1 else f"{nct_ids[0]} (+{len(nct_ids) - 1})"
+
+    # Step 1: deterministic hit
+    det = outcome.det
+    if det is not None:
+        console.print(f"[green]{label}[/green] :: det:{det.method} -> cid={det.company_id}")
+        if persist:
+            persist_decisions(
+                s,
+                run_id=run_id,
+                nct_ids=nct_ids,
+                sponsor_text=sponsor_text,
+                decision=det,
+                decided_by=decider,
+                leader_features={},
+                leader_meta={},
+            )
+            if apply_trial:
+                _apply_trials(s, det.company_id, nct_ids)
+            _promote_alias(s, label, det.company_id, sponsor_text)
+        return "det_accept"
+
+    # Step 2: no candidates
+    prob_dec = outcome.prob_dec
+    if prob_dec is None:
+        console.print(f"[yellow]{label}[/yellow] :: no candidates")
+        if persist and force_review_on_reject:
+            _enqueue_reviews(
+                s,
+                run_id=run_id,
+                nct_ids=nct_ids,
+                sponsor_text=sponsor_text,
+                candidates=[],
+                reason="force_review",
+            )
+        return "no_candidates"
+
+    serialized = _serialize_scored(outcome.scored, topn=25)
+
+    # Steps 3-4: probabilistic accept, or review/reject when the LLM is not enabled
+    if prob_dec.mode == "accept" or not _llm_enabled(decider):
+        console.print(
+            f"[cyan]{label}[/cyan] :: {sponsor_text[:60]!r} -> {prob_dec.mode} "
+            f"(cid={prob_dec.company_id}, p={prob_dec.p:.3f}, margin={prob_dec.top2_margin:.3f})"
+        )
+        if not persist:
+            return f"prob_{prob_dec.mode}"
+        if sponsor_is_ignored(s, sponsor_text):
+            console.print(f"[dim]SKIP ignored sponsor[/dim] {label} :: {sponsor_text!r}")
+            return "ignored"
+
+        persist_candidate_features_many(
+            s,
+            run_id=run_id,
+            nct_ids=nct_ids,
+            sponsor_text=sponsor_text,
+            scored_candidates=serialized,
+        )
+        if prob_dec.mode == "accept":
+            persist_decisions(
+                s,
+                run_id=run_id,
+                nct_ids=nct_ids,
+                sponsor_text=sponsor_text,
+                decision=prob_dec,
+                leader_features=prob_dec.features,
+                leader_meta=prob_dec.leader_meta,
+                decided_by=decider,
+            )
+            if apply_trial:
+                _apply_trials(s, prob_dec.company_id, nct_ids)
+            _promote_alias(s, label, prob_dec.company_id, sponsor_text)
+        elif prob_dec.mode == "review":
+            _enqueue_reviews(
+                s,
+                run_id=run_id,
+                nct_ids=nct_ids,
+                sponsor_text=sponsor_text,
+                candidates=serialized,
+                reason="prob_review",
+            )
+        return f"prob_{prob_dec.mode}"
+
+    # Step 5: LLM path (only if probabilistic didn't accept and LLM is enabled)
+    get_metadata_provider().prefetch(nct_ids, session=s)
+    ignored: Optional[bool] = None
+    for nct_id in nct_ids:
+        console.print(f"[dim]{nct_id}: Probabilistic didn't accept, trying LLM Research...[/dim]")
+        llm_dec, raw = decide_with_llm_research(
+            run_id=run_id,
+            nct_id=nct_id,
+            session=s,
+            context=outcome.ctx,
+        )
+        console.print(
+            f"[magenta]{nct_id}[/magenta] :: {sponsor_text[:60]!r} -> LLM {llm_dec.mode} "
+            f"(cid={llm_dec.company_id}, conf={llm_dec.confidence:.2f})"
+        )
+        if not persist:
+            continue
+
+        if ignored is None:
+            ignored = sponsor_is_ignored(s, sponsor_text)
+        if ignored:
+            console.print(f"[dim]SKIP ignored sponsor[/dim] {nct_id} :: {sponsor_text!r}")
+            continue
+
+        # Always persist features for training (this is key for the training loop)
+        persist_candidate_features(
+            s,
+            run_id=run_id,
+            nct_id=nct_id,
+            sponsor_text=sponsor_text,
+            scored_candidates=serialized,
+        )
+
+        if llm_dec.mode == "accept" and llm_dec.company_id:
+            decision = {
+                "mode": "accept",
+                "company_id": llm_dec.company_id,
+                "p": 1.0,
+                "top2_margin": 1.0,
+                "features": {},
+                "leader_meta": {"source": "llm", "confidence": llm_dec.confidence},
+            }
+            persist_decision(
+                s,
+                run_id=run_id,
+                nct_id=nct_id,
+                sponsor_text=sponsor_text,
+                decision=decision,
+                leader_features=decision["features"],
+                leader_meta=decision["leader_meta"],
+                decided_by="llm",
+            )
+            if apply_trial:
+                _apply_trials(s, llm_dec.company_id, [nct_id])
+            _promote_alias(s, nct_id, llm_dec.company_id, sponsor_text)
+        elif llm_dec.mode == "review":
+            _enqueue_review(
+                s,
+                run_id=run_id,
+                nct_id=nct_id,
+                sponsor_text=sponsor_text,
+                candidates=serialized,
+                reason="llm_review",
+            )
+    return "llm"
+
+
+def _shard_of(sponsor_text: str, shards: int) -> int:
+    """Stable shard for a sponsor (Python's hash() differs between processes)."""
+    digest = hashlib.blake2b((sponsor_text or "").encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shards
+
+
+def _claim_trials(session, run_id: str, nct_ids: List[str], worker: str, lease_seconds: int) -> List[str]:
+    """
+    Claim a sponsor's still-unresolved trials for this run.
+
+    Claims are rows in resolver_trial_claims keyed by (run_id, nct_id), so a
+    trial that another worker or host already finished in this run (whatever
+    the outcome) is never resolved again; an unfinished claim can be taken
+    over once its lease expires. The caller commits right away, so no row
+    locks are held while the trials are resolved.
+    """
+    rows = session.execute(
+        text(
+            """
+            INSERT INTO resolver_trial_claims (run_id, nct_id, claimed_by, lease_expires_at)
+            SELECT :run_id, t.nct_id, :worker, now() + make_interval(secs => :lease_seconds)
+              FROM trials t
+             WHERE t.nct_id = ANY(:ncts)
+               AND (t.sponsor_company_id IS NULL OR t.sponsor_company_id = 0)
+            ON CONFLICT (run_id, nct_id) DO UPDATE
+               SET claimed_by = EXCLUDED.claimed_by,
+                   lease_expires_at = EXCLUDED.lease_expires_at
+             WHERE resolver_trial_claims.completed_at IS NULL
+               AND resolver_trial_claims.lease_expires_at < now()
+            RETURNING nct_id
+            """
+        ),
+        {"run_id": run_id, "ncts": list(nct_ids), "worker": worker, "lease_seconds": lease_seconds},
+    ).fetchall()
+    claimed = {r[0] for r in rows}
+    return [n for n in nct_ids if n in claimed]
+
+
+def _complete_claims(session, run_id: str, nct_ids: List[str], worker: str, outcome: str) -> None:
+    """Mark claimed trials as finished for this run, in the transaction that wrote their outcome."""
+    session.execute(
+        text(
+            """
+            UPDATE resolver_trial_claims
+               SET completed_at = now(), outcome = :outcome
+             WHERE run_id = :run_id AND nct_id = ANY(:ncts) AND claimed_by = :worker
+            """
+        ),
+        {"run_id": run_id, "ncts": list(nct_ids), "worker": worker, "outcome": outcome},
+    )
+
+
+def _resolve_shard(
+    cfg: Dict[str, Any],
+    groups: List[Tuple[str, List[str]]],
+    options: Dict[str, Any],
+) -> Dict[str, int]:
+    """
+    Resolve one shard of sponsors on this process's own engine.
+
+    Used in-process for a single worker and as the worker entry point for
+    several. With persist, each sponsor's trials are claimed and the claim is
+    committed before resolution (including any LLM research) starts; the
+    outcome and the completed claim are then committed together, so finished
+    work survives a crashed worker and is not repeated by other hosts.
+    Dry runs write nothing, claims included.
+
+    Returns:
+        Trial counts per outcome label (plus 'claimed_elsewhere' for skipped trials)
+    """
+    options = dict(options)
+    skip_det = options.pop("skip_det", False)
+    lease_seconds = options.pop("lease_seconds", 1800)
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    run_id = options["run_id"]
+    persist = options["persist"]
+    counts: Counter = Counter()
+    candidate_memo: Dict[str, List[Dict[str, Any]]] = {}
+
+    exact_by_sponsor: Dict[str, Any] = {}
+    if not skip_det:
+        sponsors = [sponsor_text for sponsor_text, _ in groups]
+        with get_session() as s:
+            exact_by_sponsor = dict(zip(sponsors, resolve_companies(s, sponsors)))
+
+    for sponsor_text, nct_ids in groups:
+        claimed = nct_ids
+        if persist:
+            with get_session() as s:
+                claimed = _claim_trials(s, run_id, nct_ids, worker, lease_seconds)
+            counts["claimed_elsewhere"] += len(nct_ids) - len(claimed)
+            if not claimed:
+                continue
+
+        with get_session() as s:
+            outcome = _resolve_sponsor(
+                s, sponsor_text, cfg, skip_det=skip_det, candidate_memo=candidate_memo,
+                exact=exact_by_sponsor.get(sponsor_text, _NOT_LOOKED_UP),
+                interventions=load_trial_interventions(s, claimed),
+            )
+            label = _apply_sponsor_outcome(s, sponsor_text, claimed, outcome, **options)
+            if persist:
+                _complete_claims(s, run_id, claimed, worker, label)
+            counts[label] += len(claimed)
+    return dict(counts)
+
+
+def _print_run_report(run_id: str, counts: Counter, trials: int, sponsors: int, workers: int) -> None:
+    table = Table(title=f"resolve-batch {run_id}")
+    table.add_column("outcome")
+    table.add_column("trials", justify="right")
+    for outcome, n in sorted(counts.items()):
+        table.add_row(outcome, str(n))
+    table.add_row("[bold]total[/bold]", f"[bold]{trials}[/bold]")
+    console.print(table)
+    console.print(f"[dim]{sponsors} distinct sponsors across {workers} worker(s)[/dim]")
+
+
 @app.command("resolve-batch")
 def resolve_batch(
     cfg_path: str = typer.Option("config/resolver.yaml", "--cfg"),
@@ -1085,16 +1521,39 @@ def resolve_batch(
     apply_trial: bool = typer.Option(False, "--apply-trial/--no-apply-trial", help="Update trials.sponsor_company_id on accept"),
     skip_det: bool = typer.Option(False, "--skip-det", help="Skip deterministic step"),
     force_review_on_reject: bool = typer.Option(False, "--force-review-on-reject", help="Also enqueue rejects"),
+    workers: int = typer.Option(1, "--workers", help="Resolve sponsor shards in N worker processes"),
+    lease_seconds: int = typer.Option(1800, "--lease-seconds", help="How long a trial claim lasts before another worker may take it over"),
+    sync_limit: int = typer.Option(5000, "--sync-limit", help="Most companies whose blocking keys are refreshed before a --persist run (0 = no sync)"),
 ):
     """
     Pull unresolved trials and run det→prob/LLM. With --persist, writes to resolver_decisions /
     resolver_features / review_queue (+trials if --apply-trial).
+
+    With --workers N, sponsors are sharded by hash over N processes. With
+    --persist every worker claims its trials per run in resolver_trial_claims,
+    so several hosts sharing one --run-id work the same backlog without
+    resolving (or queueing) any trial twice, whatever its outcome.
+
+    With --persist, blocking keys of up to --sync-limit changed companies are
+    refreshed first (0 disables); large backlogs (such as the initial backfill)
+    are left to sync-blocking-index. Dry runs never sync.
     """
     cfg = _load_yaml(cfg_path)
     run_id = run_id or datetime.utcnow().strftime("resolver-%Y%m%dT%H%M%SZ")
     if os.getenv("RESOLVER_DISABLE_PROB", "0").lower() in ("1", "true", "yes"):
         console.rule("[yellow]Probabilistic (logistic) path disabled[/yellow]")
 
+    # Bring blocking keys up to date with company/alias changes before workers read them;
+    # syncing writes (and drains the dirty queue), so a dry run leaves it alone
+    if persist and sync_limit > 0:
+        with get_session() as s:
+            synced = sync_blocking_keys(s, max_companies=sync_limit)
+        if synced >= sync_limit:
+            console.print(
+                f"[yellow]Blocking keys refreshed for {synced} companies; run sync-blocking-index "
+                f"to finish the backlog[/yellow]"
+            )
+
     with get_session() as s:
         rows = s.execute(
             text(
@@ -1108,240 +1567,52 @@ def resolve_batch(
                            FROM resolver_ignore_sponsor ig
                           WHERE t.sponsor_text ~* ig.pattern
                    )
+                   AND NOT EXISTS (
+                         SELECT 1
+                           FROM resolver_trial_claims c
+                          WHERE c.run_id = :run_id
+                            AND c.nct_id = t.nct_id
+                            AND (c.completed_at IS NOT NULL OR c.lease_expires_at >= now())
+                   )
                  ORDER BY t.nct_id
                  LIMIT :lim
                 """
             ),
-            {"lim": limit},
+            {"lim": limit, "run_id": run_id},
         ).fetchall()
 
-        for nct_id, sponsor_text in rows:
-            # Step 1: Always try deterministic first
-            det: Optional[DetDecision] = None
-            if not skip_det and sponsor_text:
-                exact = det_exact_resolve(s, sponsor_text)
-                if exact:
-                    det = DetDecision(company_id=exact.company_id, method=f"det_exact:{exact.method}", evidence=exact.evidence)
-                else:
-                    det = det_resolve(s, sponsor_text)
-
-            if det and getattr(det, "company_id", None):
-                console.print(f"[green]{nct_id}[/green] :: det:{det.method} -> cid={det.company_id}")
-                if persist:
-                    persist_decision(
-                        s,
-                        run_id=run_id,
-                        nct_id=nct_id,
-                        sponsor_text=sponsor_text,
-                        decision=det,
-                        decided_by=decider,
-                        leader_features={},
-                        leader_meta={},
-                    )
-                    if apply_trial:
-                        s.execute(
-                            text("UPDATE trials SET sponsor_company_id=:cid WHERE nct_id=:nct"),
-                            {"cid": det.company_id, "nct": nct_id},
-                        )
-                    try:
-                        if upsert_alias_from_sponsor(s, det.company_id, sponsor_text):
-                            console.print(f"[dim][alias] + {nct_id} → company {det.company_id}[/dim]")
-                    except Exception as e:
-                        console.print(f"[dim][alias] ! {nct_id} → company {det.company_id}: {e}[/dim]")
-                continue
-
-            # Step 2: Always try probabilistic (regardless of decider)
-            # This ensures we have features and scores for training
-            qnorm = norm_name(sponsor_text)
-            cands = candidate_retrieval(s, qnorm, k=50)
-            if not cands:
-                console.print(f"[yellow]{nct_id}[/yellow] :: no candidates")
-                if persist and force_review_on_reject:
-                    _enqueue_review(
-                        s,
-                        run_id=run_id,
-                        nct_id=nct_id,
-                        sponsor_text=sponsor_text,
-                        candidates=[],
-                        reason="force_review",
-                    )
-                continue
-
-            ctx = _make_context_for_prob(s, nct=None, sponsor_text=sponsor_text)
-            weights = cfg.get("model", {}).get("weights", {})
-            intercept = cfg.get("model", {}).get("intercept", 0.0)
-            scored = score_candidates(
-                cands,
-                sponsor_text,
-                weights,
-                intercept,
-                context=ctx,
-            )
-
-            # Step 3: Try probabilistic decision first
-            th = cfg["thresholds"]
-            prob_dec = decide_probabilistic(scored, th["tau_accept"], th["review_low"], th["min_top2_margin"])
-
-            # If probabilistic hits accept, use it (regardless of decider)
-            if prob_dec.mode == "accept":
-                console.print(
-                    f"[cyan]{nct_id}[/cyan] :: {sponsor_text[:60]!r} -> {prob_dec.mode} "
-                    f"(cid={prob_dec.company_id}, p={prob_dec.p:.3f}, margin={prob_dec.top2_margin:.3f})"
-                )
-
-                if persist:
-                    ignored = s.execute(
-                        text("SELECT EXISTS (SELECT 1 FROM resolver_ignore_sponsor WHERE :s ~* pattern)"),
-                        {"s": sponsor_text},
-                    ).scalar()
-                    if ignored:
-                        console.print(f"[dim]SKIP ignored sponsor[/dim] {nct_id} :: {sponsor_text!r}")
-                        continue
-
-                    persist_candidate_features(
-                        s,
-                        run_id=run_id,
-                        nct_id=nct_id,
-                        sponsor_text=sponsor_text,
-                        scored_candidates=_serialize_scored(scored, topn=25),
-                    )
-
-                    persist_decision(
-                        s,
-                        run_id=run_id,
-                        nct_id=nct_id,
-                        sponsor_text=sponsor_text,
-                        decision=prob_dec,
-                        leader_features=prob_dec.features,
-                        leader_meta=prob_dec.leader_meta,
-                        decided_by=decider,
-                    )
-                    if apply_trial:
-                        s.execute(
-                            text("UPDATE trials SET sponsor_company_id=:cid WHERE nct_id=:nct"),
-                            {"cid": prob_dec.company_id, "nct": nct_id},
-                        )
-                    try:
-                        if upsert_alias_from_sponsor(s, prob_dec.company_id, sponsor_text):
-                            console.print(f"[dim][alias] + {nct_id} → company {prob_dec.company_id}[/dim]")
-                    except Exception as e:
-                        console.print(f"[dim][alias] ! {nct_id} → company {prob_dec.company_id}: {e}[/dim]")
-                continue
-
-            # Step 4: If probabilistic didn't accept, check if we should use LLM
-            use_llm = _llm_enabled(decider)
-            
-            if not use_llm:
-                # Use probabilistic decision (review/reject)
-                console.print(
-                    f"[cyan]{nct_id}[/cyan] :: {sponsor_text[:60]!r} -> {prob_dec.mode} "
-                    f"(cid={prob_dec.company_id}, p={prob_dec.p:.3f}, margin={prob_dec.top2_margin:.3f})"
-                )
-
-                if persist:
-                    ignored = s.execute(
-                        text("SELECT EXISTS (SELECT 1 FROM resolver_ignore_sponsor WHERE :s ~* pattern)"),
-                        {"s": sponsor_text},
-                    ).scalar()
-                    if ignored:
-                        console.print(f"[dim]SKIP ignored sponsor[/dim] {nct_id} :: {sponsor_text!r}")
-                        continue
-
-                    persist_candidate_features(
-                        s,
-                        run_id=run_id,
-                        nct_id=nct_id,
-                        sponsor_text=sponsor_text,
-                        scored_candidates=_serialize_scored(scored, topn=25),
-                    )
-
-                    if prob_dec.mode == "review":
-                        _enqueue_review(
-                            s,
-                            run_id=run_id,
-                            nct_id=nct_id,
-                            sponsor_text=sponsor_text,
-                            candidates=_serialize_scored(scored, topn=25),
-                            reason="prob_review",
-                        )
-                continue
-
-            # Step 5: LLM path (only if probabilistic didn't accept and LLM is enabled)
-            console.print(f"[dim]{nct_id}: Probabilistic didn't accept, trying LLM Research...[/dim]")
-            
-            # Use the new enhanced LLM research function
-            llm_dec, raw = decide_with_llm_research(
-                run_id=run_id,
-                nct_id=nct_id,
-                session=s,
-                context=ctx,
-            )
-
-            console.print(
-                f"[magenta]{nct_id}[/magenta] :: {sponsor_text[:60]!r} -> LLM {llm_dec.mode} "
-                f"(cid={llm_dec.company_id}, conf={llm_dec.confidence:.2f})"
-            )
-
-            # Optional log table - temporarily disabled to avoid parameter binding issues
-            # TODO: Fix logging parameter binding and re-enable
-            pass
-
-            if persist:
-                ignored = s.execute(
-                    text("SELECT EXISTS (SELECT 1 FROM resolver_ignore_sponsor WHERE :s ~* pattern)"),
-                    {"s": sponsor_text},
-                ).scalar()
-                if ignored:
-                    console.print(f"[dim]SKIP ignored sponsor[/dim] {nct_id} :: {sponsor_text!r}")
-                    continue
-
-                # Always persist features for training (this is key for the training loop)
-                persist_candidate_features(
-                    s,
-                    run_id=run_id,
-                    nct_id=nct_id,
-                    sponsor_text=sponsor_text,
-                    scored_candidates=_serialize_scored(scored, topn=25),
-                )
-
-                if llm_dec.mode == "accept" and llm_dec.company_id:
-                    decision = {
-                        "mode": "accept",
-                        "company_id": llm_dec.company_id,
-                        "p": 1.0,
-                        "top2_margin": 1.0,
-                        "features": {},
-                        "leader_meta": {"source": "llm", "confidence": llm_dec.confidence},
-                    }
-                    persist_decision(
-                        s,
-                        run_id=run_id,
-                        nct_id=nct_id,
-                        sponsor_text=sponsor_text,
-                        decision=decision,
-                        leader_features=decision["features"],
-                        leader_meta=decision["leader_meta"],
-                        decided_by="llm",
-                    )
-                    if apply_trial:
-                        s.execute(
-                            text("UPDATE trials SET sponsor_company_id=:cid WHERE nct_id=:nct"),
-                            {"cid": llm_dec.company_id, "nct": nct_id},
-                        )
-                    try:
-                        if upsert_alias_from_sponsor(s, llm_dec.company_id, sponsor_text):
-                            console.print(f"[dim][alias] + {nct_id} → company {llm_dec.company_id}[/dim]")
-                    except Exception as e:
-                        console.print(f"[dim][alias] ! {nct_id} → company {llm_dec.company_id}: {e}[/dim]")
-                elif llm_dec.mode == "review":
-                    _enqueue_review(
-                        s,
-                        run_id=run_id,
-                        nct_id=nct_id,
-                        sponsor_text=sponsor_text,
-                        candidates=_serialize_scored(scored, topn=25),
-                        reason="llm_review",
-                    )
+    # Resolve each distinct sponsor once, then fan the outcome out to its trials
+    groups = _group_pending_by_sponsor(rows)
+    console.print(f"[dim]{len(rows)} trials, {len(groups)} distinct sponsors[/dim]")
+    options = dict(
+        run_id=run_id,
+        persist=persist,
+        decider=decider,
+        apply_trial=apply_trial,
+        force_review_on_reject=force_review_on_reject,
+        skip_det=skip_det,
+        lease_seconds=lease_seconds,
+    )
+    counts: Counter = Counter()
+
+    if workers <= 1:
+        counts.update(_resolve_shard(cfg, list(groups.items()), options))
+    else:
+        shards: List[List[Tuple[str, List[str]]]] = [[] for _ in range(workers)]
+        for sponsor_text, nct_ids in groups.items():
+            shards[_shard_of(sponsor_text, workers)].append((sponsor_text, nct_ids))
+
+        # spawn: every worker builds its own engine instead of inheriting pooled connections
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            futures = [
+                pool.submit(_resolve_shard, cfg, shard, options)
+                for shard in shards if shard
+            ]
+            for fut in futures:
+                counts.update(fut.result())
+
+    _print_run_report(run_id, counts, len(rows), len(groups), max(1, workers))
 
 # --- Review queue (stable: review_queue) ------------------------------------- #
 
@@ -1582,5 +1853,26 @@ def review_reject(
         console.print(f"[blue]Rejected[/blue] rq_id={rq_id}")
 
 
+@app.command("sync-blocking-index")
+def sync_blocking_index(
+    batch_size: int = typer.Option(1000, "--batch-size", help="Companies recomputed per transaction batch"),
+):
+    """Recompute blocking keys for companies changed since the last sync (including the initial backfill)."""
+    with get_session() as s:
+        n = sync_blocking_keys(s, batch_size=batch_size)
+    console.print(f"[green]Blocking keys refreshed[/green] for {n} companies")
+
+
+@app.command("build-candidate-index")
+def build_candidate_index(
+    out: str = typer.Option(..., "--out", help="Index directory (point CANDIDATE_INDEX_PATH at it)"),
+):
+    """Snapshot company names/aliases into a memory-mappable trigram candidate index."""
+    index = CandidateIndex(out)
+    with get_session() as s:
+        index.build(s)
+    console.print(f"[green]Candidate index written[/green] to {out} ({len(index)} entries)")
+
+
 if __name__ == "__main__":
     app()
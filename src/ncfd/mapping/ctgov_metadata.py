@@ -0,0 +1,327 @@
+"""
+ClinicalTrials.gov trial metadata for the LLM decider.
+
+`CtgovMetadataProvider` answers from, in order:
+
+  1. an in-process LRU memo of trials already served this run
+  2. the latest stored `trial_versions.raw_jsonb` when it holds a v2 study
+     (`protocolSection`), which the CT.gov ingest already captured
+  3. an on-disk JSON cache of API responses younger than the TTL
+  4. the v2 API through one pooled `requests.Session` with retry/backoff
+     on 429 and 5xx
+
+`prefetch()` resolves a batch of NCT IDs up front (one DB query, then
+concurrent API calls for the rest) so the per-trial LLM loop only waits on
+the model. Trials that no source could serve are remembered for
+`failure_ttl_seconds`, so later lookups return None at once instead of
+repeating the DB query and the API retry cycle.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://clinicaltrials.gov/api/v2"
+
+
+@dataclass
+class ClinicalTrialMetadata:
+    """Structured ClinicalTrials.gov trial metadata"""
+    nct_id: str
+    sponsor: str
+    title: str
+    phase: Optional[str]
+    condition: Optional[str]
+    intervention: Optional[str]
+    status: Optional[str]
+    start_date: Optional[str]
+    completion_date: Optional[str]
+    enrollment: Optional[int]
+    raw_data: Dict[str, Any]
+
+
+def metadata_from_study(nct_id: str, data: Dict[str, Any]) -> ClinicalTrialMetadata:
+    """Build metadata from a CT.gov v2 study document."""
+    protocol_section = data.get("protocolSection", {})
+    sponsor_module = protocol_section.get("sponsorCollaboratorsModule", {})
+    sponsor = sponsor_module.get("leadSponsor", {}).get("name", "")
+
+    identification_module = protocol_section.get("identificationModule", {})
+    title = identification_module.get("briefTitle", "")
+
+    status_module = protocol_section.get("statusModule", {})
+    status = status_module.get("overallStatus", "")
+    start_date = status_module.get("startDateStruct", {}).get("date")
+    completion_date = status_module.get("completionDateStruct", {}).get("date")
+
+    phases = protocol_section.get("designModule", {}).get("phases", [])
+    conditions = protocol_section.get("conditionsModule", {}).get("conditions", [])
+    interventions = protocol_section.get("armsInterventionsModule", {}).get("interventions", [])
+    enrollment = protocol_section.get("eligibilityModule", {}).get("enrollmentInfo", {}).get("count")
+
+    return ClinicalTrialMetadata(
+        nct_id=nct_id,
+        sponsor=sponsor,
+        title=title,
+        phase=phases[0] if phases else None,
+        condition=conditions[0] if conditions else None,
+        intervention=interventions[0] if interventions else None,
+        status=status,
+        start_date=start_date,
+        completion_date=completion_date,
+        enrollment=enrollment,
+        raw_data=data,
+    )
+
+
+def _pooled_session(max_retries: int, pool_size: int) -> requests.Session:
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=1.0,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=pool_size)
+    http = requests.Session()
+    http.headers.update({"Accept": "application/json"})
+    http.mount("https://", adapter)
+    http.mount("http://", adapter)
+    return http
+
+
+class CtgovMetadataProvider:
+    """DB-first, disk-cached, session-pooled CT.gov metadata lookups."""
+
+    def __init__(
+        self,
+        cache_dir: Any = ".cache/ctgov",
+        ttl_seconds: float = 86400.0,
+        base_url: str = DEFAULT_BASE_URL,
+        http: Optional[requests.Session] = None,
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        timeout: float = 10.0,
+        memo_size: int = 10000,
+        failure_ttl_seconds: float = 600.0,
+    ):
+        """
+        Initialize the provider.
+
+        Args:
+            cache_dir: Directory for cached API responses; None disables the disk cache
+            ttl_seconds: Age after which a cached response is fetched again
+            base_url: CT.gov v2 API root
+            http: Session to use instead of the pooled default
+            max_concurrency: Parallel API requests during prefetch
+            max_retries: Retries on connection errors, 429 and 5xx
+            timeout: Per-request timeout in seconds
+            memo_size: Trials (served or failed) kept in memory, least recently used evicted first
+            failure_ttl_seconds: How long a failed lookup is answered with None without retrying
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.ttl_seconds = ttl_seconds
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self.http = http or _pooled_session(max_retries, self.max_concurrency)
+        self.memo_size = max(1, memo_size)
+        self.failure_ttl_seconds = failure_ttl_seconds
+
+        self._memo: "OrderedDict[str, ClinicalTrialMetadata]" = OrderedDict()
+        self._failures: "OrderedDict[str, float]" = OrderedDict()  # nct_id -> monotonic failure time
+        self._lock = threading.Lock()
+        self._stats = {
+            'memo_hits': 0, 'db_hits': 0, 'cache_hits': 0, 'api_calls': 0, 'errors': 0, 'failure_hits': 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "CtgovMetadataProvider":
+        """Provider configured by CTGOV_METADATA_CACHE_DIR / CTGOV_METADATA_CACHE_TTL."""
+        return cls(
+            cache_dir=os.getenv("CTGOV_METADATA_CACHE_DIR", ".cache/ctgov"),
+            ttl_seconds=float(os.getenv("CTGOV_METADATA_CACHE_TTL", "86400")),
+        )
+
+    # ------------------------------------------------------------------ #
+    # Lookups
+    # ------------------------------------------------------------------ #
+
+    def get(self, nct_id: str, session: Any = None) -> Optional[ClinicalTrialMetadata]:
+        """Metadata for one trial, or None if every source failed (now or recently)."""
+        with self._lock:
+            meta = self._memo.get(nct_id)
+            if meta is not None:
+                self._memo.move_to_end(nct_id)
+            failed = meta is None and self._failed_recently(nct_id)
+        if meta is not None:
+            self._count('memo_hits')
+            return meta
+        if failed:
+            self._count('failure_hits')
+            return None
+
+        if session is not None:
+            stored = self._stored_studies(session, [nct_id])
+            if nct_id in stored:
+                self._count('db_hits')
+                return self._remember(metadata_from_study(nct_id, stored[nct_id]))
+        return self._from_cache_or_api(nct_id)
+
+    def prefetch(self, nct_ids: Iterable[str], session: Any = None) -> int:
+        """
+        Load metadata for many trials ahead of the LLM loop.
+
+        Returns the number of trials now available from memory. Trials that
+        failed recently are not fetched again.
+        """
+        ids = [n for n in dict.fromkeys(nct_ids) if n]
+        with self._lock:
+            pending = [n for n in ids if n not in self._memo and not self._failed_recently(n)]
+
+        if pending and session is not None:
+            stored = self._stored_studies(session, pending)
+            for nct_id, data in stored.items():
+                self._count('db_hits')
+                self._remember(metadata_from_study(nct_id, data))
+            pending = [n for n in pending if n not in stored]
+
+        if pending:
+            workers = min(self.max_concurrency, len(pending))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(self._from_cache_or_api, pending))
+
+        with self._lock:
+            return sum(1 for n in ids if n in self._memo)
+
+    def _remember(self, meta: ClinicalTrialMetadata) -> ClinicalTrialMetadata:
+        with self._lock:
+            self._failures.pop(meta.nct_id, None)
+            self._memo[meta.nct_id] = meta
+            self._memo.move_to_end(meta.nct_id)
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return meta
+
+    def _remember_failure(self, nct_id: str) -> None:
+        with self._lock:
+            self._failures[nct_id] = time.monotonic()
+            self._failures.move_to_end(nct_id)
+            while len(self._failures) > self.memo_size:
+                self._failures.popitem(last=False)
+
+    def _failed_recently(self, nct_id: str) -> bool:
+        """Whether a lookup for the trial failed within the failure TTL; caller holds _lock."""
+        failed_at = self._failures.get(nct_id)
+        if failed_at is None:
+            return False
+        if time.monotonic() - failed_at > self.failure_ttl_seconds:
+            del self._failures[nct_id]
+            return False
+        return True
+
+    def _stored_studies(self, session: Any, nct_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Latest stored v2 study document per NCT ID."""
+        try:
+            with session.begin_nested():
+                rows = session.execute(text("""
+                    SELECT DISTINCT ON (t.nct_id) t.nct_id, tv.raw_jsonb
+                    FROM trials t
+                    JOIN trial_versions tv ON tv.trial_id = t.trial_id
+                    WHERE t.nct_id = ANY(:ncts)
+                    ORDER BY t.nct_id, tv.captured_at DESC
+                """), {"ncts": list(nct_ids)}).fetchall()
+        except Exception as e:
+            logger.warning(f"Stored trial version lookup failed: {e}")
+            return {}
+        # Older versions hold study cards rather than API documents; those fall through to the API
+        return {r[0]: dict(r[1]) for r in rows if r[1] and "protocolSection" in r[1]}
+
+    def _from_cache_or_api(self, nct_id: str) -> Optional[ClinicalTrialMetadata]:
+        data = self._read_cache(nct_id)
+        if data is not None:
+            self._count('cache_hits')
+            return self._remember(metadata_from_study(nct_id, data))
+
+        try:
+            self._count('api_calls')
+            response = self.http.get(f"{self.base_url}/studies/{nct_id}", timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            self._count('errors')
+            self._remember_failure(nct_id)
+            logger.warning(f"Failed to fetch ClinicalTrials.gov data for {nct_id}: {e}")
+            return None
+
+        self._write_cache(nct_id, data)
+        return self._remember(metadata_from_study(nct_id, data))
+
+    # ------------------------------------------------------------------ #
+    # Disk cache
+    # ------------------------------------------------------------------ #
+
+    def _path(self, nct_id: str) -> Path:
+        return self.cache_dir / f"{nct_id}.json"
+
+    def _read_cache(self, nct_id: str) -> Optional[Dict[str, Any]]:
+        if self.cache_dir is None:
+            return None
+        path = self._path(nct_id)
+        try:
+            if not path.exists() or time.time() - path.stat().st_mtime > self.ttl_seconds:
+                return None
+            with open(path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"CT.gov cache read failed for {nct_id}: {e}")
+            return None
+
+    def _write_cache(self, nct_id: str, data: Dict[str, Any]) -> None:
+        if self.cache_dir is None:
+            return
+        path = self._path(nct_id)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            tmp_path.replace(path)
+        except Exception as e:
+            logger.warning(f"CT.gov cache write failed for {nct_id}: {e}")
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get memo, database, cache, API call, error and remembered-failure counts."""
+        with self._lock:
+            return dict(self._stats)
+
+
+_shared_provider: Optional[CtgovMetadataProvider] = None
+
+
+def get_metadata_provider() -> CtgovMetadataProvider:
+    """Process-wide provider shared by the LLM decider and resolver CLIs."""
+    global _shared_provider
+    if _shared_provider is None:
+        _shared_provider = CtgovMetadataProvider.from_env()
+    return _shared_provider
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterable, Optional, Set, Dict
+from typing import Iterable, List, Optional, Set, Dict
 import re
 
 from sqlalchemy import text, bindparam
@@ -169,3 +169,165 @@ def resolve_company(
             )
 
     return None
+
+
+# ---------------------------------------------------------------------------- #
+# Batch API: same precedence and uniqueness rules, a few set-based queries
+# ---------------------------------------------------------------------------- #
+
+def _lookup_alias_norms(
+    session: Session, norms: Iterable[str], alias_types: Iterable[str]
+) -> Dict[str, Set[int]]:
+    norms = sorted(set(norms))
+    if not norms:
+        return {}
+    rows = session.execute(
+        text(
+            """
+            SELECT q.norm, a.company_id
+              FROM unnest(CAST(:norms AS text[])) AS q(norm)
+              JOIN company_aliases a ON a.alias_norm = q.norm
+             WHERE a.alias_type IN :types
+             GROUP BY q.norm, a.company_id
+            """
+        ).bindparams(bindparam("types", expanding=True)),
+        {"norms": norms, "types": tuple(alias_types)},
+    ).fetchall()
+    out: Dict[str, Set[int]] = {}
+    for norm, cid in rows:
+        out.setdefault(norm, set()).add(int(cid))
+    return out
+
+
+def _lookup_company_norms(session: Session, norms: Iterable[str]) -> Dict[str, List[int]]:
+    norms = sorted(set(norms))
+    if not norms:
+        return {}
+    rows = session.execute(
+        text(
+            """
+            SELECT q.norm, c.company_id
+              FROM unnest(CAST(:norms AS text[])) AS q(norm)
+              JOIN companies c ON c.name_norm = q.norm
+            """
+        ),
+        {"norms": norms},
+    ).fetchall()
+    out: Dict[str, List[int]] = {}
+    for norm, cid in rows:
+        out.setdefault(norm, []).append(int(cid))
+    return out
+
+
+def _lookup_domain_aliases(session: Session, domains: Iterable[str]) -> Dict[str, Set[int]]:
+    domains = sorted(set(domains))
+    if not domains:
+        return {}
+    rows = session.execute(
+        text(
+            """
+            SELECT q.dom, a.company_id
+              FROM unnest(CAST(:doms AS text[])) AS q(dom)
+              JOIN company_aliases a
+                ON a.alias_type = :t
+               AND lower(regexp_replace(a.alias, '^www\\.', '')) = q.dom
+             GROUP BY q.dom, a.company_id
+            """
+        ),
+        {"doms": domains, "t": DOMAIN_ALIAS_TYPE},
+    ).fetchall()
+    out: Dict[str, Set[int]] = {}
+    for dom, cid in rows:
+        out.setdefault(dom, set()).add(int(cid))
+    return out
+
+
+def _lookup_website_domains(session: Session, domains: Iterable[str]) -> Dict[str, List[int]]:
+    domains = sorted(set(domains))
+    if not domains:
+        return {}
+    rows = session.execute(
+        text(
+            """
+            SELECT q.dom, c.company_id
+              FROM unnest(CAST(:doms AS text[])) AS q(dom)
+              JOIN companies c
+                ON lower(regexp_replace(COALESCE(c.website_domain, ''), '^www\\.', '')) = q.dom
+            """
+        ),
+        {"doms": domains},
+    ).fetchall()
+    out: Dict[str, List[int]] = {}
+    for dom, cid in rows:
+        out.setdefault(dom, []).append(int(cid))
+    return out
+
+
+def _unique(hits) -> Optional[int]:
+    return next(iter(hits)) if hits is not None and len(hits) == 1 else None
+
+
+def resolve_companies(
+    session: Session,
+    sponsor_texts: List[str],
+    allowed_alias_types: Optional[Iterable[str]] = None,
+) -> List[Optional[Resolution]]:
+    """
+    Set-based resolve_company() for many sponsors.
+
+    Strict/loose norms and domains are computed in Python, then each step runs
+    once for every input still unresolved (at most four `unnest`-joined
+    queries). Returns one Resolution (or None) per input, in input order,
+    identical to calling resolve_company() on each.
+    """
+    allowed_alias_types = set(allowed_alias_types or DEFAULT_ALIAS_TYPES)
+
+    keys: Dict[str, tuple] = {}
+    for raw in sponsor_texts:
+        if raw and raw.strip() and raw not in keys:
+            keys[raw] = (norm_name(raw), norm_name_loose(raw), _extract_domain_candidate(raw))
+
+    resolved: Dict[str, Resolution] = {}
+
+    def pending():
+        return [(raw, k) for raw, k in keys.items() if raw not in resolved]
+
+    # 1) alias_exact (strict), then alias_exact_loose
+    if allowed_alias_types:
+        alias_hits = _lookup_alias_norms(
+            session, [n for _, (s, l, _d) in pending() for n in (s, l)], allowed_alias_types
+        )
+        for raw, (strict, loose, _dom) in pending():
+            cid = _unique(alias_hits.get(strict))
+            if cid is not None:
+                resolved[raw] = Resolution(cid, "alias_exact", {"alias_norm": strict, "raw": raw})
+            elif loose != strict and _unique(alias_hits.get(loose)) is not None:
+                resolved[raw] = Resolution(
+                    _unique(alias_hits[loose]), "alias_exact_loose", {"alias_norm": loose, "raw": raw}
+                )
+
+    # 2) company_name_exact (strict), then company_name_exact_loose
+    name_hits = _lookup_company_norms(session, [n for _, (s, l, _d) in pending() for n in (s, l)])
+    for raw, (strict, loose, _dom) in pending():
+        cid = _unique(name_hits.get(strict))
+        if cid is not None:
+            resolved[raw] = Resolution(cid, "company_name_exact", {"name_norm": strict, "raw": raw})
+        elif loose != strict and _unique(name_hits.get(loose)) is not None:
+            resolved[raw] = Resolution(
+                _unique(name_hits[loose]), "company_name_exact_loose", {"name_norm": loose, "raw": raw}
+            )
+
+    # 3) domain alias, then companies.website_domain
+    domain_hits = _lookup_domain_aliases(session, [d for _, (_s, _l, d) in pending() if d])
+    for raw, (_strict, _loose, dom) in pending():
+        cid = _unique(domain_hits.get(dom)) if dom else None
+        if cid is not None:
+            resolved[raw] = Resolution(cid, "domain_exact", {"domain": dom, "raw": raw})
+
+    site_hits = _lookup_website_domains(session, [d for _, (_s, _l, d) in pending() if d])
+    for raw, (_strict, _loose, dom) in pending():
+        cid = _unique(site_hits.get(dom)) if dom else None
+        if cid is not None:
+            resolved[raw] = Resolution(cid, "website_domain", {"domain": dom, "raw": raw})
+
+    return [resolved.get(raw) if raw else None for raw in sponsor_texts]
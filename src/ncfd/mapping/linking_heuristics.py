@@ -12,8 +12,9 @@ from dataclasses import dataclass
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
-from ncfd.db.models import Document, DocumentLink, DocumentEntity, Asset, AssetAlias, DocumentTextPage, LinkAudit
-from ncfd.extract.asset_extractor import AssetMatch, find_nearby_assets
+from ncfd.db.models import Document, DocumentLink, DocumentEntity, Asset, DocumentTextPage, LinkAudit
+from ncfd.extract.asset_extractor import AssetMatch, find_nearby_assets, proximity_join
+from ncfd.mapping.alias_index import AliasIndex, get_alias_index
 from ncfd.config import get_config
 
 logger = logging.getLogger(__name__)
@@ -43,7 +44,7 @@ class LinkingHeuristics:
     """
     
     def __init__(self, db_session: Session, review_only: bool = False, 
-                 confidence_threshold: float = None):
+                 confidence_threshold: float = None, alias_index: Optional[AliasIndex] = None):
         """
         Initialize the linking heuristics engine.
         
@@ -51,9 +52,11 @@ class LinkingHeuristics:
             db_session: Database session for queries
             review_only: If True, only return high-confidence links for review
             confidence_threshold: Minimum confidence for filtering (uses config if None)
+            alias_index: Alias → asset index (defaults to the shared process index)
         """
         self.db_session = db_session
         self.review_only = review_only
+        self.alias_index = alias_index or get_alias_index()
         
         # Load configuration
         self.config = get_config()
@@ -153,41 +156,44 @@ class LinkingHeuristics:
         # Get confidence from config
         confidence = self.linking_config.get('heuristics', {}).get('hp1_nct_near_asset', {}).get('confidence', 1.00)
         
-        # Find nearby pairs
-        for asset_entity in asset_entities:
-            for nct_entity in nct_entities:
-                # Calculate distance between mentions
-                distance = abs(asset_entity.char_start - nct_entity.char_start)
-                
-                if distance <= 250:  # Within ±250 characters
-                    # Find assets with this alias
-                    assets = self._find_assets_by_alias(asset_entity.value_norm, asset_entity.ent_type)
-                    
-                    for asset in assets:
-                        candidate = LinkCandidate(
-                            doc_id=doc.doc_id,
-                            asset_id=asset.asset_id,
-                            nct_id=nct_entity.value_text,
-                            link_type='nct_near_asset',
-                            confidence=confidence,
-                            evidence={
-                                'heuristic': 'HP-1',
-                                'asset_span': {
-                                    'page_no': asset_entity.page_no,
-                                    'char_start': asset_entity.char_start,
-                                    'char_end': asset_entity.char_end,
-                                    'text': asset_entity.value_text
-                                },
-                                'nct_span': {
-                                    'page_no': nct_entity.page_no,
-                                    'char_start': nct_entity.char_start,
-                                    'char_end': nct_entity.char_end,
-                                    'text': nct_entity.value_text
-                                },
-                                'distance': distance
-                            }
-                        )
-                        candidates.append(candidate)
+        # Find nearby pairs (within ±250 characters) with a sorted sweep
+        pairs = proximity_join(asset_entities, nct_entities, 250, position=lambda e: e.char_start)
+        
+        assets_by_alias: Dict[Tuple[str, str], List[Asset]] = {}
+        for asset_idx, nct_idx, distance in pairs:
+            asset_entity = asset_entities[asset_idx]
+            nct_entity = nct_entities[nct_idx]
+            
+            # Find assets with this alias (once per alias)
+            alias_key = (asset_entity.value_norm, asset_entity.ent_type)
+            if alias_key not in assets_by_alias:
+                assets_by_alias[alias_key] = self._find_assets_by_alias(*alias_key)
+            
+            for asset in assets_by_alias[alias_key]:
+                candidate = LinkCandidate(
+                    doc_id=doc.doc_id,
+                    asset_id=asset.asset_id,
+                    nct_id=nct_entity.value_text,
+                    link_type='nct_near_asset',
+                    confidence=confidence,
+                    evidence={
+                        'heuristic': 'HP-1',
+                        'asset_span': {
+                            'page_no': asset_entity.page_no,
+                            'char_start': asset_entity.char_start,
+                            'char_end': asset_entity.char_end,
+                            'text': asset_entity.value_text
+                        },
+                        'nct_span': {
+                            'page_no': nct_entity.page_no,
+                            'char_start': nct_entity.char_start,
+                            'char_end': nct_entity.char_end,
+                            'text': nct_entity.value_text
+                        },
+                        'distance': distance
+                    }
+                )
+                candidates.append(candidate)
         
         return candidates
     
@@ -249,12 +255,12 @@ class LinkingHeuristics:
                 
                 # Check if any INN entities are associated with this asset
                 for inn_entity in inn_entities:
-                    asset_aliases = self.db_session.query(AssetAlias).filter(
-                        AssetAlias.asset_id == asset.asset_id,
-                        AssetAlias.alias_type.in_(['inn', 'generic'])
-                    ).all()
+                    inn_asset_ids = (
+                        self.alias_index.asset_ids(inn_entity.value_norm, 'inn')
+                        + self.alias_index.asset_ids(inn_entity.value_norm, 'generic')
+                    )
                     
-                    if any(alias.alias_norm == inn_entity.value_norm for alias in asset_aliases):
+                    if asset.asset_id in inn_asset_ids:
                         candidate = LinkCandidate(
                             doc_id=doc.doc_id,
                             asset_id=asset.asset_id,
@@ -428,23 +434,15 @@ class LinkingHeuristics:
     
     def _find_asset_by_alias(self, alias_norm: str, alias_type: str) -> Optional[Asset]:
         """Find asset by normalized alias."""
-        alias = self.db_session.query(AssetAlias).filter(
-            AssetAlias.alias_norm == alias_norm,
-            AssetAlias.alias_type == alias_type
-        ).first()
-        
-        if alias:
-            return alias.asset
-        return None
+        assets = self._find_assets_by_alias(alias_norm, alias_type)
+        return assets[0] if assets else None
     
     def _find_assets_by_alias(self, alias_norm: str, alias_type: str) -> List[Asset]:
-        """Find all assets with a given alias."""
-        aliases = self.db_session.query(AssetAlias).filter(
-            AssetAlias.alias_norm == alias_norm,
-            AssetAlias.alias_type == alias_type
-        ).all()
-        
-        return [alias.asset for alias in aliases if alias.asset]
+        """Find all assets with a given alias, resolved through the in-memory alias index."""
+        self.alias_index.ensure_fresh(self.db_session)
+        assets = (self.db_session.get(Asset, asset_id)
+                  for asset_id in self.alias_index.asset_ids(alias_norm, alias_type))
+        return [asset for asset in assets if asset is not None]
     
     def log_linking_decision(self, candidate: LinkCandidate, decision: str = 'pending_review',
                             reviewer_id: Optional[int] = None, review_notes: Optional[str] = None):
@@ -4,11 +4,12 @@ from __future__ import annotations
 import json
 import os
 import re
-import requests
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
+from ncfd.mapping.ctgov_metadata import ClinicalTrialMetadata, get_metadata_provider
+
 try:
     from sqlalchemy import text
 except ImportError:
@@ -33,22 +34,6 @@ class LlmDecision:
     match_type: Optional[str] = None  # NEW: exact, high_confidence, moderate_confidence, low_confidence, uncertain
 
 
-@dataclass
-class ClinicalTrialMetadata:
-    """Structured ClinicalTrials.gov trial metadata"""
-    nct_id: str
-    sponsor: str
-    title: str
-    phase: Optional[str]
-    condition: Optional[str]
-    intervention: Optional[str]
-    status: Optional[str]
-    start_date: Optional[str]
-    completion_date: Optional[str]
-    enrollment: Optional[int]
-    raw_data: Dict[str, Any]
-
-
 def _client() -> Any:
     if OpenAI is None:
         raise RuntimeError(
@@ -68,70 +53,12 @@ def _client() -> Any:
     return OpenAI(api_key=api_key, **kwargs)
 
 
-def fetch_ctgov_metadata(nct_id: str) -> Optional[ClinicalTrialMetadata]:
+def fetch_ctgov_metadata(nct_id: str, session=None) -> Optional[ClinicalTrialMetadata]:
     """
-    Fetch trial metadata from ClinicalTrials.gov API v2
+    Trial metadata from the latest stored trial version (when a DB session is
+    given), the on-disk response cache, or ClinicalTrials.gov API v2.
     """
-    try:
-        # ClinicalTrials.gov API v2 endpoint
-        url = f"https://clinicaltrials.gov/api/v2/studies/{nct_id}"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        study = data.get("study", {})
-        
-        # Extract key fields from the correct API structure
-        protocol_section = data.get("protocolSection", {})
-        sponsor_module = protocol_section.get("sponsorCollaboratorsModule", {})
-        lead_sponsor = sponsor_module.get("leadSponsor", {})
-        sponsor = lead_sponsor.get("name", "")
-        
-        # Get identification module for title
-        identification_module = protocol_section.get("identificationModule", {})
-        title = identification_module.get("briefTitle", "")
-        
-        # Get status module for status and dates
-        status_module = protocol_section.get("statusModule", {})
-        status = status_module.get("overallStatus", "")
-        start_date = status_module.get("startDateStruct", {}).get("date")
-        completion_date = status_module.get("completionDateStruct", {}).get("date")
-        
-        # Get phase information
-        design_module = protocol_section.get("designModule", {})
-        phases = design_module.get("phases", [])
-        phase = phases[0] if phases else None
-        
-        # Get condition and intervention
-        conditions_module = protocol_section.get("conditionsModule", {})
-        conditions = conditions_module.get("conditions", [])
-        condition = conditions[0] if conditions else None
-        
-        arms_interventions_module = protocol_section.get("armsInterventionsModule", {})
-        interventions = arms_interventions_module.get("interventions", [])
-        intervention = interventions[0] if interventions else None
-        
-        # Get enrollment
-        eligibility_module = protocol_section.get("eligibilityModule", {})
-        enrollment = eligibility_module.get("enrollmentInfo", {}).get("count")
-        
-        return ClinicalTrialMetadata(
-            nct_id=nct_id,
-            sponsor=sponsor,
-            title=title,
-            phase=phase,
-            condition=condition,
-            intervention=intervention,
-            status=status,
-            start_date=start_date,
-            completion_date=completion_date,
-            enrollment=enrollment,
-            raw_data=data
-        )
-        
-    except Exception as e:
-        print(f"Warning: Failed to fetch ClinicalTrials.gov data for {nct_id}: {e}")
-        return None
+    return get_metadata_provider().get(nct_id, session=session)
 
 
 def _fuzzy_company_match(company_name: str, session) -> Tuple[Optional[int], float, str]:
@@ -274,7 +201,7 @@ def decide_with_llm_research(
         return _mock_llm_decision_research(nct_id, session)
     
     # Step 1: Fetch ClinicalTrials.gov metadata
-    trial_metadata = fetch_ctgov_metadata(nct_id)
+    trial_metadata = fetch_ctgov_metadata(nct_id, session=session)
     if not trial_metadata:
         # Log the failure and fallback to basic mock decision
         _log_llm_attempt(
@@ -532,7 +459,7 @@ def _mock_llm_decision_research(nct_id: str, session) -> Tuple[LlmDecision, Dict
     Mock LLM research decision for testing when OpenAI is not available.
     """
     # Fetch trial metadata for mock decision
-    trial_metadata = fetch_ctgov_metadata(nct_id)
+    trial_metadata = fetch_ctgov_metadata(nct_id, session=session)
     
     if not trial_metadata:
         # Log the mock decision with no metadata
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from dataclasses import is_dataclass, asdict
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 from sqlalchemy import text, bindparam
 from sqlalchemy.orm import Session
@@ -134,6 +134,26 @@ def persist_candidate_features(
     Table expected columns (as in your schema):
       run_id, nct_id, sponsor_text_norm, company_id, features_jsonb, score_precal, p_calibrated
     """
+    persist_candidate_features_many(
+        session,
+        run_id=run_id,
+        nct_ids=[nct_id],
+        sponsor_text=sponsor_text,
+        scored_candidates=scored_candidates,
+    )
+
+
+def persist_candidate_features_many(
+    session: Session,
+    *,
+    run_id: str,
+    nct_ids: Sequence[str],
+    sponsor_text: str,
+    scored_candidates: Iterable[Any],
+) -> None:
+    """
+    Write the same scored candidates for every trial of a sponsor (one executemany).
+    """
     s_norm = norm_name(sponsor_text or "")
 
     sql = text("""
@@ -143,19 +163,21 @@ def persist_candidate_features(
             (:run_id, :nct_id, :s_norm, :company_id, :features, NULL, :p)
     """).bindparams(bindparam("features", type_=JSONB))
 
-    for item in scored_candidates:
-        cid, p, feats, _meta = _coerce_scored(item)
-        session.execute(
-            sql,
-            {
-                "run_id": run_id,
-                "nct_id": nct_id,
-                "s_norm": s_norm,
-                "company_id": cid,
-                "features": feats,  # JSONB-bound (no ::jsonb cast in SQL)
-                "p": p,
-            },
-        )
+    coerced = [_coerce_scored(item) for item in scored_candidates]
+    rows = [
+        {
+            "run_id": run_id,
+            "nct_id": nct_id,
+            "s_norm": s_norm,
+            "company_id": cid,
+            "features": feats,  # JSONB-bound (no ::jsonb cast in SQL)
+            "p": p,
+        }
+        for nct_id in nct_ids
+        for cid, p, feats, _meta in coerced
+    ]
+    if rows:
+        session.execute(sql, rows)
     # commit handled by caller (context manager)
 
 
@@ -174,6 +196,37 @@ def persist_decision(
     """
     Upsert into resolver_decisions for this (run_id, nct_id, sponsor_text_norm).
     """
+    persist_decisions(
+        session,
+        run_id=run_id,
+        nct_ids=[nct_id],
+        sponsor_text=sponsor_text,
+        decision=decision,
+        decided_by=decided_by,
+        leader_features=leader_features,
+        leader_meta=leader_meta,
+        notes_md=notes_md,
+    )
+
+
+def persist_decisions(
+    session: Session,
+    *,
+    run_id: str,
+    nct_ids: Sequence[str],
+    sponsor_text: str,
+    decision: Any,
+    decided_by: str = "auto",  # auto|human|llm
+    leader_features: Optional[Dict[str, Any]] = None,
+    leader_meta: Optional[Dict[str, Any]] = None,
+    notes_md: Optional[str] = None,
+) -> None:
+    """
+    Upsert one sponsor-level decision for every trial in nct_ids (single statement).
+    """
+    nct_ids = list(dict.fromkeys(nct_ids))
+    if not nct_ids:
+        return
     s_norm = norm_name(sponsor_text or "")
     payload = _decision_payload(decision, leader_features, leader_meta)
 
@@ -182,10 +235,13 @@ def persist_decision(
             (run_id, nct_id, sponsor_text, sponsor_text_norm,
              company_id, match_type, p_match, top2_margin,
              features_jsonb, evidence_jsonb, decided_by, notes_md)
-        VALUES
-            (:run_id, :nct_id, :s_text, :s_norm,
-             :company_id, :match_type, :p_match, :top2_margin,
-             :features_jsonb, :evidence_jsonb, :decided_by, :notes_md)
+        SELECT
+            :run_id, n.nct_id, :s_text, :s_norm,
+            CAST(:company_id AS integer), :match_type,
+            CAST(:p_match AS double precision), CAST(:top2_margin AS double precision),
+            CAST(:features_jsonb AS jsonb), CAST(:evidence_jsonb AS jsonb),
+            :decided_by, CAST(:notes_md AS text)
+          FROM unnest(CAST(:nct_ids AS text[])) AS n(nct_id)
         ON CONFLICT (run_id, nct_id, sponsor_text_norm)
         DO UPDATE SET
             company_id   = EXCLUDED.company_id,
@@ -205,7 +261,7 @@ def persist_decision(
         sql,
         {
             "run_id": run_id,
-            "nct_id": nct_id,
+            "nct_ids": nct_ids,
             "s_text": sponsor_text,
             "s_norm": s_norm,
             "company_id": payload["company_id"],
@@ -1,8 +1,10 @@
 from __future__ import annotations
 import math, re
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 from sqlalchemy.orm import Session
 
 from ncfd.mapping.normalize import (
@@ -18,34 +20,23 @@ def _jaro(s: str, t: str) -> float:
     ls, lt = len(s), len(t)
     if ls == 0 or lt == 0:
         return 0.0
-    mmax = max(ls, lt)
-    match_dist = max(mmax // 2 - 1, 0)
-    s_matches = [False]*ls
-    t_matches = [False]*lt
-    matches = 0
-    transpositions = 0
+    match_dist = max(max(ls, lt) // 2 - 1, 0)
+    # first unmatched occurrence of each s char inside its window; str.find keeps the scan in C
+    t_matched = bytearray(lt)
+    s_seq: List[str] = []
     for i, ch in enumerate(s):
-        start = max(0, i - match_dist)
         end = min(i + match_dist + 1, lt)
-        for j in range(start, end):
-            if t_matches[j] or t[j] != ch:
-                continue
-            s_matches[i] = True
-            t_matches[j] = True
-            matches += 1
-            break
+        j = t.find(ch, max(0, i - match_dist), end)
+        while j != -1 and t_matched[j]:
+            j = t.find(ch, j + 1, end)
+        if j != -1:
+            t_matched[j] = 1
+            s_seq.append(ch)
+    matches = len(s_seq)
     if matches == 0:
         return 0.0
-    k = 0
-    for i in range(ls):
-        if not s_matches[i]:
-            continue
-        while not t_matches[k]:
-            k += 1
-        if s[i] != t[k]:
-            transpositions += 1
-        k += 1
-    transpositions //= 2
+    t_seq = [t[j] for j in range(lt) if t_matched[j]]
+    transpositions = sum(1 for a, b in zip(s_seq, t_seq) if a != b) // 2
     return (matches/ls + matches/lt + (matches - transpositions)/matches) / 3.0
 
 def _jaro_winkler(s: str, t: str, p: float = 0.1, max_l: int = 4) -> float:
@@ -87,20 +78,51 @@ def _token_set_ratio(a: List[str], b: List[str]) -> float:
     inter = len(A & B)
     return (2.0 * inter) / (len(A) + len(B))
 
-def build_features(sponsor_text: str, cand: Dict[str, Any], context: Optional[Dict[str, Any]] = None) -> Dict[str, float]:
+@dataclass
+class SponsorFeatures:
+    """Sponsor-side inputs to build_features, computed once per query."""
+    text: str
+    norm: str
+    tokens: frozenset
+    acronym: str
+    domains: List[str]
+    context_domains: List[str]
+    academic_pen: float
+    strong: frozenset
+    drug_code_hit: float
+
+def sponsor_features(sponsor_text: str, context: Optional[Dict[str, Any]] = None) -> SponsorFeatures:
     context = context or {}
     s_norm = norm_name(sponsor_text)
-    c_name_norm = norm_name(cand.get("name") or "")
-    s_stripped = strip_legal(sponsor_text)
-
-    jw_primary = _jaro_winkler(s_norm, c_name_norm)
-    tsr = _token_set_ratio(tokens_of(s_norm), tokens_of(c_name_norm))
+    return SponsorFeatures(
+        text=sponsor_text,
+        norm=s_norm,
+        tokens=frozenset(tokens_of(s_norm)),
+        acronym=acronym_of(strip_legal(sponsor_text)),
+        domains=extract_domains(sponsor_text) + [d.lower() for d in context.get("domains", [])],
+        context_domains=list(context.get("domains", [])),
+        academic_pen=1.0 if has_academic_keywords(sponsor_text) else 0.0,
+        strong=frozenset(strong_tokens(sponsor_text)),
+        drug_code_hit=1.0 if context.get("drug_code_hit") else 0.0,
+    )
+
+@lru_cache(maxsize=65536)
+def _name_features(name: str) -> Tuple[str, frozenset, str, frozenset]:
+    """Candidate-name inputs (norm, tokens, acronym, strong tokens); names recur across sponsors."""
+    c_norm = norm_name(name)
+    return c_norm, frozenset(tokens_of(c_norm)), acronym_of(name), frozenset(strong_tokens(name))
+
+def _set_ratio(A: frozenset, B: frozenset) -> float:
+    if not A or not B:
+        return 0.0
+    return (2.0 * len(A & B)) / (len(A) + len(B))
 
-    ac_s = acronym_of(s_stripped)
-    ac_c = acronym_of(cand.get("name") or "")
-    acronym_exact = 1.0 if (ac_s and ac_s == ac_c) else 0.0
+def _candidate_features(sf: SponsorFeatures, cand: Dict[str, Any]) -> Dict[str, float]:
+    c_name_norm, c_tokens, ac_c, c_strong = _name_features(cand.get("name") or "")
 
-    sponsor_domains = extract_domains(sponsor_text) + [d.lower() for d in context.get("domains", [])]
+    jw_primary = _jaro_winkler(sf.norm, c_name_norm)
+    tsr = _set_ratio(sf.tokens, c_tokens)
+    acronym_exact = 1.0 if (sf.acronym and sf.acronym == ac_c) else 0.0
 
     # NEW: consider both website_domain and any alias domains attached by candidate_retrieval
     cand_domains: List[str] = []
@@ -108,14 +130,11 @@ def build_features(sponsor_text: str, cand: Dict[str, Any], context: Optional[Di
         cand_domains.append(str(cand["website_domain"]).lower())
     cand_domains.extend([d.lower() for d in cand.get("domains", []) if d])
 
-    domain_root_match = 1.0 if sponsor_domains and any(dom in sponsor_domains for dom in cand_domains) else 0.0
+    domain_root_match = 1.0 if sf.domains and any(dom in sf.domains for dom in cand_domains) else 0.0
 
-    ticker_hit = 1.0 if ticker_in_text(cand.get("ticker"), sponsor_text) else 0.0
-    academic_pen = 1.0 if has_academic_keywords(sponsor_text) else 0.0
-    sto = _token_set_ratio(strong_tokens(sponsor_text), strong_tokens(cand.get("name") or ""))
-
-    drug_code_hit = 1.0 if context.get("drug_code_hit") else 0.0
-    extra_domain_hit = 1.0 if any(d in cand_domains for d in context.get("domains", [])) and cand_domains else 0.0
+    ticker_hit = 1.0 if ticker_in_text(cand.get("ticker"), sf.text) else 0.0
+    sto = _set_ratio(sf.strong, c_strong)
+    extra_domain_hit = 1.0 if any(d in cand_domains for d in sf.context_domains) and cand_domains else 0.0
 
     return {
         "jw_primary": jw_primary,
@@ -123,12 +142,15 @@ def build_features(sponsor_text: str, cand: Dict[str, Any], context: Optional[Di
         "acronym_exact": acronym_exact,
         "domain_root_match": domain_root_match,
         "ticker_string_hit": ticker_hit,
-        "academic_keyword_penalty": academic_pen,
+        "academic_keyword_penalty": sf.academic_pen,
         "strong_token_overlap": sto,
-        "drug_code_hit": drug_code_hit,
+        "drug_code_hit": sf.drug_code_hit,
         "extra_domain_hit": extra_domain_hit,
     }
 
+def build_features(sponsor_text: str, cand: Dict[str, Any], context: Optional[Dict[str, Any]] = None) -> Dict[str, float]:
+    return _candidate_features(sponsor_features(sponsor_text, context), cand)
+
 # ---------- scoring & policy ----------
 @dataclass
 class Scored:
@@ -146,6 +168,13 @@ def _linpred(weights: Dict[str, float], feats: Dict[str, float], intercept: floa
 def _sigmoid(x: float) -> float:
     return 1.0 / (1.0 + math.exp(-x))
 
+def _linpred_many(weights: Dict[str, float], X: np.ndarray, intercept: float) -> np.ndarray:
+    """_linpred over a feature matrix (columns in weights order); same summation order, so same floats."""
+    z = np.full(X.shape[0], float(intercept))
+    for j, w in enumerate(weights.values()):
+        z += w * X[:, j]
+    return z
+
 def score_candidates(
     candidates: List[Dict[str, Any]],
     sponsor_text: str,
@@ -153,11 +182,15 @@ def score_candidates(
     intercept: float,
     context: Optional[Dict[str, Any]] = None,
 ) -> List[Scored]:
-    out: List[Scored] = []
-    for c in candidates:
-        feats = build_features(sponsor_text, c, context=context)
-        p = _sigmoid(_linpred(weights, feats, intercept))
-        out.append(Scored(company_id=c["company_id"], p=p, features=feats, meta=c))
+    sf = sponsor_features(sponsor_text, context)
+    feats = [_candidate_features(sf, c) for c in candidates]
+    X = np.array([[float(f.get(k, 0.0)) for k in weights] for f in feats], dtype=float).reshape(len(feats), len(weights))
+    z = _linpred_many(weights, X, intercept)
+
+    out: List[Scored] = [
+        Scored(company_id=c["company_id"], p=_sigmoid(zi), features=f, meta=c)
+        for c, f, zi in zip(candidates, feats, z.tolist())
+    ]
     # add top-2 margin for policy
     out.sort(key=lambda x: x.p, reverse=True)
     return out
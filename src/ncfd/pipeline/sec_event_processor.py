@@ -7,6 +7,7 @@ This module processes extracted SEC information and:
 - Triggers signal evaluation
 - Manages review queues
 - Integrates with existing systems
+- Optionally appends events to a durable queue drained by separate consumers
 """
 
 from __future__ import annotations
@@ -19,6 +20,10 @@ from dataclasses import dataclass
 from ..ingest.sec_types import (
     EightKItem, TenKSection, FilingMetadata, ExtractionResult
 )
+from .sec_event_queue import (
+    SecEventQueue, QueuedEvent, make_dedupe_key,
+    ENTITY_RESOLUTION, SIGNAL_EVALUATION, CLINICAL_UPDATES
+)
 
 logger = logging.getLogger(__name__)
 
@@ -142,14 +147,21 @@ class SecEventProcessor:
     - Signal evaluation triggering
     - Review queue management
     - Entity resolution
+    
+    When an event queue is configured, trial events and clinical updates are
+    appended to Postgres in batches instead of held in memory, and trial
+    linking / signal evaluation / clinical updates run in separate consumers
+    via the ``run_*_consumer`` methods. Review items go to the
+    ``sec_review_items`` table, which the review accessors then read and update.
     """
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], event_queue: Optional[SecEventQueue] = None):
         """
         Initialize the event processor.
         
         Args:
             config: Configuration dictionary
+            event_queue: Durable event queue; created from config['event_queue'] if enabled
         """
         self.config = config
         self.logger = logging.getLogger(__name__)
@@ -159,6 +171,19 @@ class SecEventProcessor:
         self.clinical_updates: List[ClinicalDevelopmentUpdate] = []
         self.review_queue: List[ReviewItem] = []
         
+        # Durable queue
+        queue_config = config.get('event_queue', {})
+        if event_queue is None and queue_config.get('enabled', False):
+            event_queue = SecEventQueue(
+                lease_seconds=queue_config.get('lease_seconds', 300),
+                max_attempts=queue_config.get('max_attempts', 5)
+            )
+        self.event_queue = event_queue
+        self.queue_batch_size = queue_config.get('append_batch_size', 500)
+        self.consumer_batch_size = queue_config.get('consume_batch_size', 100)
+        self._pending_rows: List[Dict[str, Any]] = []
+        self._pending_reviews: List[Dict[str, Any]] = []
+        
         # Integration flags
         self.auto_link_trials = config.get('integration', {}).get('auto_link_trials', True)
         self.auto_trigger_signals = config.get('integration', {}).get('auto_trigger_signals', True)
@@ -200,37 +225,41 @@ class SecEventProcessor:
                     # Process 8-K trial events
                     trial_event = self._process_trial_event(item, filing_metadata)
                     if trial_event:
-                        self.trial_events.append(trial_event)
+                        self._record_event(trial_event, "trial_event")
                         processed_items['trial_events'] += 1
                         
                         # Check if review is needed
                         if self._needs_review(trial_event):
                             review_item = self._create_review_item(trial_event, "trial_event")
-                            self.review_queue.append(review_item)
+                            self._record_event(review_item, "review_item")
                             processed_items['review_items'] += 1
                 
                 elif isinstance(item, TenKSection):
                     # Process 10-K clinical development
                     clinical_update = self._process_clinical_update(item, filing_metadata)
                     if clinical_update:
-                        self.clinical_updates.append(clinical_update)
+                        self._record_event(clinical_update, "clinical_update")
                         processed_items['clinical_updates'] += 1
                         
                         # Check if review is needed
                         if self._needs_review(clinical_update):
                             review_item = self._create_review_item(clinical_update, "clinical_update")
-                            self.review_queue.append(review_item)
+                            self._record_event(review_item, "review_item")
                             processed_items['review_items'] += 1
             
-            # Process events if auto-processing is enabled
-            if self.auto_link_trials:
-                self._process_trial_events()
-            
-            if self.auto_trigger_signals:
-                self._trigger_signal_evaluations()
-            
-            if self.auto_resolve_entities:
-                self._resolve_entities()
+            if self.event_queue is not None:
+                # Consumers drain the queue at their own pace
+                processed_items['queued'] = self.flush_event_queue()
+            else:
+                # Process events if auto-processing is enabled
+                if self.auto_link_trials:
+                    self._process_trial_events()
+                
+                if self.auto_trigger_signals:
+                    self._trigger_signal_evaluations()
+                
+                if self.auto_resolve_entities:
+                    self._resolve_entities()
             
             self.logger.info(
                 f"Processed {processed_items['trial_events']} trial events, "
@@ -315,8 +344,13 @@ class SecEventProcessor:
     
     def _create_review_item(self, item: Any, item_type: str) -> ReviewItem:
         """Create review item for flagged content."""
+        if self.event_queue is None:
+            item_id = f"{item_type}_{len(self.review_queue)}"
+        else:
+            # Stable across processes and replays, so the durable table is keyed by content
+            item_id = f"{item_type}_{self._dedupe_key(item, item_type)[:16]}"
         review_item = ReviewItem(
-            item_id=f"{item_type}_{len(self.review_queue)}",
+            item_id=item_id,
             filing_id=item.filing_id,
             company_cik=item.company_cik,
             item_type=item_type,
@@ -335,17 +369,20 @@ class SecEventProcessor:
         
         for event in self.trial_events:
             try:
-                # TODO: Implement trial linking logic
-                # - Search for trials by company and phase
-                # - Match trial identifiers (NCT IDs)
-                # - Update trial status and milestones
-                
-                event.entity_resolution_complete = True
-                self.logger.info(f"Processed trial event: {event.event_type}")
-                
+                self._link_trial_event(event)
             except Exception as e:
                 self.logger.error(f"Error processing trial event: {e}")
     
+    def _link_trial_event(self, event: TrialEvent):
+        """Link a single trial event to existing trials."""
+        # TODO: Implement trial linking logic
+        # - Search for trials by company and phase
+        # - Match trial identifiers (NCT IDs)
+        # - Update trial status and milestones
+        
+        event.entity_resolution_complete = True
+        self.logger.info(f"Processed trial event: {event.event_type}")
+    
     def _trigger_signal_evaluations(self):
         """Trigger signal evaluation for relevant events."""
         self.logger.info("Triggering signal evaluations")
@@ -354,17 +391,21 @@ class SecEventProcessor:
             try:
                 # Check if event should trigger signal evaluation
                 if self._should_trigger_signals(event):
-                    # TODO: Implement signal evaluation triggering
-                    # - Create signal evaluation job
-                    # - Update trial risk assessment
-                    # - Trigger alerts if needed
-                    
-                    event.signal_evaluation_triggered = True
-                    self.logger.info(f"Triggered signal evaluation for: {event.event_type}")
+                    self._evaluate_signals_for_event(event)
                 
             except Exception as e:
                 self.logger.error(f"Error triggering signal evaluation: {e}")
     
+    def _evaluate_signals_for_event(self, event: TrialEvent):
+        """Trigger signal evaluation for a single event."""
+        # TODO: Implement signal evaluation triggering
+        # - Create signal evaluation job
+        # - Update trial risk assessment
+        # - Trigger alerts if needed
+        
+        event.signal_evaluation_triggered = True
+        self.logger.info(f"Triggered signal evaluation for: {event.event_type}")
+    
     def _should_trigger_signals(self, event: TrialEvent) -> bool:
         """Determine if event should trigger signal evaluation."""
         # High-impact events
@@ -397,13 +438,148 @@ class SecEventProcessor:
         
         pass
     
+    # ------------------------------------------------------------------
+    # Durable queue
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def _dedupe_key(event: Any, event_type: str) -> str:
+        # Timestamps (and reprs embedding them) differ between runs; exclude them from the key
+        stable = {k: v for k, v in vars(event).items() if k not in ('extracted_at', 'flagged_at')}
+        return make_dedupe_key(event_type, stable)
+    
+    def _record_event(self, event: Any, event_type: str):
+        """Hold an event in memory, or buffer it for the durable queue / review table."""
+        if self.event_queue is None:
+            if event_type == "trial_event":
+                self.trial_events.append(event)
+            elif event_type == "clinical_update":
+                self.clinical_updates.append(event)
+            else:
+                self.review_queue.append(event)
+            return
+        
+        if event_type == "review_item":
+            self._pending_reviews.append(vars(event))
+        else:
+            payload = vars(event)
+            dedupe_key = self._dedupe_key(event, event_type)
+            
+            if event_type == "clinical_update":
+                queues = [CLINICAL_UPDATES]
+            else:
+                queues = [ENTITY_RESOLUTION]
+                if self._should_trigger_signals(event):
+                    queues.append(SIGNAL_EVALUATION)
+            
+            for queue in queues:
+                self._pending_rows.append({
+                    'queue': queue,
+                    'event_type': event_type,
+                    'dedupe_key': dedupe_key,
+                    'filing_id': event.filing_id,
+                    'company_cik': event.company_cik,
+                    'payload': payload,
+                })
+        
+        if len(self._pending_rows) + len(self._pending_reviews) >= self.queue_batch_size:
+            self.flush_event_queue()
+    
+    def flush_event_queue(self) -> int:
+        """Append buffered events to the durable queue and review items to their table."""
+        if self.event_queue is None:
+            return 0
+        
+        inserted = 0
+        if self._pending_rows:
+            rows, self._pending_rows = self._pending_rows, []
+            queued = self.event_queue.append_batch(rows)
+            self.logger.info(f"Queued {queued} SEC events ({len(rows) - queued} duplicates)")
+            inserted += queued
+        if self._pending_reviews:
+            reviews, self._pending_reviews = self._pending_reviews, []
+            added = self.event_queue.add_review_items(reviews)
+            self.logger.info(f"Stored {added} SEC review items ({len(reviews) - added} duplicates)")
+            inserted += added
+        return inserted
+    
+    @staticmethod
+    def _event_from_payload(event: QueuedEvent) -> Any:
+        """Rebuild a TrialEvent or ClinicalDevelopmentUpdate from its queued payload."""
+        payload = dict(event.payload)
+        for key in ('extracted_at', 'filing_date'):
+            value = payload.get(key)
+            if isinstance(value, str):
+                parsed = datetime.fromisoformat(value)
+                payload[key] = parsed.date() if key == 'filing_date' and len(value) == 10 else parsed
+        
+        if event.event_type == "trial_event":
+            return TrialEvent(**payload)
+        if event.event_type == "clinical_update":
+            return ClinicalDevelopmentUpdate(**payload)
+        raise ValueError(f"Unsupported event type for consumer: {event.event_type}")
+    
+    def _handle_entity_resolution(self, queued: QueuedEvent):
+        self._link_trial_event(self._event_from_payload(queued))
+    
+    def _handle_signal_evaluation(self, queued: QueuedEvent):
+        event = self._event_from_payload(queued)
+        self._evaluate_signals_for_event(event)
+    
+    def _apply_clinical_update(self, update: ClinicalDevelopmentUpdate):
+        """Apply a clinical development update to the pipeline."""
+        # TODO: Implement pipeline updates
+        # - Link the update to the company's trials
+        # - Update pipeline stage and regulatory milestones
+        
+        update.pipeline_updated = True
+        self.logger.info(f"Processed clinical update for filing {update.filing_id}")
+    
+    def _handle_clinical_update(self, queued: QueuedEvent):
+        self._apply_clinical_update(self._event_from_payload(queued))
+    
+    def run_entity_resolution_consumer(self, max_batches: Optional[int] = None) -> Dict[str, int]:
+        """Drain the entity resolution queue."""
+        if self.event_queue is None:
+            raise RuntimeError("Event queue is not configured")
+        return self.event_queue.drain(
+            ENTITY_RESOLUTION, self._handle_entity_resolution,
+            batch_size=self.consumer_batch_size, max_batches=max_batches
+        )
+    
+    def run_signal_evaluation_consumer(self, max_batches: Optional[int] = None) -> Dict[str, int]:
+        """Drain the signal re-evaluation queue."""
+        if self.event_queue is None:
+            raise RuntimeError("Event queue is not configured")
+        return self.event_queue.drain(
+            SIGNAL_EVALUATION, self._handle_signal_evaluation,
+            batch_size=self.consumer_batch_size, max_batches=max_batches
+        )
+    
+    def run_clinical_update_consumer(self, max_batches: Optional[int] = None) -> Dict[str, int]:
+        """Drain the clinical development update queue."""
+        if self.event_queue is None:
+            raise RuntimeError("Event queue is not configured")
+        return self.event_queue.drain(
+            CLINICAL_UPDATES, self._handle_clinical_update,
+            batch_size=self.consumer_batch_size, max_batches=max_batches
+        )
+    
     def get_processing_summary(self) -> Dict[str, Any]:
         """Get summary of processing status."""
+        if self.event_queue is None:
+            review_counts: Dict[str, int] = {}
+            for r in self.review_queue:
+                review_counts[r.review_status] = review_counts.get(r.review_status, 0) + 1
+        else:
+            self.flush_event_queue()
+            review_counts = self.event_queue.review_counts()
         return {
             'trial_events_processed': len(self.trial_events),
             'clinical_updates_processed': len(self.clinical_updates),
-            'review_queue_size': len(self.review_queue),
-            'pending_reviews': len([r for r in self.review_queue if r.review_status == "pending"]),
+            'review_queue_size': sum(review_counts.values()),
+            'pending_reviews': review_counts.get("pending", 0),
+            'durable_queue_enabled': self.event_queue is not None,
             'auto_processing_enabled': {
                 'trial_linking': self.auto_link_trials,
                 'signal_triggering': self.auto_trigger_signals,
@@ -413,12 +589,20 @@ class SecEventProcessor:
     
     def get_review_queue(self, status: Optional[str] = None) -> List[ReviewItem]:
         """Get review queue items, optionally filtered by status."""
+        if self.event_queue is not None:
+            self.flush_event_queue()
+            return [ReviewItem(**row) for row in self.event_queue.review_items(status)]
         if status:
             return [r for r in self.review_queue if r.review_status == status]
         return self.review_queue
     
     def update_review_status(self, item_id: str, status: str, notes: Optional[str] = None):
         """Update review item status."""
+        if self.event_queue is not None:
+            self.flush_event_queue()
+            if self.event_queue.set_review_status(item_id, status, notes):
+                self.logger.info(f"Updated review status for {item_id} to {status}")
+            return
         for item in self.review_queue:
             if item.item_id == item_id:
                 item.review_status = status
@@ -0,0 +1,349 @@
+"""
+Durable Postgres-backed queue for processed SEC events.
+
+Events produced by SEC ingestion are appended in batches and drained by
+independent consumers (entity resolution, signal re-evaluation, clinical
+updates) using `FOR UPDATE SKIP LOCKED` leases, so ingestion is decoupled from
+downstream scoring and a crash never loses queued work. Items flagged for
+human review are kept in `sec_review_items`, where reviewers update them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import socket
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Consumer queues
+ENTITY_RESOLUTION = "entity_resolution"
+SIGNAL_EVALUATION = "signal_evaluation"
+CLINICAL_UPDATES = "clinical_update"
+
+
+@dataclass
+class QueuedEvent:
+    """A single leased event."""
+    event_id: int
+    queue: str
+    event_type: str
+    filing_id: Optional[str]
+    company_cik: Optional[int]
+    payload: Dict[str, Any]
+    attempts: int
+
+
+def make_dedupe_key(event_type: str, payload: Dict[str, Any]) -> str:
+    """Stable key for an event so re-appending the same event is a no-op."""
+    raw = json.dumps({"type": event_type, "payload": payload}, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SecEventQueue:
+    """
+    Append/lease/ack interface over the `sec_event_queue` table.
+
+    Every operation runs in its own short transaction obtained from
+    `session_factory` (defaults to :func:`ncfd.db.session.session_scope`).
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], AbstractContextManager[Session]]] = None,
+        lease_seconds: int = 300,
+        max_attempts: int = 5,
+        worker_id: Optional[str] = None
+    ):
+        if session_factory is None:
+            from ..db.session import session_scope
+            session_factory = session_scope
+
+        self.session_factory = session_factory
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+
+    def append_batch(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Append events in a single INSERT.
+
+        Each row needs `queue`, `event_type` and `payload`; `filing_id`,
+        `company_cik` and `dedupe_key` are optional. Duplicates are ignored.
+
+        Returns:
+            Number of rows newly inserted
+        """
+        params = []
+        for row in rows:
+            payload = row["payload"]
+            params.append({
+                "queue": row["queue"],
+                "event_type": row["event_type"],
+                "dedupe_key": row.get("dedupe_key") or make_dedupe_key(row["event_type"], payload),
+                "filing_id": row.get("filing_id"),
+                "company_cik": row.get("company_cik"),
+                "payload": json.dumps(payload, default=str),
+            })
+
+        if not params:
+            return 0
+
+        with self.session_factory() as session:
+            result = session.execute(
+                text("""
+                    INSERT INTO sec_event_queue
+                        (queue, event_type, dedupe_key, filing_id, company_cik, payload)
+                    SELECT x.queue, x.event_type, x.dedupe_key, x.filing_id, x.company_cik,
+                           x.payload::jsonb
+                    FROM jsonb_to_recordset(CAST(:rows AS jsonb)) AS x(
+                        queue text, event_type text, dedupe_key text,
+                        filing_id text, company_cik bigint, payload text
+                    )
+                    ON CONFLICT (queue, dedupe_key) DO NOTHING
+                """),
+                {"rows": json.dumps(params)},
+            )
+            inserted = result.rowcount or 0
+
+        logger.debug(f"Appended {inserted}/{len(params)} events to sec_event_queue")
+        return inserted
+
+    def lease(self, queue: str, batch_size: int = 100) -> List[QueuedEvent]:
+        """
+        Lease up to `batch_size` claimable events from a queue.
+
+        Pending events and events whose lease has expired are claimable.
+        Rows locked by another consumer are skipped rather than waited on.
+        Expired leases that already used their last attempt are failed first.
+        """
+        with self.session_factory() as session:
+            self._fail_exhausted(session, queue)
+            rows = session.execute(
+                text("""
+                    UPDATE sec_event_queue q
+                    SET status = 'leased',
+                        leased_by = :worker,
+                        lease_expires_at = now() + make_interval(secs => :lease_seconds),
+                        attempts = q.attempts + 1
+                    WHERE q.event_id IN (
+                        SELECT event_id
+                        FROM sec_event_queue
+                        WHERE queue = :queue
+                          AND (status = 'pending'
+                               OR (status = 'leased' AND lease_expires_at < now()
+                                   AND attempts < :max_attempts))
+                        ORDER BY event_id
+                        LIMIT :batch_size
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING q.event_id, q.queue, q.event_type, q.filing_id,
+                              q.company_cik, q.payload, q.attempts
+                """),
+                {
+                    "worker": self.worker_id,
+                    "lease_seconds": self.lease_seconds,
+                    "max_attempts": self.max_attempts,
+                    "queue": queue,
+                    "batch_size": batch_size,
+                },
+            ).mappings().all()
+
+        events = [
+            QueuedEvent(
+                event_id=r["event_id"],
+                queue=r["queue"],
+                event_type=r["event_type"],
+                filing_id=r["filing_id"],
+                company_cik=r["company_cik"],
+                payload=r["payload"] if isinstance(r["payload"], dict) else json.loads(r["payload"]),
+                attempts=r["attempts"],
+            )
+            for r in rows
+        ]
+        return sorted(events, key=lambda e: e.event_id)
+
+    def _fail_exhausted(self, session: Session, queue: str) -> int:
+        """Fail events whose worker died holding them on their last attempt."""
+        result = session.execute(
+            text("""
+                UPDATE sec_event_queue
+                SET status = 'failed',
+                    leased_by = NULL, lease_expires_at = NULL,
+                    last_error = COALESCE(last_error, 'lease expired after final attempt')
+                WHERE queue = :queue
+                  AND status = 'leased'
+                  AND lease_expires_at < now()
+                  AND attempts >= :max_attempts
+            """),
+            {"queue": queue, "max_attempts": self.max_attempts},
+        )
+        failed = result.rowcount or 0
+        if failed:
+            logger.warning(f"Failed {failed} {queue} events whose final lease expired")
+        return failed
+
+    def ack(self, event_ids: Iterable[int]) -> None:
+        """Mark leased events as done."""
+        ids = list(event_ids)
+        if not ids:
+            return
+
+        with self.session_factory() as session:
+            session.execute(
+                text("""
+                    UPDATE sec_event_queue
+                    SET status = 'done', processed_at = now(),
+                        leased_by = NULL, lease_expires_at = NULL, last_error = NULL
+                    WHERE event_id = ANY(:ids) AND leased_by = :worker
+                """),
+                {"ids": ids, "worker": self.worker_id},
+            )
+
+    def nack(self, event_id: int, error: str) -> None:
+        """Release a failed event for retry, or mark it failed after max attempts."""
+        with self.session_factory() as session:
+            session.execute(
+                text("""
+                    UPDATE sec_event_queue
+                    SET status = CASE WHEN attempts >= :max_attempts THEN 'failed' ELSE 'pending' END,
+                        leased_by = NULL, lease_expires_at = NULL, last_error = :error
+                    WHERE event_id = :event_id AND leased_by = :worker
+                """),
+                {
+                    "max_attempts": self.max_attempts,
+                    "error": error[:2000],
+                    "event_id": event_id,
+                    "worker": self.worker_id,
+                },
+            )
+
+    def drain(
+        self,
+        queue: str,
+        handler: Callable[[QueuedEvent], None],
+        batch_size: int = 100,
+        max_batches: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Lease and process events until the queue is empty.
+
+        Handler exceptions nack only the failing event; the rest of the batch
+        is acked.
+
+        Returns:
+            Counts of processed and failed events
+        """
+        stats = {"processed": 0, "failed": 0, "batches": 0}
+
+        while max_batches is None or stats["batches"] < max_batches:
+            events = self.lease(queue, batch_size)
+            if not events:
+                break
+
+            stats["batches"] += 1
+            done = []
+            for event in events:
+                try:
+                    handler(event)
+                    done.append(event.event_id)
+                except Exception as e:
+                    logger.error(f"Error handling {queue} event {event.event_id}: {e}")
+                    self.nack(event.event_id, str(e))
+                    stats["failed"] += 1
+
+            self.ack(done)
+            stats["processed"] += len(done)
+
+        return stats
+
+    # ------------------------------------------------------------------ #
+    # Review items
+    # ------------------------------------------------------------------ #
+
+    def add_review_items(self, items: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert review items in a single INSERT; items already present are kept as is.
+
+        Returns:
+            Number of items newly inserted
+        """
+        params = [
+            {**item, "evidence_spans": json.dumps(item.get("evidence_spans") or [], default=str)}
+            for item in items
+        ]
+        if not params:
+            return 0
+
+        with self.session_factory() as session:
+            result = session.execute(
+                text("""
+                    INSERT INTO sec_review_items
+                        (item_id, filing_id, company_cik, item_type, reason, confidence,
+                         extracted_content, evidence_spans, flagged_at)
+                    VALUES
+                        (:item_id, :filing_id, :company_cik, :item_type, :reason, :confidence,
+                         :extracted_content, CAST(:evidence_spans AS jsonb), :flagged_at)
+                    ON CONFLICT (item_id) DO NOTHING
+                """),
+                params,
+            )
+            return result.rowcount or 0
+
+    def review_items(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Review items, oldest first, optionally filtered by review status."""
+        with self.session_factory() as session:
+            rows = session.execute(
+                text("""
+                    SELECT item_id, filing_id, company_cik, item_type, reason, confidence,
+                           extracted_content, evidence_spans, flagged_at, assigned_to,
+                           review_status, review_notes, reviewed_at
+                    FROM sec_review_items
+                    WHERE CAST(:status AS text) IS NULL OR review_status = :status
+                    ORDER BY flagged_at, item_id
+                """),
+                {"status": status},
+            ).mappings().all()
+        return [dict(r) for r in rows]
+
+    def set_review_status(self, item_id: str, status: str, notes: Optional[str] = None) -> bool:
+        """Record a review decision; False if the item does not exist."""
+        with self.session_factory() as session:
+            result = session.execute(
+                text("""
+                    UPDATE sec_review_items
+                    SET review_status = :status, review_notes = :notes, reviewed_at = now()
+                    WHERE item_id = :item_id
+                """),
+                {"item_id": item_id, "status": status, "notes": notes},
+            )
+            return bool(result.rowcount)
+
+    def review_counts(self) -> Dict[str, int]:
+        """Count review items per review status."""
+        with self.session_factory() as session:
+            rows = session.execute(
+                text("SELECT review_status, COUNT(*) FROM sec_review_items GROUP BY review_status")
+            ).all()
+        return {status: int(n) for status, n in rows}
+
+    def depth(self) -> Dict[str, int]:
+        """Count claimable events per queue."""
+        with self.session_factory() as session:
+            rows = session.execute(
+                text("""
+                    SELECT queue, COUNT(*)
+                    FROM sec_event_queue
+                    WHERE status IN ('pending','leased')
+                    GROUP BY queue
+                """)
+            ).all()
+        return {q: int(n) for q, n in rows}
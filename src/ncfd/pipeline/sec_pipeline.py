@@ -20,6 +20,7 @@ import json
 
 from ..ingest.sec_filings import SecFilingsClient
 from ..ingest.sec_langextract import SecLangExtractor
+from ..ingest.sec_relevance import SectionRelevanceScorer
 from ..ingest.sec_types import (
     FilingMetadata, FilingDocument, EightKItem, TenKSection,
     ExtractionResult, SecIngestionResult
@@ -40,17 +41,23 @@ class SecPipeline:
     - Integration with existing systems
     """
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], session=None):
         """
         Initialize the SEC pipeline.
         
         Args:
             config: Configuration dictionary
+            session: Database session for loading the relevance vocabulary
         """
         self.config = config
         self.client = SecFilingsClient(config)
         self.langextract = SecLangExtractor(config)
         
+        # Local relevance pre-filter in front of the LLM
+        relevance_config = config.get('relevance_filter', {})
+        self.relevance_filter_enabled = relevance_config.get('enabled', True)
+        self.relevance_scorer = SectionRelevanceScorer.from_config(relevance_config, session)
+        
         # Pipeline state
         self.state_file = Path(config.get('state_file', '.state/sec_pipeline.json'))
         self.state_file.parent.mkdir(parents=True, exist_ok=True)
@@ -311,6 +318,13 @@ class SecPipeline:
                 relevant_sections, filing_metadata, form_type
             )
             
+            # Feed outcomes back for recall monitoring
+            if self.relevance_filter_enabled and extraction_result:
+                productive_hashes = {
+                    item.content_hash for item in extraction_result.extracted_items
+                }
+                self.relevance_scorer.record_outcomes(relevant_sections, productive_hashes)
+            
             return extraction_result
             
         except Exception as e:
@@ -318,7 +332,7 @@ class SecPipeline:
             return None
     
     def _filter_relevant_sections(self, sections: List[Any]) -> List[Any]:
-        """Filter sections by relevance and confidence."""
+        """Filter sections by confidence, then by local relevance score."""
         relevant_sections = []
         
         for section in sections:
@@ -329,7 +343,14 @@ class SecPipeline:
                 # Include low confidence sections if they have substantial content
                 relevant_sections.append(section)
         
-        return relevant_sections
+        if not self.relevance_filter_enabled:
+            return relevant_sections
+        
+        routed_sections = self.relevance_scorer.filter_sections(relevant_sections)
+        logger.debug(
+            f"Relevance filter routed {len(routed_sections)}/{len(relevant_sections)} sections to LLM"
+        )
+        return routed_sections
     
     def _process_extracted_items(
         self, 
@@ -478,6 +499,7 @@ class SecPipeline:
             'company_last_check': self.company_last_check,
             'daily_stats': self.daily_stats,
             'recent_errors': self.processing_errors[-10:] if self.processing_errors else [],
+            'relevance_filter': self.relevance_scorer.get_stats(),
             'state_file': str(self.state_file)
         }
     
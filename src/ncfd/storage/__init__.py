@@ -8,6 +8,7 @@ local filesystem or S3, with automatic fallback and size management.
 from abc import ABC, abstractmethod
 from typing import Optional, Dict, Any, BinaryIO
 from pathlib import Path
+import io
 import logging
 import hashlib
 
@@ -31,6 +32,24 @@ def compute_sha256(content: bytes) -> str:
     return hashlib.sha256(content).hexdigest()
 
 
+def compute_file_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Compute SHA256 hash of a file without reading it into memory.
+    
+    Args:
+        path: File to hash
+        chunk_size: Read size in bytes
+        
+    Returns:
+        SHA256 hash as hexadecimal string
+    """
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
 def parse_storage_uri(storage_uri: str) -> tuple[str, str, str]:
     """
     Parse storage URI to extract backend type and path components.
@@ -109,6 +128,44 @@ class StorageBackend(ABC):
         """
         pass
     
+    def store_file(self, path: Path, sha256: str | None, filename: str,
+                   metadata: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Store content from a local file and return storage URI.
+        
+        Backends override this to move or stream the file instead of loading
+        it into memory. The file may be consumed (moved); callers should
+        remove ``path`` afterwards if it still exists.
+        
+        Args:
+            path: Local file holding the content
+            sha256: SHA256 hash of the file (computed if not provided)
+            filename: Original filename
+            metadata: Optional metadata to store alongside
+            
+        Returns:
+            Storage URI for the stored content
+        """
+        with open(path, 'rb') as f:
+            content = f.read()
+        return self.store(content, sha256, filename, metadata)
+    
+    def open_stream(self, storage_uri: str) -> BinaryIO:
+        """
+        Open stored content as a readable binary stream.
+        
+        Args:
+            storage_uri: URI returned by store()
+            
+        Returns:
+            Readable binary file-like object; the caller closes it
+        """
+        return io.BytesIO(self.retrieve(storage_uri))
+    
+    def staging_dir(self) -> Optional[Path]:
+        """Directory for temp files that store_file() can move cheaply, if any."""
+        return None
+    
     @abstractmethod
     def retrieve(self, storage_uri: str) -> bytes:
         """
@@ -256,6 +313,7 @@ __all__ = [
     'StorageBackend',
     'StorageError',
     'compute_sha256',
+    'compute_file_sha256',
     'parse_storage_uri',
     'resolve_backend',
     'create_storage_backend',
@@ -15,7 +15,7 @@ from pathlib import Path
 from typing import Optional, Dict, Any, List, Tuple
 import tempfile
 
-from . import StorageBackend, StorageError, compute_sha256
+from . import StorageBackend, StorageError, compute_sha256, compute_file_sha256
 
 logger = logging.getLogger(__name__)
 
@@ -124,6 +124,84 @@ class LocalStorageBackend(StorageBackend):
         logger.info(f"Stored {len(content)} bytes at {content_path}")
         return f"local://{sha256}/{filename}"
     
+    def store_file(self, path: Path, sha256: str | None, filename: str,
+                   metadata: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Store a local file by moving it into the SHA256-based directory structure.
+        
+        The file is renamed into place (atomic when it lives in staging_dir()),
+        so content is never loaded into memory.
+        
+        Args:
+            path: Local file holding the content
+            sha256: SHA256 hash of the file (computed if not provided)
+            filename: Original filename
+            metadata: Optional metadata to store alongside
+            
+        Returns:
+            Local storage URI
+        """
+        path = Path(path)
+        sha256 = sha256 or compute_file_sha256(path)
+        size = path.stat().st_size
+        storage_uri = f"local://{sha256}/{filename}"
+        
+        if self.exists(storage_uri):
+            logger.info(f"Content already exists: {sha256}/{filename}")
+            return storage_uri
+        
+        if not self._has_space(size):
+            if self.fallback_s3 and self.fallback_backend:
+                logger.info("Local storage full, falling back to S3")
+                return self.fallback_backend.store_file(path, sha256, filename, metadata)
+            raise StorageError(f"Local storage full ({self.get_total_size() / (1024**3):.2f} GB used)")
+        
+        content_dir = self.root_path / 'docs' / sha256
+        content_dir.mkdir(parents=True, exist_ok=True)
+        content_file = content_dir / filename
+        
+        try:
+            shutil.move(str(path), str(content_file))
+        except OSError as e:
+            raise StorageError(f"Failed to move content into storage: {e}")
+        
+        if metadata:
+            meta_file = self.root_path / 'meta' / f"{sha256}.json"
+            metadata['stored_at'] = datetime.utcnow().isoformat()
+            metadata['filename'] = filename
+            metadata['size_bytes'] = size
+            
+            try:
+                with open(meta_file, 'w') as f:
+                    json.dump(metadata, f, indent=2)
+            except IOError as e:
+                logger.warning(f"Failed to store metadata: {e}")
+        
+        logger.info(f"Stored {size} bytes at {content_file}")
+        return storage_uri
+    
+    def staging_dir(self) -> Optional[Path]:
+        """Temp directory on the same filesystem as the store, so moves are renames."""
+        staging = self.root_path / 'tmp'
+        staging.mkdir(exist_ok=True)
+        return staging
+    
+    def open_stream(self, storage_uri: str):
+        """Open stored content for streaming reads."""
+        if not storage_uri.startswith('local://'):
+            raise StorageError(f"Invalid local storage URI: {storage_uri}")
+        
+        path_parts = storage_uri[8:].split('/')
+        if len(path_parts) != 2:
+            raise StorageError(f"Invalid local storage URI format: {storage_uri}")
+        
+        sha256, filename = path_parts
+        content_path = self.root_path / 'docs' / sha256 / filename
+        try:
+            return open(content_path, 'rb')
+        except IOError as e:
+            raise StorageError(f"Failed to open content: {e}")
+    
     def _atomic_store(self, content: bytes, sha256: str | None, filename: str, 
                      metadata: Optional[Dict[str, Any]] = None) -> str:
         """
@@ -157,6 +157,46 @@ class UnifiedStorageManager:
         # Fallback to standard store for backends without atomic support
         return backend.store(content, sha256, filename, metadata)
     
+    def store_file(self, path: Path, sha256: str | None, filename: str,
+                   metadata: Optional[Dict[str, Any]] = None,
+                   backend_type: Optional[str] = None) -> str:
+        """
+        Store content from a local file without loading it into memory.
+        
+        Args:
+            path: Local file holding the content
+            sha256: SHA256 hash of the file (computed if not provided)
+            filename: Original filename
+            metadata: Optional metadata
+            backend_type: Preferred backend type ('local' or 's3')
+            
+        Returns:
+            Storage URI for the stored content
+        """
+        if backend_type and backend_type in self.backends:
+            backend = self.backends[backend_type]
+        else:
+            backend = self.primary_backend
+        
+        return backend.store_file(path, sha256, filename, metadata)
+    
+    def staging_dir(self) -> Optional[Path]:
+        """Temp directory of the primary backend for files passed to store_file()."""
+        return self.primary_backend.staging_dir()
+    
+    def open_stream(self, storage_uri: str):
+        """
+        Open stored content as a stream by resolving the appropriate backend.
+        
+        Args:
+            storage_uri: Storage URI to open
+            
+        Returns:
+            Readable binary file-like object
+        """
+        backend = resolve_backend(storage_uri, self.backends)
+        return backend.open_stream(storage_uri)
+    
     def retrieve(self, storage_uri: str) -> bytes:
         """
         Retrieve content by resolving the appropriate backend.
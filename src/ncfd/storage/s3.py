@@ -7,6 +7,7 @@ error handling and metadata management.
 
 import json
 import logging
+import os
 from datetime import datetime
 from typing import Optional, Dict, Any
 
@@ -25,7 +26,7 @@ except ImportError:
     class NoCredentialsError(Exception):
         pass
 
-from . import StorageBackend, StorageError, compute_sha256
+from . import StorageBackend, StorageError, compute_sha256, compute_file_sha256
 
 logger = logging.getLogger(__name__)
 
@@ -179,6 +180,80 @@ class S3StorageBackend(StorageBackend):
         except Exception as e:
             raise StorageError(f"Failed to store content in S3: {e}")
     
+    def store_file(self, path, sha256: str | None, filename: str,
+                   metadata: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Store a local file in S3 using a streaming (multipart) upload.
+        
+        Args:
+            path: Local file holding the content
+            sha256: SHA256 hash of the file (computed if not provided)
+            filename: Original filename
+            metadata: Optional metadata to store alongside
+            
+        Returns:
+            S3 storage URI
+        """
+        sha256 = sha256 or compute_file_sha256(path)
+        size = os.path.getsize(path)
+        
+        storage_uri = f"s3://{self.bucket}/docs/{sha256}/{filename}"
+        if self.exists(storage_uri):
+            logger.info(f"Content already exists in S3: {sha256}/{filename}")
+            return storage_uri
+        
+        s3_key = f"docs/{sha256}/{filename}"
+        s3_metadata = {
+            'sha256': sha256,
+            'filename': filename,
+            'stored_at': datetime.utcnow().isoformat(),
+            'size_bytes': str(size)
+        }
+        if metadata:
+            s3_metadata.update({k: str(v) for k, v in metadata.items()})
+        
+        try:
+            self.s3_client.upload_file(
+                str(path), self.bucket, s3_key,
+                ExtraArgs={'Metadata': s3_metadata, 'ContentType': self._get_content_type(filename)}
+            )
+            
+            meta_data = {
+                'sha256': sha256,
+                'filename': filename,
+                's3_key': s3_key,
+                'stored_at': s3_metadata['stored_at'],
+                'size_bytes': size,
+                'metadata': metadata or {}
+            }
+            self.s3_client.put_object(
+                Bucket=self.bucket,
+                Key=f"meta/{sha256}.json",
+                Body=json.dumps(meta_data, indent=2),
+                ContentType='application/json'
+            )
+            
+            logger.info(f"Streamed {size} bytes to S3: {s3_key}")
+            return storage_uri
+            
+        except ClientError as e:
+            raise StorageError(f"S3 upload failed: {e}")
+        except Exception as e:
+            raise StorageError(f"Failed to store file in S3: {e}")
+    
+    def open_stream(self, storage_uri: str):
+        """Open S3 content as a streaming body."""
+        if not storage_uri.startswith(f"s3://{self.bucket}/"):
+            raise StorageError(f"Invalid S3 storage URI: {storage_uri}")
+        
+        s3_key = storage_uri.replace(f"s3://{self.bucket}/", "")
+        try:
+            return self.s3_client.get_object(Bucket=self.bucket, Key=s3_key)['Body']
+        except ClientError as e:
+            raise StorageError(f"S3 retrieval failed: {e}")
+        except Exception as e:
+            raise StorageError(f"Failed to open content from S3: {e}")
+    
     def retrieve(self, storage_uri: str) -> bytes:
         """
         Retrieve content from S3.
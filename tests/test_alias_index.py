@@ -0,0 +1,104 @@
+"""
+Tests for the in-memory alias → asset index.
+"""
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+
+from ncfd.mapping.alias_index import AliasIndex
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE asset_aliases (asset_id INTEGER, alias_norm TEXT, alias_type TEXT)"
+        ))
+        conn.execute(text(
+            "INSERT INTO asset_aliases VALUES (2, 'pembrolizumab', 'inn'), "
+            "(1, 'pembrolizumab', 'inn'), (1, 'keytruda', 'brand'), (3, 'ab-123', 'code')"
+        ))
+    with Session(engine) as s:
+        yield s
+
+
+def count_queries(session):
+    statements = []
+    event.listen(session.bind, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    return statements
+
+
+def test_lookups_from_memory(session):
+    index = AliasIndex(check_interval=60)
+    index.ensure_fresh(session)
+    statements = count_queries(session)
+
+    for _ in range(100):
+        index.ensure_fresh(session)
+        assert index.asset_ids('pembrolizumab', 'inn') == [1, 2]
+        assert index.asset_ids('pembrolizumab', 'brand') == []
+    assert sorted(index.aliases_for('keytruda')) == [('brand', 1)]
+    assert statements == []  # No round trips inside the check interval
+
+
+def test_reload_only_when_version_changes(session, monkeypatch):
+    index = AliasIndex(check_interval=0)
+    versions = iter([1, 1, 2])
+    monkeypatch.setattr(index, '_read_version', lambda s: next(versions))
+
+    index.ensure_fresh(session)
+    session.execute(text("INSERT INTO asset_aliases VALUES (4, 'nivolumab', 'inn')"))
+
+    index.ensure_fresh(session)  # Same version: stale data kept
+    assert index.asset_ids('nivolumab', 'inn') == []
+
+    index.ensure_fresh(session)  # Version moved: reloaded
+    assert index.asset_ids('nivolumab', 'inn') == [4]
+
+
+def test_add_is_visible_immediately(session):
+    index = AliasIndex(check_interval=60)
+    index.ensure_fresh(session)
+
+    index.add('tebentafusp', 'inn', 9)
+    index.add('tebentafusp', 'inn', 9)
+
+    assert index.asset_ids('tebentafusp', 'inn') == [9]
+    assert index.aliases_for('tebentafusp') == [('inn', 9)]
+
+
+def test_add_on_commit_waits_for_commit(session):
+    index = AliasIndex(check_interval=60)
+    index.ensure_fresh(session)
+
+    session.execute(text("INSERT INTO asset_aliases VALUES (5, 'nivolumab', 'inn')"))
+    index.add_on_commit(session, 'nivolumab', 'inn', 5)
+    assert index.asset_ids('nivolumab', 'inn') == []
+
+    session.commit()
+    assert index.asset_ids('nivolumab', 'inn') == [5]
+
+
+def test_add_on_commit_discarded_on_rollback(session):
+    index = AliasIndex(check_interval=60)
+    index.ensure_fresh(session)
+
+    session.execute(text("INSERT INTO asset_aliases VALUES (6, 'ipilimumab', 'inn')"))
+    index.add_on_commit(session, 'ipilimumab', 'inn', 6)
+    session.rollback()
+    session.commit()
+
+    assert index.asset_ids('ipilimumab', 'inn') == []
+
+
+def test_version_read_from_counter_row(session):
+    session.execute(text("CREATE TABLE asset_aliases_version (id INTEGER PRIMARY KEY, version INTEGER)"))
+    session.execute(text("INSERT INTO asset_aliases_version VALUES (1, 41)"))
+    index = AliasIndex()
+
+    index.ensure_fresh(session)
+
+    assert index.version == 41
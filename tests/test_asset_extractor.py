@@ -7,8 +7,8 @@ without requiring a database connection.
 
 import pytest
 from ncfd.extract.asset_extractor import (
-    norm_drug_name, extract_asset_codes, extract_nct_ids,
-    find_nearby_assets, AssetMatch, get_confidence_for_link_type
+    norm_drug_name, extract_asset_codes, extract_nct_ids, extract_inn_generics,
+    extract_all_entities, generate_deduplication_key, get_inn_matcher, clear_inn_matcher_cache, InnDictionary, proximity_join, find_nearby_assets, deduplicate_asset_matches, AssetMatch, get_confidence_for_link_type
 )
 
 
@@ -96,6 +96,95 @@ class TestAssetExtractor:
             assert match.confidence == 1.0
             assert match.value_norm == match.value_text.upper()
     
+    def test_extract_all_entities_single_pass(self):
+        """Test the fused code/NCT scan keeps overlapping hits and lazy dedup keys."""
+        text = "BMS-AA-001 in NCT12345678; legacy id NCT123."
+        
+        matches = extract_all_entities(text, page_no=2)
+        
+        codes = sorted((m.value_text, m.char_start) for m in matches if m.alias_type == 'code')
+        assert codes == [("AA-001", 4), ("AA001", 4), ("BMS-AA-001", 0), ("BMSAA001", 0), ("NCT123", 37)]
+        assert [m.value_norm for m in matches if m.alias_type == 'nct'] == ["NCT12345678", "NCT123"]
+        
+        code = next(m for m in matches if m.value_text == "BMS-AA-001")
+        assert code._deduplication_key is None  # Not hashed until needed
+        assert code.deduplication_key == generate_deduplication_key("BMS-AA-001", 2, 0, 10, "")
+        assert code._deduplication_key == code.deduplication_key
+        nct = next(m for m in matches if m.alias_type == 'nct')
+        assert nct.deduplication_key == ""
+        assert AssetMatch("X", "x", "code", 1, 0, 1, "regex", deduplication_key="k").deduplication_key == "k"
+        assert len(deduplicate_asset_matches(matches + [code])) == len(matches) - 2
+    
+    def test_extract_inn_generics(self):
+        """Test dictionary extraction with word boundaries and overlapping names."""
+        inn_dict = {'pembrolizumab': 'inn', 'keytruda': 'brand', 'mab': 'inn', 'interferon alfa': 'inn',
+                    'interferon': 'inn'}
+        text = "Keytruda (pembrolizumab) plus Interferon Alfa-2b; not interferonic."
+        
+        matches = extract_inn_generics(text, inn_dict, page_no=3)
+        
+        found = [(m.value_text, m.value_norm, m.alias_type, m.char_start) for m in matches]
+        assert found == [
+            ("Keytruda", "keytruda", "brand", 0),
+            ("pembrolizumab", "pembrolizumab", "inn", 10),
+            ("Interferon Alfa", "interferon alfa", "inn", 30),
+            ("Interferon", "interferon", "inn", 30),
+        ]
+        assert all(m.page_no == 3 and m.detector == 'dict' for m in matches)
+        assert text[matches[1].char_start:matches[1].char_end] == "pembrolizumab"
+    
+    def test_inn_matcher_rebuilt_on_dictionary_change(self):
+        """Test that the INN automaton is cached and rebuilt only on change."""
+        inn_dict = {'nivolumab': 'inn'}
+        matcher = get_inn_matcher(inn_dict)
+        assert get_inn_matcher(inn_dict) is matcher
+        
+        inn_dict['ipilimumab'] = 'inn'
+        assert get_inn_matcher(inn_dict) is not matcher
+        assert [m.value_norm for m in extract_inn_generics("ipilimumab and nivolumab", inn_dict)] == [
+            'ipilimumab', 'nivolumab'
+        ]
+    
+    def test_inn_matcher_rebuilt_when_names_replaced_at_same_size(self):
+        """Test that swapping a name without changing the size is not missed."""
+        inn_dict = {'nivolumab': 'inn', 'relatlimab': 'inn'}
+        assert [m.value_norm for m in extract_inn_generics("relatlimab", inn_dict)] == ['relatlimab']
+        
+        del inn_dict['relatlimab']
+        inn_dict['ipilimumab'] = 'inn'
+        assert [m.value_norm for m in extract_inn_generics("ipilimumab, relatlimab", inn_dict)] == ['ipilimumab']
+    
+    def test_versioned_inn_dictionary_cache_check_is_o1(self):
+        """Test that an InnDictionary is validated by version, not by reading its names."""
+        class CountingDict(InnDictionary):
+            reads = 0
+            
+            def keys(self):
+                CountingDict.reads += 1
+                return super().keys()
+        
+        inn_dict = CountingDict({'nivolumab': 'inn', 'relatlimab': 'inn'})
+        matcher = get_inn_matcher(inn_dict)
+        assert get_inn_matcher(inn_dict) is matcher
+        
+        inn_dict['relatlimab'] = 'generic'  # Type change keeps the name set
+        assert get_inn_matcher(inn_dict) is matcher
+        assert CountingDict.reads == 1  # Only the initial build
+        
+        del inn_dict['relatlimab']
+        inn_dict['ipilimumab'] = 'inn'
+        assert get_inn_matcher(inn_dict) is not matcher
+        assert [m.value_norm for m in extract_inn_generics("ipilimumab, relatlimab", inn_dict)] == ['ipilimumab']
+    
+    def test_inn_matcher_caller_supplied_version(self):
+        """Test that a caller-supplied version controls rebuilds."""
+        inn_dict = {'nivolumab': 'inn'}
+        matcher = get_inn_matcher(inn_dict, version=1)
+        assert get_inn_matcher(inn_dict, version=1) is matcher
+        
+        inn_dict['ipilimumab'] = 'inn'
+        assert [m.value_norm for m in extract_inn_generics("ipilimumab", inn_dict, inn_version=2)] == ['ipilimumab']
+    
     def test_find_nearby_assets(self):
         """Test nearby asset detection (HP-1 heuristic)."""
         # Create test asset matches
@@ -151,6 +240,24 @@ class TestAssetExtractor:
         nearby_pairs = find_nearby_assets(asset_matches, nct_matches, window_size=250)
         assert len(nearby_pairs) == 0, "Assets beyond window size should not match"
     
+    def test_proximity_join_matches_nested_loop(self):
+        """Test the sweep join returns the same pairs, distances and order as a nested loop."""
+        import random
+        rng = random.Random(7)
+        left = [(rng.randint(1, 2), rng.randint(0, 3000)) for _ in range(60)]
+        right = [(rng.randint(1, 2), rng.randint(0, 3000)) for _ in range(40)]
+        
+        pairs = proximity_join(left, right, 250, position=lambda m: m[1], group=lambda m: m[0])
+        
+        expected = [
+            (i, j, abs(a[1] - b[1]))
+            for i, a in enumerate(left)
+            for j, b in enumerate(right)
+            if a[0] == b[0] and abs(a[1] - b[1]) <= 250
+        ]
+        assert pairs == expected
+        assert proximity_join(left, [], 250, position=lambda m: m[1]) == []
+    
     def test_get_confidence_for_link_type(self):
         """Test confidence scoring for different link types."""
         # Test known link types
@@ -0,0 +1,122 @@
+"""
+Tests for the DB-first, cached CT.gov metadata provider.
+"""
+
+import os
+import time
+from unittest.mock import MagicMock, Mock
+
+from ncfd.mapping.ctgov_metadata import CtgovMetadataProvider
+
+
+def study(nct_id, sponsor):
+    return {
+        "protocolSection": {
+            "identificationModule": {"nctId": nct_id, "briefTitle": f"Trial {nct_id}"},
+            "sponsorCollaboratorsModule": {"leadSponsor": {"name": sponsor}},
+            "statusModule": {"overallStatus": "RECRUITING", "startDateStruct": {"date": "2024-01"}},
+            "designModule": {"phases": ["PHASE3"]},
+        }
+    }
+
+
+def fake_http():
+    http = Mock()
+
+    def get(url, timeout):
+        nct_id = url.rsplit("/", 1)[-1]
+        response = Mock()
+        response.json.return_value = study(nct_id, "API Sponsor")
+        return response
+
+    http.get.side_effect = get
+    return http
+
+
+def fake_db(rows):
+    session = MagicMock()
+    session.execute.return_value.fetchall.return_value = rows
+    return session
+
+
+def test_stored_version_served_before_api(tmp_path):
+    http = fake_http()
+    provider = CtgovMetadataProvider(cache_dir=tmp_path, http=http)
+    session = fake_db([("NCT1", study("NCT1", "Stored Sponsor"))])
+
+    meta = provider.get("NCT1", session=session)
+
+    assert meta.sponsor == "Stored Sponsor" and meta.phase == "PHASE3"
+    assert provider.get("NCT1", session=session) is meta
+    http.get.assert_not_called()
+    assert provider.get_stats()["db_hits"] == 1 and provider.get_stats()["memo_hits"] == 1
+
+
+def test_api_responses_cached_on_disk_with_ttl(tmp_path):
+    http = fake_http()
+    assert CtgovMetadataProvider(cache_dir=tmp_path, http=http).get("NCT2").sponsor == "API Sponsor"
+
+    # A new process reads the cached response instead of calling the API
+    rerun = CtgovMetadataProvider(cache_dir=tmp_path, ttl_seconds=3600, http=http)
+    assert rerun.get("NCT2").title == "Trial NCT2"
+    assert http.get.call_count == 1
+
+    old = time.time() - 7200
+    os.utime(tmp_path / "NCT2.json", (old, old))
+    CtgovMetadataProvider(cache_dir=tmp_path, ttl_seconds=3600, http=http).get("NCT2")
+    assert http.get.call_count == 2
+
+
+def test_prefetch_batches_db_and_fetches_rest_once(tmp_path):
+    http = fake_http()
+    provider = CtgovMetadataProvider(cache_dir=tmp_path, http=http)
+    # NCT5's stored version is an older study-card shape, so it is fetched from the API
+    session = fake_db([("NCT3", study("NCT3", "Stored")), ("NCT5", {"sponsors": {}})])
+
+    assert provider.prefetch(iter(["NCT3", "NCT4", "NCT5", "NCT4"]), session=session) == 3
+
+    assert session.execute.call_count == 1
+    assert sorted(c[0][0].rsplit("/", 1)[-1] for c in http.get.call_args_list) == ["NCT4", "NCT5"]
+    assert provider.get("NCT4").sponsor == "API Sponsor"
+    assert http.get.call_count == 2
+
+
+def test_failed_fetch_returns_none(tmp_path):
+    http = Mock()
+    http.get.side_effect = ConnectionError("down")
+    provider = CtgovMetadataProvider(cache_dir=tmp_path, http=http)
+
+    assert provider.get("NCT9") is None
+    assert provider.get_stats()["errors"] == 1
+
+
+def test_failed_trial_not_refetched_until_failure_ttl(tmp_path):
+    http = Mock()
+    http.get.side_effect = ConnectionError("down")
+    provider = CtgovMetadataProvider(cache_dir=tmp_path, http=http, failure_ttl_seconds=60)
+    session = fake_db([])
+
+    assert provider.prefetch(["NCT9"], session=session) == 0
+    assert provider.get("NCT9", session=session) is None
+    assert provider.prefetch(["NCT9"], session=session) == 0
+
+    assert http.get.call_count == 1
+    assert session.execute.call_count == 1  # Remembered failures skip the DB as well
+    assert provider.get_stats()["failure_hits"] == 1
+
+    provider._failures["NCT9"] -= 61  # Failure has expired
+    http.get.side_effect = fake_http().get.side_effect
+    assert provider.get("NCT9").sponsor == "API Sponsor"
+    assert "NCT9" not in provider._failures
+
+
+def test_memo_evicts_least_recently_used(tmp_path):
+    provider = CtgovMetadataProvider(cache_dir=None, http=fake_http(), memo_size=2)
+
+    provider.get("NCT1")
+    provider.get("NCT2")
+    provider.get("NCT1")  # NCT2 is now the least recently used
+    provider.get("NCT3")
+
+    assert list(provider._memo) == ["NCT1", "NCT3"]
+    assert provider.get_stats()["memo_hits"] == 1
@@ -0,0 +1,81 @@
+"""
+Tests for the streaming ChEMBL / WHO INN dictionary loader.
+"""
+
+import gzip
+
+from ncfd.extract.dictionary_loader import (
+    CopyStream,
+    chembl_rows,
+    iter_dictionary_records,
+    normalize_rows,
+    who_inn_rows,
+)
+
+
+def test_iter_records_csv_tsv_and_gzip(tmp_path):
+    csv_path = tmp_path / "chembl.csv"
+    csv_path.write_text("CHEMBL_ID,PREF_NAME,SYNONYMS\nCHEMBL25,ASPIRIN,Acetylsalicylic acid|Ecotrin\n")
+    tsv_path = tmp_path / "inn.tsv.gz"
+    with gzip.open(tsv_path, "wt") as f:
+        f.write("inn\tstatus\npembrolizumab\trecommended\ntebentafusp\tproposed\n")
+
+    assert list(iter_dictionary_records(str(csv_path))) == [
+        {"chembl_id": "CHEMBL25", "pref_name": "ASPIRIN", "synonyms": "Acetylsalicylic acid|Ecotrin"}
+    ]
+    assert [r["inn"] for r in iter_dictionary_records(str(tsv_path))] == ["pembrolizumab", "tebentafusp"]
+
+
+def test_iter_records_sdf(tmp_path):
+    sdf_path = tmp_path / "chembl.sdf"
+    sdf_path.write_text(
+        "\n  RDKit          2D\n\n  0  0  0  0  0  0  0  0  0  0999 V2000\nM  END\n"
+        "> <chembl_id>\nCHEMBL1431\n\n"
+        "> <chembl_pref_name>\nMETFORMIN\n\n"
+        "$$$$\n"
+        "\nM  END\n> <chembl_id>\nCHEMBL999\n\n$$$$\n"
+    )
+
+    records = list(iter_dictionary_records(str(sdf_path)))
+
+    assert records == [
+        {"chembl_id": "CHEMBL1431", "chembl_pref_name": "METFORMIN"},
+        {"chembl_id": "CHEMBL999"},
+    ]
+    rows = list(chembl_rows(records))
+    assert [(r[0], r[1]) for r in rows] == [("METFORMIN", "generic"), ("CHEMBL1431", "chembl")]
+
+
+def test_rows_normalized_in_order_across_workers():
+    records = [{"chembl_id": f"CHEMBL{i}", "pref_name": f"DRUG-{i}MAB"} for i in range(50)]
+    records.append({"chembl_id": "CHEMBL25", "pref_name": "Aspirin®", "synonyms": "Ecotrin",
+                    "syn_type": "TRADE_NAME"})
+
+    serial = list(normalize_rows(chembl_rows(records), workers=1, chunk_size=7))
+    parallel = list(normalize_rows(chembl_rows(records), workers=2, chunk_size=7))
+
+    assert parallel == serial
+    assert [r[:6] for r in serial[-3:]] == [
+        ("Aspirin®", "aspirin", "generic", "chembl", "chembl:CHEMBL25", True),
+        ("Ecotrin", "ecotrin", "brand", "chembl", "chembl:CHEMBL25", False),
+        ("CHEMBL25", "chembl25", "chembl", "chembl", "chembl:CHEMBL25", False),
+    ]
+
+    inn = list(normalize_rows(who_inn_rows([{"inn": "Pembrolizumab", "status": "recommended"}])))
+    assert inn == [("Pembrolizumab", "pembrolizumab", "inn", "who_inn", "who_inn:pembrolizumab",
+                    True, {"inn_status": "recommended", "therapeutic_class": None, "year_proposed": None})]
+
+
+def test_copy_stream_renders_text_format_in_chunks():
+    rows = [("a\tb", "x\\y", None, True, {"k": "v", "empty": None}), ("line\nbreak", "", "z", False, {})]
+    stream = CopyStream(iter(rows))
+
+    chunks = []
+    while True:
+        chunk = stream.read(5)
+        if not chunk:
+            break
+        chunks.append(chunk)
+
+    assert "".join(chunks) == 'a\\tb\tx\\\\y\t\\N\tt\t{"k": "v"}\nline\\nbreak\t\tz\tf\t{}\n'
+    assert stream.rows == 2
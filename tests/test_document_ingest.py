@@ -10,6 +10,35 @@ from unittest.mock import Mock, patch, MagicMock
 from ncfd.ingest.document_ingest import DocumentIngester
 
 
+def make_pdf(pages):
+    """Build a minimal PDF; each page is a list of (x, y, text) strings."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        stream = b"".join(
+            b"BT /F1 10 Tf %d %d Td (%s) Tj ET\n" % (x, y, text.encode()) for x, y, text in lines
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objects))
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids))
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (i, obj)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % o for o in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
 class TestDocumentIngester:
     """Test document ingestion functionality."""
     
@@ -242,18 +271,131 @@ class TestDocumentIngester:
         assert result['text_pages'][0]['page_no'] == 1
     
     def test_parse_document_pdf(self):
-        """Test PDF document parsing (minimal implementation)."""
+        """Test page-parallel PDF text and table extraction."""
         mock_session = Mock()
-        ingester = DocumentIngester(mock_session)
-        
-        pdf_content = b"%PDF-1.4 fake pdf content"
+        ingester = DocumentIngester(mock_session, parse_config={'pdf_workers': 2})
+        
+        pdf_content = make_pdf([
+            [(72, 700, 'Phase 2 trial NCT01234567 met its primary endpoint')],
+            [(72, 700, 'Arm'), (250, 700, 'N'), (400, 700, 'ORR'),
+             (72, 680, 'Drug'), (250, 680, '40'), (400, 680, '35%'),
+             (72, 660, 'Placebo'), (250, 660, '38'), (400, 660, '5%')],
+        ])
+        
+        try:
+            result = ingester.parse_document(pdf_content, 'application/pdf', 'https://example.com')
+        finally:
+            ingester.close()
+        
+        assert [p['page_no'] for p in result['text_pages']] == [1, 2]
+        assert 'NCT01234567' in result['text_pages'][0]['text']
+        assert any(e['value_norm'] == 'NCT01234567' for e in result['entities'])
+        assert len(result['tables']) == 1
+        assert result['tables'][0]['page_no'] == 2
+        assert result['tables'][0]['table_jsonb']['rows'][1] == ['Drug', '40', '35%']
+        
+        # Unreadable PDFs yield no pages rather than failing the batch
+        result = ingester.parse_document(b"%PDF-1.4 fake pdf content", 'application/pdf', 'https://example.com')
+        assert result['text_pages'] == []
+    
+    def test_store_document_streams_pdf_pages(self):
+        """Test that streamed PDF pages are flushed to the DB page by page."""
+        from ncfd.db.models import DocumentTextPage
         
-        result = ingester.parse_document(pdf_content, 'application/pdf', 'https://example.com')
+        mock_session = Mock()
+        ingester = DocumentIngester(mock_session, parse_config={'pdf_workers': 2})
+        pdf_content = make_pdf([[(72, 700, 'Page one')], [(72, 700, 'Page two')], [(72, 700, 'Page three')]])
+        fetch_data = {
+            'url': 'https://example.com/poster.pdf', 'sha256': 'abc', 'content_type': 'application/pdf',
+            'published_at': None, 'oa_status': 'unknown', 'headers': {}, 'storage_uri': 'local://abc/poster.pdf'
+        }
         
-        assert 'text_pages' in result
-        assert len(result['text_pages']) == 1
-        assert result['text_pages'][0]['text'] == '[PDF content - parsing not implemented]'
+        try:
+            parsed_data = ingester.parse_document(pdf_content, 'application/pdf', fetch_data['url'], stream=True)
+            assert parsed_data['text_pages'] == []
+            doc = ingester.store_document(fetch_data, parsed_data, 'Abstract')
+        finally:
+            ingester.close()
+        
+        assert doc is not None
+        batches = [c.args[0] for c in mock_session.add_all.call_args_list]
+        assert len(batches) == 3
+        assert sorted(r.page_no for b in batches for r in b if isinstance(r, DocumentTextPage)) == [1, 2, 3]
+        assert mock_session.expunge.call_count == 3
+
+    def test_pdf_page_range_walks_page_tree_once(self, tmp_path):
+        """Test that a worker range opens the PDF and walks its pages once."""
+        from pdfminer.pdfpage import PDFPage
+        from ncfd.ingest.pdf_pages import PdfPageExtractor, extract_page_range
+        
+        path = tmp_path / "doc.pdf"
+        path.write_bytes(make_pdf([[(72, 700, f'Page {i}')] for i in range(1, 7)]))
+        
+        with patch.object(PDFPage, 'get_pages', wraps=PDFPage.get_pages) as get_pages:
+            pages = extract_page_range(str(path), 2, 5)
+        
+        assert get_pages.call_count == 1
+        assert [p['page_no'] for p in pages] == [2, 3, 4, 5]
+        assert [p['text'] for p in pages] == ['Page 2', 'Page 3', 'Page 4', 'Page 5']
+        assert PdfPageExtractor(max_workers=4)._page_ranges(6) == [(1, 2), (3, 4), (5, 6)]
+        assert extract_page_range(str(path), 1, 6, deadline=0.0) == []  # Past its deadline
+    
+    def test_pdf_deadline_terminates_busy_workers(self, tmp_path):
+        """Test that ranges still running at the document deadline do not keep the pool."""
+        from concurrent.futures import Future
+        from ncfd.ingest.pdf_pages import PdfPageExtractor
+        
+        path = tmp_path / "doc.pdf"
+        path.write_bytes(make_pdf([[(72, 700, f'Page {i}')] for i in range(1, 5)]))
+        pool = Mock()
+        pool.submit.side_effect = lambda *args: Future()  # Never finishes
+        worker = Mock()
+        worker.is_alive.return_value = True
+        pool._processes = {1: worker}
+        extractor = PdfPageExtractor(max_workers=2, max_seconds=0.05)
+        extractor._pool = pool
+        
+        assert list(extractor.iter_pages(str(path))) == []
+        
+        assert extractor.last_stats['timed_out'] and extractor.last_stats['skipped'] == 4
+        pool.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+        worker.terminate.assert_called_once()
+        assert extractor._pool is None
     
+    def test_near_duplicate_skips_entities_and_linking(self):
+        """Test that a near-duplicate is attached to its canonical doc and not linked."""
+        from ncfd.db.models import DocumentEntity
+
+        mock_session = MagicMock()
+        ingester = DocumentIngester(mock_session)
+        ingester.near_dup_index.find = Mock(return_value=(7, 0.95))
+        ingester.near_dup_index.add = Mock()
+
+        text = " ".join(f"word{i}" for i in range(100))
+        fetch_data = {
+            'url': 'https://wire.example.com/release', 'sha256': 'abc', 'content_type': 'text/html',
+            'published_at': None, 'oa_status': 'unknown', 'headers': {}, 'storage_uri': 'local://abc/release'
+        }
+        parsed_data = {
+            'text_pages': [{'page_no': 1, 'char_count': len(text), 'text': text}],
+            'tables': [],
+            'entities': [{'alias_type': 'code', 'value_text': 'AB-123', 'value_norm': 'AB-123',
+                          'page_no': 1, 'char_start': 0, 'char_end': 6, 'detector': 'regex',
+                          'confidence': 0.95}],
+            'citations': {}
+        }
+
+        doc = ingester.store_document(fetch_data, parsed_data, 'PR')
+
+        assert doc.canonical_doc_id == 7
+        ingester.near_dup_index.add.assert_not_called()
+        added = [c.args[0] for c in mock_session.add.call_args_list]
+        assert not any(isinstance(row, DocumentEntity) for row in added)
+
+        linked = ingester.run_link_job([{'source': {'url': fetch_data['url']}, 'document': doc}])
+        assert linked[0]['canonical_doc_id'] == 7
+        assert linked[0]['entities'] == []
+
     def test_determine_oa_status(self):
         """Test open access status determination."""
         mock_session = Mock()
@@ -267,6 +409,93 @@ class TestDocumentIngester:
         
         # Test other URLs (should be unknown)
         assert ingester._determine_oa_status('https://example.com', 'text/html', {}) == 'unknown'
+    
+    def test_run_fetch_job_conditional_get(self):
+        """Test that 304 responses are skipped and validators are sent."""
+        mock_session = Mock()
+        ingester = DocumentIngester(mock_session, fetch_config={'per_host_delay_seconds': 0})
+        
+        def fake_get(url, timeout=None, headers=None):
+            response = Mock()
+            if headers and headers.get('If-None-Match') == '"v1"':
+                response.status_code = 304
+                response.headers = {'ETag': '"v1"'}
+            else:
+                response.status_code = 200
+                response.content = b"<html><body>NCT01234567</body></html>"
+                response.headers = {'content-type': 'text/html', 'ETag': '"v2"'}
+            return response
+        
+        ingester.session.get = Mock(side_effect=fake_get)
+        sources = [
+            {'url': 'https://a.example.com/news/1', 'source_type': 'PR', 'headers': {'etag': '"v1"'}},
+            {'url': 'https://b.example.com/news/2', 'source_type': 'PR'},
+        ]
+        
+        fetched = ingester.run_fetch_job(sources)
+        
+        assert [d['source']['url'] for d in fetched] == ['https://b.example.com/news/2']
+        assert ingester.last_fetch_stats == {'fetched': 1, 'not_modified': 1, 'failed': 0}
+        first_call = [c for c in ingester.session.get.call_args_list if c.args[0].startswith('https://a.')][0]
+        assert first_call.kwargs['headers'] == {'If-None-Match': '"v1"'}
+
+    
+    def test_host_delay_does_not_hold_global_slots(self):
+        """Test that a request waiting out its host delay leaves global slots to other hosts."""
+        import asyncio
+        import time
+        
+        ingester = DocumentIngester(Mock(), fetch_config={
+            'max_concurrency': 2, 'per_host_concurrency': 2, 'per_host_delay_seconds': 0.3,
+        })
+        started = {}
+        t0 = time.monotonic()
+        
+        def fake_fetch(url, source_type, validators):
+            started[url] = time.monotonic() - t0
+            time.sleep(0.1)
+            return {'url': url}
+        
+        ingester.fetch_document = fake_fetch
+        sources = [{'url': 'https://a.example.com/1'}, {'url': 'https://a.example.com/2'},
+                   {'url': 'https://b.example.com/1'}]
+        
+        asyncio.run(ingester._fetch_sources_async(sources, {}))
+        
+        assert started['https://b.example.com/1'] < 0.08
+        assert started['https://a.example.com/2'] - started['https://a.example.com/1'] >= 0.29
+    
+    def test_run_fetch_job_streams_to_storage(self, tmp_path):
+        """Test that fetched bodies are streamed to storage and parsed lazily from handles."""
+        import hashlib
+        from ncfd.storage.fs import LocalStorageBackend
+        
+        mock_session = Mock()
+        ingester = DocumentIngester(mock_session, fetch_config={'per_host_delay_seconds': 0,
+                                                                'stream_chunk_size': 8})
+        ingester.storage_backend = LocalStorageBackend({'fs': {'root': str(tmp_path), 'fallback_s3': False}})
+        
+        body = b"<html><body><p>Trial NCT01234567 update</p></body></html>"
+        
+        def fake_get(url, timeout=None, headers=None, stream=False):
+            assert stream is True
+            response = Mock()
+            response.status_code = 200
+            response.headers = {'content-type': 'text/html'}
+            response.iter_content = lambda chunk_size: (body[i:i + chunk_size] for i in range(0, len(body), chunk_size))
+            return response
+        
+        ingester.session.get = Mock(side_effect=fake_get)
+        
+        fetched = ingester.run_fetch_job([{'url': 'https://a.example.com/news/1', 'source_type': 'PR'}])
+        
+        fetch_data = fetched[0]['fetch_data']
+        assert 'content' not in fetch_data
+        assert fetch_data['sha256'] == hashlib.sha256(body).hexdigest()
+        assert fetch_data['size'] == len(body)
+        assert fetch_data['storage_uri'] == f"local://{fetch_data['sha256']}/1"
+        assert ingester.load_content(fetch_data) == body
+        assert list((tmp_path / 'tmp').iterdir()) == []
 
 
 if __name__ == "__main__":
@@ -0,0 +1,49 @@
+"""
+Tests for buffered span persistence in EnhancedSpanCapture.
+"""
+
+from unittest.mock import Mock
+
+from sqlalchemy.dialects import postgresql
+
+from ncfd.extract.inn_dictionary import EnhancedSpanCapture
+
+
+def make_capture(flush_size):
+    session = Mock()
+    session.execute.side_effect = lambda stmt, rows: Mock(rowcount=len(rows))
+    inn_manager = Mock()
+    inn_manager.discover_assets.return_value = []
+    return EnhancedSpanCapture(session, inn_manager, flush_size=flush_size), session
+
+
+def test_spans_buffered_across_pages_and_documents():
+    capture, session = make_capture(flush_size=100)
+
+    for doc_id in (1, 2):
+        for page_no in (1, 2, 3):
+            capture.capture_comprehensive_spans("AB-123 in NCT01234567", doc_id, page_no)
+
+    assert session.execute.call_count == 0
+    assert session.add.call_count == 0
+
+    inserted = capture.flush()
+
+    assert session.execute.call_count == 1
+    stmt, rows = session.execute.call_args[0]
+    assert inserted == len(rows) == 6 * 3  # code, normalized code and NCT per page
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (doc_id, ent_type, page_no, char_start, char_end, value_text) DO NOTHING" in sql
+    assert capture.flush() == 0
+
+
+def test_flush_triggered_by_buffer_size_and_duplicates_collapsed():
+    capture, session = make_capture(flush_size=5)
+
+    capture.capture_comprehensive_spans("AB-123 and AB-123", 1)  # Four distinct spans
+    capture.capture_comprehensive_spans("AB-123 and AB-123", 1)  # Same spans again
+    assert session.execute.call_count == 0
+
+    capture.capture_comprehensive_spans("CD-456 and EF-789", 1)
+    batches = [len(call[0][1]) for call in session.execute.call_args_list]
+    assert batches == [5, 3]
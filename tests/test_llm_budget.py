@@ -0,0 +1,68 @@
+"""
+Tests for the shared per-run LLM budget.
+"""
+
+import threading
+import time
+
+from ncfd.extract.llm_budget import KeyedLocks, RunBudget
+
+
+def test_input_tokens_are_charged_on_reserve():
+    budget = RunBudget(max_tokens=100, counters=('cache_hits',))
+
+    assert budget.reserve(60)
+    assert not budget.reserve(60)  # 120 > 100 before any response is recorded
+    budget.record_tokens(-20)      # Actual usage came in under the estimate
+    assert budget.reserve(60)
+
+    assert budget.stats() == {'llm_calls': 2, 'tokens_used': 100, 'budget_skips': 1, 'cache_hits': 0}
+
+
+def test_concurrent_reservations_respect_call_limit():
+    budget = RunBudget(max_calls=5)
+    barrier = threading.Barrier(16)
+    granted = []
+
+    def worker():
+        barrier.wait()
+        granted.append(budget.reserve())
+
+    threads = [threading.Thread(target=worker) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert granted.count(True) == 5
+    assert budget.stats()['budget_skips'] == 11
+
+    budget.reset()
+    assert budget.stats() == {'llm_calls': 0, 'tokens_used': 0, 'budget_skips': 0}
+
+
+def test_keyed_locks_serialize_per_key_and_are_dropped():
+    locks = KeyedLocks()
+    active = {'a': 0}
+    peak = []
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        with locks.hold('a'):
+            active['a'] += 1
+            peak.append(active['a'])
+            time.sleep(0.005)
+            active['a'] -= 1
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert max(peak) == 1
+    for i in range(100):
+        with locks.hold(f"key{i}"):
+            assert len(locks) == 1
+    assert len(locks) == 0
@@ -0,0 +1,101 @@
+"""
+Tests for the persisted resolver blocking-key index.
+"""
+
+from unittest.mock import Mock
+
+import ncfd.mapping.blocking_index as bi
+from ncfd.mapping.blocks import TrialParty, derive_context
+
+
+def result(rows):
+    res = Mock()
+    res.fetchall.return_value = rows
+    return res
+
+
+def test_company_keys_line_up_with_trial_context():
+    keys = bi.company_keys(
+        ["Regenxbio Biologics Inc", "Regenxbio Gene Therapy"],
+        ["www.RegenxBio.com", ""],
+        ["rgx-121", "not a code"],
+    )
+    assert keys == {
+        ("token_pair", "biologics regenxbio"),
+        ("token_pair", "regenxbio therapy"),
+        ("domain", "regenxbio.com"),
+        ("drug_code", "RGX-121"),
+    }
+
+    tp = TrialParty(nct_id="NCT1", texts=["Regenxbio Biologics Inc (regenxbio.com)"], interventions=["RGX-121"])
+    lookup = bi.context_keys(derive_context(tp))
+    assert ("token_pair", lookup["token_pair"][0]) in keys
+    assert lookup["domain"] == ["regenxbio.com"] and lookup["drug_code"] == ["RGX-121"]
+
+
+def test_derive_context_pairs_are_unique():
+    tp = TrialParty(nct_id="NCT1", texts=["Oncology Partners Oncology", "Partners Genomics"], interventions=[])
+    pairs = derive_context(tp).strong_token_pairs
+    assert len(pairs) == len(set(pairs)) == 3
+    assert all(a < b for a, b in pairs)
+
+
+def test_sync_recomputes_only_dirty_companies(monkeypatch):
+    monkeypatch.setattr(bi, "_index_installed", lambda s: True)
+    session = Mock()
+    session.execute.side_effect = [
+        result([(7,), (9,)]),                                    # claimed dirty companies (9 was deleted)
+        result([(7, "Acmegen Oncology Holdings", "acme.com")]),  # companies
+        result([(7, "Acme Oncology Research", "aka"),
+                (7, "www.acmebio.com", "domain")]),              # aliases
+        result([(7, "AC-101")]),                                 # drug codes of sponsored trials
+        None,                                                    # delete old keys
+        None,                                                    # insert new keys
+    ]
+
+    assert bi.sync_blocking_keys(session, batch_size=10) == 2
+
+    delete_call, insert_call = session.execute.call_args_list[4:]
+    assert delete_call[0][1] == {"ids": [7, 9]}
+    assert {(r["key_type"], r["key"]) for r in insert_call[0][1]} == {
+        ("token_pair", "acmegen oncology"),
+        ("token_pair", "oncology research"),
+        ("domain", "acme.com"),
+        ("domain", "acmebio.com"),
+        ("drug_code", "AC-101"),
+    }
+    assert {r["cid"] for r in insert_call[0][1]} == {7}
+
+
+def test_sync_commits_each_batch_and_stops_at_limit(monkeypatch):
+    monkeypatch.setattr(bi, "_index_installed", lambda s: True)
+    rebuilt = []
+    monkeypatch.setattr(bi, "_rebuild_keys", lambda s, ids: rebuilt.append(ids))
+    session = Mock()
+    session.execute.side_effect = [result([(1,), (2,)]), result([(3,)])]
+
+    assert bi.sync_blocking_keys(session, batch_size=2, max_companies=3) == 3
+
+    assert rebuilt == [[1, 2], [3]]
+    assert session.execute.call_args_list[1][0][1] == {"lim": 1}  # Last batch trimmed to the limit
+    assert session.commit.call_count == 2
+
+
+def test_blocked_candidates_appended_after_trigram_hits(monkeypatch):
+    monkeypatch.setattr(bi, "blocking_candidates", lambda s, ctx, limit: [(1, 2), (5, 1)])
+    monkeypatch.setattr(bi, "hydrate_candidates", lambda s, top: [
+        {"company_id": cid, "name": "Acme Oncology", "sim": sim} for cid, sim in top
+    ])
+    cands = [{"company_id": 1, "name": "Acme Inc", "sim": 0.8}]
+
+    out = bi.add_blocked_candidates(Mock(), cands, Mock(), "acme oncology research")
+
+    assert [c["company_id"] for c in out] == [1, 5]
+    assert 0.3 < out[1]["sim"] < 1.0
+
+
+def test_lookup_skipped_without_keys():
+    session = Mock()
+    tp = TrialParty(nct_id="NCT1", texts=["Acme"], interventions=[])
+    assert bi.blocking_candidates(session, derive_context(tp)) == []
+    session.execute.assert_not_called()
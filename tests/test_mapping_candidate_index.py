@@ -0,0 +1,231 @@
+"""
+Tests for the in-process trigram candidate index.
+"""
+
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+
+import ncfd.mapping.candidate_index as ci
+from ncfd.mapping.candidate_index import CandidateIndex, similarity, trigrams
+
+
+@pytest.fixture
+def clock():
+    """Transaction ids seen by the sqlite stand-ins for pg_current_xact_id() and snapshot xmin."""
+    return {"xid": 5, "xmin": 10}
+
+
+def _install_change_queue(conn):
+    """sqlite version of the company_index_changes triggers."""
+    conn.execute(text(
+        "CREATE TABLE company_index_changes (company_id INTEGER PRIMARY KEY, changed_xid INTEGER NOT NULL)"
+    ))
+    mark = (
+        "INSERT INTO company_index_changes VALUES ({row}.company_id, pg_current_xact_id()) "
+        "ON CONFLICT (company_id) DO UPDATE SET changed_xid = excluded.changed_xid;"
+    )
+    for table in ("companies", "company_aliases"):
+        for op, rows in (("INSERT", ("NEW",)), ("UPDATE", ("NEW", "OLD")), ("DELETE", ("OLD",))):
+            body = " ".join(mark.format(row=row) for row in rows)
+            conn.execute(text(f"CREATE TRIGGER trg_{table}_{op.lower()} AFTER {op} ON {table} BEGIN {body} END"))
+
+
+@pytest.fixture
+def change_queue():
+    return True
+
+
+@pytest.fixture
+def session(monkeypatch, clock, change_queue):
+    monkeypatch.setattr(ci, "_best_us_security", lambda s, ids: {
+        cid: {"ticker": "RGNX", "cik": "0001501756", "exchange": "NASDAQ"} for cid in ids if cid == 2002
+    })
+    engine = create_engine("sqlite://")
+
+    @event.listens_for(engine, "connect")
+    def _pg_functions(dbapi_conn, _record):
+        dbapi_conn.create_function("pg_current_xact_id", 0, lambda: clock["xid"])
+        dbapi_conn.create_function("pg_current_snapshot", 0, lambda: None)
+        dbapi_conn.create_function("pg_snapshot_xmin", 1, lambda _snapshot: clock["xmin"])
+
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE companies (company_id INTEGER, name TEXT, name_norm TEXT, website_domain TEXT)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE company_aliases (company_id INTEGER, alias TEXT, alias_norm TEXT, alias_type TEXT)"
+        ))
+        if change_queue:
+            _install_change_queue(conn)
+        conn.execute(text(
+            "INSERT INTO companies VALUES "
+            "(2001, 'Regeneron Pharmaceuticals, Inc.', 'regeneron pharmaceuticals inc', 'regeneron.com'), "
+            "(2002, 'Regenxbio Inc', 'regenxbio inc', 'regenxbio.com'), "
+            "(2003, 'AlphaBio Therapeutics', 'alphabio therapeutics', NULL)"
+        ))
+        conn.execute(text(
+            "INSERT INTO company_aliases VALUES "
+            "(2002, 'Regenx Bio', 'regenx bio', 'aka'), "
+            "(2002, 'www.RegenxBio.com', 'regenxbio com', 'domain'), "
+            "(2003, 'Alpha Bio', 'alpha bio', 'aka')"
+        ))
+    with Session(engine) as s:
+        yield s
+
+
+def count_queries(session):
+    statements = []
+    event.listen(session.bind, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    return statements
+
+
+def brute_force(session, qnorm, k):
+    """Reference result computed the way candidate_retrieval's SQL does."""
+    best = {}
+    for table, col in (("companies", "name_norm"), ("company_aliases", "alias_norm")):
+        rows = session.execute(text(f"SELECT company_id, {col} FROM {table}")).fetchall()
+        hits = sorted(((similarity(norm, qnorm), cid) for cid, norm in rows), reverse=True)
+        for sim, cid in [h for h in hits if h[0] >= 0.3][:max(1, k // 2)]:
+            best[cid] = max(best.get(cid, 0.0), sim)
+    return sorted(best.items(), key=lambda x: x[1], reverse=True)[:k]
+
+
+def test_trigrams_follow_pg_trgm():
+    assert trigrams("cat") == {"  c", " ca", "cat", "at "}
+    assert trigrams("A-b") == {"  a", " a ", "  b", " b "}
+    assert similarity("word", "two words") == pytest.approx(4 / 11)  # 0.363636 in the pg_trgm docs
+    assert similarity("", "") == 0.0
+
+
+def test_matches_brute_force_and_hydrates(session, tmp_path):
+    index = CandidateIndex(tmp_path / "idx")
+    index.ensure_fresh(session)
+
+    for q in ("regenx bio", "alpha bio", "regeneron", "nothing like it"):
+        out = index.candidates(q, k=4)
+        assert [(r["company_id"], r["sim"]) for r in out] == pytest.approx(brute_force(session, q, 4))
+
+    item = next(r for r in index.candidates("regenx bio", k=5) if r["company_id"] == 2002)
+    assert item["ticker"] == "RGNX" and item["exchange"] == "NASDAQ"
+    assert item["domains"] == ["regenxbio.com"]
+    assert item["website_domain"] == "regenxbio.com"
+
+
+def test_saved_index_is_memory_mapped_and_queried_without_db(session, tmp_path):
+    CandidateIndex(tmp_path / "idx").ensure_fresh(session)
+
+    index = CandidateIndex(tmp_path / "idx", refresh_interval=60)
+    assert index.load()
+    assert index._postings.__class__.__name__ == "memmap"
+    index.ensure_fresh(session)  # First use checks the watermark once
+    statements = count_queries(session)
+
+    for _ in range(100):
+        index.ensure_fresh(session)
+        assert index.candidates("alpha bio", k=2)[0]["company_id"] == 2003
+    assert statements == []
+
+
+def test_incremental_refresh_from_change_queue(session, clock, tmp_path):
+    index = CandidateIndex(tmp_path / "idx", refresh_interval=0)
+    index.ensure_fresh(session)
+    assert index.watermark == "10"
+
+    clock.update(xid=11, xmin=12)
+    session.execute(text("INSERT INTO company_aliases VALUES (2001, 'Alpha Biologics', 'alpha biologics', 'aka')"))
+    session.execute(text("INSERT INTO companies VALUES (2004, 'Alpha Bio Labs', 'alpha bio labs', NULL)"))
+    session.execute(text("UPDATE company_aliases SET alias_norm = 'gamma labs' WHERE company_id = 2003"))
+    session.execute(text("UPDATE companies SET website_domain = 'regenxbio.org' WHERE company_id = 2002"))
+    statements = count_queries(session)
+    index.ensure_fresh(session)
+
+    assert any("WHERE company_id IN" in s for s in statements)  # Only changed companies re-read
+    assert set(index._overlay) == {2001, 2002, 2003, 2004}
+    assert index.watermark == "12"
+    assert [r["company_id"] for r in index.candidates("alpha bio", k=10)] == \
+        [cid for cid, _ in brute_force(session, "alpha bio", 10)]
+    assert next(r for r in index.candidates("regenxbio", k=5) if r["company_id"] == 2002)["website_domain"] \
+        == "regenxbio.org"  # Raw-SQL update without any timestamp column
+
+    clock.update(xid=12, xmin=13)
+    session.execute(text("DELETE FROM companies WHERE company_id = 2003"))
+    session.execute(text("DELETE FROM company_aliases WHERE company_id = 2003"))
+    del statements[:]
+    index.ensure_fresh(session)
+
+    assert not any("FROM companies " in s and "WHERE" not in s for s in statements)  # No rebuild
+    assert index._overlay[2003] == ([], None)
+    assert 2003 not in [r["company_id"] for r in index.candidates("alpha bio", k=10)]
+
+
+def test_late_commit_below_watermark_time_is_picked_up(session, clock, tmp_path):
+    index = CandidateIndex(tmp_path / "idx", refresh_interval=0)
+    clock.update(xmin=10)  # Transaction 10 is still running when the index is built
+    index.ensure_fresh(session)
+
+    clock.update(xid=10, xmin=15)  # ...and commits only after that read
+    session.execute(text("INSERT INTO companies VALUES (2005, 'Alpha Bioworks', 'alpha bioworks', NULL)"))
+    index.ensure_fresh(session)
+
+    assert 2005 in [r["company_id"] for r in index.candidates("alpha bioworks", k=5)]
+
+
+def test_large_overlay_is_folded_into_saved_snapshot(session, clock, tmp_path):
+    index = CandidateIndex(tmp_path / "idx", refresh_interval=0, max_overlay=1)
+    index.ensure_fresh(session)
+
+    clock.update(xid=11, xmin=12)
+    session.execute(text("INSERT INTO companies VALUES (2004, 'Alpha Bio Labs', 'alpha bio labs', NULL)"))
+    index.ensure_fresh(session)
+    assert set(index._overlay) == {2004}
+
+    clock.update(xid=12, xmin=13)
+    session.execute(text("INSERT INTO companies VALUES (2005, 'Alpha Bioworks', 'alpha bioworks', NULL)"))
+    index.ensure_fresh(session)
+
+    assert index._overlay == {} and index.watermark == "13"
+    saved = CandidateIndex(tmp_path / "idx")
+    assert saved.load()
+    assert {2004, 2005} <= {r["company_id"] for r in saved.candidates("alpha bio", k=10)}
+
+
+@pytest.mark.parametrize("change_queue", [False])
+def test_rebuilds_without_change_queue(session, tmp_path):
+    index = CandidateIndex(tmp_path / "idx", refresh_interval=0)
+    index.ensure_fresh(session)
+    assert index.watermark is None
+
+    session.execute(text("UPDATE company_aliases SET alias_norm = 'gamma labs' WHERE company_id = 2003"))
+    index.ensure_fresh(session)
+
+    assert index._overlay == {}
+    assert [r["company_id"] for r in index.candidates("gamma labs", k=5)] == [2003]
+
+
+def test_concurrent_callers_apply_changes_once(tmp_path):
+    index = CandidateIndex(tmp_path / "idx", refresh_interval=60)
+    index._loaded, index.watermark = True, "10"
+    index._read_watermark = lambda session: "20"
+    applied = []
+
+    def apply_changes(session, since):
+        applied.append(since)
+        time.sleep(0.05)
+
+    index._apply_changes = apply_changes
+    threads = [threading.Thread(target=index.ensure_fresh, args=(Mock(),)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert applied == ["10"]
+    assert index.watermark == "20"
+    index.ensure_fresh(Mock())
+    assert applied == ["10"]  # Checked within the refresh interval
@@ -0,0 +1,107 @@
+"""
+Tests for set-based deterministic resolution (resolve_companies).
+
+A small in-memory fake answers both the per-sponsor and the unnest-joined
+queries, so the batch API can be checked against resolve_company().
+"""
+
+from unittest.mock import Mock
+
+from ncfd.mapping.deterministic import resolve_companies, resolve_company
+from ncfd.mapping.normalize import norm_name
+
+COMPANIES = [  # company_id, name, website_domain
+    (1, "Alpha Therapeutics, Inc.", "alpha-thera.com"),
+    (2, "Beta Pharma PLC", "www.betapharma.com"),
+    (3, "Organon & Co.", None),
+    (4, "Twin Bio", None),
+    (5, "Twin Bio", None),
+    (6, "Gamma Labs", "shared.com"),
+    (7, "Delta Labs", "shared.com"),
+]
+ALIASES = [  # company_id, alias, alias_type
+    (1, "AlphaTx", "short"),
+    (1, "alphathera.com", "domain"),
+    (2, "Beta Pharma Ltd.", "former_name"),
+    (2, "Gamma Labs", "aka"),
+    (4, "Shared Name", "aka"),
+    (5, "Shared Name", "aka"),
+    (6, "BrandOnly", "brand"),
+]
+
+
+def _dom(value):
+    value = (value or "").lower()
+    return value[4:] if value.startswith("www.") else value
+
+
+class FakeDb:
+    def __init__(self):
+        self.queries = 0
+
+    def execute(self, stmt, params):
+        self.queries += 1
+        sql = str(stmt)
+        types = set(params.get("types", ()))
+        if "unnest" in sql:
+            keys = params.get("norms") or params.get("doms")
+            rows = [(k, cid) for k in keys for cid in self._match(sql, k, types)]
+        else:
+            key = params.get("norm", params.get("dom"))
+            rows = [(cid,) for cid in self._match(sql, key, types)]
+        result = Mock()
+        result.fetchall.return_value = rows
+        return result
+
+    def _match(self, sql, key, types):
+        if "company_aliases" in sql and "dom" in sql:
+            return sorted({cid for cid, alias, t in ALIASES if t == "domain" and _dom(alias) == key})
+        if "company_aliases" in sql:
+            return sorted({cid for cid, alias, t in ALIASES if norm_name(alias) == key and t in types})
+        if "website_domain" in sql:
+            return [cid for cid, _name, site in COMPANIES if _dom(site) == key]
+        return [cid for cid, name, _site in COMPANIES if norm_name(name) == key]
+
+
+SPONSORS = [
+    "Alpha Therapeutics Inc",      # company name, strict
+    "AlphaTx",                     # alias
+    "Organon and Co",              # company name, loose
+    "Beta Pharma Ltd.",            # former name alias
+    "Gamma Labs",                  # alias wins over company name
+    "Twin Bio",                    # ambiguous company name
+    "Shared Name",                 # ambiguous alias
+    "Sponsored via alphathera.com",  # domain alias
+    "Info at betapharma.com.",     # website domain
+    "Contact shared.com",          # ambiguous website domain
+    "BrandOnly",                   # alias type not allowed below
+    "Unknown Sponsor",
+    "",
+    "AlphaTx",                     # duplicate input
+]
+
+
+def test_batch_matches_single_resolution():
+    single = [resolve_company(FakeDb(), sp) for sp in SPONSORS]
+    batch = resolve_companies(FakeDb(), SPONSORS)
+    assert batch == single
+
+    methods = [r.method if r else None for r in batch]
+    assert methods[:5] == ["company_name_exact", "alias_exact", "company_name_exact_loose",
+                           "alias_exact", "alias_exact"]
+    assert batch[4].company_id == 2
+    assert methods[7:9] == ["domain_exact", "website_domain"]
+    assert batch[5] is None and batch[6] is None and batch[9] is None
+
+
+def test_allowed_alias_types_respected():
+    types = {"aka", "short"}
+    single = [resolve_company(FakeDb(), sp, types) for sp in SPONSORS]
+    assert resolve_companies(FakeDb(), SPONSORS, types) == single
+    assert resolve_companies(FakeDb(), ["BrandOnly"], types) == [None]
+
+
+def test_batch_uses_at_most_four_queries():
+    db = FakeDb()
+    resolve_companies(db, SPONSORS * 50)
+    assert db.queries == 4
@@ -43,3 +43,63 @@ def test_academic_penalty_blocks_false_positive():
     c = {"company_id": 1, "name": "General Hospital Therapeutics", "website_domain":"", "ticker":"GHTX"}
     feats = build_features(sponsor, c, context={})
     assert feats["academic_keyword_penalty"] == 1.0
+
+def _reference_jaro(s, t):
+    """Straightforward O(n*m) Jaro, as the scorer originally computed it."""
+    if s == t:
+        return 1.0
+    ls, lt = len(s), len(t)
+    if ls == 0 or lt == 0:
+        return 0.0
+    match_dist = max(max(ls, lt) // 2 - 1, 0)
+    s_m, t_m = [False] * ls, [False] * lt
+    matches = 0
+    for i, ch in enumerate(s):
+        for j in range(max(0, i - match_dist), min(i + match_dist + 1, lt)):
+            if not t_m[j] and t[j] == ch:
+                s_m[i] = t_m[j] = True
+                matches += 1
+                break
+    if matches == 0:
+        return 0.0
+    k = trans = 0
+    for i in range(ls):
+        if s_m[i]:
+            while not t_m[k]:
+                k += 1
+            trans += s[i] != t[k]
+            k += 1
+    trans //= 2
+    return (matches/ls + matches/lt + (matches - trans)/matches) / 3.0
+
+def test_jaro_kernel_matches_reference():
+    import random
+    from ncfd.mapping.probabilistic import _jaro
+    rng = random.Random(7)
+    for _ in range(5000):
+        a = "".join(rng.choice("abca -") for _ in range(rng.randint(0, 10)))
+        b = "".join(rng.choice("abca -") for _ in range(rng.randint(0, 10)))
+        assert _jaro(a, b) == _reference_jaro(a, b)
+    assert _jaro("martha", "marhta") == _reference_jaro("martha", "marhta")
+
+def test_vectorized_scores_match_per_candidate_scoring():
+    import math
+    weights, intercept = CFG["model"]["weights"], CFG["model"]["intercept"]
+    sponsor = "AlphaBio Therapeutics (NASDAQ: ABTX), see alphabio.com"
+    ctx = {"domains": ["alphabio.com"], "drug_code_hit": True}
+    cands = [
+        {"company_id": 1, "name": "AlphaBio Therapeutics", "website_domain": "alphabio.com", "ticker": "ABTX"},
+        {"company_id": 2, "name": "Alpha Biologics Inc", "website_domain": "", "domains": ["AlphaBio.com"]},
+        {"company_id": 3, "name": None, "ticker": None},
+    ]
+    scored = score_candidates(cands, sponsor, weights, intercept, context=ctx)
+
+    for s in scored:
+        feats = build_features(sponsor, s.meta, context=ctx)
+        z = intercept
+        for k, w in weights.items():
+            z += w * float(feats.get(k, 0.0))
+        assert s.features == feats
+        assert s.p == 1.0 / (1.0 + math.exp(-z))
+    assert [s.company_id for s in scored] == [1, 2, 3]
+    assert score_candidates([], sponsor, weights, intercept) == []
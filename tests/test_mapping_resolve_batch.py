@@ -0,0 +1,236 @@
+"""
+Tests for sponsor-level deduplication in resolve-batch.
+"""
+
+from contextlib import contextmanager
+from unittest.mock import Mock
+
+from sqlalchemy.dialects import postgresql
+
+import ncfd.mapping.cli as cli
+from ncfd.mapping.det import DetDecision
+
+CFG = {
+    "model": {"weights": {"jw_primary": 4.0}, "intercept": -2.0},
+    "thresholds": {"tau_accept": 0.95, "review_low": 0.5, "min_top2_margin": 0.1},
+}
+
+
+def sql_of(call):
+    stmt = call[0][0]
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_trials_grouped_by_sponsor_in_first_seen_order():
+    rows = [("NCT3", "Pfizer"), ("NCT1", "NCI"), ("NCT2", "Pfizer"), ("NCT4", "Pfizer")]
+    assert cli._group_pending_by_sponsor(rows) == {"Pfizer": ["NCT3", "NCT2", "NCT4"], "NCI": ["NCT1"]}
+
+
+def test_candidates_memoized_per_normalized_sponsor(monkeypatch):
+    retrieval = Mock(return_value=[
+        {"company_id": 7, "name": "Acme Inc", "website_domain": "", "domains": [],
+         "ticker": None, "cik": None, "exchange": None, "sim": 1.0},
+    ])
+    monkeypatch.setattr(cli, "candidate_retrieval", retrieval)
+    memo = {}
+
+    first = cli._resolve_sponsor(Mock(), "Acme Inc", CFG, skip_det=True, candidate_memo=memo)
+    second = cli._resolve_sponsor(Mock(), "ACME, Inc.", CFG, skip_det=True, candidate_memo=memo)
+
+    assert retrieval.call_count == 1
+    assert first.prob_dec.company_id == second.prob_dec.company_id == 7
+
+
+def test_deterministic_outcome_fanned_out_with_bulk_writes(monkeypatch):
+    upsert = Mock(return_value=True)
+    monkeypatch.setattr(cli, "upsert_alias_from_sponsor", upsert)
+    session = Mock()
+    outcome = cli._SponsorOutcome(det=DetDecision(company_id=42, method="det_exact:alias_exact", evidence={}))
+
+    cli._apply_sponsor_outcome(
+        session, "Pfizer", ["NCT1", "NCT2", "NCT3"], outcome,
+        run_id="run-1", persist=True, decider="auto", apply_trial=True, force_review_on_reject=False,
+    )
+
+    decision_call, update_call = session.execute.call_args_list
+    assert "unnest(CAST(%(nct_ids)s AS text[]))" in sql_of(decision_call)
+    assert decision_call[0][1]["nct_ids"] == ["NCT1", "NCT2", "NCT3"]
+    assert "nct_id = ANY(%(ncts)s)" in sql_of(update_call)
+    assert update_call[0][1] == {"cid": 42, "ncts": ["NCT1", "NCT2", "NCT3"]}
+    upsert.assert_called_once_with(session, 42, "Pfizer")
+
+
+def test_review_outcome_queues_every_trial_in_one_call(monkeypatch):
+    monkeypatch.setattr(cli, "sponsor_is_ignored", Mock(return_value=False))
+    monkeypatch.setattr(cli, "_llm_enabled", lambda decider: False)
+    session = Mock()
+    scored = [Mock(company_id=5, p=0.7, features={"jw_primary": 0.9}, meta={"name": "Beta"})]
+    prob_dec = Mock(mode="review", company_id=5, p=0.7, top2_margin=0.7)
+    outcome = cli._SponsorOutcome(scored=scored, prob_dec=prob_dec)
+
+    cli._apply_sponsor_outcome(
+        session, "Beta Pharma", ["NCT7", "NCT8"], outcome,
+        run_id="run-1", persist=True, decider="auto", apply_trial=False, force_review_on_reject=False,
+    )
+
+    features_call, review_call = session.execute.call_args_list
+    assert [r["nct_id"] for r in features_call[0][1]] == ["NCT7", "NCT8"]
+    assert [r["nct_id"] for r in review_call[0][1]] == ["NCT7", "NCT8"]
+    assert review_call[0][1][0]["reason"] == "prob_review"
+
+
+def test_shards_are_stable_and_cover_all_workers():
+    sponsors = [f"Sponsor {i}" for i in range(200)]
+    shards = [cli._shard_of(sp, 4) for sp in sponsors]
+
+    assert shards == [cli._shard_of(sp, 4) for sp in sponsors]
+    assert set(shards) == {0, 1, 2, 3}
+
+
+def _session_factory(events, first_rows=None, rows_session=0):
+    """
+    get_session stand-in yielding a fresh Mock per transaction and logging enter/exit.
+
+    Queries of the `rows_session`-th session (the first by default) return `first_rows`.
+    """
+    sessions = []
+
+    @contextmanager
+    def fake_session():
+        session = Mock()
+        if len(sessions) == rows_session and first_rows is not None:
+            session.execute.return_value.fetchall.return_value = first_rows
+        sessions.append(session)
+        events.append(("enter", session))
+        yield session
+        events.append(("exit", session))
+
+    return fake_session, sessions
+
+
+SHARD_OPTIONS = {"run_id": "run-1", "persist": True, "decider": "auto", "apply_trial": False,
+                 "force_review_on_reject": False, "skip_det": True, "lease_seconds": 60}
+
+
+def test_shard_worker_commits_claim_before_resolving(monkeypatch):
+    events = []
+    # NCT2 was already finished (or is leased) by another worker in this run
+    fake_session, sessions = _session_factory(events, first_rows=[("NCT3",), ("NCT1",)])
+    monkeypatch.setattr(cli, "get_session", fake_session)
+    resolve = Mock(side_effect=lambda s, *a, **k: events.append(("resolve", s)) or cli._SponsorOutcome())
+    monkeypatch.setattr(cli, "_resolve_sponsor", resolve)
+    interventions = Mock(return_value=["AB-101"])
+    monkeypatch.setattr(cli, "load_trial_interventions", interventions)
+    apply = Mock(return_value="no_candidates")
+    monkeypatch.setattr(cli, "_apply_sponsor_outcome", apply)
+
+    counts = cli._resolve_shard(CFG, [("Pfizer", ["NCT1", "NCT2", "NCT3"])], SHARD_OPTIONS)
+
+    assert counts == {"no_candidates": 2, "claimed_elsewhere": 1}
+    claim_session, work_session = sessions
+    claim_sql = sql_of(claim_session.execute.call_args_list[0])
+    assert "INSERT INTO resolver_trial_claims" in claim_sql and "ON CONFLICT" in claim_sql
+    assert "FOR UPDATE" not in claim_sql
+    # The claim transaction is closed before resolution (and any LLM call) starts
+    assert events.index(("exit", claim_session)) < events.index(("resolve", work_session))
+    assert apply.call_args[0][2] == ["NCT1", "NCT3"]
+    # Blocking sees the drug codes of the claimed trials' interventions
+    assert interventions.call_args[0] == (work_session, ["NCT1", "NCT3"])
+    assert resolve.call_args[1]["interventions"] == ["AB-101"]
+    complete_call = work_session.execute.call_args_list[-1]
+    assert "SET completed_at = now()" in sql_of(complete_call)
+    assert complete_call[0][1]["ncts"] == ["NCT1", "NCT3"]
+    assert complete_call[0][1]["outcome"] == "no_candidates"
+
+
+def test_dry_run_shard_claims_nothing(monkeypatch):
+    fake_session, sessions = _session_factory([])
+    monkeypatch.setattr(cli, "get_session", fake_session)
+    monkeypatch.setattr(cli, "_resolve_sponsor", Mock(return_value=cli._SponsorOutcome()))
+    monkeypatch.setattr(cli, "load_trial_interventions", Mock(return_value=[]))
+    monkeypatch.setattr(cli, "_apply_sponsor_outcome", Mock(return_value="no_candidates"))
+
+    counts = cli._resolve_shard(CFG, [("Pfizer", ["NCT1", "NCT2"])], dict(SHARD_OPTIONS, persist=False))
+
+    assert counts == {"no_candidates": 2}
+    assert len(sessions) == 1
+    sessions[0].execute.assert_not_called()
+
+
+def test_single_worker_run_claims_and_skips_finished_trials(monkeypatch):
+    fake_session, sessions = _session_factory([], first_rows=[("NCT1", "Pfizer")], rows_session=1)
+    monkeypatch.setattr(cli, "get_session", fake_session)
+    monkeypatch.setattr(cli, "_load_yaml", lambda path: CFG)
+    sync = Mock(return_value=0)
+    monkeypatch.setattr(cli, "sync_blocking_keys", sync)
+    shard = Mock(return_value={"prob_review": 1})
+    monkeypatch.setattr(cli, "_resolve_shard", shard)
+
+    cli.resolve_batch(cfg_path="cfg.yaml", limit=10, run_id="run-1", persist=True, decider="auto",
+                      apply_trial=False, skip_det=True, force_review_on_reject=False, workers=1,
+                      lease_seconds=60, sync_limit=500)
+
+    # Blocking keys are synced (bounded) in their own transaction, not the selection's
+    assert sync.call_args[0][0] is sessions[0] and sync.call_args[1] == {"max_companies": 500}
+    select_call = sessions[1].execute.call_args_list[0]
+    assert "resolver_trial_claims" in sql_of(select_call)
+    assert select_call[0][1]["run_id"] == "run-1"
+    # The in-process path goes through the same claiming shard worker
+    shard.assert_called_once()
+    assert shard.call_args[0][1] == [("Pfizer", ["NCT1"])]
+
+
+def test_dry_run_does_not_sync_blocking_keys(monkeypatch):
+    fake_session, sessions = _session_factory([], first_rows=[("NCT1", "Pfizer")])
+    monkeypatch.setattr(cli, "get_session", fake_session)
+    monkeypatch.setattr(cli, "_load_yaml", lambda path: CFG)
+    sync = Mock(return_value=0)
+    monkeypatch.setattr(cli, "sync_blocking_keys", sync)
+    monkeypatch.setattr(cli, "_resolve_shard", Mock(return_value={"no_candidates": 1}))
+
+    cli.resolve_batch(cfg_path="cfg.yaml", limit=10, run_id="run-1", persist=False, decider="auto",
+                      apply_trial=False, skip_det=True, force_review_on_reject=False, workers=1,
+                      lease_seconds=60, sync_limit=500)
+
+    sync.assert_not_called()
+    assert len(sessions) == 1  # Only the row selection
+
+
+ACCEPT_CFG = {**CFG, "thresholds": {"tau_accept": 0.8, "review_low": 0.5, "min_top2_margin": 0.1}}
+
+
+def _cand(cid, name):
+    return {"company_id": cid, "name": name, "website_domain": "", "domains": [],
+            "ticker": None, "cik": None, "exchange": None, "sim": 1.0}
+
+
+def test_blocked_candidate_cannot_turn_accept_into_review(monkeypatch):
+    monkeypatch.setattr(cli, "candidate_retrieval", Mock(return_value=[_cand(7, "Acme Inc")]))
+    blocked = Mock(side_effect=lambda s, cands, ctx, q: cands + [_cand(8, "Acme Inc")])
+    monkeypatch.setattr(cli, "add_blocked_candidates", blocked)
+
+    outcome = cli._resolve_sponsor(Mock(), "Acme Inc", ACCEPT_CFG, skip_det=True)
+
+    # A blocked twin would leave a zero top-2 margin; it is never consulted for an accept
+    assert outcome.prob_dec.mode == "accept" and outcome.prob_dec.company_id == 7
+    blocked.assert_not_called()
+
+
+def test_blocked_candidates_consulted_without_trigram_accept(monkeypatch):
+    monkeypatch.setattr(cli, "candidate_retrieval", Mock(return_value=[]))
+    monkeypatch.setattr(cli, "add_blocked_candidates",
+                        Mock(side_effect=lambda s, cands, ctx, q: cands + [_cand(9, "Acme Inc")]))
+
+    outcome = cli._resolve_sponsor(Mock(), "Acme Inc", ACCEPT_CFG, skip_det=True)
+
+    assert outcome.prob_dec.mode == "accept" and outcome.prob_dec.company_id == 9
+
+
+def test_batch_blocking_uses_trial_drug_codes(monkeypatch):
+    monkeypatch.setattr(cli, "candidate_retrieval", Mock(return_value=[]))
+    blocked = Mock(side_effect=lambda s, cands, ctx, q: cands)
+    monkeypatch.setattr(cli, "add_blocked_candidates", blocked)
+
+    cli._resolve_sponsor(Mock(), "Acme Inc", ACCEPT_CFG, skip_det=True, interventions=["AB-101 tablets", "Placebo"])
+
+    assert blocked.call_args[0][2].drug_codes == ["AB-101"]
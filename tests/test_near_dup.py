@@ -0,0 +1,85 @@
+"""
+Tests for MinHash-LSH near-duplicate detection.
+"""
+
+import random
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from ncfd.ingest.near_dup import MinHasher, NearDuplicateIndex, similarity
+
+
+def release(seed, n=400):
+    rng = random.Random(seed)
+    return " ".join(f"w{rng.randint(0, 5000)}" for _ in range(n))
+
+
+def signature_of(*pages):
+    hasher = MinHasher()
+    for page in pages:
+        hasher.update(page)
+    return hasher, hasher.signature()
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE document_fingerprints (doc_id INTEGER PRIMARY KEY, signature BLOB)"))
+        conn.execute(text(
+            "CREATE TABLE document_fingerprint_bands (band INTEGER, band_hash INTEGER, doc_id INTEGER, "
+            "PRIMARY KEY (band, band_hash, doc_id))"
+        ))
+    with Session(engine) as s:
+        yield s
+
+
+def test_syndicated_copy_scores_high():
+    body = release(1)
+    _, original = signature_of("Acme Therapeutics announces topline results. " + body + " About Acme.")
+    _, syndicated = signature_of("BUSINESS WIRE -- " + body + " Contact: media@example.com")
+    _, unrelated = signature_of(release(2))
+
+    assert similarity(original, syndicated) >= 0.9
+    assert similarity(original, unrelated) < 0.1
+
+    # Feeding the text page by page gives nearly the same signature
+    words = body.split()
+    _, paged = signature_of(" ".join(words[:200]), " ".join(words[200:]))
+    _, whole = signature_of(body)
+    assert similarity(paged, whole) >= 0.9
+
+
+def test_index_finds_canonical_document(session):
+    index = NearDuplicateIndex(threshold=0.8, min_tokens=50)
+    body = release(3)
+    _, first = signature_of(body + " Forward-looking statements apply.")
+    _, other = signature_of(release(4))
+
+    assert index.find(session, first) is None
+    index.add(session, 10, first)
+    index.add(session, 11, other)
+
+    hasher, copy = signature_of("PRNewswire -- " + body)
+    assert index.eligible(hasher)
+    doc_id, score = index.find(session, copy)
+    assert doc_id == 10 and score >= 0.8
+
+    assert index.find(session, signature_of(release(5))[1]) is None
+    assert not index.eligible(signature_of("Short note")[0])
+
+
+def test_reindexing_replaces_bands(session):
+    index = NearDuplicateIndex()
+    _, first = signature_of(release(6))
+    _, second = signature_of(release(7))
+
+    index.add(session, 1, first)
+    index.add(session, 1, second)
+
+    assert index.find(session, first) is None
+    assert index.find(session, second)[0] == 1
+    bands = session.execute(text("SELECT count(*) FROM document_fingerprint_bands")).scalar()
+    assert bands == 16
@@ -0,0 +1,77 @@
+"""
+Tests for the process-wide schema introspection cache.
+"""
+
+from unittest.mock import Mock
+
+import pytest
+
+import ncfd.db.schema_cache as schema_cache
+from ncfd.db.schema_cache import SchemaCache
+from ncfd.mapping import candidates
+
+COLUMNS = {
+    "public.securities": {"company_id", "ticker", "cik", "exchange_id"},
+    "public.exchanges": {"exchange_id", "code", "name"},
+    "public.companies": {"company_id", "name"},
+}
+
+
+def fake_session(url="postgresql://ncfd@db/ncfd"):
+    session = Mock()
+    session.get_bind.return_value.url.render_as_string.return_value = url
+    session.execute.return_value.fetchall.return_value = [(1, "ABC", 123, "NASDAQ")]
+    return session
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    reads = {"columns": 0, "revision": "rev1"}
+
+    def read_columns(session):
+        reads["columns"] += 1
+        return {k: set(v) for k, v in COLUMNS.items()}
+
+    monkeypatch.setattr(schema_cache, "_read_columns", read_columns)
+    monkeypatch.setattr(schema_cache, "_read_revision", lambda session: reads["revision"])
+    monkeypatch.setattr(schema_cache, "_shared_cache", SchemaCache(check_interval=0))
+    return reads
+
+
+def test_snapshot_lookups(catalog):
+    schema = schema_cache.get_schema(fake_session())
+    assert schema.has_table("Exchanges")
+    assert schema.has_column("securities", "exchange_id")
+    assert not schema.has_column("securities", "exchange")
+    assert not schema.has_table("filings")
+
+
+def test_catalog_read_once_per_url_and_revision(catalog):
+    session = fake_session()
+    for _ in range(5):
+        schema_cache.get_schema(session)
+    assert catalog["columns"] == 1
+
+    schema_cache.get_schema(fake_session("postgresql://ncfd@other/ncfd"))
+    assert catalog["columns"] == 2  # Different database, separate snapshot
+
+    catalog["revision"] = "rev2"  # Migration applied
+    assert schema_cache.get_schema(session).revision == "rev2"
+    assert catalog["columns"] == 3
+
+
+def test_best_us_security_sql_built_once(catalog, monkeypatch):
+    built = []
+    real = candidates._security_rank_sql
+    monkeypatch.setattr(candidates, "_security_rank_sql", lambda schema: built.append(1) or real(schema))
+    session = fake_session()
+
+    for _ in range(3):
+        assert candidates._best_us_security(session, [1]) == {
+            1: {"ticker": "ABC", "cik": 123, "exchange": "NASDAQ"}
+        }
+
+    assert len(built) == 1
+    assert session.execute.call_count == 3  # Only the ranking query, no catalog probes
+    sql = str(session.execute.call_args[0][0])
+    assert "LEFT JOIN exchanges e" in sql and "e.code" in sql
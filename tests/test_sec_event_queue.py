@@ -0,0 +1,258 @@
+"""
+Tests for durable queueing in SecEventProcessor.
+
+The Postgres queue is replaced by an in-memory fake or SQLite so these run without a database.
+"""
+
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from unittest.mock import Mock
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+
+from ncfd.ingest.sec_types import EightKItem, ExtractionResult, FilingMetadata, TenKSection
+from ncfd.pipeline.sec_event_processor import ClinicalDevelopmentUpdate, SecEventProcessor, TrialEvent
+from ncfd.pipeline.sec_event_queue import (
+    QueuedEvent, SecEventQueue, ENTITY_RESOLUTION, SIGNAL_EVALUATION, CLINICAL_UPDATES
+)
+
+
+class FakeQueue:
+    """In-memory stand-in for SecEventQueue."""
+
+    def __init__(self):
+        self.rows = []
+        self.reviews = {}
+
+    def append_batch(self, rows):
+        keys = {(r['queue'], r['dedupe_key']) for r in self.rows}
+        new = [r for r in rows if (r['queue'], r['dedupe_key']) not in keys]
+        self.rows.extend(new)
+        return len(new)
+
+    def drain(self, queue, handler, batch_size=100, max_batches=None):
+        processed = 0
+        for i, row in enumerate(r for r in self.rows if r['queue'] == queue):
+            handler(QueuedEvent(
+                event_id=i, queue=queue, event_type=row['event_type'],
+                filing_id=row['filing_id'], company_cik=row['company_cik'],
+                payload={k: (v.isoformat() if hasattr(v, 'isoformat') else v)
+                         for k, v in row['payload'].items()},
+                attempts=1,
+            ))
+            processed += 1
+        return {'processed': processed, 'failed': 0, 'batches': 1}
+
+    def add_review_items(self, items):
+        new = [dict(i) for i in items if i['item_id'] not in self.reviews]
+        self.reviews.update((i['item_id'], i) for i in new)
+        return len(new)
+
+    def review_items(self, status=None):
+        return [dict(r) for r in self.reviews.values() if status is None or r['review_status'] == status]
+
+    def set_review_status(self, item_id, status, notes=None):
+        if item_id not in self.reviews:
+            return False
+        self.reviews[item_id].update(review_status=status, review_notes=notes, reviewed_at=datetime(2025, 8, 2))
+        return True
+
+    def review_counts(self):
+        counts = {}
+        for r in self.reviews.values():
+            counts[r['review_status']] = counts.get(r['review_status'], 0) + 1
+        return counts
+
+
+def _metadata():
+    return FilingMetadata(
+        cik=1234, accession="0001234-25-000001", form_type="8-K",
+        filing_date=date(2025, 8, 1), company_name="Acme Bio",
+        description="8-K", url="https://example.com",
+    )
+
+
+def _extraction_result():
+    item = EightKItem(
+        item_number="8.01", title="Other Events", content="...", content_hash="abc",
+        trial_events=["safety_signal"], safety_signals=["hepatotoxicity"], confidence=0.9,
+    )
+    item.requires_review = False
+    return ExtractionResult(filing_id="1234_x", extraction_type="8k", extracted_items=[item])
+
+
+def test_trial_events_are_queued_not_held_in_memory():
+    queue = FakeQueue()
+    processor = SecEventProcessor({}, event_queue=queue)
+
+    summary = processor.process_extraction_result(_extraction_result(), _metadata())
+
+    assert summary['trial_events'] == 1
+    assert summary['review_items'] == 1
+    assert processor.trial_events == []
+    assert {r['queue'] for r in queue.rows} == {ENTITY_RESOLUTION, SIGNAL_EVALUATION}
+
+
+def _ten_k_result():
+    section = TenKSection(
+        section_name="Business", content="...", content_hash="def",
+        clinical_development=["Phase 3"], confidence=0.5,
+    )
+    section.primary_endpoints, section.secondary_endpoints = ["PFS"], []
+    section.requires_review = False
+    return ExtractionResult(filing_id="1234_y", extraction_type="10k", extracted_items=[section])
+
+
+def test_review_items_are_persisted_with_queue_enabled():
+    queue = FakeQueue()
+    processor = SecEventProcessor({}, event_queue=queue)
+    processor.process_extraction_result(_extraction_result(), _metadata())
+
+    assert processor.review_queue == []
+    [item] = processor.get_review_queue("pending")
+    assert item.item_id in queue.reviews and item.item_type == "trial_event"
+
+    # A fresh processor (e.g. after a crash) sees the same durable review queue
+    reviewer = SecEventProcessor({}, event_queue=queue)
+    reviewer.update_review_status(item.item_id, "approved", "checked")
+
+    [approved] = processor.get_review_queue("approved")
+    assert approved.item_id == item.item_id and approved.review_notes == "checked"
+    summary = processor.get_processing_summary()
+    assert summary['review_queue_size'] == 1 and summary['pending_reviews'] == 0
+
+    processor.process_extraction_result(_extraction_result(), _metadata())
+    assert len(queue.reviews) == 1  # Replays keep one review item
+
+
+def test_clinical_updates_are_queued_and_consumed():
+    queue = FakeQueue()
+    processor = SecEventProcessor({}, event_queue=queue)
+
+    summary = processor.process_extraction_result(_ten_k_result(), _metadata())
+
+    assert summary['clinical_updates'] == 1 and summary['review_items'] == 1
+    assert processor.clinical_updates == []
+    assert [r['queue'] for r in queue.rows] == [CLINICAL_UPDATES]
+
+    applied = []
+    processor._apply_clinical_update = applied.append
+    assert processor.run_clinical_update_consumer()['processed'] == 1
+    assert isinstance(applied[0], ClinicalDevelopmentUpdate)
+    assert applied[0].primary_endpoints == ["PFS"]
+
+
+def test_replayed_filing_is_deduplicated():
+    queue = FakeQueue()
+    processor = SecEventProcessor({}, event_queue=queue)
+
+    processor.process_extraction_result(_extraction_result(), _metadata())
+    processor.process_extraction_result(_extraction_result(), _metadata())
+
+    assert len(queue.rows) == 2
+
+
+def test_consumers_rebuild_events_from_payload():
+    queue = FakeQueue()
+    processor = SecEventProcessor({}, event_queue=queue)
+    processor.process_extraction_result(_extraction_result(), _metadata())
+
+    handled = []
+    processor._evaluate_signals_for_event = handled.append
+
+    stats = processor.run_signal_evaluation_consumer()
+
+    assert stats['processed'] == 1
+    assert isinstance(handled[0], TrialEvent)
+    assert handled[0].filing_date == date(2025, 8, 1)
+
+
+def test_without_queue_events_stay_in_memory():
+    processor = SecEventProcessor({})
+
+    processor.process_extraction_result(_extraction_result(), _metadata())
+
+    assert len(processor.trial_events) == 1
+
+
+@contextmanager
+def _sqlite_queue_session():
+    engine = create_engine("sqlite://")
+    event.listen(engine, "connect", lambda conn, _: conn.create_function(
+        "now", 0, lambda: datetime(2025, 8, 1, 12, 0).isoformat(" ")))
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE sec_event_queue (event_id INTEGER, queue TEXT, status TEXT, "
+            "leased_by TEXT, lease_expires_at TEXT, attempts INTEGER, last_error TEXT)"
+        ))
+        expired = (datetime(2025, 8, 1, 12, 0) - timedelta(minutes=5)).isoformat(" ")
+        live = (datetime(2025, 8, 1, 12, 0) + timedelta(minutes=5)).isoformat(" ")
+        conn.execute(text(
+            "INSERT INTO sec_event_queue VALUES "
+            "(1, 'signal_evaluation', 'leased', 'dead:1', :expired, 5, NULL), "
+            "(2, 'signal_evaluation', 'leased', 'dead:1', :expired, 2, NULL), "
+            "(3, 'signal_evaluation', 'leased', 'live:2', :live, 5, NULL)"
+        ), {"expired": expired, "live": live})
+    with Session(engine) as s:
+        yield s
+
+
+def test_expired_lease_on_last_attempt_is_failed():
+    with _sqlite_queue_session() as session:
+        queue = SecEventQueue(session_factory=lambda: session, max_attempts=5)
+
+        assert queue._fail_exhausted(session, SIGNAL_EVALUATION) == 1
+
+        rows = session.execute(text(
+            "SELECT event_id, status, leased_by, last_error FROM sec_event_queue ORDER BY event_id"
+        )).all()
+        assert rows[0] == (1, 'failed', None, 'lease expired after final attempt')
+        assert rows[1][1] == 'leased'  # Retries remain; lease() re-claims it
+        assert rows[2][1] == 'leased'  # Lease still held
+
+
+def test_review_status_updates_in_review_table():
+    engine = create_engine("sqlite://")
+    event.listen(engine, "connect", lambda conn, _: conn.create_function("now", 0, lambda: "2025-08-02"))
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE sec_review_items (item_id TEXT PRIMARY KEY, filing_id TEXT, company_cik INTEGER, "
+            "item_type TEXT, reason TEXT, confidence REAL, extracted_content TEXT, evidence_spans TEXT, "
+            "flagged_at TEXT, assigned_to TEXT, review_status TEXT, review_notes TEXT, reviewed_at TEXT)"
+        ))
+        conn.execute(text(
+            "INSERT INTO sec_review_items (item_id, item_type, flagged_at, review_status) VALUES "
+            "('trial_event_a', 'trial_event', '2025-08-01', 'pending'), "
+            "('trial_event_b', 'trial_event', '2025-08-01', 'pending')"
+        ))
+
+    @contextmanager
+    def session_factory():
+        with Session(engine) as session:
+            yield session
+            session.commit()
+
+    queue = SecEventQueue(session_factory=session_factory)
+
+    assert queue.set_review_status("trial_event_b", "approved", "ok")
+    assert not queue.set_review_status("missing", "approved")
+    assert [r['item_id'] for r in queue.review_items("pending")] == ["trial_event_a"]
+    assert queue.review_items("approved")[0]['reviewed_at'] == "2025-08-02"
+    assert queue.review_counts() == {"pending": 1, "approved": 1}
+
+
+def test_lease_fails_exhausted_events_before_claiming():
+    calls = []
+
+    @contextmanager
+    def session_factory():
+        session = Mock()
+        session.execute.return_value.mappings.return_value.all.return_value = []
+        yield session
+
+    queue = SecEventQueue(session_factory=session_factory)
+    queue._fail_exhausted = lambda session, name: calls.append(name)
+
+    assert queue.lease(SIGNAL_EVALUATION) == []
+    assert calls == [SIGNAL_EVALUATION]
@@ -0,0 +1,143 @@
+"""
+Tests for the SEC section relevance pre-filter.
+
+These tests run without a database connection.
+"""
+
+import hashlib
+
+from ncfd.ingest.sec_relevance import SectionRelevanceScorer
+from ncfd.ingest.sec_types import DocumentSection
+
+
+def _section(title: str, content: str) -> DocumentSection:
+    return DocumentSection(
+        title=title,
+        content=content,
+        content_hash=hashlib.sha256(content.encode()).hexdigest(),
+        start_offset=0,
+        end_offset=len(content),
+    )
+
+
+TRIAL_TEXT = (
+    "Our pivotal Phase 3 trial of AB-123 (NCT01234567) met its primary endpoint. "
+    "The randomized, double-blind, placebo-controlled study enrolled 600 patients."
+)
+
+BOILERPLATE_TEXT = (
+    "We lease approximately 40,000 square feet of office space in Cambridge, "
+    "Massachusetts under a lease that expires in 2029. We believe our facilities "
+    "are adequate for our current needs."
+)
+
+
+class TestSectionRelevanceScorer:
+    """Test relevance scoring and routing."""
+
+    def test_trial_text_scores_above_boilerplate(self):
+        scorer = SectionRelevanceScorer()
+        assert scorer.score(TRIAL_TEXT) > scorer.threshold
+        assert scorer.score(BOILERPLATE_TEXT) < scorer.threshold
+
+    def test_known_inns_are_counted(self):
+        scorer = SectionRelevanceScorer(known_inns=["pembrolizumab"])
+        features = scorer.extract_features("Sales of Pembrolizumab grew this quarter.")
+        assert features['inn'] > 0
+
+    def test_filter_sections_routes_relevant_only(self):
+        scorer = SectionRelevanceScorer({'audit_sample_rate': 0.0})
+        trial = _section("Clinical Development", TRIAL_TEXT)
+        props = _section("Properties", BOILERPLATE_TEXT)
+
+        routed = scorer.filter_sections([trial, props])
+
+        assert routed == [trial]
+        assert scorer.stats['routed'] == 1
+        assert scorer.stats['rejected'] == 1
+
+    def test_audit_sample_routes_rejected_sections(self):
+        scorer = SectionRelevanceScorer({'audit_sample_rate': 1.0})
+        props = _section("Properties", BOILERPLATE_TEXT)
+
+        routed = scorer.filter_sections([props])
+
+        assert routed == [props]
+        assert scorer.stats['audited'] == 1
+
+    def test_recall_estimate_from_audit_outcomes(self):
+        scorer = SectionRelevanceScorer({'audit_sample_rate': 1.0})
+        trial = _section("Clinical Development", TRIAL_TEXT)
+        props = _section("Properties", BOILERPLATE_TEXT)
+
+        routed = scorer.filter_sections([trial, props])
+        assert scorer.estimated_recall() is None
+
+        scorer.record_outcomes(routed, {trial.content_hash, props.content_hash})
+
+        assert scorer.stats['routed_positive'] == 1
+        assert scorer.stats['audit_positive'] == 1
+        assert scorer.estimated_recall() == 0.5
+
+
+class TestDatabaseVocabulary:
+    """Test that the pipeline's scorer uses the DB-backed vocabulary."""
+
+    def test_db_aliases_raise_section_score(self):
+        from sqlalchemy import create_engine, text
+        from sqlalchemy.orm import Session
+
+        engine = create_engine("sqlite://")
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE asset_aliases (alias_norm TEXT, alias_type TEXT)"))
+            conn.execute(text(
+                "INSERT INTO asset_aliases VALUES ('zanubrutinib', 'inn'), ('bgb-3111', 'code')"
+            ))
+
+        text_ = "Zanubrutinib (BGB-3111) revenue grew and the label was expanded."
+        builtin = SectionRelevanceScorer.from_config({'load_db_vocabulary': False})
+        with Session(engine) as session:
+            scorer = SectionRelevanceScorer.from_config({}, session)
+
+        assert scorer.extract_features(text_)['inn'] > 0
+        assert builtin.extract_features(text_)['inn'] == 0
+        assert scorer.score(text_) > builtin.score(text_)
+
+    def test_missing_vocabulary_falls_back_to_builtin_terms(self):
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import Session
+
+        with Session(create_engine("sqlite://")) as session:
+            scorer = SectionRelevanceScorer.from_config({}, session)
+
+        assert scorer.score(TRIAL_TEXT) > scorer.threshold
+
+
+class TestLargeVocabulary:
+    """Test that scoring cost does not grow with vocabulary size."""
+
+    def test_scores_section_against_50k_terms(self):
+        import time
+
+        inns = [f"testimab{i:05d}" for i in range(40000)]
+        codes = [f"zz-{i:05d}" for i in range(10000)]
+        scorer = SectionRelevanceScorer(known_terms=codes, known_inns=inns)
+
+        section = " ".join(
+            [TRIAL_TEXT, "Revenue from testimab01234 and ZZ-00042 grew.", BOILERPLATE_TEXT] * 60
+        )
+        assert len(section.split()) > 2000
+
+        started = time.perf_counter()
+        features = scorer.extract_features(section)
+        elapsed = time.perf_counter() - started
+
+        assert features['inn'] > 0
+        assert features['asset_code'] > 0
+        assert elapsed < 0.1
+
+    def test_nested_phrase_counted_once(self):
+        scorer = SectionRelevanceScorer()
+        assert scorer.extract_features("A phase 1/2 study.")['trial_terms'] == \
+            scorer.extract_features("A phase 2 study.")['trial_terms']
+        assert scorer.extract_features("Subphase 2 work.")['trial_terms'] == 0
@@ -220,6 +220,25 @@ class TestLocalStorageBackend:
         assert backend.delete(storage_uri)
         assert not backend.exists(storage_uri)
     
+    def test_store_file_and_open_stream(self, local_config):
+        """Test storing a staged file by move and reading it back as a stream."""
+        from ncfd.storage.fs import LocalStorageBackend
+        backend = LocalStorageBackend(local_config)
+        
+        content = b"Streamed content" * 1000
+        import hashlib
+        sha256 = hashlib.sha256(content).hexdigest()
+        
+        staged = backend.staging_dir() / "fetch.part"
+        staged.write_bytes(content)
+        
+        storage_uri = backend.store_file(staged, None, "streamed.html", {'source': 'test'})
+        
+        assert storage_uri == f"local://{sha256}/streamed.html"
+        assert not staged.exists()  # Moved, not copied
+        with backend.open_stream(storage_uri) as stream:
+            assert stream.read() == content
+    
     def test_get_storage_info(self, local_config):
         """Test storage information retrieval."""
         from ncfd.storage.fs import LocalStorageBackend
@@ -0,0 +1,104 @@
+"""
+Tests for cached Study Card extraction through the real StudyCardAdapter.
+
+LangExtract's `lx.extract` is replaced by a counting fake so these run without an API key.
+"""
+
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import ncfd.extract.lanextract_adapter as adapter_module
+from ncfd.extract.lanextract_adapter import ModelConfig, StudyCardAdapter
+from ncfd.extract.study_card_batch import StudyCardExtractionScheduler, StudyCardJob
+from ncfd.extract.study_card_cache import StudyCardCache
+
+EVIDENCE = [{"loc": {"scheme": "page_paragraph", "page": 1, "paragraph": 1}}]
+
+CARD = {
+    "doc": {"doc_type": "Abstract", "title": "BRIGHT-1", "year": 2025,
+            "url": "https://conf.org/abs/BRIGHT1", "source_id": "abs_bright1"},
+    "trial": {"nct_id": "NCT87654321", "phase": "3", "indication": "Psoriasis", "is_pivotal": True},
+    "primary_endpoints": [{"name": "PASI-75 at Week 16", "evidence": EVIDENCE}],
+    "populations": {"itt": {"defined": True, "text": "ITT", "evidence": EVIDENCE},
+                    "pp": {"defined": False, "text": None, "evidence": []},
+                    "analysis_primary_on": "ITT"},
+    "arms": [{"label": "BX-12", "n": 440, "evidence": EVIDENCE}],
+    "sample_size": {"total_n": 660, "evidence": EVIDENCE},
+    "results": {"primary": [{"endpoint": "PASI-75 at Week 16", "p_value": 0.001, "evidence": EVIDENCE}]},
+    "coverage_level": "high",
+}
+
+
+class FakeExtract:
+    """Counts lx.extract calls; optionally slow to widen race windows."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, **kwargs):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return SimpleNamespace(extractions=[SimpleNamespace(extraction_text=json.dumps(CARD))])
+
+
+@pytest.fixture
+def fake_extract(monkeypatch):
+    monkeypatch.delenv(ModelConfig.OPENAI["env_var"], raising=False)
+    monkeypatch.setenv(ModelConfig.GEMINI["env_var"], "test-key")
+    fake = FakeExtract(delay=0.05)
+    monkeypatch.setattr(adapter_module.lx, "extract", fake)
+    return fake
+
+
+def job(source_id, text="Results: PASI-75 met at Week 16."):
+    return StudyCardJob(doc_meta={"source_id": source_id}, pages=[{"page_no": 1, "text": text}])
+
+
+def test_cache_hit_skips_extract_and_on_miss(tmp_path, fake_extract):
+    payload = {"document_metadata": {"source_id": "abs_bright1"}, "text_chunks": [], "trial_context": {}}
+    misses = []
+
+    first = StudyCardAdapter(cache=StudyCardCache(tmp_path)).extract_payload(payload, on_miss=lambda: misses.append(1))
+    # A fresh adapter (new run) reads the persisted card
+    second = StudyCardAdapter(cache=StudyCardCache(tmp_path)).extract_payload(payload, on_miss=lambda: misses.append(1))
+
+    assert first == second == CARD
+    assert fake_extract.calls == 1
+    assert misses == [1]
+
+
+def test_concurrent_duplicate_windows_make_one_call(tmp_path, fake_extract):
+    adapter = StudyCardAdapter(cache=StudyCardCache(tmp_path))
+    scheduler = StudyCardExtractionScheduler({"max_concurrency": 4}, adapter=adapter)
+
+    results = scheduler.extract_many([job("abs_bright1") for _ in range(4)])
+
+    assert all(r.card == CARD for r in results)
+    assert fake_extract.calls == 1
+    stats = scheduler.get_run_stats()
+    assert stats["llm_calls"] == 1 and stats["cache_hits"] == 3
+
+
+def test_cached_windows_skip_budget(tmp_path, fake_extract):
+    adapter = StudyCardAdapter(cache=StudyCardCache(tmp_path))
+    jobs = [job(f"doc{i}") for i in range(3)]
+
+    first = StudyCardExtractionScheduler({"max_llm_calls_per_run": 3}, adapter=adapter)
+    assert all(r.card for r in first.extract_many(jobs))
+
+    rerun = StudyCardExtractionScheduler({"max_llm_calls_per_run": 0}, adapter=adapter)
+    results = rerun.extract_many(jobs + [job("doc9")])
+
+    assert [r.card is not None for r in results] == [True, True, True, False]
+    assert results[3].budget_skipped
+    assert fake_extract.calls == 3
+    assert rerun.get_run_stats()["cache_hits"] == 3
+    # A budget-skipped window is not cached, so a later run can still extract it
+    assert adapter.cache.get_stats()["writes"] == 3
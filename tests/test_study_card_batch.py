@@ -0,0 +1,138 @@
+"""
+Tests for paragraph chunking and concurrent Study Card extraction.
+"""
+
+import threading
+import time
+
+from ncfd.extract.chunking import create_text_chunks_from_pages, pack_windows
+from ncfd.extract.study_card_batch import StudyCardExtractionScheduler, StudyCardJob
+
+
+class FakeAdapter:
+    prompts = "Extract a Study Card."
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.payloads = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def extract_payload(self, payload, on_miss=None):
+        # No cache here; cache, lock and on_miss ordering are covered against
+        # the real StudyCardAdapter in test_study_card_adapter.py
+        if on_miss is not None:
+            on_miss()
+        return self._call(payload)
+
+    def _call(self, payload):
+        with self._lock:
+            self.payloads.append(payload)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        if "fail" in payload["document_metadata"]["source_id"]:
+            raise ValueError("Invalid JSON returned")
+        texts = " ".join(c["text"] for c in payload["text_chunks"])
+        return {"doc": payload["document_metadata"], "coverage_level": "high" if "Results" in texts else "low"}
+
+
+def job(source_id, *pages):
+    return StudyCardJob(
+        doc_meta={"source_id": source_id},
+        pages=[{"page_no": i + 1, "text": text} for i, text in enumerate(pages)],
+    )
+
+
+def test_chunk_offsets_point_into_page_text():
+    page = "  Methods: randomized.\n\n\n\nResults: met primary endpoint.  \n\n \n\nSafety."
+    chunks = create_text_chunks_from_pages([{"page_no": 2, "text": page}])
+
+    assert [(c["page"], c["paragraph"], c["text"]) for c in chunks] == [
+        (2, 1, "Methods: randomized."),
+        (2, 3, "Results: met primary endpoint."),
+        (2, 5, "Safety."),
+    ]
+    assert all(page[c["start"]:c["end"]] == c["text"] for c in chunks)
+
+
+def test_long_paragraphs_split_and_windows_respect_budget():
+    long_para = " ".join(f"word{i}" for i in range(400))
+    page = "Intro.\n\n" + long_para
+    chunks = create_text_chunks_from_pages([{"text": page}], max_chunk_tokens=100)
+
+    assert all(len(c["text"]) <= 400 for c in chunks)
+    assert {c["paragraph"] for c in chunks[1:]} == {2}
+    assert " ".join(c["text"] for c in chunks[1:]) == long_para
+    assert all(page[c["start"]:c["end"]] == c["text"] for c in chunks)
+
+    windows = pack_windows(chunks, max_tokens=250)
+    assert [c for w in windows for c in w] == chunks
+    assert len(windows) > 1
+    assert all(sum(len(c["text"]) // 4 + 16 for c in w) <= 250 for w in windows)
+
+
+def test_documents_extracted_concurrently_with_windows_merged():
+    adapter = FakeAdapter(delay=0.05)
+    scheduler = StudyCardExtractionScheduler(
+        {"max_concurrency": 4, "max_window_tokens": 40, "max_chunk_tokens": 20}, adapter=adapter
+    )
+    jobs = [job(f"doc{i}", "Background text for this study.", "Results: primary endpoint met.") for i in range(4)]
+    jobs.append(job("fail1", "Results: unparseable."))
+
+    results = scheduler.extract_many(jobs)
+
+    assert [r.source_id for r in results] == ["doc0", "doc1", "doc2", "doc3", "fail1"]
+    assert all(r.windows == 2 and r.card["coverage_level"] == "high" for r in results[:4])
+    assert results[4].card is None and results[4].errors == ["Invalid JSON returned"]
+    assert adapter.peak > 1
+    assert scheduler.get_run_stats()["llm_calls"] == 9
+
+
+class SplitFactsAdapter(FakeAdapter):
+    """Each window reports only the arms and endpoints found in its own text."""
+
+    def _call(self, payload):
+        texts = " ".join(c["text"] for c in payload["text_chunks"])
+        arms = [{"label": "Placebo"}] + ([{"label": "Drug 10 mg"}] if "Drug" in texts else [])
+        return {
+            "doc": payload["document_metadata"],
+            "trial": {"nct_id": "NCT01234567", "phase": None if "Drug" in texts else "3"},
+            "arms": arms,
+            "primary_endpoints": [{"name": "PFS"}] if "PFS" in texts else [{"name": "OS"}],
+            "coverage_level": "high" if "Drug" in texts else "medium",
+        }
+
+
+def test_facts_split_across_windows_are_merged():
+    adapter = SplitFactsAdapter()
+    scheduler = StudyCardExtractionScheduler(
+        {"max_window_tokens": 40, "max_chunk_tokens": 20}, adapter=adapter
+    )
+
+    [result] = scheduler.extract_many([job("doc1", "Phase 3 OS endpoint.", "Drug 10 mg arm; PFS endpoint.")])
+
+    assert result.windows == 2
+    assert result.card["arms"] == [{"label": "Placebo"}, {"label": "Drug 10 mg"}]
+    assert result.card["primary_endpoints"] == [{"name": "PFS"}, {"name": "OS"}]
+    assert result.card["trial"] == {"nct_id": "NCT01234567", "phase": "3"}
+    assert result.card["coverage_level"] == "high"
+
+
+def test_call_budget_and_rate_limit():
+    adapter = FakeAdapter()
+    scheduler = StudyCardExtractionScheduler(
+        {"max_concurrency": 3, "max_llm_calls_per_run": 2, "requests_per_minute": 1200}, adapter=adapter
+    )
+    started = time.monotonic()
+    results = scheduler.extract_many([job(f"doc{i}", "Results: met.") for i in range(4)])
+    elapsed = time.monotonic() - started
+
+    assert sum(r.card is not None for r in results) == 2
+    assert sum(r.budget_skipped for r in results) == 2
+    assert scheduler.get_run_stats()["budget_skips"] == 2
+    assert elapsed >= 0.05  # second request waits one 50 ms slot
+
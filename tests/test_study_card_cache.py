@@ -0,0 +1,55 @@
+"""
+Tests for the persistent Study Card extraction cache.
+"""
+
+from ncfd.extract.study_card_cache import StudyCardCache
+
+PAYLOAD = {
+    "document_metadata": {"source_id": "pr_topaz_2024", "title": "TOPAZ results"},
+    "text_chunks": [{"page": 1, "paragraph": 1, "text": "The study met its primary endpoint.", "start": 0, "end": 35}],
+    "trial_context": {"nct_id": "NCT12345678"},
+}
+CARD = {"doc": {"source_id": "pr_topaz_2024"}, "coverage_level": "med"}
+
+
+def test_cache_persists_across_instances(tmp_path):
+    cache = StudyCardCache(tmp_path)
+    key = cache.key(PAYLOAD, "prompt v1", "gpt-5-mini")
+
+    assert cache.get(key) is None
+    cache.put(key, CARD)
+
+    reopened = StudyCardCache(tmp_path)
+    assert reopened.get(reopened.key(dict(reversed(PAYLOAD.items())), "prompt v1", "gpt-5-mini")) == CARD
+    assert cache.get_stats() == {"hits": 0, "misses": 1, "writes": 1, "errors": 0}
+    assert reopened.get_stats()["hits"] == 1
+
+
+def test_key_changes_with_document_prompt_and_model(tmp_path):
+    cache = StudyCardCache(tmp_path)
+    base = cache.key(PAYLOAD, "prompt v1", "gpt-5-mini")
+    edited = dict(PAYLOAD, trial_context={"nct_id": "NCT00000000"})
+
+    assert cache.key(PAYLOAD, "prompt v1", "gpt-5-mini") == base
+    assert cache.key(edited, "prompt v1", "gpt-5-mini") != base
+    assert cache.key(PAYLOAD, "prompt v2", "gpt-5-mini") != base
+    assert cache.key(PAYLOAD, "prompt v1", "gemini-1.5-pro") != base
+
+
+def test_disabled_cache_never_hits(tmp_path):
+    cache = StudyCardCache(tmp_path / "off", enabled=False)
+    key = cache.key(PAYLOAD, "prompt v1", "gpt-5-mini")
+    cache.put(key, CARD)
+
+    assert cache.get(key) is None
+    assert not (tmp_path / "off").exists()
+
+
+def test_corrupt_entry_counts_as_miss(tmp_path):
+    cache = StudyCardCache(tmp_path)
+    key = cache.key(PAYLOAD, "prompt v1", "gpt-5-mini")
+    cache.put(key, CARD)
+    (tmp_path / key[:2] / f"{key}.json").write_text("{not json")
+
+    assert cache.get(key) is None
+    assert cache.get_stats()["errors"] == 1
@@ -0,0 +1,101 @@
+"""
+Tests for incremental, parallel EX-21 subsidiary harvesting.
+"""
+
+import inspect
+from contextlib import contextmanager
+from unittest.mock import Mock
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+import ncfd.ingest.subsidiaries as subs
+
+FCOL = {"cik": "cik", "form": "form_type", "date": "filing_date", "accession": "accession_no"}
+DCOL = {"accession": "accession_no", "doc_type": "doc_type", "description": "description", "path": "local_path"}
+
+EX21 = """EXHIBIT 21.1
+
+SUBSIDIARIES OF THE REGISTRANT
+
+Acme Therapeutics GmbH
+Acme Bio Ltd
+"""
+
+
+def _sources(monkeypatch):
+    monkeypatch.setattr(subs, "_resolve_sources", lambda *a: ("sec_filings", FCOL, "sec_documents", DCOL))
+
+
+def test_incremental_is_the_default():
+    assert inspect.signature(subs.build_subs).parameters["incremental"].default.default is True
+
+
+def test_incremental_query_skips_processed_exhibits(monkeypatch):
+    _sources(monkeypatch)
+    session = Mock()
+
+    subs._ex21_documents(session, "2018-01-01", 10, incremental=True)
+    subs._ex21_documents(session, "2018-01-01", 10, incremental=False)
+
+    incremental_sql, full_sql = (str(c[0][0]) for c in session.execute.call_args_list)
+    assert "NOT EXISTS" in incremental_sql and "ex21_processed_exhibits p" in incremental_sql
+    assert "p.accession_no = f.accession_no" in incremental_sql
+    assert "p.local_path = d.local_path" in incremental_sql
+    assert "ex21_processed_exhibits" not in full_sql
+
+
+def test_bulk_upsert_dedupes_aliases():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE company_aliases (company_id INTEGER, alias_type TEXT, alias TEXT, "
+            "alias_norm TEXT, source TEXT, UNIQUE (company_id, alias_norm, alias_type))"
+        ))
+
+    pairs = [(1, "Acme Bio Ltd"), (1, "ACME BIO LTD"), (2, "Acme Bio Ltd"), (1, "Acme Therapeutics GmbH")]
+    with Session(engine) as s:
+        assert subs._insert_aliases_bulk(s, pairs, chunk_size=2) == 3
+        assert subs._insert_aliases_bulk(s, pairs) == 0  # Re-harvest inserts nothing
+
+        rows = s.execute(text("SELECT company_id, alias FROM company_aliases ORDER BY company_id, alias")).all()
+    assert rows == [(1, "Acme Bio Ltd"), (1, "Acme Therapeutics GmbH"), (2, "Acme Bio Ltd")]
+
+
+def test_mark_processed_writes_one_row_per_exhibit():
+    session = Mock()
+
+    subs._mark_processed(session, [("acc-1", "/a.htm", 1, 2), ("acc-1", "/a.htm", 1, 2), ("acc-2", "/b.htm", 1, 0)])
+
+    params = session.execute.call_args[0][1]
+    assert params == {"accs": ["acc-1", "acc-2"], "paths": ["/a.htm", "/b.htm"], "cids": [1, 1], "counts": [2, 0]}
+
+
+def test_build_subs_parses_in_process_pool_and_records_exhibits(monkeypatch, tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"ex21_{i}.txt"
+        path.write_text(EX21)
+        paths.append(str(path))
+    rows = [(7, 1234, "10-K", "2024-03-01", f"acc-{i}", "EX-21.1", "Subsidiaries", p) for i, p in enumerate(paths)]
+    rows.append((7, 1234, "10-K", "2024-03-01", "acc-9", "EX-21", "Subsidiaries", str(tmp_path / "missing.txt")))
+
+    @contextmanager
+    def fake_session():
+        yield Mock()
+
+    calls = {}
+    monkeypatch.setattr(subs, "get_session", fake_session)
+    monkeypatch.setattr(subs, "_ex21_documents", lambda *a, **kw: calls.setdefault("incremental", kw["incremental"]) and rows)
+    monkeypatch.setattr(subs, "_insert_aliases_bulk", lambda s, pairs: calls.setdefault("pairs", pairs) and 2)
+    monkeypatch.setattr(subs, "_mark_processed", lambda s, processed: calls.setdefault("processed", processed))
+
+    overrides = {name: None for name in subs._common_cli_overrides()}
+    subs.build_subs(since="2018-01-01", limit=10, dry_run=False, debug=False,
+                    incremental=True, workers=2, **overrides)
+
+    assert calls["incremental"] is True
+    assert sorted(set(name for _, name in calls["pairs"])) == ["Acme Bio Ltd", "Acme Therapeutics GmbH"]
+    # Exhibits whose body could not be loaded are retried next run rather than marked processed
+    assert [p[0] for p in calls["processed"]] == ["acc-0", "acc-1", "acc-2"]
+    assert all(p[3] == 2 for p in calls["processed"])
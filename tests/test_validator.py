@@ -0,0 +1,78 @@
+"""
+Tests for the precompiled Study Card validator and combined card check.
+"""
+
+import copy
+
+import jsonschema
+import pytest
+
+from ncfd.extract.validator import (
+    check_card,
+    get_coverage_level,
+    get_validator,
+    validate_card,
+    validate_card_completeness,
+    validate_evidence_spans,
+)
+
+EVIDENCE = [{"loc": {"scheme": "page_paragraph", "page": 1, "paragraph": 1}}]
+
+CARD = {
+    "doc": {"doc_type": "Abstract", "title": "BRIGHT-1", "year": 2025,
+            "url": "https://conf.org/abs/BRIGHT1", "source_id": "abs_bright1"},
+    "trial": {"nct_id": "NCT87654321", "phase": "3", "indication": "Psoriasis", "is_pivotal": True},
+    "primary_endpoints": [{"name": "PASI-75 at Week 16", "evidence": EVIDENCE}],
+    "populations": {"itt": {"defined": True, "text": "ITT", "evidence": EVIDENCE},
+                    "pp": {"defined": False, "text": None, "evidence": []},
+                    "analysis_primary_on": "ITT"},
+    "arms": [{"label": "BX-12", "n": 440, "evidence": EVIDENCE}],
+    "sample_size": {"total_n": 660, "evidence": EVIDENCE},
+    "results": {"primary": [{"endpoint": "PASI-75 at Week 16", "p_value": 0.001, "evidence": EVIDENCE}]},
+    "coverage_level": "high",
+}
+
+
+def test_validator_built_once():
+    assert get_validator() is get_validator()
+    assert get_validator().format_checker is not None
+
+
+def test_combined_check_matches_individual_functions():
+    card = copy.deepcopy(CARD)
+    del card["sample_size"]["evidence"]
+    card["results"]["primary"][0]["evidence"] = []
+    card["populations"]["analysis_primary_on"] = None
+
+    check = check_card(card)
+
+    assert check.is_valid
+    assert check.evidence_issues == validate_evidence_spans(card) == [
+        "sample_size.evidence", "results.primary[0].evidence"
+    ]
+    assert check.missing_fields == ["populations.analysis_primary_on"]
+    assert check.coverage_level == get_coverage_level(card) == "med"
+    with pytest.raises(ValueError, match="PivotalStudyMissingFields"):
+        validate_card(card, is_pivotal=True)
+
+
+def test_schema_errors_collected_with_best_match_first():
+    card = copy.deepcopy(CARD)
+    del card["doc"]["title"]
+    card["arms"][0]["n"] = 0
+
+    check = check_card(card)
+    assert len(check.schema_errors) == 2
+
+    with pytest.raises(jsonschema.ValidationError) as raised:
+        validate_card(card)
+    expected = jsonschema.exceptions.best_match(
+        jsonschema.Draft202012Validator(get_validator().schema).iter_errors(card)
+    )
+    assert raised.value.message == expected.message
+
+    results = validate_card_completeness(card)
+    assert not results["is_valid"]
+    assert results["coverage_level"] == "unknown"
+    assert results["schema_errors"][0] == str(expected)
+    assert len(results["schema_errors"]) == 2